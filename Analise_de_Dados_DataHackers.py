@@ -5,32 +5,97 @@
 
 
 # Importação de bibliotecas necessárias para a análise.
-from google.colab import drive # Importa a biblioteca 'drive' para interagir com o Google Drive no Google Colab.
 import pandas as pd # Importa a biblioteca 'pandas', essencial para manipulação e análise de dados tabulares.
                      # 'pd' é um alias comum e convencional para pandas.
 import numpy as np   # Importa a biblioteca 'numpy', fundamental para operações numéricas e estatísticas,
                      # especialmente com arrays e matrizes. 'np' é um alias comum.
 import matplotlib.pyplot as plt # Importa o módulo 'pyplot' da biblioteca 'matplotlib',
                                 # utilizado para criar visualizações estáticas e interativas. 'plt' é um alias comum.
-import seaborn as sns # Importa a biblioteca 'seaborn', construída sobre o matplotlib,
-                      # para criar gráficos estatísticos mais atraentes e informativos. 'sns' é um alias comum.
-import plotly.express as px # Importa o módulo 'express' da biblioteca 'plotly',
-                            # facilitando a criação de gráficos interativos e dinâmicos com poucas linhas de código. 'px' é um alias comum.
 from scipy import stats # Importa o módulo 'stats' da biblioteca 'scipy',
                         # que contém funções para estatística descritiva e inferencial, incluindo distribuições.
 import sqlite3 # Importa a biblioteca 'sqlite3' para interagir com bancos de dados SQLite.
+import os # Importa a biblioteca 'os' para montar os caminhos dos arquivos.
+from cache_colunar import carregar_planilha # Leitura das planilhas através do cache colunar (Parquet) em disco.
+from regras import aplicar_regra, REGRA_NOVO_NIVEL, REGRA_GERACAO # Regras vetorizadas da engenharia de features.
+from esquema import aplicar_esquema, relatorio_memoria # Esquema de colunas categóricas da pesquisa.
+from imputacao import ImputadorPorGrupo, ESTRATEGIA_PADRAO # Preenchimento de valores faltantes por grupo.
+from outliers import calcular_limites, medias_por_faixa, substituir_outliers # Limites e tratamento de outliers de salário.
+from intervalos import intervalos_t_por_dimensoes, intervalos_bootstrap # Intervalos de confiança por grupo.
+from associacao import cramer_coeficiente, matriz_associacao # V de Cramér e associação entre colunas categóricas.
+from fonte_sql import conectar, renda_por_estado, CONSULTA_RENDA_ESTADO # Acesso ao banco SQLite 'status_brasil'.
+from enriquecimento import anexar_colunas # Junção com tabelas de consulta sem copiar o DataFrame inteiro.
+from codificacao import CodificadorEsparso # One-Hot Encoding esparso com vocabulário fixo.
+from extracao_flags import extrair_flags # Flags de respostas em texto, calculadas por resposta distinta.
+from cubo import CuboAgregado # Agregados por GENERO/NIVEL/FAIXA IDADE/Estado/GESTOR? calculados uma única vez.
+from incremental import EstadoIncremental # Resumos combináveis para somar novas ondas da pesquisa.
+from perfil import perfilar # Perfil de todas as colunas (nulos, tipos, frequências, estatísticas) em uma passada.
+from indice_bitmap import IndiceBitmap # Filtros repetidos resolvidos por bitmaps pré-calculados.
+from correlacoes import correlacoes_com_alvo, correlacoes_pares # Correlações de todas as colunas, em blocos.
+from instrumentacao import Instrumentacao # Tempo, CPU, memória e tamanho dos dados de cada seção.
+from edicoes import gravar_edicao, ConjuntoEdicoes, salario_por_estado # Edições da pesquisa em Parquet particionado.
 
 ### Configuração e Carregamento de Dados
 
-# Montando o Google Drive para acessar os arquivos
-drive.mount('/content/drive/')
+# Mede o tempo de relógio e de CPU, a memória (RSS) e as dimensões de 'dados' em cada seção do script.
+# Cada 'instrumentacao.secao(nome, dados)' encerra a seção anterior e começa a próxima; no fim do script
+# o registro é gravado em 'instrumentacao.json' e acrescentado ao histórico 'historico_instrumentacao.csv',
+# que 'python instrumentacao.py historico_instrumentacao.csv' compara com a execução anterior.
+# Com a variável de ambiente 'DATAHACKERS_PERFILAR' definida, as seções também rodam sob o cProfile
+# e o perfil da seção mais lenta é gravado junto.
+instrumentacao = Instrumentacao(perfilar=bool(os.environ.get('DATAHACKERS_PERFILAR')))
+instrumentacao.secao('carregamento')
+
+# Montando o Google Drive para acessar os arquivos.
+# Fora do Google Colab (ex.: em um servidor Linux) não há Drive para montar: os arquivos são lidos
+# da pasta indicada pela variável de ambiente 'DATAHACKERS_DADOS' (ou da pasta atual).
+# Para execuções agendadas, sem gráficos na tela, use o 'executar_analise.py'.
+try:
+    from google.colab import drive # Importa a biblioteca 'drive' para interagir com o Google Drive no Google Colab.
+    EM_COLAB = True
+except ImportError:
+    EM_COLAB = False
+
+if EM_COLAB:
+    drive.mount('/content/drive/')
+    # Pasta do Google Drive onde ficam as planilhas, o CSV exportado e o banco SQLite.
+    DIRETORIO_DADOS = '/content/drive/MyDrive/Análise de Dados: Meus primeiros passos em python!'
+else:
+    DIRETORIO_DADOS = os.environ.get('DATAHACKERS_DADOS', '.')
 
 # Lendo os dados da planilha Excel para um DataFrame Pandas
 # O caminho especificado aponta para o arquivo 'planilha_modulo3.xlsx' no Google Drive.
-dados = pd.read_excel('/content/drive/MyDrive/Análise de Dados: Meus primeiros passos em python!/planilha_modulo3.xlsx')
+# 'carregar_planilha' converte o Excel para Parquet apenas na primeira execução;
+# nas seguintes o cache é lido diretamente, o que é bem mais rápido que o openpyxl.
+dados = carregar_planilha(os.path.join(DIRETORIO_DADOS, 'planilha_modulo3.xlsx'))
+
+# Converte as colunas de texto conhecidas ('GENERO', 'FAIXA IDADE', 'FAIXA SALARIAL', 'NIVEL', ...)
+# para o tipo 'category', com as categorias fixas definidas em 'esquema.py'.
+# Nessa conversão também são corrigidas grafias alternativas, como '+55' -> '55+'
+# e o espaço no início de ' Acima de R$ 40.001/mês'.
+# O relatório mostra o uso de memória de cada coluna antes e depois da conversão.
+dados_originais = dados
+dados = aplicar_esquema(dados)
+print(relatorio_memoria(dados_originais, dados))
+del dados_originais
+
+# Várias edições da pesquisa (2021, 2022, ...) podem ser empilhadas em um diretório Parquet
+# particionado por ano e por estado ('edicoes.py'), com os mesmos nomes e tipos de coluna em todos os anos.
+# Quando a variável de ambiente 'DATAHACKERS_EDICOES' aponta para esse diretório, a edição 2022
+# é gravada nele (substituindo uma gravação anterior do mesmo ano) e o salário por estado é
+# comparado entre as edições. A consulta lê do disco apenas a coluna 'SALARIO' dos respondentes
+# com 30 anos ou mais: ano e estado vêm dos nomes dos diretórios, e os grupos de linhas com
+# idades menores são descartados pelas estatísticas do Parquet, sem serem lidos.
+DIRETORIO_EDICOES = os.environ.get('DATAHACKERS_EDICOES')
+if DIRETORIO_EDICOES:
+    gravar_edicao(dados, 2022, DIRETORIO_EDICOES)
+    edicoes = ConjuntoEdicoes(DIRETORIO_EDICOES)
+    print(edicoes.plano(['SALARIO'], [('IDADE', '>=', 30)]))
+    print(salario_por_estado(edicoes, [('IDADE', '>=', 30)]))
 
 ### Análise Exploratória Inicial dos Dados
 
+instrumentacao.secao('exploracao', dados)
+
 # Exibe a quantidade de linhas (registros) no DataFrame.
 # 'len()' retorna o número de itens em um objeto.
 len(dados)
@@ -43,16 +108,18 @@ dados.shape
 # 'columns' é um atributo que contém o rótulo de cada coluna.
 dados.columns
 
-# Exibe um resumo conciso do DataFrame, incluindo o tipo de dado de cada coluna,
-# o número de valores não nulos e o uso de memória. Útil para verificar a integridade dos dados.
-dados.info()
-
-# Gera estatísticas descritivas para as colunas numéricas do DataFrame,
-# como contagem, média, desvio padrão, mínimo, quartis (25%, 50%, 75%) e máximo.
-dados.describe()
+# Perfil de todas as colunas em uma única passada pelos dados (no lugar de 'dados.info()' e 'dados.describe()'):
+# tipo, não nulos, nulos, valores distintos e o valor mais frequente de cada coluna e, nas colunas
+# numéricas, média, desvio padrão, mínimo, quartis (25%, 50%, 75%) e máximo.
+# O perfil também é gravado em JSON, para comparar com o de outras ondas da pesquisa ('perfil.comparar_perfis').
+perfil = perfilar(dados)
+perfil.salvar(os.path.join(DIRETORIO_DADOS, 'perfil_pesquisa.json'))
+perfil.tabela()
 
 ### Filtragem e Seleção de Dados
 
+instrumentacao.secao('filtragem', dados)
+
 # Seleciona e exibe todas as linhas onde a coluna 'GENERO' é exatamente 'Feminino'.
 dados[dados['GENERO'] == 'Feminino']
 
@@ -72,12 +139,33 @@ dados[(dados['IDADE'] > 30) & (dados['GENERO'] == 'Feminino')]
 # Seleciona linhas onde 'COR/RACA/ETNIA' é 'Amarela' E 'IDADE' é menor que 40.
 dados[(dados['COR/RACA/ETNIA'] == 'Amarela') & (dados['IDADE'] < 40)]
 
+# Para filtrar muitas vezes as mesmas colunas (ex.: em um painel), um índice de bitmaps guarda, uma única vez,
+# as linhas de cada valor das colunas categóricas e de cada faixa de 'IDADE' e 'SALARIO'.
+# As condições se combinam com '&', '|' e '~' como acima, mas sem percorrer as colunas de novo;
+# 'contagem()' conta as linhas sem selecioná-las e 'selecionar' devolve as linhas, como dados[...].
+# O índice vale para o DataFrame atual: depois de alterar 'dados' (ex.: preencher nulos), é preciso construí-lo de novo.
+indice = IndiceBitmap(dados)
+filtro = indice.maior('IDADE', 30) & indice.igual('GENERO', 'Feminino')
+filtro.contagem()
+indice.selecionar(dados, indice.igual('COR/RACA/ETNIA', 'Amarela') & indice.menor('IDADE', 40))
+# Equivalente a dados[(dados['IDADE'] >= 30) & (dados['GENERO'] == 'Feminino')]['NIVEL'].value_counts():
+(indice.maior_igual('IDADE', 30) & indice.igual('GENERO', 'Feminino')).contar_por('NIVEL')
+
 ### Agrupamento e Contagem de Valores
 
+instrumentacao.secao('agrupamento', dados)
+
+# Calcula, em uma única passada, um cubo de agregados: para cada combinação de 'GENERO', 'NIVEL',
+# 'FAIXA IDADE', 'Estado' ('UF ONDE MORA') e 'GESTOR?', guarda o número de linhas e a contagem,
+# soma, soma dos quadrados, mínimo e máximo de 'IDADE' e 'SALARIO'.
+# As contagens e médias por grupo abaixo passam a ser consultas ao cubo, sem filtrar o DataFrame inteiro.
+cubo = CuboAgregado.construir(dados)
+
 # Agrupa o DataFrame pela coluna 'GENERO' e, para cada grupo, conta o número de IDs únicos.
 # 'dropna=False' garante que valores nulos na coluna 'GENERO' também sejam considerados como um grupo.
 # 'nunique()' conta o número de valores únicos.
-dados.groupby('GENERO', dropna=False)['ID'].nunique()
+# 'observed=True' mostra apenas os gêneros presentes nos dados (a coluna é categórica).
+dados.groupby('GENERO', dropna=False, observed=True)['ID'].nunique()
 
 # Conta a frequência de cada valor único na coluna 'GENERO'.
 # 'value_counts()' retorna uma Série contendo contagens de valores únicos.
@@ -93,10 +181,16 @@ dados[(dados['IDADE'] >= 30) & (dados['GENERO'] == 'Feminino')]['NIVEL'].value_c
 # 'index=['GENERO']' define 'GENERO' como as linhas da tabela.
 # 'columns=['GESTOR?']' define 'GESTOR?' como as colunas da tabela.
 # 'aggfunc='count'' especifica que a função de agregação será a contagem de IDs.
-pd.pivot_table(dados, values=['ID'], index=['GENERO'], columns=['GESTOR?'], aggfunc='count')
+# pd.pivot_table(dados, values=['ID'], index=['GENERO'], columns=['GESTOR?'], aggfunc='count', observed=True)
+# A tabela equivalente, lida do cubo de agregados. O cubo não guarda 'ID', então a contagem é de linhas
+# (como 'pd.crosstab'); ela só difere da contagem de IDs acima se alguma linha tiver 'ID' nulo.
+# Para contar os valores não nulos de uma medida do cubo, use por exemplo 'medida='SALARIO''.
+cubo.tabela_cruzada('GENERO', 'GESTOR?')
 
 ### Estatística Descritiva Básica (com listas e aplicação no DataFrame)
 
+instrumentacao.secao('descritivas', dados)
+
 # Exemplo de lista para demonstração de conceitos estatísticos.
 lista_idades = [26, 30, 32, 22, 26, 35, 40, 20, 43, 31, 23]
 
@@ -145,29 +239,36 @@ dados['IDADE'].min()
 # Encontra o valor máximo na coluna 'IDADE'.
 dados['IDADE'].max()
 
+# As médias por gênero vêm do cubo de agregados (soma / contagem de cada grupo),
+# equivalentes a dados[dados['GENERO'] == 'Feminino']['IDADE'].mean() e semelhantes.
 # Calcula a média da 'IDADE' apenas para pessoas do gênero 'Feminino'.
-dados[dados['GENERO'] == 'Feminino']['IDADE'].mean()
+cubo.estatistica('IDADE', 'media', filtros={'GENERO': 'Feminino'})
 
 # Calcula a média do 'SALARIO' apenas para pessoas do gênero 'Feminino'.
-dados[dados['GENERO'] == 'Feminino']['SALARIO'].mean()
+cubo.estatistica('SALARIO', 'media', filtros={'GENERO': 'Feminino'})
 
 # Calcula a média do 'SALARIO' apenas para pessoas do gênero 'Masculino'.
-dados[dados['GENERO'] == 'Masculino']['SALARIO'].mean()
+cubo.estatistica('SALARIO', 'media', filtros={'GENERO': 'Masculino'})
 
 # Calcula a média da 'IDADE' apenas para pessoas do gênero 'Masculino'.
-dados[dados['GENERO'] == 'Masculino']['IDADE'].mean()
+cubo.estatistica('IDADE', 'media', filtros={'GENERO': 'Masculino'})
+
+# Todas as médias, desvios, mínimos e máximos por gênero de uma só vez:
+cubo.consultar('GENERO')
 
 ### Tratamento de Valores Faltantes (Missing Values)
 
-# Exibe um resumo conciso do DataFrame, incluindo o tipo de dado de cada coluna
-# e o número de valores não nulos. É crucial para identificar colunas com valores faltantes.
-dados.info()
+instrumentacao.secao('faltantes', dados)
+
+# Tipo de dado, não nulos e nulos de cada coluna (o mesmo que 'dados.info()' mostra), calculados
+# em uma única passada. É crucial para identificar colunas com valores faltantes.
+perfilar(dados).tabela()[['COLUNA', 'TIPO', 'NAO_NULOS', 'NULOS', 'PERCENTUAL_NULOS']]
 
 #### Trabalhando na Coluna 'GENERO'
 
 # Agrupa pela coluna 'GENERO' (incluindo nulos com dropna=False) e conta o número de IDs únicos
 # para ver a distribuição de gêneros e a quantidade de nulos.
-dados.groupby('GENERO', dropna=False)['ID'].nunique()
+dados.groupby('GENERO', dropna=False, observed=True)['ID'].nunique()
 
 # Mostra uma prévia de como os valores nulos na coluna 'GENERO' seriam substituídos por 'Prefiro não informar'.
 # Esta linha apenas exibe o resultado, mas não altera o DataFrame original.
@@ -179,7 +280,7 @@ dados['GENERO'] = dados['GENERO'].fillna('Prefiro não informar')
 
 # Verifica novamente a contagem de valores únicos em 'GENERO' após o preenchimento,
 # confirmando que os nulos foram substituídos.
-dados.groupby('GENERO', dropna=False)['ID'].nunique()
+dados.groupby('GENERO', dropna=False, observed=True)['ID'].nunique()
 
 #### Trabalhando na Coluna 'IDADE'
 
@@ -196,36 +297,13 @@ dados.columns
 # Isso ajuda a entender quais faixas etárias têm mais valores de idade ausentes.
 dados[dados['IDADE'].isnull()]['FAIXA IDADE'].value_counts()
 
-# Calcula a média da 'IDADE' para o grupo de 'FAIXA IDADE' igual a '17-21'.
-# Essa média será usada para preencher os valores nulos nessa faixa específica.
-media_17_21 = dados[dados['FAIXA IDADE'] == '17-21']['IDADE'].mean()
-
-# Localiza as linhas onde 'IDADE' é nulo E 'FAIXA IDADE' é '17-21',
-# e substitui os valores nulos de 'IDADE' pela 'media_17_21' calculada.
-# 'loc' é usado para seleção baseada em rótulos/condições e modificação de valores.
-dados.loc[dados['IDADE'].isnull() & (dados['FAIXA IDADE'] == '17-21'), 'IDADE'] = media_17_21
-
-# Verifica novamente a contagem de 'FAIXA IDADE' para 'IDADE' nula.
-# Espera-se que os 6 valores nulos para a faixa '17-21' tenham sido preenchidos.
-dados[dados['IDADE'].isnull()]['FAIXA IDADE'].value_counts() # Confirma que os 6 valores foram substituídos.
-
 # Exibe os valores da coluna 'IDADE' para a 'FAIXA IDADE' '55+'.
+# Todas as idades dessa faixa estão nulas, então não há média do grupo para usar no preenchimento.
 dados[dados['FAIXA IDADE'] == '55+']['IDADE']
 
 # Exibe os valores da coluna 'NIVEL' para a 'FAIXA IDADE' '55+'.
-dados[dados['FAIXA IDADE'] == '+55']['NIVEL'] # Nota: O '55+' e '+55' podem ser inconsistências na digitação da faixa etária.
-
-# Calcula a média geral da coluna 'IDADE' para ser usada como um valor de preenchimento.
-media_geral = dados['IDADE'].mean()
-media_geral
-
-# Localiza as linhas onde 'FAIXA IDADE' é '55+' E 'IDADE' é nulo,
-# e preenche esses valores nulos de 'IDADE' com a 'media_geral'.
-dados.loc[(dados['FAIXA IDADE'] == '55+') & (dados['IDADE'].isnull()), 'IDADE'] = media_geral
-
-# Verifica se ainda há valores nulos na coluna 'IDADE' associados a alguma 'FAIXA IDADE'.
-# Espera-se que não haja valores, indicando que os 68 valores nulos na faixa '55+' foram preenchidos.
-dados[dados['IDADE'].isnull()]['FAIXA IDADE'].value_counts() # Não retorna valores, indicando sucesso no preenchimento.
+# Nota: na planilha original havia as grafias '55+' e '+55'; o esquema categórico já unificou as duas em '55+'.
+dados[dados['FAIXA IDADE'] == '55+']['NIVEL']
 
 ### Tratando a Coluna 'SALARIO'
 
@@ -238,15 +316,33 @@ dados[dados['SALARIO'].isnull()] # Indica que há 577 linhas com valores nulos n
 # Ajuda a entender se os nulos estão concentrados em alguma faixa salarial específica.
 dados[dados['SALARIO'].isnull()]['FAIXA SALARIAL'].value_counts()
 
-# Calcula a mediana da coluna 'SALARIO'. A mediana é frequentemente preferida à média
-# para preencher valores faltantes de salário, pois é menos sensível a outliers.
-mediana_salario = dados['SALARIO'].median()
+#### Preenchimento de 'IDADE' e 'SALARIO' em uma única etapa
 
-# Preenche todos os valores nulos na coluna 'SALARIO' com a 'mediana_salario' calculada.
-dados.loc[dados['SALARIO'].isnull(), 'SALARIO'] = mediana_salario # Todos os nulos agora contêm o valor da mediana.
+# A estratégia de preenchimento de cada coluna está declarada em 'imputacao.ESTRATEGIA_PADRAO':
+# - 'IDADE': média da idade dentro da mesma 'FAIXA IDADE' (ex.: a média da faixa '17-21');
+#   quando a faixa não tem nenhuma idade preenchida (caso da '55+'), usa a média geral.
+# - 'SALARIO': mediana do salário dentro da mesma 'FAIXA SALARIAL'; sem faixa, usa a mediana geral.
+#   A mediana é frequentemente preferida à média para salários, pois é menos sensível a outliers.
+# As estatísticas são calculadas com um único 'groupby' por coluna de agrupamento e
+# ficam guardadas em 'imputador', podendo ser reaplicadas em novos lotes da pesquisa.
+imputador = ImputadorPorGrupo(ESTRATEGIA_PADRAO)
+dados = imputador.ajustar_aplicar(dados)
+
+# Estatísticas usadas no preenchimento (por grupo e globais).
+imputador.estatisticas_grupo['IDADE']
+imputador.estatisticas_globais
+
+# Verifica se ainda há valores nulos na coluna 'IDADE' associados a alguma 'FAIXA IDADE'.
+# Espera-se que não haja valores, indicando que os nulos das faixas '17-21' e '55+' foram preenchidos.
+dados[dados['IDADE'].isnull()]['FAIXA IDADE'].value_counts() # Não retorna valores, indicando sucesso no preenchimento.
+
+# Confirma que não restam nulos na coluna 'SALARIO'.
+dados['SALARIO'].isnull().value_counts()
 
 ### Tratamento de Valores Discrepantes (Outliers)
 
+instrumentacao.secao('outliers', dados)
+
 # Exemplo de lista com um outlier (400) para demonstrar o impacto.
 lista_idades_new = [26, 30, 32, 22, 26, 35, 400, 20, 43, 31, 23]
 
@@ -274,79 +370,45 @@ plt.show() # Exibe o gráfico.
 plt.boxplot(dados['SALARIO'])
 plt.show() # Exibe o gráfico.
 
-# Calcula o Primeiro Quartil (Q1) da coluna 'SALARIO'.
-# Q1 representa o 25º percentil dos dados.
-Q1 = dados['SALARIO'].quantile(0.25)
-Q1
+# Calcula de uma só vez, em uma única passada pela coluna 'SALARIO', os valores usados nas duas regras de outliers:
+# - Primeiro Quartil (Q1, 25º percentil), Terceiro Quartil (Q3, 75º percentil) e o Intervalo Interquartil (IIQ = Q3 - Q1),
+#   usados na regra do 1.5 * IIQ ('limites['iqr']');
+# - média e desvio padrão, usados na regra dos 3 desvios padrão ('limites['3sigma']').
+# 'k=None' calcula os quartis exatos (os mesmos de 'dados['SALARIO'].quantile()'), sem o esboço de quantis aproximado.
+limites = calcular_limites(dados, coluna='SALARIO', k=None)
+Q1, Q3, IIQ = limites['Q1'], limites['Q3'], limites['IIQ']
+Q1, Q3, IIQ
 
-# Calcula o Terceiro Quartil (Q3) da coluna 'SALARIO'.
-# Q3 representa o 75º percentil dos dados.
-Q3 = dados['SALARIO'].quantile(0.75)
-Q3
-
-# Calcula o Intervalo Interquartil (IIQ), que é a diferença entre Q3 e Q1.
-# O IIQ é uma medida de dispersão estatística e é usado na regra do 1.5*IIQ para outliers.
-IIQ = Q3 - Q1
-IIQ
-
-# Calcula o limite superior para outliers usando a regra do 1.5 * IIQ acima de Q3.
-lim_superior = Q3 + (1.5 * IIQ)
-lim_superior
-
-# Calcula o limite inferior para outliers usando a regra do 1.5 * IIQ abaixo de Q1.
-limite_inferior = Q1 - (1.5 * IIQ)
-limite_inferior
+# Limites inferior e superior pela regra do 1.5 * IIQ.
+limite_inferior, lim_superior = limites['iqr']
+limite_inferior, lim_superior
 
 # Conta a frequência de cada valor na coluna 'FAIXA SALARIAL'.
 dados['FAIXA SALARIAL'].value_counts()
 
-# Calcula a média da coluna 'SALARIO' (após preenchimento de nulos).
-media_salario = dados['SALARIO'].mean()
-media_salario
-
-# Calcula o desvio padrão da coluna 'SALARIO' (após preenchimento de nulos).
-desvio_salario = dados['SALARIO'].std()
-desvio_salario
-
-# Calcula o limite superior para outliers usando a regra do 3 desvios padrão acima da média para 'SALARIO'.
-limite_superior = media_salario + (3 * desvio_salario)
-limite_superior
+# Média e desvio padrão da coluna 'SALARIO' (após preenchimento de nulos).
+media_salario, desvio_salario = limites['media'], limites['desvio']
+media_salario, desvio_salario
 
-# Calcula o limite inferior para outliers usando a regra do 3 desvios padrão abaixo da média para 'SALARIO'.
-limite_inferior = media_salario - (3 * desvio_salario)
-limite_inferior
+# Limites inferior e superior pela regra dos 3 desvios padrão em torno da média.
+limite_inferior, limite_superior = limites['3sigma']
+limite_inferior, limite_superior
 
 # Filtra e conta a frequência da 'FAIXA SALARIAL' para salários que estão acima do limite superior calculado.
-# Isso ajuda a identificar quais faixas salariais contêm os outliers de salário.
+# Isso ajuda a identificar quais faixas salariais contêm os outliers de salário
+# (na planilha original, 'de R$ 30.001/mês a R$ 40.000/mês' e 'Acima de R$ 40.001/mês').
 dados[(dados['SALARIO'] > limite_superior)]['FAIXA SALARIAL'].value_counts()
 
-# Calcula a média dos salários para a faixa 'de R$ 30.001/mês a R$ 40.000/mês',
-# excluindo os salários que já foram identificados como outliers (maiores que o limite_superior).
-# Essa média será usada para substituir os outliers nessa faixa.
-media_30_40 = dados[(dados['FAIXA SALARIAL'] == 'de R$ 30.001/mês a R$ 40.000/mês') & (dados['SALARIO'] < limite_superior)]['SALARIO'].mean()
-
-# Localiza as linhas onde a 'FAIXA SALARIAL' é 'de R$ 30.001/mês a R$ 40.000/mês'
-# E o 'SALARIO' é um outlier (maior que 'limite_superior'),
-# e substitui esses salários pelo 'media_30_40' calculada.
-dados.loc[(dados['FAIXA SALARIAL'] == 'de R$ 30.001/mês a R$ 40.000/mês') & (dados['SALARIO'] > limite_superior), 'SALARIO'] = media_30_40
-
-# Verifica novamente a contagem de 'FAIXA SALARIAL' para salários que ainda estão acima do limite superior.
-# Espera-se que a contagem para a faixa 'de R$ 30.001/mês a R$ 40.000/mês' seja zero após a substituição.
-dados[dados['SALARIO'] > limite_superior]['FAIXA SALARIAL'].value_counts()
-
-# Calcula a média dos salários para a faixa 'Acima de R$ 40.001/mês',
-# excluindo os salários que são outliers (maiores que o limite_superior).
-# Essa média será usada para substituir os outliers nessa faixa.
-media_40 = dados[(dados['FAIXA SALARIAL'] == ' Acima de R$ 40.001/mês') & (dados['SALARIO'] < limite_superior)]['SALARIO'].mean()
-media_40
+# Calcula, para TODAS as faixas salariais, a média dos salários que não são outliers
+# (dentro dos limites dos 3 desvios padrão). Essas médias substituem os outliers de cada faixa.
+medias_faixa = medias_por_faixa(dados, limites['3sigma'])
+medias_faixa
 
-# Localiza as linhas onde a 'FAIXA SALARIAL' é 'Acima de R$ 40.001/mês'
-# E o 'SALARIO' é um outlier (maior que 'limite_superior'),
-# e substitui esses salários pelo 'media_40' calculada.
-dados.loc[(dados['FAIXA SALARIAL'] == ' Acima de R$ 40.001/mês') & (dados['SALARIO'] > limite_superior), 'SALARIO'] = media_40
+# Substitui cada salário fora dos limites pela média da sua própria faixa salarial.
+dados = substituir_outliers(dados, limites['3sigma'], medias_faixa)
 
 # Verifica se ainda há outliers de salário após as substituições.
-# Espera-se que a contagem para a faixa 'Acima de R$ 40.001/mês' seja zero.
+# Espera-se que nenhuma faixa tenha salários acima do limite superior.
 dados[dados['SALARIO'] > limite_superior]['FAIXA SALARIAL'].value_counts()
 
 # Gera um boxplot atualizado da coluna 'SALARIO' após o tratamento de outliers.
@@ -354,8 +416,16 @@ dados[dados['SALARIO'] > limite_superior]['FAIXA SALARIAL'].value_counts()
 plt.boxplot(dados['SALARIO'])
 plt.show() # Exibe o gráfico.
 
+# Com 'IDADE' e 'SALARIO' já tratados, recalcula o cubo de agregados e o grava em Parquet.
+# O arquivo tem uma linha por combinação de 'GENERO', 'NIVEL', 'FAIXA IDADE', 'Estado' e 'GESTOR?'
+# e pode ser usado como fonte de dados do dashboard no Looker Studio no lugar das linhas completas.
+cubo = CuboAgregado.construir(dados)
+cubo.salvar(os.path.join(DIRETORIO_DADOS, 'cubo_agregados.parquet'))
+
 ### Intervalo de Confiança e Distribuição Amostral
 
+instrumentacao.secao('intervalos_confianca', dados)
+
 # Cria uma cópia da coluna 'SALARIO' para realizar análises de inferência.
 salarios = dados['SALARIO']
 
@@ -390,21 +460,26 @@ erro_padrao
 intervalo_confianca = stats.t.interval(nivel_confianca, tamanho_amostral - 1, loc=media_amostral, scale=erro_padrao)
 intervalo_confianca
 
+# Guarda resumos combináveis dos dados tratados: momentos de 'IDADE' e 'SALARIO', o co-momento
+# usado na correlação entre as duas, contagens das colunas categóricas e esboços de quantis.
+# Quando chegar uma nova onda de respostas, 'estado.atualizar(nova_onda, tratar=True)' atualiza
+# o intervalo de confiança, a correlação e as contagens percorrendo apenas as linhas novas.
+# (Para tratar a onda bruta, o estado precisa dos parâmetros de tratamento; a execução em modo
+# batch, 'executar_analise.py --acrescentar', já grava o estado com eles.)
+estado = EstadoIncremental().atualizar(dados)
+estado.intervalo_media('SALARIO', nivel_confianca) # Mesmo resultado de 'intervalo_confianca'.
+
 ## Feature Engineering (Criação de Novas Colunas/Variáveis)
 
-# Define uma função para criar a nova coluna 'NOVO_NIVEL' com base em 'GESTOR?' e 'NIVEL'.
+instrumentacao.secao('features', dados)
+
+# Cria a nova coluna 'NOVO_NIVEL' com base em 'GESTOR?' e 'NIVEL'.
 # Se a pessoa for gestora (GESTOR? == 1), o 'NOVO_NIVEL' será "Pessoa gestora".
 # Caso contrário, manterá o valor original da coluna 'NIVEL'.
-def preencher_nivel(gestor, nivel):
-    if gestor == 1:
-        return "Pessoa gestora"
-    else:
-        return nivel
-
-# Aplica a função 'preencher_nivel' a cada linha do DataFrame.
-# 'axis=1' garante que a função seja aplicada linha a linha, acessando 'GESTOR?' e 'NIVEL' de cada registro.
-# O resultado é armazenado na nova coluna 'NOVO_NIVEL'.
-dados['NOVO_NIVEL'] = dados.apply(lambda x: preencher_nivel(x['GESTOR?'], x['NIVEL']), axis=1)
+# A regra está descrita como tabela em 'regras.REGRA_NOVO_NIVEL' e é compilada para 'np.select',
+# o que evita chamar uma função Python por linha como fazia 'dados.apply(..., axis=1)'.
+# A função original 'preencher_nivel' continua em 'regras.py' como referência.
+dados['NOVO_NIVEL'] = aplicar_regra(dados, REGRA_NOVO_NIVEL)
 
 # Conta a frequência de cada valor na nova coluna 'NOVO_NIVEL' para verificar a distribuição.
 dados['NOVO_NIVEL'].value_counts()
@@ -415,41 +490,56 @@ dados['NIVEL']
 # Realiza One-Hot Encoding na coluna 'NIVEL'.
 # Isso converte a coluna categórica 'NIVEL' em múltiplas colunas binárias (0 ou 1).
 # Cada categoria se torna uma nova coluna, útil para modelos de machine learning.
-dados = pd.get_dummies(dados, columns=['NIVEL'])
+# O 'CodificadorEsparso' gera as mesmas colunas do 'pd.get_dummies', mas esparsas (só os 1 ocupam memória)
+# e sem reconstruir o DataFrame. O vocabulário ajustado pode ser salvo com 'codificador_nivel.salvar(...)'
+# para codificar novos lotes da pesquisa com exatamente as mesmas colunas.
+codificador_nivel = CodificadorEsparso(['NIVEL']).ajustar(dados)
+dados = codificador_nivel.anexar(dados)
 
 # Exibe os nomes de todas as colunas do DataFrame após o One-Hot Encoding.
 # Novas colunas como 'NIVEL_Junior', 'NIVEL_Pleno', etc., devem estar presentes.
 dados.columns
 
-# Define uma função para categorizar a 'IDADE' em 'GERACAO' (Geração X, Y, Z, Alpha).
+# Categoriza a 'IDADE' em 'GERACAO' (Geração X, Y, Z, Alpha).
 # Esta é uma forma de criar uma feature categórica a partir de uma numérica.
-def determinar_geracao(idade):
-    if 39 < idade <= 58:
-        return "Geração X"
-    elif 29 < idade <= 39:
-        return "Geração Y"
-    elif 19 < idade <= 29:
-        return "Geração Z"
-    else:
-        return "Geração Alpha"
-
-# Aplica a função 'determinar_geracao' à coluna 'IDADE' para criar a nova coluna 'GERACAO'.
-dados['GERACAO'] = dados['IDADE'].apply(determinar_geracao)
+# As faixas de idade de cada geração estão em 'regras.REGRA_GERACAO' e são aplicadas com 'pd.cut'
+# (mesmo resultado da função 'determinar_geracao', mantida em 'regras.py', sem o '.apply').
+dados['GERACAO'] = aplicar_regra(dados, REGRA_GERACAO)
 
 # Conta a frequência de cada valor na nova coluna 'GERACAO' para verificar a distribuição.
 dados['GERACAO'].value_counts()
 
+#### Intervalos de Confiança por Grupo
+
+instrumentacao.secao('intervalos_grupo', dados)
+
+# Intervalo de confiança de 95% da média salarial para cada gênero, estado, nível e geração.
+# Um único groupby por dimensão calcula contagem, média e desvio de todos os grupos,
+# e a distribuição t é avaliada para todos eles de uma vez (mesmo cálculo do 'stats.t.interval' acima).
+intervalos_media = intervalos_t_por_dimensoes(dados, coluna='SALARIO', dimensoes=['GENERO', 'UF ONDE MORA', 'NOVO_NIVEL', 'GERACAO'])
+intervalos_media
+
+# Intervalo de confiança de 95% da MEDIANA salarial por gênero, usando bootstrap.
+# As 2.000 reamostras de cada grupo são sorteadas de uma vez como uma matriz de índices do NumPy.
+# 'semente' torna o resultado reprodutível; 'processos' permite dividir os grupos entre vários processos.
+intervalos_mediana = intervalos_bootstrap(dados, coluna='SALARIO', grupo='GENERO', estatistica='median', reamostras=2000, semente=42)
+intervalos_mediana
+
+instrumentacao.secao('juncao_complemento', dados)
+
 # Carrega um segundo conjunto de dados (planilha_aula_parte2.xlsx) em um novo DataFrame.
 # Este DataFrame provavelmente contém informações adicionais a serem mescladas com os dados principais.
-dados2 = pd.read_excel('/content/drive/MyDrive/Análise de Dados: Meus primeiros passos em python!/Cópia de Planilha_Aula_parte2.xlsx')
+dados2 = carregar_planilha(os.path.join(DIRETORIO_DADOS, 'Cópia de Planilha_Aula_parte2.xlsx'))
 
 # Exibe as primeiras 5 linhas do 'dados2' para inspeção.
 dados2.head()
 
-# Realiza a fusão (merge) do DataFrame 'dados' com 'dados2' com base na coluna 'ID'.
-# 'on='ID'' especifica a coluna para a junção.
-# 'how='left'' significa um left join, mantendo todas as linhas de 'dados' e adicionando correspondências de 'dados2'.
-dados = dados.merge(dados2, on='ID', how='left')
+# Junta ao DataFrame 'dados' as colunas de 'dados2' com base na coluna 'ID'.
+# Funciona como um left join: mantém todas as linhas de 'dados' e adiciona as correspondências de 'dados2'.
+# Diferente do 'merge', 'anexar_colunas' não copia o DataFrame inteiro: as novas colunas são
+# acrescentadas ao próprio 'dados'. Ela também confere que 'ID' não se repete em 'dados2',
+# o que multiplicaria as linhas de 'dados' sem aviso.
+dados = anexar_colunas(dados, dados2, chave='ID')
 
 # Exibe os nomes de todas as colunas do DataFrame após a fusão.
 dados.columns
@@ -458,33 +548,48 @@ dados.columns
 # Isso mostra a distribuição das intenções de mudança de emprego.
 dados['Você pretende mudar de emprego nos próximos 6 meses?'].value_counts()
 
-# Cria uma nova coluna booleana 'EM_BUSCA'.
-# Retorna True se a coluna 'Você pretende mudar de emprego nos próximos 6 meses?' contém a substring 'em busca' (case-insensitive).
-dados['EM_BUSCA'] = dados['Você pretende mudar de emprego nos próximos 6 meses?'].str.contains('em busca', case=False)
+# Cria duas novas colunas booleanas a partir da coluna 'Você pretende mudar de emprego nos próximos 6 meses?':
+# - 'EM_BUSCA': True se a resposta contém 'em busca' (sem diferenciar maiúsculas e minúsculas);
+# - 'ABERTO_OPORTUNIDADES': True se a resposta contém 'aberto'.
+# 'extrair_flags' avalia os dois padrões de uma vez e apenas uma vez por resposta distinta
+# (são poucas opções no formulário), espalhando o resultado para todas as linhas.
+flags_emprego = extrair_flags(dados['Você pretende mudar de emprego nos próximos 6 meses?'],
+                              {'EM_BUSCA': 'em busca', 'ABERTO_OPORTUNIDADES': 'aberto'}, case=False)
+dados['EM_BUSCA'] = flags_emprego['EM_BUSCA']
+dados['ABERTO_OPORTUNIDADES'] = flags_emprego['ABERTO_OPORTUNIDADES']
 
 # Conta a frequência de valores True/False na nova coluna 'EM_BUSCA'.
 dados['EM_BUSCA'].value_counts()
 
-# Cria uma nova coluna booleana 'ABERTO_OPORTUNIDADES'.
-# Retorna True se a coluna 'Você pretende mudar de emprego nos próximos 6 meses?' contém a substring 'aberto' (case-insensitive).
-dados['ABERTO_OPORTUNIDADES'] = dados['Você pretende mudar de emprego nos próximos 6 meses?'].str.contains('aberto', case=False)
-
 # Conta a frequência de valores True/False na nova coluna 'ABERTO_OPORTUNIDADES'.
 dados['ABERTO_OPORTUNIDADES'].value_counts()
 
 ### Correlação (Funções para Dados Discretos e Contínuos)
 
+instrumentacao.secao('correlacao', dados)
+
 # Calcula a correlação de Pearson entre as colunas 'IDADE' e 'SALARIO'.
 # A correlação de Pearson mede a relação linear entre duas variáveis contínuas.
 correlacao_continua = dados['IDADE'].corr(dados['SALARIO'])
 correlacao_continua
 
+# A mesma correlação a partir dos resumos incrementais (atualizada a cada nova onda de respostas).
+estado.correlacao()
+
 from scipy.stats import chi2_contingency # Importa a função para o teste Qui-Quadrado de independência.
 
-# O código abaixo está chamando uma função 'cramer_coeficiente' que não foi definida neste script.
-# Para o coeficiente de Cramer, você precisaria de uma implementação personalizada.
-# No entanto, a base para ele é a tabela de contingência e o teste Qui-Quadrado.
-# cramer_coeficiente(dados['COR/RACA/ETNIA'], dados['NIVEL DE ENSINO']) # Linha comentada por ser uma função não definida
+# Coeficiente V de Cramér entre 'COR/RACA/ETNIA' e 'NIVEL DE ENSINO' (0 = sem associação, 1 = associação total).
+# 'cramer_coeficiente' está definida em 'associacao.py' e usa a estatística do teste Qui-Quadrado
+# calculada sobre a tabela de contingência das duas colunas.
+cramer_coeficiente(dados['COR/RACA/ETNIA'], dados['NIVEL DE ENSINO'])
+
+# Matriz do V de Cramér entre todos os pares de colunas categóricas do DataFrame,
+# junto com os p-valores do teste Qui-Quadrado. Cada coluna é convertida em códigos inteiros
+# uma única vez e as tabelas de contingência são montadas com 'np.bincount'.
+# 'processos' permite distribuir os pares entre vários processos quando há muitas perguntas.
+# Colunas com mais de 'max_categorias' (100) categorias, como textos livres, ficam de fora com um aviso.
+matriz_cramer, matriz_p_valores = matriz_associacao(dados)
+matriz_cramer
 
 # Cria uma tabela de contingência (crosstab) entre 'COR/RACA/ETNIA' e 'NIVEL DE ENSINO'.
 # Uma tabela de contingência é usada para resumir a relação entre duas variáveis categóricas.
@@ -496,25 +601,31 @@ np.array(tabela_cruzada)
 
 ### Exportando Dados Processados
 
+instrumentacao.secao('exportacao', dados)
+
 # Salva o DataFrame 'dados' processado em um novo arquivo CSV.
 # 'analise_dados.csv' será o nome do arquivo.
 # 'index=False' impede que o índice do DataFrame seja salvo como uma coluna no CSV.
-dados.to_csv('/content/drive/MyDrive/Análise de Dados: Meus primeiros passos em python!/analise_dados.csv', index=False)
+dados.to_csv(os.path.join(DIRETORIO_DADOS, 'analise_dados.csv'), index=False)
 
 # Monta novamente o Google Drive. Esta linha pode ser redundante se o drive já estiver montado,
 # mas garante o acesso caso a sessão seja reiniciada.
-from google.colab import drive
-drive.mount('/content/drive')
+if EM_COLAB:
+    drive.mount('/content/drive')
 
 ### Conectando SQL com Pandas (Integração de Dados Externos)
 
+instrumentacao.secao('sql', dados)
+
 # Importa a biblioteca 'sqlite3' para trabalhar com banco de dados SQLite.
 # (Já importado no início do script, mas repetido aqui para clareza contextual da seção).
 import sqlite3
 
 # Estabelece uma conexão com o banco de dados SQLite 'status_brasil'.
 # O caminho aponta para o arquivo do banco de dados no Google Drive.
-conexao = sqlite3.connect('/content/drive/MyDrive/Análise de Dados: Meus primeiros passos em python!/status_brasil')
+# 'conectar' (de 'fonte_sql.py') abre uma conexão somente leitura e a reaproveita nas chamadas seguintes.
+CAMINHO_BANCO = os.path.join(DIRETORIO_DADOS, 'status_brasil')
+conexao = conectar(CAMINHO_BANCO)
 
 # Define uma consulta SQL para selecionar todos os registros da tabela 'Municipios_Brasileiros'
 # onde a 'Cidade' é 'Itaquaquecetuba'.
@@ -529,29 +640,25 @@ pd.read_sql(query, conexao)
 
 # Carrega o DataFrame 'dados' novamente a partir do arquivo CSV que foi salvo anteriormente.
 # Isso garante que as transformações anteriores estejam presentes antes da junção com dados SQL.
-dados = pd.read_csv('/content/drive/MyDrive/Análise de Dados: Meus primeiros passos em python!/analise_dados.csv')
+# O CSV também passa pelo cache colunar: ele só é reconvertido quando o arquivo muda.
+dados = carregar_planilha(os.path.join(DIRETORIO_DADOS, 'analise_dados.csv'))
 
 # Exibe os nomes das colunas do DataFrame 'dados' para verificar sua estrutura.
 dados.columns
 
 # Obtém uma lista de todos os estados únicos presentes na coluna 'UF ONDE MORA' do DataFrame 'dados'.
-# Isso será usado para construir a cláusula 'WHERE IN' na próxima query SQL.
 lista_estados = list(dados['UF ONDE MORA'].unique())
 
-# Constrói uma query SQL dinâmica para calcular a renda média por estado.
-# Ela faz um INNER JOIN entre 'Municipios_Brasileiros' e 'Municipio_Status'
-# e filtra pelos estados presentes na 'lista_estados'.
-# O formato '{}' com '?' placeholders é para prevenção de SQL Injection e tratamento seguro de parâmetros.
-query = '''SELECT Municipios_Brasileiros.Estado, AVG(Municipio_Status.Renda) FROM Municipios_Brasileiros
-           INNER JOIN Municipio_Status ON Municipios_Brasileiros.municipio_ID = Municipio_Status.municipio_ID
-           WHERE Municipios_Brasileiros.Estado IN ({}) GROUP BY Municipios_Brasileiros.Estado;'''.format(','.join(['?' for _ in lista_estados]))
+# Consulta SQL que calcula a renda média por estado.
+# Ela faz um INNER JOIN entre 'Municipios_Brasileiros' e 'Municipio_Status' e agrupa por estado.
+print(CONSULTA_RENDA_ESTADO)
 
-# Imprime a query SQL construída para verificação.
-print(query)
-
-# Executa a query SQL dinâmica com os parâmetros da lista de estados e carrega os resultados em um DataFrame.
-# 'params=lista_estados' passa os valores para os '?' placeholders na query.
-estados_renda = pd.read_sql(query, conexao, params=lista_estados)
+# Obtém a renda média dos estados presentes na 'lista_estados'.
+# 'renda_por_estado' cria (uma única vez) índices em 'municipio_ID' e 'Estado', executa a consulta
+# para todos os estados e guarda o resultado em memória e no cache em disco: nas próximas execuções
+# a tabela 'Municipio_Status' não é varrida de novo, a menos que o banco mude.
+# O filtro pelos estados da pesquisa (o antigo 'WHERE ... IN (?, ?, ...)') é feito no Pandas.
+estados_renda = renda_por_estado(CAMINHO_BANCO, estados=lista_estados)
 
 # Renomeia a coluna 'UF ONDE MORA' para 'Estado' no DataFrame 'dados'.
 # Isso é feito para que a coluna tenha o mesmo nome que a coluna de junção no DataFrame 'estados_renda',
@@ -561,15 +668,32 @@ dados.rename(columns={'UF ONDE MORA': 'Estado'}, inplace=True)
 # Exibe os nomes das colunas de 'dados' após a renomeação.
 dados.columns
 
-# Realiza a fusão (merge) do DataFrame 'dados' com 'estados_renda' com base na coluna 'Estado'.
-# 'how='left'' mantém todas as linhas de 'dados' e adiciona a renda média por estado correspondente.
-dados = dados.merge(estados_renda, on='Estado', how='left')
+# Junta ao DataFrame 'dados' a renda média de 'estados_renda' com base na coluna 'Estado'.
+# Como no left join, todas as linhas de 'dados' são mantidas; apenas a coluna de renda é acrescentada.
+dados = anexar_colunas(dados, estados_renda, chave='Estado', colunas=['AVG(Municipio_Status.Renda)'])
 
 # Calcula a correlação de Pearson entre a coluna 'SALARIO' e a nova coluna de renda média por estado.
 # Isso investiga a relação entre o salário do profissional e a renda média do seu estado.
 correlacao_renda_salario = dados['SALARIO'].corr(dados['AVG(Municipio_Status.Renda)'])
 correlacao_renda_salario
 
+# Em vez de uma correlação de cada vez, 'correlacoes_com_alvo' calcula a correlação de todas as colunas
+# numéricas ('IDADE', 'GESTOR?', a renda média do estado, as flags 'EM_BUSCA'/'ABERTO_OPORTUNIDADES' e as
+# indicadoras 'NIVEL_*') e das indicadoras de 'GENERO' e 'Estado' com 'SALARIO'.
+# Para as colunas 0/1 o coeficiente é a correlação ponto-bisserial. Cada linha traz o número de pares
+# usados (os nulos são descartados par a par, como no '.corr()'), o p-valor e o q-valor, que corrige
+# os p-valores pelo número de testes (Benjamini-Hochberg): com muitas colunas, algumas teriam p < 0,05 por acaso.
+correlacoes_salario = correlacoes_com_alvo(dados, 'SALARIO', categoricas=['GENERO', 'Estado'])
+correlacoes_salario
+
+# Correlações de Spearman (sobre os postos), menos sensíveis aos salários muito altos.
+correlacoes_com_alvo(dados, 'SALARIO', metodo='spearman')
+
+# Todos os pares de colunas numéricas, em formato longo (um par por linha) e ordenados pela força da
+# correlação, mantendo só os pares com |coeficiente| >= 0,1. Os pares são calculados em blocos de colunas
+# com produtos de matrizes, sem montar a matriz completa de '.corr()'.
+correlacoes_pares(dados, limiar=0.1)
+
 ### Tipos de Gráficos e Elementos Visuais (Notas Teóricas)
 
 # Seção de notas teóricas sobre diferentes tipos de gráficos e suas aplicações.
@@ -582,9 +706,21 @@ correlacao_renda_salario
 
 ### Visualização de Dados em Python
 
+instrumentacao.secao('graficos', dados)
+
+# Bibliotecas usadas apenas nos gráficos, importadas só nesta seção.
+import seaborn as sns # Importa a biblioteca 'seaborn', construída sobre o matplotlib,
+                      # para criar gráficos estatísticos mais atraentes e informativos. 'sns' é um alias comum.
+import plotly.express as px # Importa o módulo 'express' da biblioteca 'plotly',
+                            # facilitando a criação de gráficos interativos e dinâmicos com poucas linhas de código. 'px' é um alias comum.
+# Gráficos de dispersão que trocam os pontos por densidade acima de 'LIMITE_PONTOS' respondentes,
+# com linha de tendência calculada em forma fechada e agregados (não as figuras) guardados em cache.
+from graficos import dispersao_matplotlib, dispersao_plotly, decimar_serie
+
 # Recarrega o DataFrame 'dados' a partir do arquivo CSV processado.
 # (Repetido para garantir um estado limpo dos dados antes da visualização, útil em notebooks).
-dados = pd.read_csv('/content/drive/MyDrive/Análise de Dados: Meus primeiros passos em python!/Cópia de analise_dados.csv')
+# Os gráficos abaixo só usam 'GENERO', 'IDADE' e 'SALARIO', então apenas essas colunas são lidas do cache.
+dados = carregar_planilha(os.path.join(DIRETORIO_DADOS, 'Cópia de analise_dados.csv'), colunas=['GENERO', 'IDADE', 'SALARIO'])
 
 # Exibe as primeiras 5 linhas do DataFrame para uma rápida verificação.
 dados.head()
@@ -646,7 +782,10 @@ plt.figure()
 # 'salario_por_idade.values' são os salários médios (eixo Y).
 # 'marker='o'' adiciona círculos nos pontos de dados.
 # 'linestyle='--'' define o estilo da linha como tracejada.
-plt.plot(salario_por_idade.index, salario_por_idade.values, marker='o', linestyle='--')
+# 'decimar_serie' só reduz a série quando há mais de 2.000 idades distintas (ex.: idades imputadas
+# com casas decimais em bases muito grandes), mantendo o mínimo e o máximo de cada trecho.
+salario_por_idade_grafico = decimar_serie(salario_por_idade)
+plt.plot(salario_por_idade_grafico.index, salario_por_idade_grafico.values, marker='o', linestyle='--')
 # Define o título do gráfico.
 plt.title('Média de Salário por Idade')
 # Define o rótulo do eixo X.
@@ -665,35 +804,62 @@ plt.show()
 # 'x='IDADE'' e 'y='SALARIO'' especificam os eixos.
 # 'title' define o título.
 # 'markers=True' adiciona marcadores aos pontos.
-fig = px.line(salario_por_idade.reset_index(), x='IDADE', y='SALARIO', title='Média de Salário por Idade', markers=True)
+fig = px.line(decimar_serie(salario_por_idade).reset_index(), x='IDADE', y='SALARIO', title='Média de Salário por Idade', markers=True)
 # Exibe o gráfico interativo.
 fig.show()
 
 #### Gráfico de Dispersão (Matplotlib) - Relação Idade x Salário
 
-# Cria uma nova figura com um tamanho específico.
-plt.figure(figsize=(10, 6))
-# Cria um gráfico de dispersão (scatter plot).
+# Cria um gráfico de dispersão (scatter plot) em uma figura de 10 x 6 polegadas.
 # 'dados['IDADE']' no eixo X e 'dados['SALARIO']' no eixo Y.
-# 'alpha=0.5' define a transparência dos pontos, útil para ver densidade em grandes conjuntos de dados.
-plt.scatter(dados['IDADE'], dados['SALARIO'], alpha=0.5)
-# Define o título do gráfico.
-plt.title('Relação Idade x Salário')
-# Define o rótulo do eixo X.
-plt.xlabel('Idade')
-# Define o rótulo do eixo Y.
-plt.ylabel('Salário')
-# Adiciona uma grade ao gráfico.
-plt.grid(True)
+# Até 50 mil respondentes, os pontos são desenhados com 'alpha=0.5' (transparência), como em 'plt.scatter'.
+# Acima disso, cada célula de um histograma 2-D (idade x salário) é colorida pela quantidade de
+# respondentes, em escala logarítmica: o gráfico mostra a mesma concentração sem desenhar milhões de pontos.
+# Título, rótulos dos eixos e grade são definidos pela própria função.
+fig = dispersao_matplotlib(dados['IDADE'], dados['SALARIO'], titulo='Relação Idade x Salário',
+                           rotulo_x='Idade', rotulo_y='Salário')
 # Exibe o gráfico.
 plt.show()
 
 #### Gráfico de Dispersão Interativo (Plotly Express) com Linha de Tendência
 
-# Cria um gráfico de dispersão interativo usando Plotly Express.
-# 'x' e 'y' especificam as colunas.
-# 'title' define o título.
-# 'trendline='ols'' adiciona uma linha de tendência de regressão linear (Ordinary Least Squares).
-fig = px.scatter(dados, x='IDADE', y='SALARIO', title='Relação Idade x Salário', trendline='ols')
+# Cria um gráfico de dispersão interativo usando Plotly.
+# Equivale a px.scatter(dados, x='IDADE', y='SALARIO', title='Relação Idade x Salário', trendline='ols'):
+# - a linha de tendência de regressão linear (Ordinary Least Squares) é calculada diretamente com
+#   médias e covariância (inclinação = cov(IDADE, SALARIO) / var(IDADE)), sem o statsmodels;
+# - até 50 mil respondentes os pontos são desenhados com WebGL ('Scattergl'); acima disso o HTML
+#   recebe um mapa de calor da densidade ('modo='densidade'') ou uma amostra de 50 mil pontos
+#   ('modo='amostra''), em vez de todas as linhas.
+fig = dispersao_plotly(dados['IDADE'], dados['SALARIO'], titulo='Relação Idade x Salário',
+                       rotulo_x='IDADE', rotulo_y='SALARIO')
 # Exibe o gráfico interativo.
 fig.show()
+
+#### Relatório com Todos os Gráficos em Arquivos
+
+instrumentacao.secao('relatorio_graficos', dados)
+
+# Grava todos os gráficos acima em arquivos (PNG e SVG para o matplotlib/seaborn, HTML para o Plotly)
+# e um 'index.html' que reúne todos, na pasta 'relatorio_graficos' do Drive.
+# Os gráficos são desenhados em paralelo, em processos separados e sem tela (backend 'Agg').
+# Os agregados já calculados acima ('genero_counts' e 'salario_por_idade') são reaproveitados;
+# só o resumo da dispersão idade x salário é calculado aqui, uma vez, para os dois gráficos de dispersão.
+from graficos import agregar_dispersao
+from relatorio_graficos import gerar_relatorio
+
+agregados = {
+    'genero_counts': genero_counts,
+    'salario_por_idade': salario_por_idade,
+    'idade_salario': agregar_dispersao(dados['IDADE'], dados['SALARIO']),
+}
+# Retorna uma tabela com os arquivos gerados e o tempo gasto em cada gráfico.
+gerar_relatorio(agregados, os.path.join(DIRETORIO_DADOS, 'relatorio_graficos'))
+
+# Encerra a última seção e grava o registro da execução (um JSON por execução e o histórico em CSV).
+# A tabela mostra, para cada seção, o tempo, o tempo de CPU, a memória e as linhas/colunas de 'dados'
+# na entrada e na saída.
+instrumentacao.secao(None, dados)
+instrumentacao.salvar(os.path.join(DIRETORIO_DADOS, 'instrumentacao.json'))
+instrumentacao.salvar(os.path.join(DIRETORIO_DADOS, 'historico_instrumentacao.csv'))
+instrumentacao.salvar_perfil(DIRETORIO_DADOS)
+instrumentacao.tabela()
@@ -0,0 +1,141 @@
+# Associação entre variáveis categóricas: qui-quadrado e V de Cramér.
+#
+# O script importava 'chi2_contingency', montava um único 'pd.crosstab' entre
+# 'COR/RACA/ETNIA' e 'NIVEL DE ENSINO' e deixava comentada a chamada a
+# 'cramer_coeficiente', que nunca tinha sido definida. Este módulo define essa
+# função e calcula a matriz de associação entre TODOS os pares de colunas
+# categóricas.
+#
+# Cada coluna é convertida uma única vez em códigos inteiros; a tabela de
+# contingência de um par é obtida com 'np.bincount' sobre o código combinado
+# (codigo_x * n_categorias_y + codigo_y), sem chamar 'crosstab' de novo. Os
+# pares podem ser distribuídos entre processos.
+#
+# A tabela de um par ocupa n_x * n_y células, então colunas com mais de
+# 'MAX_CATEGORIAS' categorias (texto livre, identificadores) ficam fora da
+# matriz: o V de Cramér também não diz nada de útil sobre elas.
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+MAX_CATEGORIAS = 100
+
+
+def codificar(serie):
+    """Converte 'serie' em (códigos inteiros, número de categorias); nulos recebem -1."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(dtype=np.int64), len(serie.cat.categories)
+    codigos, categorias = pd.factorize(serie, use_na_sentinel=True)
+    return codigos.astype(np.int64), len(categorias)
+
+
+def tabela_contingencia(codigos_x, n_x, codigos_y, n_y):
+    """
+    Tabela de contingência n_x x n_y de dois vetores de códigos (pares com nulo
+    são ignorados). Aloca n_x * n_y contagens: limite as categorias antes.
+    """
+    validos = (codigos_x >= 0) & (codigos_y >= 0)
+    combinado = codigos_x[validos] * n_y + codigos_y[validos]
+    return np.bincount(combinado, minlength=n_x * n_y).reshape(n_x, n_y)
+
+
+def qui_quadrado(tabela):
+    """
+    Estatística qui-quadrado, p-valor e V de Cramér de uma tabela de contingência.
+
+    Linhas e colunas vazias são descartadas antes do cálculo. Não aplica a
+    correção de continuidade de Yates (equivale a 'chi2_contingency(tabela,
+    correction=False)').
+    """
+    tabela = np.asarray(tabela, dtype=float)
+    tabela = tabela[tabela.sum(axis=1) > 0][:, tabela.sum(axis=0) > 0]
+    total = tabela.sum()
+    linhas, colunas = tabela.shape
+    if total == 0 or min(linhas, colunas) < 2:
+        return np.nan, np.nan, np.nan
+    esperado = np.outer(tabela.sum(axis=1), tabela.sum(axis=0)) / total
+    qui2 = float(((tabela - esperado) ** 2 / esperado).sum())
+    p_valor = float(stats.chi2.sf(qui2, (linhas - 1) * (colunas - 1)))
+    v = float(np.sqrt(qui2 / total / (min(linhas, colunas) - 1)))
+    return qui2, p_valor, v
+
+
+def cramer_coeficiente(x, y):
+    """V de Cramér entre duas Series categóricas (0 = sem associação, 1 = associação total)."""
+    codigos_x, n_x = codificar(x)
+    codigos_y, n_y = codificar(y)
+    return qui_quadrado(tabela_contingencia(codigos_x, n_x, codigos_y, n_y))[2]
+
+
+# Códigos das colunas compartilhados com os processos de trabalho, enviados uma
+# única vez pelo 'initializer' em vez de a cada par.
+_CODIGOS = None
+
+
+def _inicializar_processo(codigos):
+    global _CODIGOS
+    _CODIGOS = codigos
+
+
+def _calcular_pares(pares):
+    resultados = []
+    for i, j in pares:
+        codigos_x, n_x = _CODIGOS[i]
+        codigos_y, n_y = _CODIGOS[j]
+        resultados.append((i, j) + qui_quadrado(tabela_contingencia(codigos_x, n_x, codigos_y, n_y)))
+    return resultados
+
+
+def colunas_categoricas(dados):
+    """Nomes das colunas de texto, categóricas ou booleanas de 'dados'."""
+    return [
+        coluna for coluna in dados.columns
+        if isinstance(dados[coluna].dtype, pd.CategoricalDtype)
+        or pd.api.types.is_object_dtype(dados[coluna])
+        or pd.api.types.is_string_dtype(dados[coluna])
+        or pd.api.types.is_bool_dtype(dados[coluna])
+    ]
+
+
+def matriz_associacao(dados, colunas=None, processos=None, pares_por_tarefa=64, max_categorias=MAX_CATEGORIAS):
+    """
+    V de Cramér e p-valor do qui-quadrado para todos os pares de 'colunas'.
+
+    Retorna (matriz de V, matriz de p-valores), ambas DataFrames simétricos
+    indexados pelas colunas. Por padrão usa todas as colunas categóricas.
+    Colunas com mais de 'max_categorias' categorias são descartadas com um
+    aviso (None desliga o limite). Com 'processos' > 1 os pares são divididos
+    em tarefas de 'pares_por_tarefa' pares e distribuídos entre processos.
+    """
+    colunas = colunas_categoricas(dados) if colunas is None else list(colunas)
+    codigos = [codificar(dados[coluna]) for coluna in colunas]
+    if max_categorias is not None:
+        descartadas = [coluna for coluna, (_, n) in zip(colunas, codigos) if n > max_categorias]
+        if descartadas:
+            warnings.warn(f'Colunas com mais de {max_categorias} categorias ficaram fora da matriz de '
+                          f'associação: {descartadas}', stacklevel=2)
+            mantidas = [(coluna, codigo) for coluna, codigo in zip(colunas, codigos) if coluna not in descartadas]
+            colunas, codigos = [coluna for coluna, _ in mantidas], [codigo for _, codigo in mantidas]
+    pares = list(combinations(range(len(colunas)), 2))
+    tarefas = [pares[inicio:inicio + pares_por_tarefa] for inicio in range(0, len(pares), pares_por_tarefa)]
+
+    if processos and processos > 1:
+        with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo,
+                                 initargs=(codigos,)) as executor:
+            resultados = [linha for parte in executor.map(_calcular_pares, tarefas) for linha in parte]
+    else:
+        _inicializar_processo(codigos)
+        resultados = [linha for tarefa in tarefas for linha in _calcular_pares(tarefa)]
+
+    v = np.eye(len(colunas))
+    p_valores = np.zeros((len(colunas), len(colunas)))
+    for i, j, _, p_valor, coeficiente in resultados:
+        v[i, j] = v[j, i] = coeficiente
+        p_valores[i, j] = p_valores[j, i] = p_valor
+    return (pd.DataFrame(v, index=colunas, columns=colunas),
+            pd.DataFrame(p_valores, index=colunas, columns=colunas))
@@ -0,0 +1,122 @@
+# Configuração do benchmark das etapas (pytest-benchmark).
+#
+# Os dados de 'dados_sinteticos.py' são gerados (ou reutilizados, com
+# '--dados') uma vez para cada tamanho de '--linhas'. As entradas de cada etapa
+# são as saídas da etapa anterior na versão atual, calculadas uma vez por
+# tamanho, para que a versão atual e a original sejam medidas sobre os mesmos
+# dados.
+
+import os
+import tracemalloc
+
+import pytest
+
+import cache_colunar
+import dados_sinteticos
+import etapas_analise
+import fonte_sql
+
+LIMITE_ORIGINAL_PADRAO = 1_000_000
+
+
+def pytest_addoption(parser):
+    grupo = parser.getgroup('etapas', 'Benchmark das etapas da análise')
+    grupo.addoption('--linhas', type=int, action='append',
+                    help=f'Tamanho a medir; repita para vários (padrão: {dados_sinteticos.TAMANHOS_PADRAO[0]}).')
+    grupo.addoption('--dados', help='Diretório onde os dados sintéticos são gerados e reutilizados '
+                                    '(padrão: diretório temporário).')
+    grupo.addoption('--formato', default='csv', choices=['csv', 'parquet'],
+                    help='Formato das planilhas geradas (padrão: csv, como um export da planilha).')
+    grupo.addoption('--limite-original', type=int, default=LIMITE_ORIGINAL_PADRAO,
+                    help='Maior número de linhas em que o código original também é medido '
+                         "(o '.apply(axis=1)' original leva muitos minutos em 10 milhões).")
+    grupo.addoption('--sem-memoria', action='store_true',
+                    help='Não mede o pico de memória (evita a execução extra com o tracemalloc).')
+
+
+def pytest_generate_tests(metafunc):
+    if 'linhas' in metafunc.fixturenames:
+        tamanhos = metafunc.config.getoption('linhas') or [dados_sinteticos.TAMANHOS_PADRAO[0]]
+        metafunc.parametrize('linhas', tamanhos, scope='session', ids=[f'{n}_linhas' for n in tamanhos])
+
+
+@pytest.fixture(scope='session')
+def fontes(linhas, request, tmp_path_factory):
+    formato = request.config.getoption('formato')
+    base = request.config.getoption('dados') or str(tmp_path_factory.getbasetemp())
+    diretorio = os.path.join(base, f'{linhas}_linhas')
+    fontes = {
+        'planilha': os.path.join(diretorio, f'{dados_sinteticos.ARQUIVO_PLANILHA}.{formato}'),
+        'planilha_complemento': os.path.join(diretorio, f'{dados_sinteticos.ARQUIVO_COMPLEMENTO}.{formato}'),
+        'banco': os.path.join(diretorio, dados_sinteticos.ARQUIVO_BANCO),
+        'cache': os.path.join(diretorio, 'cache'),
+    }
+    if not all(os.path.exists(fontes[chave]) for chave in ('planilha', 'planilha_complemento', 'banco')):
+        fontes.update(dados_sinteticos.gravar_conjunto(diretorio, linhas, formato=formato))
+    # A primeira leitura converte o arquivo para o cache colunar; as medidas são da leitura já em cache.
+    cache_colunar.garantir_cache(fontes['planilha'], fontes['cache'])
+    cache_colunar.garantir_cache(fontes['planilha_complemento'], fontes['cache'])
+    fonte_sql.renda_por_estado(fontes['banco'], diretorio_cache=fontes['cache'])
+    yield fontes
+    fonte_sql.fechar_conexoes()
+    fonte_sql.limpar_memoria()
+
+
+@pytest.fixture(scope='session')
+def carregar_pesquisa(fontes):
+    """'etapas_analise.carregar_pesquisa' com o cache colunar do diretório dos dados sintéticos."""
+    def carregar(caminho):
+        dados = cache_colunar.carregar_planilha(caminho, diretorio_cache=fontes['cache'])
+        return etapas_analise.esquema.aplicar_esquema(dados)
+
+    return carregar
+
+
+@pytest.fixture(scope='session')
+def entradas(fontes, carregar_pesquisa):
+    """Saídas da versão atual de cada etapa, na ordem do pipeline."""
+    resultado = {'pesquisa': carregar_pesquisa(fontes['planilha'])}
+    resultado['faltantes'] = etapas_analise.tratar_faltantes(resultado['pesquisa'])
+    resultado['outliers'] = etapas_analise.tratar_outliers_salario(resultado['faltantes'])
+    resultado['features'] = etapas_analise.criar_features(resultado['outliers'])
+    resultado['complemento'] = cache_colunar.carregar_planilha(fontes['planilha_complemento'],
+                                                               diretorio_cache=fontes['cache'])
+    resultado['dados_completos'] = etapas_analise.juntar_complemento(resultado['features'],
+                                                                     resultado['complemento'])
+    resultado['renda_estados'] = fonte_sql.renda_por_estado(fontes['banco'], diretorio_cache=fontes['cache'])
+    resultado['dados_renda'] = etapas_analise.juntar_renda(resultado['dados_completos'], resultado['renda_estados'])
+    return resultado
+
+
+def pico_memoria(funcao, *argumentos):
+    """
+    Pico de memória (MB) alocada durante 'funcao', segundo o tracemalloc.
+    O tracemalloc deixa o código Python bem mais lento, por isso essa execução
+    é separada das execuções cronometradas.
+    """
+    tracemalloc.start()
+    try:
+        funcao(*argumentos)
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.fixture
+def medir(benchmark, linhas, request):
+    """
+    'medir(etapa, funcao, *argumentos, original=False)': cronometra 'funcao' no
+    grupo da etapa e guarda o pico de memória em 'extra_info'. A versão
+    original é pulada acima de '--limite-original' linhas.
+    """
+    def executar(etapa, funcao, *argumentos, original=False):
+        if original and linhas > request.config.getoption('limite_original'):
+            pytest.skip(f'código original não é medido acima de {request.config.getoption("limite_original")} linhas')
+        benchmark.group = f'{etapa} ({linhas} linhas)'
+        benchmark.extra_info['versao'] = 'original' if original else 'atual'
+        resultado = benchmark(funcao, *argumentos)
+        if not request.config.getoption('sem_memoria'):
+            benchmark.extra_info['pico_mb'] = pico_memoria(funcao, *argumentos)
+        return resultado
+
+    return executar
@@ -0,0 +1,81 @@
+# Reproduções do código original do script, etapa por etapa.
+#
+# Usadas em 'test_etapas.py' como referência para as versões atuais: leitura
+# sem cache, '.apply' linha a linha, 'merge', filtros repetidos...
+
+import sqlite3
+
+import pandas as pd
+
+import regras
+
+
+def carregar(caminho):
+    if caminho.endswith('.csv'):
+        return pd.read_csv(caminho)
+    return pd.read_parquet(caminho)
+
+
+def faltantes(dados):
+    dados = dados.copy()
+    dados['GENERO'] = dados['GENERO'].fillna('Prefiro não informar')
+    media_17_21 = dados[dados['FAIXA IDADE'] == '17-21']['IDADE'].mean()
+    dados.loc[dados['IDADE'].isnull() & (dados['FAIXA IDADE'] == '17-21'), 'IDADE'] = media_17_21
+    media_geral = dados['IDADE'].mean()
+    dados.loc[(dados['FAIXA IDADE'] == '55+') & (dados['IDADE'].isnull()), 'IDADE'] = media_geral
+    mediana_salario = dados['SALARIO'].median()
+    dados.loc[dados['SALARIO'].isnull(), 'SALARIO'] = mediana_salario
+    return dados
+
+
+def outliers(dados):
+    dados = dados.copy()
+    limite_superior = dados['SALARIO'].mean() + 3 * dados['SALARIO'].std()
+    for faixa in ['de R$ 30.001/mês a R$ 40.000/mês', 'Acima de R$ 40.001/mês']:
+        media = dados[(dados['FAIXA SALARIAL'] == faixa) & (dados['SALARIO'] < limite_superior)]['SALARIO'].mean()
+        dados.loc[(dados['FAIXA SALARIAL'] == faixa) & (dados['SALARIO'] > limite_superior), 'SALARIO'] = media
+    return dados
+
+
+def features(dados):
+    dados = dados.copy()
+    dados['NOVO_NIVEL'] = dados.apply(lambda x: regras.preencher_nivel(x['GESTOR?'], x['NIVEL']), axis=1)
+    dados = pd.get_dummies(dados, columns=['NIVEL'])
+    dados['GERACAO'] = dados['IDADE'].apply(regras.determinar_geracao)
+    return dados
+
+
+def complemento(dados, dados2):
+    dados = dados.merge(dados2, on='ID', how='left')
+    pergunta = dados['Você pretende mudar de emprego nos próximos 6 meses?']
+    dados['EM_BUSCA'] = pergunta.str.contains('em busca', case=False)
+    dados['ABERTO_OPORTUNIDADES'] = pergunta.str.contains('aberto', case=False)
+    return dados
+
+
+def renda_estados(caminho_banco, estados):
+    conexao = sqlite3.connect(caminho_banco)
+    try:
+        query = '''SELECT Municipios_Brasileiros.Estado, AVG(Municipio_Status.Renda) FROM Municipios_Brasileiros
+                   INNER JOIN Municipio_Status ON Municipios_Brasileiros.municipio_ID = Municipio_Status.municipio_ID
+                   WHERE Municipios_Brasileiros.Estado IN ({}) GROUP BY Municipios_Brasileiros.Estado;'''.format(
+            ','.join(['?' for _ in estados]))
+        return pd.read_sql(query, conexao, params=estados)
+    finally:
+        conexao.close()
+
+
+def renda(dados, estados_renda):
+    dados = dados.rename(columns={'UF ONDE MORA': 'Estado'})
+    return dados.merge(estados_renda, on='Estado', how='left')
+
+
+def descritivas(dados):
+    return [
+        dados.groupby('GENERO', dropna=False, observed=True)['ID'].nunique(),
+        pd.pivot_table(dados, values=['ID'], index=['GENERO'], columns=['GESTOR?'], aggfunc='count', observed=True),
+        dados[dados['GENERO'] == 'Feminino']['IDADE'].mean(),
+        dados[dados['GENERO'] == 'Feminino']['SALARIO'].mean(),
+        dados[dados['GENERO'] == 'Masculino']['SALARIO'].mean(),
+        dados[dados['GENERO'] == 'Masculino']['IDADE'].mean(),
+    ]
@@ -0,0 +1,119 @@
+# Benchmark das etapas da análise sobre dados sintéticos (pytest-benchmark).
+#
+# Cada etapa de 'etapas_analise.py' é medida na versão atual e, quando existe,
+# em uma reprodução do código original do script ('originais.py'). Os grupos
+# juntam as duas versões de cada etapa e tamanho.
+#
+# Exemplos:
+#   python -m pytest benchmarks                                      # 10 mil linhas
+#   python -m pytest benchmarks --linhas 10000 --linhas 1000000 --benchmark-autosave
+#   python -m pytest benchmarks --linhas 1000000 --benchmark-compare --benchmark-compare-fail=min:20%
+#
+# Com '--benchmark-compare-fail' a execução termina com erro se alguma etapa
+# ficar mais lenta que a execução gravada anteriormente (regressão de desempenho).
+
+import cache_colunar
+import dados_sinteticos
+import etapas_analise
+import fonte_sql
+import originais
+from cubo import CuboAgregado
+
+
+def descritivas_cubo(dados):
+    cubo = CuboAgregado.construir(dados)
+    return [
+        cubo.contagem('GENERO'),
+        cubo.tabela_cruzada('GENERO', 'GESTOR?'),
+        cubo.estatistica('IDADE', filtros={'GENERO': 'Feminino'}),
+        cubo.estatistica('SALARIO', filtros={'GENERO': 'Feminino'}),
+        cubo.estatistica('SALARIO', filtros={'GENERO': 'Masculino'}),
+        cubo.estatistica('IDADE', filtros={'GENERO': 'Masculino'}),
+    ]
+
+
+def test_pesquisa(medir, fontes, carregar_pesquisa):
+    medir('pesquisa', carregar_pesquisa, fontes['planilha'])
+
+
+def test_pesquisa_original(medir, fontes):
+    medir('pesquisa', originais.carregar, fontes['planilha'], original=True)
+
+
+def test_faltantes(medir, entradas):
+    medir('faltantes', etapas_analise.tratar_faltantes, entradas['pesquisa'])
+
+
+def test_faltantes_original(medir, entradas):
+    medir('faltantes', originais.faltantes, entradas['pesquisa'], original=True)
+
+
+def test_descritivas(medir, entradas):
+    medir('descritivas', descritivas_cubo, entradas['faltantes'])
+
+
+def test_descritivas_original(medir, entradas):
+    medir('descritivas', originais.descritivas, entradas['faltantes'], original=True)
+
+
+def test_outliers(medir, entradas):
+    medir('outliers', etapas_analise.tratar_outliers_salario, entradas['faltantes'])
+
+
+def test_outliers_original(medir, entradas):
+    medir('outliers', originais.outliers, entradas['faltantes'], original=True)
+
+
+def test_features(medir, entradas):
+    medir('features', etapas_analise.criar_features, entradas['outliers'])
+
+
+def test_features_original(medir, entradas):
+    medir('features', originais.features, entradas['outliers'], original=True)
+
+
+def test_complemento(medir, fontes):
+    medir('complemento', cache_colunar.carregar_planilha, fontes['planilha_complemento'], None, fontes['cache'])
+
+
+def test_complemento_original(medir, fontes):
+    medir('complemento', originais.carregar, fontes['planilha_complemento'], original=True)
+
+
+def test_dados_completos(medir, entradas):
+    medir('dados_completos', etapas_analise.juntar_complemento, entradas['features'], entradas['complemento'])
+
+
+def test_dados_completos_original(medir, entradas):
+    medir('dados_completos', originais.complemento, entradas['features'], entradas['complemento'], original=True)
+
+
+def test_renda_estados(medir, fontes):
+    # Depois da primeira consulta a tabela vem da memória, como nas execuções seguintes da análise.
+    medir('renda_estados', fonte_sql.renda_por_estado, fontes['banco'], None, fontes['cache'])
+
+
+def test_renda_estados_original(medir, fontes):
+    estados = [estado for estado, *_ in dados_sinteticos.ESTADOS]
+    medir('renda_estados', originais.renda_estados, fontes['banco'], estados, original=True)
+
+
+def test_dados_renda(medir, entradas):
+    medir('dados_renda', etapas_analise.juntar_renda, entradas['dados_completos'], entradas['renda_estados'])
+
+
+def test_dados_renda_original(medir, entradas):
+    medir('dados_renda', originais.renda, entradas['dados_completos'], entradas['renda_estados'], original=True)
+
+
+def test_agregados_graficos(medir, entradas):
+    medir('agregados_graficos', etapas_analise.agregados_graficos, entradas['dados_renda'])
+
+
+def test_cubo(medir, entradas):
+    medir('cubo', etapas_analise.cubo_agregados, entradas['outliers'])
+
+
+def test_estado_incremental(medir, entradas):
+    medir('estado_incremental', etapas_analise.estado_incremental, entradas['pesquisa'], entradas['faltantes'],
+          entradas['outliers'])
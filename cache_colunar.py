@@ -0,0 +1,201 @@
+# Cache colunar em disco para as planilhas da pesquisa State of Data.
+#
+# Ler o .xlsx com 'pd.read_excel' (openpyxl) e reler o CSV exportado a cada
+# execução é a parte mais lenta da análise. Este módulo converte cada arquivo
+# de origem UMA única vez para Parquet (tipado e colunar) e, nas execuções
+# seguintes, lê o Parquet com memory-map carregando apenas as colunas pedidas.
+#
+# O cache é identificado pelo hash (SHA-256) do conteúdo do arquivo de origem.
+# Um pequeno manifesto JSON guarda também o mtime e o tamanho do arquivo: se
+# eles não mudaram, o hash não é recalculado; se mudaram, o hash é refeito e,
+# caso o conteúdo seja diferente, o Parquet é gerado novamente e os Parquets
+# da versão anterior do mesmo arquivo são apagados (um CSV regravado a cada
+# execução não faz o cache crescer sem limite).
+
+import hashlib
+import json
+import os
+import warnings
+
+import pandas as pd
+
+# Diretório padrão do cache, ao lado deste módulo. Pode ser trocado pela
+# variável de ambiente 'DATAHACKERS_CACHE'.
+DIRETORIO_CACHE_PADRAO = os.environ.get(
+    'DATAHACKERS_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_colunar'),
+)
+
+# Tamanho do bloco usado para calcular o hash sem carregar o arquivo inteiro na memória.
+_TAMANHO_BLOCO_HASH = 1 << 20
+# Versão da conversão para Parquet; faz parte do nome do cache, para que uma
+# conversão diferente não reaproveite arquivos gravados pela anterior.
+_VERSAO_CONVERSAO = 2
+
+
+def calcular_hash_arquivo(caminho):
+    """Calcula o SHA-256 do conteúdo de 'caminho', lendo em blocos de 1 MiB."""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(_TAMANHO_BLOCO_HASH), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _caminho_manifesto(diretorio_cache):
+    return os.path.join(diretorio_cache, 'manifesto.json')
+
+
+def _ler_manifesto(diretorio_cache):
+    try:
+        with open(_caminho_manifesto(diretorio_cache), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _gravar_manifesto(diretorio_cache, manifesto):
+    # Grava em um arquivo temporário e renomeia, para não deixar um manifesto
+    # corrompido caso a execução seja interrompida no meio da escrita.
+    temporario = _caminho_manifesto(diretorio_cache) + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, _caminho_manifesto(diretorio_cache))
+
+
+def _ler_origem(caminho, **opcoes_leitura):
+    # Escolhe o leitor do pandas de acordo com a extensão do arquivo de origem.
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in ('.xlsx', '.xlsm', '.xls'):
+        return pd.read_excel(caminho, **opcoes_leitura)
+    if extensao == '.csv':
+        return pd.read_csv(caminho, **opcoes_leitura)
+    if extensao == '.parquet':
+        return pd.read_parquet(caminho, **opcoes_leitura)
+    raise ValueError(f"Formato de arquivo não suportado para o cache colunar: '{caminho}'")
+
+
+def _preparar_para_parquet(dados):
+    # Colunas 'object' com tipos misturados (ex.: números e textos na mesma coluna,
+    # comum em respostas de formulário) não podem ser gravadas em Parquet.
+    # Só nesses casos os valores não nulos são convertidos para texto, com um aviso;
+    # colunas 'object' de um único tipo que o pyarrow sabe gravar (inteiros com
+    # nulos, datas, horários, decimais...) mantêm o tipo.
+    import pyarrow as pa
+
+    dados = dados.copy()
+    for coluna in dados.columns:
+        if dados[coluna].dtype != object:
+            continue
+        try:
+            pa.array(dados[coluna], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            tipo = pd.api.types.infer_dtype(dados[coluna], skipna=True)
+            warnings.warn(f"Coluna '{coluna}' com tipos misturados ({tipo}) foi gravada como texto "
+                          'no cache colunar.', stacklevel=3)
+            nao_nulos = dados[coluna].notna()
+            dados.loc[nao_nulos, coluna] = dados.loc[nao_nulos, coluna].astype(str)
+    # Parquet exige nomes de coluna em texto.
+    dados.columns = [str(coluna) for coluna in dados.columns]
+    return dados
+
+
+def _remover_versao(diretorio_cache, sha):
+    # Apaga os Parquets de um conteúdo que saiu do manifesto: os de todas as
+    # opções de leitura e os derivados dele (ex.: 'renda_<tipo>_<sha>' de 'fonte_sql.py').
+    for nome in os.listdir(diretorio_cache):
+        if sha in nome and nome.endswith('.parquet'):
+            os.remove(os.path.join(diretorio_cache, nome))
+
+
+def identificar_origem(caminho, diretorio_cache=None):
+    """
+    Retorna o hash do arquivo de origem.
+
+    Se o mtime e o tamanho do arquivo são os mesmos registrados no manifesto,
+    o hash registrado é reaproveitado; caso contrário ele é recalculado e o
+    manifesto é atualizado. Se o conteúdo mudou, os Parquets da versão
+    anterior são apagados, a menos que outro arquivo de origem com o mesmo
+    conteúdo ainda os use.
+    """
+    diretorio_cache = diretorio_cache or DIRETORIO_CACHE_PADRAO
+    info = os.stat(caminho)
+    chave = os.path.abspath(caminho)
+    manifesto = _ler_manifesto(diretorio_cache)
+    registro = manifesto.get(chave)
+    if registro and registro['mtime_ns'] == info.st_mtime_ns and registro['tamanho'] == info.st_size:
+        return registro['sha256']
+    sha = calcular_hash_arquivo(caminho)
+    os.makedirs(diretorio_cache, exist_ok=True)
+    manifesto[chave] = {'sha256': sha, 'mtime_ns': info.st_mtime_ns, 'tamanho': info.st_size}
+    _gravar_manifesto(diretorio_cache, manifesto)
+    anterior = registro['sha256'] if registro else None
+    if anterior and anterior != sha and all(outro['sha256'] != anterior for outro in manifesto.values()):
+        _remover_versao(diretorio_cache, anterior)
+    return sha
+
+
+def garantir_cache(caminho, diretorio_cache=None, **opcoes_leitura):
+    """
+    Garante que 'caminho' (xlsx, csv ou parquet) esteja convertido no cache colunar
+    e retorna o caminho do arquivo Parquet correspondente.
+
+    A conversão só acontece quando o conteúdo do arquivo de origem muda.
+    'opcoes_leitura' é repassado ao leitor do pandas na conversão e faz parte da
+    identificação do cache.
+    """
+    diretorio_cache = diretorio_cache or DIRETORIO_CACHE_PADRAO
+    sha = identificar_origem(caminho, diretorio_cache)
+
+    # As opções de leitura mudam o resultado (ex.: 'sheet_name'), então entram no nome do cache.
+    opcoes = json.dumps([_VERSAO_CONVERSAO, opcoes_leitura], sort_keys=True, default=str)
+    sufixo = hashlib.sha256(opcoes.encode('utf-8')).hexdigest()[:8]
+    arquivo_cache = os.path.join(diretorio_cache, f'{sha}_{sufixo}.parquet')
+
+    if not os.path.exists(arquivo_cache):
+        dados = _preparar_para_parquet(_ler_origem(caminho, **opcoes_leitura))
+        temporario = arquivo_cache + '.tmp'
+        dados.to_parquet(temporario, index=False)
+        os.replace(temporario, arquivo_cache)
+
+    return arquivo_cache
+
+
+def carregar_planilha(caminho, colunas=None, diretorio_cache=None, **opcoes_leitura):
+    """
+    Carrega 'caminho' (xlsx, csv ou parquet) usando o cache colunar em Parquet.
+
+    Na primeira leitura o arquivo é convertido e gravado no cache; nas seguintes
+    apenas o Parquet é lido, com memory-map, e somente as 'colunas' pedidas
+    (todas, se 'colunas' for None).
+    """
+    arquivo_cache = garantir_cache(caminho, diretorio_cache, **opcoes_leitura)
+    return pd.read_parquet(arquivo_cache, columns=colunas, memory_map=True)
+
+
+def limpar_cache(diretorio_cache=None):
+    """Remove todos os arquivos do cache colunar."""
+    diretorio_cache = diretorio_cache or DIRETORIO_CACHE_PADRAO
+    if not os.path.isdir(diretorio_cache):
+        return
+    for nome in os.listdir(diretorio_cache):
+        os.remove(os.path.join(diretorio_cache, nome))
+
+
+def ler_em_blocos(caminho, colunas=None, tamanho_bloco=100_000, diretorio_cache=None, **opcoes_leitura):
+    """
+    Lê 'caminho' em blocos de até 'tamanho_bloco' linhas, sem carregar o arquivo inteiro.
+
+    Arquivos CSV são lidos diretamente com 'chunksize'; os demais formatos passam
+    pelo cache colunar e são lidos do Parquet grupo a grupo com o pyarrow.
+    """
+    if os.path.splitext(caminho)[1].lower() == '.csv':
+        yield from pd.read_csv(caminho, usecols=colunas, chunksize=tamanho_bloco, **opcoes_leitura)
+        return
+
+    import pyarrow.parquet as pq
+
+    # Garante que o Parquet do cache exista (só converte na primeira vez).
+    arquivo = pq.ParquetFile(garantir_cache(caminho, diretorio_cache, **opcoes_leitura), memory_map=True)
+    for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=colunas):
+        yield lote.to_pandas()
@@ -0,0 +1,153 @@
+# One-Hot Encoding esparso com vocabulário fixo.
+#
+# 'pd.get_dummies(dados, columns=['NIVEL'])' e o 'pd.get_dummies(...,
+# drop_first=True)' do notebook de regressão criam colunas densas (um byte por
+# linha e categoria, mesmo quando quase tudo é zero) e reconstroem o DataFrame
+# inteiro. Além disso, as colunas geradas dependem das categorias presentes em
+# cada lote: um lote novo da pesquisa sem uma das categorias gera outro layout.
+#
+# 'CodificadorEsparso' aprende o vocabulário (categorias de cada coluna) uma vez,
+# pode salvá-lo em JSON e codifica qualquer lote para o mesmo layout, como
+# matriz CSR do SciPy ou como colunas esparsas do pandas. Perguntas de múltipla
+# escolha (várias respostas no mesmo texto, separadas por um delimitador)
+# geram várias colunas marcadas na mesma linha e continuam compactas.
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+class CodificadorEsparso:
+    """
+    Codifica 'colunas' categóricas em indicadores 0/1 esparsos.
+
+    'drop_first=True' descarta a primeira categoria de cada coluna (como no
+    'pd.get_dummies'). 'multiselecao' é um dicionário {coluna: separador} para
+    colunas de múltipla escolha. Categorias não vistas no ajuste são ignoradas
+    (a linha fica com zeros nas colunas daquela variável).
+    """
+
+    def __init__(self, colunas, drop_first=False, multiselecao=None, separador_nome='_'):
+        self.colunas = list(colunas)
+        self.drop_first = drop_first
+        self.multiselecao = multiselecao or {}
+        self.separador_nome = separador_nome
+        self.vocabulario = {}
+
+    def _valores(self, dados, coluna):
+        serie = dados[coluna]
+        if coluna in self.multiselecao:
+            # Uma linha por resposta marcada, mantendo a posição da linha original.
+            partes = serie.astype(object).str.split(self.multiselecao[coluna]).explode().str.strip()
+            linhas = dados.index.get_indexer(partes.index)
+            return partes.to_numpy(dtype=object), linhas
+        return serie, np.arange(len(dados))
+
+    def ajustar(self, dados):
+        """Aprende as categorias de cada coluna (em ordem, como o 'pd.get_dummies')."""
+        if not dados.index.is_unique:
+            dados = dados.reset_index(drop=True)
+        self.vocabulario = {}
+        for coluna in self.colunas:
+            valores, _ = self._valores(dados, coluna)
+            if isinstance(getattr(valores, 'dtype', None), pd.CategoricalDtype):
+                # Como no 'pd.get_dummies', todas as categorias do tipo categórico viram colunas.
+                categorias = list(valores.cat.categories)
+            else:
+                categorias = sorted(pd.unique(pd.Series(valores).dropna()), key=str)
+            if self.drop_first:
+                categorias = categorias[1:]
+            self.vocabulario[coluna] = [str(c) for c in categorias]
+        return self
+
+    @property
+    def nomes_colunas(self):
+        """Nomes das colunas geradas, no formato '<coluna>_<categoria>'."""
+        return [f'{coluna}{self.separador_nome}{categoria}'
+                for coluna in self.colunas for categoria in self.vocabulario[coluna]]
+
+    def transformar(self, dados, formato='csr'):
+        """
+        Codifica 'dados' com o vocabulário ajustado.
+
+        'formato' é 'csr' (matriz 'scipy.sparse.csr_matrix' de uint8) ou 'pandas'
+        (DataFrame com colunas 'Sparse[uint8]' e o mesmo índice de 'dados').
+        """
+        if not self.vocabulario:
+            raise RuntimeError('O codificador precisa ser ajustado antes de transformar.')
+        indice_original = dados.index
+        if not dados.index.is_unique:
+            dados = dados.reset_index(drop=True)
+        linhas, colunas_matriz = [], []
+        deslocamento = 0
+        for coluna in self.colunas:
+            vocabulario = self.vocabulario[coluna]
+            valores, posicoes = self._valores(dados, coluna)
+            # O vocabulário guarda as categorias como texto (para o JSON); os valores são
+            # convertidos da mesma forma, mantendo os nulos.
+            serie = pd.Series(valores)
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.cat.rename_categories([str(c) for c in serie.cat.categories])
+            else:
+                serie = serie.astype(object).where(serie.isna(), serie.astype(str))
+            codigos = pd.Index(vocabulario).get_indexer(serie)
+            marcados = codigos >= 0
+            linhas.append(np.asarray(posicoes)[marcados])
+            colunas_matriz.append(codigos[marcados].astype(np.int64) + deslocamento)
+            deslocamento += len(vocabulario)
+
+        # Importação adiada: só a codificação precisa do SciPy, não o 'import codificacao'.
+        from scipy import sparse
+
+        linhas = np.concatenate(linhas) if linhas else np.empty(0, dtype=np.int64)
+        colunas_matriz = np.concatenate(colunas_matriz) if colunas_matriz else np.empty(0, dtype=np.int64)
+        matriz = sparse.csr_matrix(
+            (np.ones(len(linhas), dtype=np.uint8), (linhas, colunas_matriz)),
+            shape=(len(dados), deslocamento),
+        )
+        # Em múltipla escolha a mesma resposta repetida não deve somar 2.
+        matriz.data = np.minimum(matriz.data, 1)
+        if formato == 'csr':
+            return matriz
+        if formato == 'pandas':
+            return pd.DataFrame.sparse.from_spmatrix(matriz, index=indice_original, columns=self.nomes_colunas)
+        raise ValueError(f"Formato desconhecido: '{formato}'. Use 'csr' ou 'pandas'.")
+
+    def ajustar_transformar(self, dados, formato='csr'):
+        return self.ajustar(dados).transformar(dados, formato)
+
+    def anexar(self, dados):
+        """
+        Substitui, no próprio 'dados', as colunas codificadas pelas colunas
+        esparsas geradas (equivalente a 'pd.get_dummies(dados, columns=...)',
+        mas sem reconstruir o DataFrame). Retorna o próprio 'dados'.
+        """
+        codificadas = self.transformar(dados, formato='pandas')
+        for coluna in self.colunas:
+            del dados[coluna]
+        for nome, serie in codificadas.items():
+            dados[nome] = serie
+        return dados
+
+    def salvar(self, caminho):
+        """Grava a configuração e o vocabulário ajustado em JSON."""
+        conteudo = {
+            'colunas': self.colunas,
+            'drop_first': self.drop_first,
+            'multiselecao': self.multiselecao,
+            'separador_nome': self.separador_nome,
+            'vocabulario': self.vocabulario,
+        }
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(conteudo, arquivo, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Recria um codificador já ajustado a partir do JSON gravado por 'salvar'."""
+        with open(caminho, encoding='utf-8') as arquivo:
+            conteudo = json.load(arquivo)
+        codificador = cls(conteudo['colunas'], conteudo['drop_first'],
+                          conteudo['multiselecao'], conteudo['separador_nome'])
+        codificador.vocabulario = conteudo['vocabulario']
+        return codificador
@@ -0,0 +1,344 @@
+# Correlações entre todas as colunas numéricas e indicadoras, calculadas em blocos.
+#
+# O script calcula só duas correlações, uma de cada vez:
+# 'dados['IDADE'].corr(dados['SALARIO'])' e 'SALARIO' x 'AVG(Municipio_Status.Renda)'.
+# Este módulo calcula, de uma vez, as correlações de todas as colunas numéricas
+# e das indicadoras 0/1 (as 'NIVEL_*' do 'CodificadorEsparso' e as dummies da
+# regressão) contra 'SALARIO' ou entre todos os pares de colunas:
+#   - Pearson; quando uma das colunas é 0/1 o mesmo coeficiente é a correlação
+#     ponto-bisserial (e o phi quando as duas são 0/1), com o mesmo teste t;
+#   - Spearman: Pearson sobre os postos de cada coluna.
+#
+# As colunas são padronizadas (média 0, desvio 1) e guardadas em float32, com
+# os nulos trocados por 0 e uma máscara 0/1 de valores presentes. Para um bloco
+# de colunas contra outro bloco, as somas de cada par restritas às linhas em
+# que os dois valores existem (como no 'Series.corr') saem de produtos de
+# matrizes: Zᵀ Z, Zᵀ M, (Z²)ᵀ M e Mᵀ M. Blocos sem nulos usam só Zᵀ Z.
+# As indicadoras das 'categoricas' ficam esparsas (sem nulos, média e desvio
+# saem das somas de cada coluna) e só as colunas do bloco atual viram densas,
+# então uma categórica com milhares de valores não ocupa linhas x valores floats.
+# A matriz completa nunca é montada: os pares são devolvidos em formato longo
+# (um par por linha), opcionalmente filtrados por um valor mínimo de |r|, o
+# que permite milhares de colunas codificadas.
+#
+# Os p-valores usam o teste t com n - 2 graus de liberdade (o mesmo do
+# 'scipy.stats.pearsonr', 'pointbiserialr' e 'spearmanr') e podem ser
+# ajustados pela taxa de falsas descobertas de Benjamini-Hochberg.
+#
+# Precisão: com float32 os coeficientes coincidem com os do pandas até ~1e-5.
+# No Spearman os postos de cada coluna são calculados uma vez, sobre os seus
+# próprios valores não nulos (contra um alvo, só nas linhas em que o alvo
+# existe); as indicadoras 0/1 entram sem postos, pois os postos de uma coluna
+# 0/1 são uma função linear dela e o Pearson não muda. Quando duas colunas têm
+# nulos em linhas diferentes o resultado pode diferir um pouco do
+# 'corr(method='spearman')', que refaz os postos para cada par.
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from codificacao import CodificadorEsparso
+
+METODOS = ('pearson', 'spearman')
+ALVO_PADRAO = 'SALARIO'
+# Colunas numéricas que não são medidas (identificadores).
+COLUNAS_IGNORADAS = ['ID']
+TAMANHO_BLOCO_PADRAO = 512
+
+
+def _numerica(serie):
+    if isinstance(serie.dtype, pd.SparseDtype):
+        return pd.api.types.is_numeric_dtype(serie.dtype.subtype) or pd.api.types.is_bool_dtype(serie.dtype.subtype)
+    return pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie)
+
+
+def colunas_numericas(dados, ignoradas=None):
+    """Colunas numéricas, booleanas ou esparsas (indicadoras 'NIVEL_*') de 'dados', sem 'COLUNAS_IGNORADAS'."""
+    ignoradas = set(COLUNAS_IGNORADAS if ignoradas is None else ignoradas)
+    return [coluna for coluna in dados.columns if coluna not in ignoradas and _numerica(dados[coluna])]
+
+
+def _atributos(dados, colunas=None, categoricas=None, drop_first=False):
+    """
+    Matriz float32 densa das 'colunas' numéricas (NaN nos nulos), indicadoras
+    das 'categoricas' em 'scipy.sparse.csc_matrix' float32 (ou None) e nomes.
+    """
+    colunas = colunas_numericas(dados) if colunas is None else list(colunas)
+    matriz = np.empty((len(dados), len(colunas)), dtype=np.float32, order='F')
+    for posicao, coluna in enumerate(colunas):
+        serie = dados[coluna]
+        if isinstance(serie.dtype, pd.SparseDtype):
+            serie = serie.sparse.to_dense()
+        matriz[:, posicao] = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+    nomes = list(colunas)
+    indicadoras = None
+    if categoricas:
+        codificador = CodificadorEsparso(list(categoricas), drop_first=drop_first).ajustar(dados)
+        indicadoras = codificador.transformar(dados).astype(np.float32).tocsc()
+        nomes += codificador.nomes_colunas
+    return matriz, indicadoras, nomes
+
+
+def preparar_atributos(dados, colunas=None, categoricas=None, drop_first=False):
+    """
+    Monta a matriz float32 (linhas x colunas, com NaN nos nulos) das 'colunas'
+    numéricas (todas, se None) e, opcionalmente, das indicadoras 0/1 das
+    'categoricas', geradas pelo 'CodificadorEsparso' ('drop_first' como no
+    'pd.get_dummies' da regressão). Retorna (matriz, nomes das colunas).
+
+    A matriz é densa; as funções de correlação mantêm as indicadoras esparsas.
+    """
+    matriz, indicadoras, nomes = _atributos(dados, colunas, categoricas, drop_first)
+    if indicadoras is not None:
+        matriz = np.asfortranarray(np.hstack([matriz, indicadoras.toarray()]))
+    return matriz, nomes
+
+
+def postos(matriz):
+    """Postos médios (empates) de cada coluna sobre os seus valores não nulos; nulos continuam NaN."""
+    resultado = np.full(matriz.shape, np.nan, dtype=np.float32, order='F')
+    for coluna in range(matriz.shape[1]):
+        valores = matriz[:, coluna]
+        presentes = ~np.isnan(valores)
+        resultado[presentes, coluna] = stats.rankdata(valores[presentes])
+    return resultado
+
+
+def binarias(matriz):
+    """True para as colunas cujos valores não nulos são só 0 e 1 (e não constantes)."""
+    zeros_uns = ((matriz == 0) | (matriz == 1) | np.isnan(matriz)).all(axis=0)
+    return zeros_uns & (matriz == 0).any(axis=0) & (matriz == 1).any(axis=0)
+
+
+class _Padronizada:
+    """
+    Colunas padronizadas em float32 (nulos = 0), máscara de presença e somas de
+    quadrados, montadas por fatia de colunas. As colunas densas vêm primeiro;
+    as indicadoras (esparsas, sem nulos) só viram densas na fatia pedida.
+    """
+
+    def __init__(self, matriz, indicadoras=None):
+        self.matriz = matriz
+        self.indicadoras = indicadoras
+        self.linhas = matriz.shape[0]
+        presentes = ~np.isnan(matriz)
+        contagem = presentes.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.nansum(matriz, axis=0, dtype=np.float64) / contagem
+            centrada = np.where(presentes, matriz - media.astype(np.float32), np.float32(0))
+            desvio = np.sqrt(np.einsum('ij,ij->j', centrada, centrada, dtype=np.float64) / contagem)
+        completas = presentes.all(axis=0)
+        if indicadoras is not None:
+            # Sem nulos: média e variância saem das somas de cada coluna (valores 0/1).
+            soma = np.asarray(indicadoras.sum(axis=0), dtype=np.float64).ravel()
+            quadrados = np.asarray(indicadoras.multiply(indicadoras).sum(axis=0), dtype=np.float64).ravel()
+            media_indicadoras = soma / self.linhas if self.linhas else np.full(soma.shape, np.nan)
+            with np.errstate(invalid='ignore'):
+                desvio_indicadoras = np.sqrt(np.maximum(quadrados / self.linhas - media_indicadoras ** 2, 0))
+            media = np.concatenate([media, media_indicadoras])
+            desvio = np.concatenate([desvio, desvio_indicadoras])
+            contagem = np.concatenate([contagem, np.full(soma.shape, self.linhas)])
+            completas = np.concatenate([completas, np.ones(soma.shape, dtype=bool)])
+        variavel = desvio > 0
+        desvio[~variavel] = 1.0
+        self.media = media.astype(np.float32)
+        self.desvio = desvio.astype(np.float32)
+        self.completas = completas
+        self.contagem = contagem
+        # Soma dos z² de cada coluna: o número de valores, ou 0 se a coluna é constante.
+        self.normas = np.where(variavel, contagem, 0).astype(np.float64)
+        self._fatias = {}
+
+    def fatia(self, colunas):
+        """(z, máscara, z²) densos das 'colunas' (uma fatia); guarda as duas últimas fatias pedidas."""
+        chave = (colunas.start, colunas.stop)
+        if chave in self._fatias:
+            self._fatias[chave] = self._fatias.pop(chave)
+        else:
+            if len(self._fatias) >= 2:
+                self._fatias.pop(next(iter(self._fatias)))
+            self._fatias[chave] = self._montar(colunas)
+        return self._fatias[chave]
+
+    def _montar(self, colunas):
+        densas = self.matriz.shape[1]
+        partes = []
+        if colunas.start < densas:
+            partes.append(self.matriz[:, colunas.start:min(colunas.stop, densas)])
+        if colunas.stop > densas:
+            partes.append(self.indicadoras[:, max(colunas.start - densas, 0):colunas.stop - densas].toarray())
+        valores = partes[0] if len(partes) == 1 else np.hstack(partes)
+        presentes = ~np.isnan(valores)
+        z = np.where(presentes, (valores - self.media[colunas]) / self.desvio[colunas], np.float32(0))
+        z = np.asfortranarray(z, dtype=np.float32)
+        return z, np.asfortranarray(presentes, dtype=np.float32), np.asfortranarray(z * z)
+
+    def binarias(self):
+        """'binarias' de todas as colunas; as indicadoras são 0/1 e só falta ver se não são constantes."""
+        resultado = binarias(self.matriz)
+        if self.indicadoras is not None:
+            uns = self.indicadoras.getnnz(axis=0)
+            resultado = np.concatenate([resultado, (uns > 0) & (uns < self.linhas)])
+        return resultado
+
+
+def _bloco(padronizada, linhas, colunas):
+    """Correlações e número de pares válidos entre as colunas 'linhas' e 'colunas' (fatias)."""
+    zx, mx, qx = padronizada.fatia(linhas)
+    zy, my, qy = padronizada.fatia(colunas)
+    produto = (zx.T @ zy).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if padronizada.completas[linhas].all() and padronizada.completas[colunas].all():
+            # Sem nulos: as médias já são 0 e as somas de quadrados são as de cada coluna.
+            n = np.full(produto.shape, float(padronizada.linhas))
+            r = produto / np.sqrt(np.outer(padronizada.normas[linhas], padronizada.normas[colunas]))
+        else:
+            n = (mx.T @ my).astype(np.float64)
+            soma_x = (zx.T @ my).astype(np.float64)
+            soma_y = (mx.T @ zy).astype(np.float64)
+            quadrados_x = (qx.T @ my).astype(np.float64)
+            quadrados_y = (mx.T @ qy).astype(np.float64)
+            covariancia = produto - soma_x * soma_y / n
+            variancia_x = quadrados_x - soma_x ** 2 / n
+            variancia_y = quadrados_y - soma_y ** 2 / n
+            r = covariancia / np.sqrt(variancia_x * variancia_y)
+        # Colunas constantes (variância 0) no par ficam sem correlação.
+        r[~np.isfinite(r)] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+
+def p_valores(r, n):
+    """P-valor bilateral do teste t (n - 2 graus de liberdade) para correlações 'r' com 'n' pares."""
+    r = np.asarray(r, dtype=np.float64)
+    graus = np.asarray(n, dtype=np.float64) - 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = r * np.sqrt(graus / ((1 - r) * (1 + r)))
+        resultado = 2 * stats.t.sf(np.abs(t), graus)
+    resultado = np.where(np.abs(r) == 1, 0.0, resultado)
+    return np.where(graus > 0, resultado, np.nan)
+
+
+def ajustar_fdr(p_valores):
+    """
+    Q-valores de Benjamini-Hochberg (taxa de falsas descobertas) para 'p_valores'.
+    Nulos são ignorados e continuam nulos; equivale ao
+    'scipy.stats.false_discovery_control(p, method='bh')' sem nulos.
+    """
+    p = np.asarray(p_valores, dtype=np.float64)
+    q = np.full(p.shape, np.nan)
+    validos = ~np.isnan(p)
+    ordem = np.argsort(p[validos])
+    ordenados = p[validos][ordem]
+    total = len(ordenados)
+    ajustados = ordenados * total / np.arange(1, total + 1)
+    ajustados = np.minimum.accumulate(ajustados[::-1])[::-1]
+    valores = np.empty(total)
+    valores[ordem] = np.minimum(ajustados, 1.0)
+    q[validos] = valores
+    return q
+
+
+def _tipos(metodo, binaria_x, binaria_y):
+    if metodo == 'spearman':
+        return np.full(np.broadcast(binaria_x, binaria_y).shape, 'spearman', dtype=object)
+    return np.where(binaria_x & binaria_y, 'phi',
+                    np.where(binaria_x | binaria_y, 'ponto-bisserial', 'pearson')).astype(object)
+
+
+def _validar_metodo(metodo):
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconhecido: '{metodo}'. Use um de {METODOS}.")
+
+
+def correlacoes_com_alvo(dados, alvo=ALVO_PADRAO, colunas=None, categoricas=None, metodo='pearson', fdr=True,
+                         drop_first=False, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Correlação de cada coluna numérica (e das indicadoras das 'categoricas')
+    com 'alvo', em blocos de 'tamanho_bloco' colunas. Retorna um DataFrame com
+    COLUNA, N, COEFICIENTE, P_VALOR, Q_VALOR (se 'fdr') e TIPO, ordenado pelo
+    |COEFICIENTE|.
+    """
+    _validar_metodo(metodo)
+    colunas = [c for c in (colunas_numericas(dados) if colunas is None else colunas) if c != alvo]
+    matriz, indicadoras, nomes = _atributos(dados, [alvo] + colunas, categoricas, drop_first)
+    if metodo == 'spearman':
+        # Os postos são calculados só nas linhas em que o alvo existe.
+        presentes = ~np.isnan(matriz[:, 0])
+        matriz = postos(matriz[presentes])
+        if indicadoras is not None:
+            indicadoras = indicadoras[presentes]
+    padronizada = _Padronizada(matriz, indicadoras)
+    total = len(nomes)
+    blocos = [_bloco(padronizada, slice(0, 1), slice(inicio, min(inicio + tamanho_bloco, total)))
+              for inicio in range(1, total, tamanho_bloco)]
+    r = np.concatenate([bloco[0][0] for bloco in blocos]) if blocos else np.empty(0)
+    n = np.concatenate([bloco[1][0] for bloco in blocos]) if blocos else np.empty(0)
+    binaria = padronizada.binarias()
+    resultado = pd.DataFrame({
+        'COLUNA': nomes[1:],
+        'N': n.astype(np.int64),
+        'COEFICIENTE': r,
+        'P_VALOR': p_valores(r, n),
+    })
+    if fdr:
+        resultado['Q_VALOR'] = ajustar_fdr(resultado['P_VALOR'].to_numpy())
+    resultado['TIPO'] = _tipos(metodo, binaria[0], binaria[1:])
+    ordem = np.argsort(-np.abs(resultado['COEFICIENTE'].fillna(0).to_numpy()), kind='stable')
+    return resultado.iloc[ordem].reset_index(drop=True)
+
+
+def correlacoes_pares(dados, colunas=None, categoricas=None, metodo='pearson', fdr=True, limiar=0.0,
+                      tamanho_bloco=TAMANHO_BLOCO_PADRAO, drop_first=False):
+    """
+    Correlações entre todos os pares de colunas, em blocos de 'tamanho_bloco'
+    colunas, sem montar a matriz completa.
+
+    Retorna um DataFrame em formato longo (COLUNA_X, COLUNA_Y, N, COEFICIENTE,
+    P_VALOR, Q_VALOR, TIPO) só com os pares em que |COEFICIENTE| >= 'limiar',
+    ordenado pelo |COEFICIENTE|. Os q-valores consideram TODOS os pares
+    testados, não só os devolvidos.
+    """
+    _validar_metodo(metodo)
+    matriz, indicadoras, nomes = _atributos(dados, colunas, categoricas, drop_first)
+    if metodo == 'spearman':
+        matriz = postos(matriz)
+    padronizada = _Padronizada(matriz, indicadoras)
+    binaria = padronizada.binarias()
+    total = len(nomes)
+
+    todos_p, partes = [], []
+    deslocamento = 0
+    for inicio_x in range(0, total, tamanho_bloco):
+        fim_x = min(inicio_x + tamanho_bloco, total)
+        for inicio_y in range(inicio_x, total, tamanho_bloco):
+            fim_y = min(inicio_y + tamanho_bloco, total)
+            r, n = _bloco(padronizada, slice(inicio_x, fim_x), slice(inicio_y, fim_y))
+            i, j = np.nonzero(np.ones(r.shape, dtype=bool) if inicio_y > inicio_x
+                              else np.triu(np.ones(r.shape, dtype=bool), k=1))
+            r, n = r[i, j], n[i, j]
+            p = p_valores(r, n)
+            todos_p.append(p)
+            mantidos = np.abs(np.nan_to_num(r)) >= limiar
+            partes.append((i[mantidos] + inicio_x, j[mantidos] + inicio_y, n[mantidos], r[mantidos], p[mantidos],
+                           np.nonzero(mantidos)[0] + deslocamento))
+            deslocamento += len(p)
+
+    if partes:
+        x, y, n, r, p, posicoes = (np.concatenate(valores) for valores in zip(*partes))
+    else:
+        x = y = posicoes = np.empty(0, dtype=np.int64)
+        n = r = p = np.empty(0)
+    nomes = np.asarray(nomes, dtype=object)
+    resultado = pd.DataFrame({
+        'COLUNA_X': nomes[x],
+        'COLUNA_Y': nomes[y],
+        'N': n.astype(np.int64),
+        'COEFICIENTE': r,
+        'P_VALOR': p,
+    })
+    if fdr:
+        resultado['Q_VALOR'] = ajustar_fdr(np.concatenate(todos_p))[posicoes] if len(posicoes) else np.empty(0)
+    resultado['TIPO'] = _tipos(metodo, binaria[x], binaria[y])
+    ordem = np.argsort(-np.abs(np.nan_to_num(resultado['COEFICIENTE'].to_numpy())), kind='stable')
+    return resultado.iloc[ordem].reset_index(drop=True)
+
@@ -0,0 +1,172 @@
+# Cubo de agregados pré-calculados para as estatísticas descritivas.
+#
+# A seção de estatística descritiva filtra o DataFrame inteiro a cada pergunta:
+# 'dados[dados['GENERO'] == 'Feminino']['IDADE'].mean()', o mesmo para salário
+# e para 'Masculino', o 'pivot_table' de 'GENERO' x 'GESTOR?' etc.
+#
+# 'CuboAgregado' percorre os dados UMA vez e guarda, para cada combinação das
+# dimensões principais ('GENERO', 'NIVEL', 'FAIXA IDADE', 'Estado', 'GESTOR?'),
+# o número de linhas e, para cada medida ('IDADE', 'SALARIO'), a contagem de
+# valores não nulos, a soma, a soma dos quadrados, o mínimo e o máximo. Essas
+# estatísticas são somáveis: qualquer agregação por um subconjunto das
+# dimensões (com ou sem filtros) é obtida somando as células do cubo, sem
+# voltar às linhas. Média, variância e desvio padrão saem dessas somas.
+#
+# O cubo é gravado em Parquet (uma linha por combinação), um formato que uma
+# ferramenta de BI como o Looker Studio consulta diretamente no lugar das linhas.
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES_PADRAO = ['GENERO', 'NIVEL', 'FAIXA IDADE', 'Estado', 'GESTOR?']
+MEDIDAS_PADRAO = ['IDADE', 'SALARIO']
+
+# Nomes alternativos das dimensões: antes da junção com o banco SQLite a
+# coluna de estado ainda se chama 'UF ONDE MORA'.
+SINONIMOS = {'Estado': 'UF ONDE MORA'}
+
+COLUNA_LINHAS = 'LINHAS'
+ESTATISTICAS = ['n', 'soma', 'soma2', 'min', 'max']
+
+
+def _coluna_medida(medida, estatistica):
+    return f'{medida}_{estatistica}'
+
+
+class CuboAgregado:
+    """
+    Agregados somáveis por combinação de 'dimensoes'.
+
+    'tabela' tem uma linha por combinação observada das dimensões (nulos
+    incluídos), a coluna 'LINHAS' e, para cada medida, as colunas
+    '<medida>_n', '<medida>_soma', '<medida>_soma2', '<medida>_min' e '<medida>_max'.
+    """
+
+    def __init__(self, tabela, dimensoes, medidas):
+        self.tabela = tabela
+        self.dimensoes = list(dimensoes)
+        self.medidas = list(medidas)
+
+    @classmethod
+    def construir(cls, dados, dimensoes=None, medidas=None):
+        """
+        Calcula o cubo de 'dados' em uma única passada (um 'groupby' por todas
+        as dimensões). Dimensões ausentes em 'dados' são procuradas pelos
+        nomes em 'SINONIMOS' e, se também não existirem, são ignoradas.
+        """
+        dimensoes = DIMENSOES_PADRAO if dimensoes is None else dimensoes
+        medidas = MEDIDAS_PADRAO if medidas is None else medidas
+
+        colunas = {}
+        for dimensao in dimensoes:
+            origem = dimensao if dimensao in dados.columns else SINONIMOS.get(dimensao)
+            if origem in dados.columns:
+                colunas[dimensao] = dados[origem]
+        medidas = [m for m in medidas if m in dados.columns]
+        if not colunas:
+            raise ValueError(f'Nenhuma das dimensões {list(dimensoes)} existe nos dados.')
+
+        base = pd.DataFrame(colunas, index=dados.index)
+        base[COLUNA_LINHAS] = np.uint8(1)
+        agregacoes = {COLUNA_LINHAS: (COLUNA_LINHAS, 'size')}
+        for medida in medidas:
+            valores = pd.to_numeric(dados[medida], errors='coerce').astype(float)
+            base[medida] = valores
+            base[_coluna_medida(medida, 'quadrado')] = valores ** 2
+            agregacoes[_coluna_medida(medida, 'n')] = (medida, 'count')
+            agregacoes[_coluna_medida(medida, 'soma')] = (medida, 'sum')
+            agregacoes[_coluna_medida(medida, 'soma2')] = (_coluna_medida(medida, 'quadrado'), 'sum')
+            agregacoes[_coluna_medida(medida, 'min')] = (medida, 'min')
+            agregacoes[_coluna_medida(medida, 'max')] = (medida, 'max')
+
+        tabela = (base.groupby(list(colunas), dropna=False, observed=True, sort=True)
+                  .agg(**agregacoes)
+                  .reset_index())
+        return cls(tabela, list(colunas), medidas)
+
+    def _filtrar(self, filtros):
+        tabela = self.tabela
+        for dimensao, valor in (filtros or {}).items():
+            if dimensao not in self.dimensoes:
+                raise KeyError(f"'{dimensao}' não é uma dimensão do cubo ({self.dimensoes}).")
+            valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            tabela = tabela[tabela[dimensao].isin(valores)]
+        return tabela
+
+    def consultar(self, por=(), filtros=None, dropna=False):
+        """
+        Agrega o cubo pelas dimensões 'por' (um nome ou uma lista; vazio para o
+        total), considerando apenas as células que atendem a 'filtros'
+        ({dimensão: valor ou lista de valores}).
+
+        Retorna um DataFrame com 'LINHAS' e, para cada medida, contagem, soma,
+        mínimo, máximo, média, variância e desvio padrão (amostrais, ddof=1).
+        """
+        por = [por] if isinstance(por, str) else list(por)
+        desconhecidas = [d for d in por if d not in self.dimensoes]
+        if desconhecidas:
+            raise KeyError(f'{desconhecidas} não são dimensões do cubo ({self.dimensoes}).')
+        tabela = self._filtrar(filtros)
+
+        somas = [COLUNA_LINHAS] + [_coluna_medida(m, e) for m in self.medidas for e in ('n', 'soma', 'soma2')]
+        minimos = [_coluna_medida(m, 'min') for m in self.medidas]
+        maximos = [_coluna_medida(m, 'max') for m in self.medidas]
+        if por:
+            grupos = tabela.groupby(por, dropna=dropna, observed=True)
+            resultado = pd.concat([grupos[somas].sum(), grupos[minimos].min(), grupos[maximos].max()], axis=1)
+        else:
+            total = {**tabela[somas].sum(), **tabela[minimos].min(), **tabela[maximos].max()}
+            resultado = pd.DataFrame([total], index=['TOTAL'])
+
+        for medida in self.medidas:
+            n = resultado[_coluna_medida(medida, 'n')]
+            soma = resultado[_coluna_medida(medida, 'soma')]
+            media = soma / n.where(n > 0)
+            # Variância a partir das somas: (soma2 - n * média²) / (n - 1).
+            variancia = (resultado[_coluna_medida(medida, 'soma2')] - n * media ** 2) / (n - 1).where(n > 1)
+            resultado[_coluna_medida(medida, 'media')] = media
+            resultado[_coluna_medida(medida, 'variancia')] = variancia.clip(lower=0)
+            resultado[_coluna_medida(medida, 'desvio')] = np.sqrt(resultado[_coluna_medida(medida, 'variancia')])
+        return resultado
+
+    def estatistica(self, medida, estatistica='media', por=(), filtros=None):
+        """
+        Uma estatística de uma medida ('media', 'desvio', 'variancia', 'n',
+        'soma', 'min' ou 'max'). Sem 'por', retorna um número.
+        Ex.: cubo.estatistica('IDADE', filtros={'GENERO': 'Feminino'}).
+        """
+        if medida not in self.medidas:
+            raise KeyError(f"'{medida}' não é uma medida do cubo ({self.medidas}).")
+        valores = self.consultar(por, filtros)[_coluna_medida(medida, estatistica)]
+        return valores.iloc[0] if not por else valores
+
+    def contagem(self, por, filtros=None, dropna=False):
+        """Número de linhas por valor das dimensões 'por' (como 'value_counts')."""
+        contagem = self.consultar(por, filtros, dropna=dropna)[COLUNA_LINHAS]
+        return contagem.sort_values(ascending=False, kind='stable')
+
+    def tabela_cruzada(self, linhas, colunas, filtros=None, medida=None):
+        """
+        Tabela de 'linhas' x 'colunas'. Sem 'medida', conta as linhas (como
+        'pd.crosstab'); com 'medida', conta os valores não nulos dela, como
+        'pivot_table(values=medida, ..., aggfunc='count')'. As duas contagens
+        só diferem quando a medida tem nulos.
+        """
+        if medida is not None and medida not in self.medidas:
+            raise KeyError(f"'{medida}' não é uma medida do cubo ({self.medidas}).")
+        coluna = COLUNA_LINHAS if medida is None else _coluna_medida(medida, 'n')
+        contagem = self.consultar([linhas, colunas], filtros, dropna=True)[coluna]
+        return contagem.unstack(colunas)
+
+    def salvar(self, caminho):
+        """Grava o cubo em Parquet (as dimensões continuam categóricas)."""
+        self.tabela.to_parquet(caminho, index=False)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Lê um cubo gravado por 'salvar'; dimensões e medidas vêm dos nomes das colunas."""
+        tabela = pd.read_parquet(caminho)
+        medidas = [c[:-len('_n')] for c in tabela.columns if c.endswith('_n')]
+        colunas_medidas = {_coluna_medida(m, e) for m in medidas for e in ESTATISTICAS}
+        dimensoes = [c for c in tabela.columns if c != COLUNA_LINHAS and c not in colunas_medidas]
+        return cls(tabela, dimensoes, medidas)
@@ -0,0 +1,316 @@
+# Gerador de dados sintéticos no formato da pesquisa State of Data Brazil 2022.
+#
+# A pesquisa original não pode ser redistribuída, mas os benchmarks e as
+# verificações dos módulos precisam de dados com o mesmo esquema, em tamanhos
+# bem maiores que os ~4 mil respondentes reais. Este módulo gera:
+#
+#   - a planilha principal ('planilha_modulo3'), com as colunas usadas pelo
+#     script e pelo notebook de regressão (ID, IDADE, FAIXA IDADE, GENERO,
+#     SALARIO, FAIXA SALARIAL, NIVEL, GESTOR?, UF ONDE MORA, ...);
+#   - a segunda planilha ('dados2'), com a pergunta sobre mudar de emprego;
+#   - o banco SQLite 'status_brasil' (tabelas Municipios_Brasileiros e
+#     Municipio_Status).
+#
+# As proporções de nulos e as grafias "sujas" seguem o que aparece na planilha
+# real (ex.: 74 idades nulas, ~13% de salários nulos, '+55' e '55+' misturados,
+# ' Acima de R$ 40.001/mês' com espaço, 'Índigina'); 'NIVEL' é nulo para as
+# pessoas gestoras, como na pesquisa. Uma pequena fração dos salários recebe um
+# erro de digitação (valor multiplicado), gerando outliers para a regra dos
+# 3 desvios padrão. As colunas de texto são geradas como 'Categorical' (códigos
+# inteiros), o que permite gerar 10 milhões de linhas com pouca memória.
+#
+# Exemplo (linha de comando):
+#   python dados_sinteticos.py --linhas 1000000 --saida ./dados_sinteticos --formato parquet
+
+import argparse
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+TAMANHOS_PADRAO = [10_000, 1_000_000, 10_000_000]
+
+# Nomes dos arquivos, os mesmos esperados por 'executar_analise.py' (sem a extensão).
+ARQUIVO_PLANILHA = 'planilha_modulo3'
+ARQUIVO_COMPLEMENTO = 'Cópia de Planilha_Aula_parte2'
+ARQUIVO_BANCO = 'status_brasil'
+
+# Limite de linhas de uma planilha do Excel (mais o cabeçalho).
+LINHAS_MAXIMAS_EXCEL = 1_048_575
+
+# Proporção de valores nulos por coluna da planilha principal.
+TAXAS_NULOS = {
+    'IDADE': 0.017,
+    'GENERO': 0.003,
+    'SALARIO': 0.135,
+    'UF ONDE MORA': 0.02,
+    'COR/RACA/ETNIA': 0.002,
+}
+TAXA_OUTLIERS_SALARIO = 0.004
+TAXA_GESTORES = 0.2
+
+# (faixa, idade mínima, idade máxima, peso)
+FAIXAS_IDADE = [
+    ('17-21', 17, 21, 0.05), ('22-24', 22, 24, 0.12), ('25-29', 25, 29, 0.25), ('30-34', 30, 34, 0.21),
+    ('35-39', 35, 39, 0.15), ('40-44', 40, 44, 0.10), ('45-49', 45, 49, 0.06), ('50-54', 50, 54, 0.035),
+    ('55+', 55, 70, 0.025),
+]
+
+# (faixa como aparece na planilha, salário mínimo, salário máximo, peso)
+FAIXAS_SALARIAIS = [
+    ('Menos de R$ 1.000/mês', 500, 1_000, 0.02),
+    ('de R$ 1.001/mês a R$ 2.000/mês', 1_001, 2_000, 0.06),
+    ('de R$ 2.001/mês a R$ 3.000/mês', 2_001, 3_000, 0.08),
+    ('de R$ 3.001/mês a R$ 4.000/mês', 3_001, 4_000, 0.09),
+    ('de R$ 4.001/mês a R$ 6.000/mês', 4_001, 6_000, 0.15),
+    ('de R$ 6.001/mês a R$ 8.000/mês', 6_001, 8_000, 0.13),
+    ('de R$ 8.001/mês a R$ 12.000/mês', 8_001, 12_000, 0.18),
+    ('de R$ 12.001/mês a R$ 16.000/mês', 12_001, 16_000, 0.12),
+    ('de R$ 16.001/mês a R$ 20.000/mês', 16_001, 20_000, 0.07),
+    ('de R$ 20.001/mês a R$ 25.000/mês', 20_001, 25_000, 0.04),
+    ('de R$ 25.001/mês a R$ 30.000/mês', 25_001, 30_000, 0.025),
+    ('de R$ 30.001/mês a R$ 40.000/mês', 30_001, 40_000, 0.02),
+    (' Acima de R$ 40.001/mês', 40_001, 60_000, 0.015),
+]
+
+# (UF, região, peso entre os respondentes, número de municípios)
+ESTADOS = [
+    ('SP', 'Sudeste', 0.40, 645), ('MG', 'Sudeste', 0.10, 853), ('RJ', 'Sudeste', 0.09, 92),
+    ('ES', 'Sudeste', 0.015, 78), ('PR', 'Sul', 0.06, 399), ('SC', 'Sul', 0.05, 295),
+    ('RS', 'Sul', 0.06, 497), ('DF', 'Centro-oeste', 0.03, 1), ('GO', 'Centro-oeste', 0.02, 246),
+    ('MS', 'Centro-oeste', 0.008, 79), ('MT', 'Centro-oeste', 0.008, 141), ('BA', 'Nordeste', 0.03, 417),
+    ('PE', 'Nordeste', 0.025, 185), ('CE', 'Nordeste', 0.02, 184), ('PB', 'Nordeste', 0.01, 223),
+    ('RN', 'Nordeste', 0.008, 167), ('AL', 'Nordeste', 0.005, 102), ('SE', 'Nordeste', 0.005, 75),
+    ('PI', 'Nordeste', 0.005, 224), ('MA', 'Nordeste', 0.005, 217), ('PA', 'Norte', 0.01, 144),
+    ('AM', 'Norte', 0.008, 62), ('TO', 'Norte', 0.003, 139), ('RO', 'Norte', 0.003, 52),
+    ('AC', 'Norte', 0.001, 22), ('AP', 'Norte', 0.001, 16), ('RR', 'Norte', 0.001, 15),
+]
+
+# Demais colunas categóricas: {coluna: [(valor, peso), ...]}.
+CATEGORIAS = {
+    'GENERO': [('Masculino', 0.755), ('Feminino', 0.24), ('Prefiro não informar', 0.005)],
+    'NIVEL': [('Júnior', 0.30), ('Pleno', 0.35), ('Sênior', 0.35)],
+    'COR/RACA/ETNIA': [('Branca', 0.62), ('Parda', 0.245), ('Preta', 0.08), ('Amarela', 0.035),
+                       ('Índigina', 0.003), ('Outra', 0.007), ('Prefiro não informar', 0.01)],
+    'NIVEL DE ENSINO': [('Não tenho graduação formal', 0.03), ('Estudante de graduação', 0.12),
+                        ('Graduação/Bacharelado', 0.33), ('Pós-graduação', 0.35), ('Mestrado', 0.12),
+                        ('Doutorado ou Phd', 0.045), ('Prefiro não informar', 0.005)],
+    'QUAL SUA SITUAÇÃO ATUAL DE TRABALHO?': [
+        ('Empregado (CLT)', 0.63), ('Empreendedor ou Empregado (CNPJ)', 0.10), ('Servidor Público', 0.07),
+        ('Estagiário', 0.04), ('Desempregado, buscando recolocação', 0.06), ('Freelancer', 0.03),
+        ('Somente Estudante (graduação)', 0.03), ('Somente Estudante (pós-graduação)', 0.02),
+        ('Trabalho na área Acadêmica/Pesquisador', 0.02)],
+    'Quanto tempo de experiência na área de dados você tem?': [
+        ('Não tenho experiência na área de dados', 0.05), ('Menos de 1 ano', 0.17), ('de 1 a 2 anos', 0.27),
+        ('de 3 a 4 anos', 0.22), ('de 5 a 6 anos', 0.12), ('de 7 a 10 anos', 0.09), ('Mais de 10 anos', 0.08)],
+    'NUMERO DE FUNCIONARIOS': [
+        ('de 1 a 5', 0.03), ('de 6 a 10', 0.03), ('de 11 a 50', 0.09), ('de 51 a 100', 0.07),
+        ('de 101 a 500', 0.16), ('de 501 a 1.000', 0.10), ('de 1.001 a 3.000', 0.13), ('Acima de 3.000', 0.39)],
+    'SETOR': [('Finanças ou Bancos', 0.20), ('Tecnologia/Fábrica de Software', 0.22), ('Varejo', 0.08),
+              ('Indústria', 0.08), ('Educação', 0.05), ('Área da Saúde', 0.06), ('Setor Público', 0.07),
+              ('Telecomunicação', 0.04), ('Agronegócios', 0.03), ('Outra Opção', 0.17)],
+    'Qual o principal motivo da sua insatisfação com a empresa atual?': [
+        (None, 0.60), ('Salário atual não corresponde ao mercado', 0.16),
+        ('Falta de oportunidade de crescimento no emprego atual', 0.10),
+        ('Não tenho uma boa relação com meu líder/gestor', 0.03),
+        ('Gostaria de trabalhar em em outra área de atuação', 0.04),
+        ('Falta de maturidade analítica na empresa', 0.04),
+        ('Salário atual não corresponde ao mercado, Falta de oportunidade de crescimento no emprego atual', 0.03)],
+}
+
+RESPOSTAS_MUDAR_EMPREGO = [
+    ('Não estou buscando e não pretendo mudar de emprego nos próximos 6 meses', 0.33),
+    ('Não estou buscando, mas me considero aberto a outras oportunidades', 0.42),
+    ('Estou em busca de oportunidades dentro ou fora do Brasil', 0.15),
+    ('Estou em busca de oportunidades, mas apenas fora do Brasil', 0.03),
+    ('Estou em busca de oportunidades, mas apenas no Brasil', 0.02),
+    (None, 0.05),
+]
+TAXA_SEM_COMPLEMENTO = 0.03
+
+
+def _sortear(aleatorio, pesos, n):
+    """Índices sorteados com as probabilidades 'pesos' (normalizadas)."""
+    pesos = np.asarray(pesos, dtype=float)
+    return aleatorio.choice(len(pesos), size=n, p=pesos / pesos.sum()).astype(np.int16)
+
+
+def _categorica(aleatorio, opcoes, n):
+    # 'opcoes' é uma lista (valor, peso); um valor None gera nulos.
+    valores = [valor for valor, _ in opcoes]
+    codigos = _sortear(aleatorio, [peso for _, peso in opcoes], n)
+    categorias = [valor for valor in valores if valor is not None]
+    mapa = np.array([categorias.index(valor) if valor is not None else -1 for valor in valores], dtype=np.int16)
+    return pd.Categorical.from_codes(mapa[codigos], categories=categorias)
+
+
+def _anular(aleatorio, coluna, taxa):
+    """Cópia de 'coluna' com uma fração 'taxa' de valores nulos."""
+    nulos = aleatorio.random(len(coluna)) < taxa
+    if isinstance(coluna, pd.Categorical):
+        codigos = coluna.codes.copy()
+        codigos[nulos] = -1
+        return pd.Categorical.from_codes(codigos, categories=coluna.categories)
+    coluna = coluna.astype(float, copy=True)
+    coluna[nulos] = np.nan
+    return coluna
+
+
+def gerar_pesquisa(n_linhas, semente=0):
+    """
+    Planilha principal com 'n_linhas' respondentes sintéticos.
+
+    As colunas de texto são 'Categorical' com as grafias da planilha original
+    (sem passar pelo 'esquema.py'); 'IDADE' e 'SALARIO' são float com nulos.
+    """
+    aleatorio = np.random.default_rng(semente)
+    n = n_linhas
+
+    # Idade: faixa sorteada e idade uniforme dentro da faixa. Metade da faixa
+    # '55+' aparece como '+55', como na planilha original.
+    faixas_idade = _sortear(aleatorio, [peso for *_, peso in FAIXAS_IDADE], n)
+    minimos = np.array([minimo for _, minimo, _, _ in FAIXAS_IDADE])
+    maximos = np.array([maximo for _, _, maximo, _ in FAIXAS_IDADE])
+    idade = aleatorio.integers(minimos[faixas_idade], maximos[faixas_idade] + 1).astype(float)
+    rotulos_idade = [faixa for faixa, *_ in FAIXAS_IDADE] + ['+55']
+    codigos_idade = faixas_idade.copy()
+    ultima = len(FAIXAS_IDADE) - 1
+    codigos_idade[(faixas_idade == ultima) & (aleatorio.random(n) < 0.5)] = ultima + 1
+
+    # Salário: cresce com a idade (a faixa salarial é sorteada com peso maior
+    # para as faixas altas entre os mais velhos) e é uniforme dentro da faixa.
+    pesos_salario = np.array([peso for *_, peso in FAIXAS_SALARIAIS])
+    deslocamento = np.clip((idade - 30) / 6, -3, 4).round().astype(np.int16)
+    faixas_salario = np.clip(_sortear(aleatorio, pesos_salario, n) + deslocamento, 0, len(FAIXAS_SALARIAIS) - 1)
+    minimos = np.array([minimo for _, minimo, _, _ in FAIXAS_SALARIAIS], dtype=float)
+    maximos = np.array([maximo for _, _, maximo, _ in FAIXAS_SALARIAIS], dtype=float)
+    salario = aleatorio.uniform(minimos[faixas_salario], maximos[faixas_salario])
+    # Erros de digitação (ex.: um zero a mais): outliers para a regra dos 3 desvios.
+    outliers = aleatorio.random(n) < TAXA_OUTLIERS_SALARIO
+    salario[outliers] *= aleatorio.uniform(5, 15, outliers.sum())
+
+    estados = _sortear(aleatorio, [peso for _, _, peso, _ in ESTADOS], n)
+    ufs = pd.Categorical.from_codes(estados, categories=[uf for uf, *_ in ESTADOS])
+    regioes_por_estado = [regiao for _, regiao, _, _ in ESTADOS]
+    nomes_regioes = list(dict.fromkeys(regioes_por_estado))
+    codigos_regiao = np.array([nomes_regioes.index(regiao) for regiao in regioes_por_estado], dtype=np.int16)
+
+    gestor = (aleatorio.random(n) < TAXA_GESTORES).astype(np.int64)
+    nivel = _categorica(aleatorio, CATEGORIAS['NIVEL'], n)
+    # Na pesquisa, 'NIVEL' só é respondido por quem não é gestor.
+    codigos_nivel = nivel.codes.copy()
+    codigos_nivel[gestor == 1] = -1
+
+    dados = pd.DataFrame({
+        'ID': np.arange(n, dtype=np.int64),
+        'IDADE': _anular(aleatorio, idade, TAXAS_NULOS['IDADE']),
+        'FAIXA IDADE': pd.Categorical.from_codes(codigos_idade, categories=rotulos_idade),
+        'GENERO': _anular(aleatorio, _categorica(aleatorio, CATEGORIAS['GENERO'], n), TAXAS_NULOS['GENERO']),
+        'COR/RACA/ETNIA': _anular(aleatorio, _categorica(aleatorio, CATEGORIAS['COR/RACA/ETNIA'], n),
+                                  TAXAS_NULOS['COR/RACA/ETNIA']),
+        'NIVEL DE ENSINO': _categorica(aleatorio, CATEGORIAS['NIVEL DE ENSINO'], n),
+        'SALARIO': _anular(aleatorio, salario, TAXAS_NULOS['SALARIO']),
+        'FAIXA SALARIAL': pd.Categorical.from_codes(faixas_salario, categories=[f for f, *_ in FAIXAS_SALARIAIS]),
+        'NIVEL': pd.Categorical.from_codes(codigos_nivel, categories=nivel.categories),
+        'GESTOR?': gestor,
+        'UF ONDE MORA': _anular(aleatorio, ufs, TAXAS_NULOS['UF ONDE MORA']),
+        'REGIAO ONDE MORA': pd.Categorical.from_codes(codigos_regiao[estados], categories=nomes_regioes),
+    })
+    for coluna in ['QUAL SUA SITUAÇÃO ATUAL DE TRABALHO?', 'Quanto tempo de experiência na área de dados você tem?',
+                   'NUMERO DE FUNCIONARIOS', 'SETOR', 'Qual o principal motivo da sua insatisfação com a empresa atual?']:
+        dados[coluna] = _categorica(aleatorio, CATEGORIAS[coluna], n)
+    return dados
+
+
+def gerar_complemento(ids, semente=0):
+    """
+    Segunda planilha ('dados2'): 'ID' e a pergunta sobre mudar de emprego.
+    Uma pequena parte dos IDs não tem resposta e as linhas vêm embaralhadas.
+    """
+    aleatorio = np.random.default_rng([semente, 1])
+    ids = np.asarray(ids)
+    ids = ids[aleatorio.random(len(ids)) >= TAXA_SEM_COMPLEMENTO]
+    ids = aleatorio.permutation(ids)
+    return pd.DataFrame({
+        'ID': ids,
+        'Você pretende mudar de emprego nos próximos 6 meses?': _categorica(aleatorio, RESPOSTAS_MUDAR_EMPREGO, len(ids)),
+    })
+
+
+def gerar_banco(caminho, semente=0, anos=3):
+    """
+    Cria o banco SQLite 'status_brasil' em 'caminho' (substituindo um existente),
+    com um município por linha em 'Municipios_Brasileiros' e 'anos' medições de
+    renda por município em 'Municipio_Status'.
+    """
+    aleatorio = np.random.default_rng([semente, 2])
+    municipios = []
+    for uf, _, _, quantidade in ESTADOS:
+        renda_estado = aleatorio.lognormal(np.log(1_200), 0.3)
+        for indice in range(quantidade):
+            municipios.append((len(municipios) + 1, f'Município {uf} {indice + 1:04d}', uf, renda_estado))
+    municipio_ids = np.array([municipio[0] for municipio in municipios])
+    rendas_base = np.array([municipio[3] for municipio in municipios])
+
+    status = pd.DataFrame({
+        'municipio_ID': np.repeat(municipio_ids, anos),
+        'Renda': np.repeat(rendas_base, anos) * aleatorio.lognormal(0, 0.25, len(municipio_ids) * anos),
+    })
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    conexao = sqlite3.connect(caminho)
+    try:
+        conexao.execute('CREATE TABLE Municipios_Brasileiros (municipio_ID int, Cidade text, Estado text);')
+        conexao.execute('CREATE TABLE Municipio_Status (municipio_ID int, Renda real);')
+        conexao.executemany('INSERT INTO Municipios_Brasileiros VALUES (?, ?, ?);',
+                            [municipio[:3] for municipio in municipios])
+        conexao.executemany('INSERT INTO Municipio_Status VALUES (?, ?);',
+                            status.itertuples(index=False, name=None))
+        conexao.commit()
+    finally:
+        conexao.close()
+    return caminho
+
+
+def _gravar(dados, caminho_sem_extensao, formato):
+    caminho = f'{caminho_sem_extensao}.{formato}'
+    if formato == 'parquet':
+        dados.to_parquet(caminho, index=False)
+    elif formato == 'csv':
+        dados.to_csv(caminho, index=False)
+    elif formato == 'xlsx':
+        if len(dados) > LINHAS_MAXIMAS_EXCEL:
+            raise ValueError(f'O Excel aceita no máximo {LINHAS_MAXIMAS_EXCEL} linhas; use o formato parquet ou csv.')
+        dados.to_excel(caminho, index=False)
+    else:
+        raise ValueError(f"Formato desconhecido: '{formato}'. Use 'parquet', 'csv' ou 'xlsx'.")
+    return caminho
+
+
+def gravar_conjunto(diretorio, n_linhas, semente=0, formato='parquet'):
+    """
+    Gera e grava em 'diretorio' a planilha principal, a segunda planilha e o
+    banco SQLite. Retorna os caminhos com as chaves das fontes do pipeline
+    ('planilha', 'planilha_complemento', 'banco').
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    dados = gerar_pesquisa(n_linhas, semente)
+    caminhos = {
+        'planilha': _gravar(dados, os.path.join(diretorio, ARQUIVO_PLANILHA), formato),
+        'planilha_complemento': _gravar(gerar_complemento(dados['ID'], semente),
+                                        os.path.join(diretorio, ARQUIVO_COMPLEMENTO), formato),
+        'banco': gerar_banco(os.path.join(diretorio, ARQUIVO_BANCO), semente),
+    }
+    return caminhos
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos no formato da pesquisa State of Data 2022.')
+    parser.add_argument('--linhas', type=int, default=TAMANHOS_PADRAO[0], help='Número de respondentes.')
+    parser.add_argument('--saida', default='dados_sinteticos', help='Diretório de saída.')
+    parser.add_argument('--formato', default='parquet', choices=['parquet', 'csv', 'xlsx'])
+    parser.add_argument('--semente', type=int, default=0)
+    opcoes = parser.parse_args()
+    for fonte, caminho in gravar_conjunto(opcoes.saida, opcoes.linhas, opcoes.semente, opcoes.formato).items():
+        print(f'{fonte}: {caminho}')
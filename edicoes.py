@@ -0,0 +1,328 @@
+# Conjunto de várias edições da pesquisa em Parquet particionado por ano e estado.
+#
+# O script lê uma única planilha fixa do Google Drive. Para comparar edições
+# (2019, 2021, 2022, ...) as respostas de cada ano são gravadas, uma vez, em um
+# diretório Parquet no layout "hive":
+#
+#   edicoes/ANO=2022/UF ONDE MORA=SP/parte-2022-0.parquet
+#
+# com o esquema harmonizado de 'esquema.harmonizar_edicao' (mesmos nomes e
+# tipos em todos os anos; colunas que faltam em uma edição são lidas como nulas).
+# A leitura usa o 'pyarrow.dataset':
+#   - filtros em 'ANO' e 'UF ONDE MORA' (ou 'Estado') descartam diretórios
+#     inteiros sem abrir nenhum arquivo;
+#   - filtros nas demais colunas (ex.: 'IDADE >= 30') descartam os grupos de
+#     linhas cujas estatísticas (mínimo/máximo) não atendem ao filtro. Cada
+#     partição é gravada ordenada por 'IDADE', para que essas estatísticas
+#     sejam estreitas;
+#   - apenas as colunas pedidas são lidas do disco: uma análise de salário por
+#     estado lê só 'SALARIO' (ano e estado vêm do nome do diretório).
+# 'ConjuntoEdicoes.plano' mostra quantos arquivos, grupos de linhas e bytes uma
+# consulta lê de fato.
+#
+# Exemplo (linha de comando):
+#   python edicoes.py gravar planilha_modulo3.xlsx --ano 2022 --destino ./edicoes
+#   python edicoes.py consultar ./edicoes --colunas SALARIO --filtro "IDADE >= 30" --filtro "Estado == SP"
+
+import argparse
+import os
+import re
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from esquema import TIPOS_NUMERICOS_EDICOES, aplicar_esquema, harmonizar_edicao
+
+COLUNA_ANO = 'ANO'
+COLUNA_ESTADO = 'UF ONDE MORA'
+# Nomes alternativos aceitos em 'colunas' e nos filtros (ver 'cubo.SINONIMOS').
+SINONIMOS = {'Estado': COLUNA_ESTADO}
+# Coluna usada para ordenar as linhas de cada partição antes da gravação.
+COLUNA_ORDENACAO = 'IDADE'
+LINHAS_POR_GRUPO = 64 * 1024
+TAMANHO_BLOCO_PADRAO = 100_000
+
+_OPERADORES = ('==', '!=', '>=', '<=', '>', '<', 'in', 'not in')
+
+
+def _particionamento():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([(COLUNA_ANO, pa.int16()), (COLUNA_ESTADO, pa.string())]), flavor='hive')
+
+
+def _tipo_arrow(tipo):
+    import pyarrow as pa
+
+    return {'Int64': pa.int64(), 'float64': pa.float64()}[tipo]
+
+
+def _esquema_arquivo(dados, tipos_numericos=None):
+    # Esquema explícito dos arquivos: sem ele, uma coluna toda nula em um estado
+    # seria gravada com o tipo 'null' e não combinaria com os outros arquivos.
+    import pyarrow as pa
+
+    tipos_numericos = TIPOS_NUMERICOS_EDICOES if tipos_numericos is None else tipos_numericos
+    return pa.schema([(coluna, _tipo_arrow(tipos_numericos[coluna]) if coluna in tipos_numericos else pa.string())
+                      for coluna in dados.columns])
+
+
+def _nome_real(coluna):
+    return SINONIMOS.get(coluna, coluna)
+
+
+def _traduzir_filtros(filtros):
+    """Troca os sinônimos de coluna em filtros no formato do 'pd.read_parquet' (lista de tuplas)."""
+    if not filtros:
+        return filtros
+    if isinstance(filtros[0], tuple):
+        return [(_nome_real(coluna), operador, valor) for coluna, operador, valor in filtros]
+    return [_traduzir_filtros(conjuncao) for conjuncao in filtros]
+
+
+def _colunas_filtro(filtros, colunas):
+    if isinstance(filtros, list):
+        conjuncoes = [filtros] if not filtros or isinstance(filtros[0], tuple) else filtros
+        tuplas = [tupla for conjuncao in conjuncoes for tupla in conjuncao]
+        return {_nome_real(coluna) for coluna, _, _ in tuplas}
+    # Expressão do pyarrow: as colunas são procuradas no texto da expressão.
+    texto = str(filtros)
+    return {coluna for coluna in colunas if coluna in texto}
+
+
+def _expressao(filtros):
+    """Converte 'filtros' (lista de tuplas, lista de listas ou expressão do pyarrow) em expressão."""
+    if filtros is None or not isinstance(filtros, list):
+        return filtros
+    import pyarrow.parquet as pq
+
+    return pq.filters_to_expression(_traduzir_filtros(filtros))
+
+
+def gravar_edicao(dados, ano, diretorio, linhas_por_grupo=LINHAS_POR_GRUPO):
+    """
+    Grava as respostas de uma edição em 'diretorio', particionadas por estado.
+
+    'dados' é harmonizado ('esquema.harmonizar_edicao') e ordenado por
+    'COLUNA_ORDENACAO' antes da gravação. Uma gravação anterior do mesmo 'ano'
+    é substituída por inteiro; as demais edições não são tocadas.
+    Retorna o número de linhas gravadas.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dados = harmonizar_edicao(dados)
+    if COLUNA_ESTADO not in dados.columns:
+        raise KeyError(f"A edição {ano} não tem a coluna de estado '{COLUNA_ESTADO}' (ou 'Estado').")
+    if COLUNA_ORDENACAO in dados.columns:
+        dados = dados.sort_values(COLUNA_ORDENACAO, kind='stable', na_position='last')
+    dados = dados.drop(columns=[COLUNA_ANO], errors='ignore')
+
+    esquema = _esquema_arquivo(dados)
+    tabela = pa.Table.from_pandas(dados, schema=esquema, preserve_index=False)
+    tabela = tabela.append_column(COLUNA_ANO, pa.array(np.full(len(tabela), ano, dtype=np.int16)))
+
+    diretorio_ano = os.path.join(diretorio, f'{COLUNA_ANO}={ano}')
+    if os.path.isdir(diretorio_ano):
+        shutil.rmtree(diretorio_ano)
+    ds.write_dataset(
+        tabela, diretorio, format='parquet', partitioning=_particionamento(),
+        basename_template=f'parte-{ano}-{{i}}.parquet', existing_data_behavior='overwrite_or_ignore',
+        max_rows_per_group=linhas_por_grupo, min_rows_per_group=min(linhas_por_grupo, max(len(tabela), 1)),
+    )
+    return len(tabela)
+
+
+class ConjuntoEdicoes:
+    """
+    Leitura das edições gravadas em 'diretorio' por 'gravar_edicao'.
+
+    'filtros' segue o formato do 'pd.read_parquet': uma lista de tuplas
+    (coluna, operador, valor) combinadas com E, por exemplo
+    '[('IDADE', '>=', 30), ('Estado', '==', 'SP')]', ou uma lista dessas listas
+    combinadas com OU. Uma expressão do 'pyarrow.dataset' também é aceita.
+    """
+
+    def __init__(self, diretorio):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if not os.path.isdir(diretorio):
+            raise FileNotFoundError(f"Diretório de edições não encontrado: '{diretorio}'")
+        self.diretorio = diretorio
+        particionamento = _particionamento()
+        descoberta = ds.dataset(diretorio, format='parquet', partitioning=particionamento)
+        # O 'pyarrow' deduz o esquema só pelo primeiro arquivo; as edições podem ter
+        # colunas diferentes, então o esquema é a união dos rodapés de todos os arquivos.
+        esquemas = [fragmento.physical_schema for fragmento in descoberta.get_fragments()]
+        esquema = pa.unify_schemas(esquemas + [particionamento.schema]) if esquemas else particionamento.schema
+        self.dataset = ds.dataset(diretorio, schema=esquema, format='parquet', partitioning=particionamento)
+
+    @property
+    def colunas(self):
+        return list(self.dataset.schema.names)
+
+    def anos(self):
+        """Anos (edições) presentes no diretório."""
+        anos = {int(nome.split('=', 1)[1]) for nome in os.listdir(self.diretorio)
+                if nome.startswith(f'{COLUNA_ANO}=')}
+        return sorted(anos)
+
+    def _projecao(self, colunas):
+        if colunas is None:
+            return None, {}
+        reais = [_nome_real(coluna) for coluna in colunas]
+        desconhecidas = sorted(set(reais) - set(self.colunas))
+        if desconhecidas:
+            raise KeyError(f'Colunas ausentes em todas as edições: {desconhecidas}')
+        return reais, {_nome_real(coluna): coluna for coluna in colunas if coluna in SINONIMOS}
+
+    def _para_pandas(self, tabela, renomeacoes, categorico):
+        dados = tabela.to_pandas()
+        if categorico:
+            dados = aplicar_esquema(dados)
+        return dados.rename(columns=renomeacoes)
+
+    def carregar(self, colunas=None, filtros=None, categorico=True):
+        """
+        Lê as linhas que atendem a 'filtros', apenas com as 'colunas' pedidas
+        (todas, se None). 'Estado' é aceito no lugar de 'UF ONDE MORA' e volta
+        com o nome pedido. Com 'categorico' as colunas do 'ESQUEMA_CATEGORICO'
+        são convertidas para 'Categorical', com as mesmas categorias em todos os anos.
+        """
+        reais, renomeacoes = self._projecao(colunas)
+        tabela = self.dataset.to_table(columns=reais, filter=_expressao(filtros))
+        return self._para_pandas(tabela, renomeacoes, categorico)
+
+    def ler_em_blocos(self, colunas=None, filtros=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO, categorico=False):
+        """Como 'carregar', mas em blocos de até 'tamanho_bloco' linhas (ver 'cache_colunar.ler_em_blocos')."""
+        import pyarrow as pa
+
+        reais, renomeacoes = self._projecao(colunas)
+        for lote in self.dataset.to_batches(columns=reais, filter=_expressao(filtros), batch_size=tamanho_bloco):
+            if lote.num_rows:
+                yield self._para_pandas(pa.Table.from_batches([lote]), renomeacoes, categorico)
+
+    def plano(self, colunas=None, filtros=None):
+        """
+        Quanto uma consulta lê do disco: arquivos e grupos de linhas que restam
+        depois do descarte por partição e por estatísticas, e os bytes
+        (comprimidos) das colunas lidas nesses grupos, comparados com o total.
+        """
+        expressao = _expressao(filtros)
+        reais, _ = self._projecao(colunas)
+        lidas = set(self.colunas if reais is None else reais)
+        if filtros is not None:
+            # As colunas usadas no filtro também são lidas, mesmo fora da projeção.
+            lidas |= _colunas_filtro(filtros, self.colunas)
+
+        plano = {'arquivos': 0, 'arquivos_lidos': 0, 'grupos': 0, 'grupos_lidos': 0, 'bytes': 0, 'bytes_lidos': 0}
+        selecionados = {fragmento.path for fragmento in self.dataset.get_fragments(filter=expressao)}
+        for fragmento in self.dataset.get_fragments():
+            metadados = fragmento.metadata
+            nomes = metadados.schema.names
+            tamanhos = [sum(metadados.row_group(i).column(j).total_compressed_size for j in range(len(nomes)))
+                        for i in range(metadados.num_row_groups)]
+            plano['arquivos'] += 1
+            plano['grupos'] += metadados.num_row_groups
+            plano['bytes'] += sum(tamanhos)
+            if fragmento.path not in selecionados:
+                continue
+            plano['arquivos_lidos'] += 1
+            grupos = [grupo.id for parte in fragmento.split_by_row_group(expressao, self.dataset.schema)
+                      for grupo in parte.row_groups]
+            plano['grupos_lidos'] += len(grupos)
+            indices = [j for j, nome in enumerate(nomes) if nome in lidas]
+            plano['bytes_lidos'] += sum(metadados.row_group(i).column(j).total_compressed_size
+                                        for i in grupos for j in indices)
+        return plano
+
+
+def salario_por_estado(conjunto, filtros=None, coluna='SALARIO'):
+    """
+    Contagem, média e mediana de 'coluna' por ano e estado. Lê do disco apenas
+    'coluna' (e as colunas dos filtros); ano e estado vêm das partições.
+    """
+    dados = conjunto.carregar([COLUNA_ANO, COLUNA_ESTADO, coluna], filtros, categorico=False)
+    return (dados.groupby([COLUNA_ANO, COLUNA_ESTADO])[coluna]
+            .agg(['count', 'mean', 'median'])
+            .rename(columns={'count': 'RESPONDENTES', 'mean': 'MEDIA', 'median': 'MEDIANA'}))
+
+
+def _interpretar_filtro(texto):
+    """'IDADE >= 30' -> ('IDADE', '>=', 30.0); 'Estado in SP,RJ' -> ('Estado', 'in', ['SP', 'RJ'])."""
+    padrao = '|'.join(re.escape(operador) for operador in sorted(_OPERADORES, key=len, reverse=True))
+    encontrado = re.fullmatch(rf'\s*(.+?)\s+({padrao})\s+(.+?)\s*', texto) or \
+        re.fullmatch(rf'\s*(.+?)\s*({padrao})\s*(.+?)\s*', texto)
+    if not encontrado:
+        raise ValueError(f"Filtro inválido: '{texto}'. Use 'COLUNA OPERADOR VALOR', ex.: 'IDADE >= 30'.")
+    coluna, operador, valor = encontrado.groups()
+
+    def converter(valor):
+        try:
+            return int(valor) if _nome_real(coluna) == COLUNA_ANO else float(valor)
+        except ValueError:
+            return valor
+
+    if operador in ('in', 'not in'):
+        return coluna, operador, [converter(item.strip()) for item in valor.split(',')]
+    return coluna, operador, converter(valor)
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description='Edições da pesquisa em Parquet particionado por ano e estado.')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    gravar = comandos.add_parser('gravar', help='Grava (ou substitui) uma edição no conjunto.')
+    gravar.add_argument('arquivo', help='Planilha, CSV ou Parquet da edição.')
+    gravar.add_argument('--ano', type=int, required=True, help='Ano da edição.')
+    gravar.add_argument('--destino', default='edicoes', help='Diretório do conjunto de edições.')
+
+    consultar = comandos.add_parser('consultar', help='Lê colunas e linhas filtradas do conjunto.')
+    consultar.add_argument('diretorio', help='Diretório do conjunto de edições.')
+    consultar.add_argument('--colunas', nargs='+', help='Colunas lidas (padrão: todas).')
+    consultar.add_argument('--filtro', action='append', default=[],
+                           help="Filtro 'COLUNA OPERADOR VALOR' (pode ser repetido), ex.: 'IDADE >= 30'.")
+    consultar.add_argument('--saida', help='CSV onde gravar as linhas lidas.')
+    return parser
+
+
+def main(argumentos=None):
+    opcoes = criar_parser().parse_args(argumentos)
+
+    if opcoes.comando == 'gravar':
+        # Importação adiada, como em 'executar_analise.py'.
+        from cache_colunar import carregar_planilha
+
+        if not os.path.exists(opcoes.arquivo):
+            print(f"Arquivo de entrada não encontrado: '{opcoes.arquivo}'", file=sys.stderr)
+            return 2
+        linhas = gravar_edicao(carregar_planilha(opcoes.arquivo), opcoes.ano, opcoes.destino)
+        print(f"Edição {opcoes.ano}: {linhas} linhas gravadas em '{opcoes.destino}'.")
+        return 0
+
+    try:
+        filtros = [_interpretar_filtro(texto) for texto in opcoes.filtro] or None
+        conjunto = ConjuntoEdicoes(opcoes.diretorio)
+        plano = conjunto.plano(opcoes.colunas, filtros)
+        dados = conjunto.carregar(opcoes.colunas, filtros)
+    except (ValueError, KeyError, FileNotFoundError) as erro:
+        print(erro, file=sys.stderr)
+        return 2
+    print(f"Arquivos lidos: {plano['arquivos_lidos']}/{plano['arquivos']}, "
+          f"grupos de linhas: {plano['grupos_lidos']}/{plano['grupos']}, "
+          f"bytes: {plano['bytes_lidos']}/{plano['bytes']}.")
+    if opcoes.saida:
+        dados.to_csv(opcoes.saida, index=False)
+        print(f"{len(dados)} linhas gravadas em '{opcoes.saida}'.")
+    else:
+        print(dados.head(20).to_string(index=False))
+        print(f'{len(dados)} linhas.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# Enriquecimento do DataFrame principal com tabelas de consulta (hash join).
+#
+# 'dados.merge(dados2, on='ID', how='left')' e 'dados.merge(estados_renda,
+# on='Estado', how='left')' copiam o DataFrame inteiro a cada junção, e ele fica
+# ainda mais largo depois do 'pd.get_dummies'. Além disso, um 'ID' repetido em
+# 'dados2' multiplicaria linhas de 'dados' sem nenhum aviso.
+#
+# 'TabelaConsulta' monta UMA vez o índice (hash) da chave da tabela de consulta,
+# confere que a chave é única e anexa ao DataFrame principal apenas as colunas
+# pedidas, sem copiar as demais colunas. Para chaves categóricas, a busca é
+# feita uma vez por categoria e o resultado é espalhado pelos códigos.
+
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+class TabelaConsulta:
+    """Tabela de consulta indexada pela coluna 'chave' (que precisa ser única)."""
+
+    def __init__(self, tabela, chave):
+        self.chave = chave
+        self.tabela = tabela.reset_index(drop=True)
+        self.indice = pd.Index(self.tabela[chave])
+        if not self.indice.is_unique:
+            repetidas = self.indice[self.indice.duplicated()].unique()
+            raise ValueError(
+                f"A chave '{chave}' tem {len(repetidas)} valor(es) repetido(s) na tabela de consulta "
+                f"(ex.: {list(repetidas[:5])}); a junção multiplicaria linhas."
+            )
+
+    def posicoes(self, valores):
+        """Posição de cada valor na tabela de consulta (-1 quando não encontrado)."""
+        if isinstance(valores.dtype, pd.CategoricalDtype):
+            por_categoria = self.indice.get_indexer(valores.cat.categories)
+            codigos = valores.cat.codes.to_numpy()
+            return np.where(codigos >= 0, por_categoria[codigos], -1)
+        return self.indice.get_indexer(valores)
+
+    def anexar(self, dados, colunas=None, sobrescrever=False):
+        """
+        Anexa a 'dados' (no próprio DataFrame) as 'colunas' da tabela de consulta.
+
+        Equivale a um left join pela chave: linhas sem correspondência recebem
+        nulo. Por padrão todas as colunas da tabela, exceto a chave, são anexadas.
+        Retorna o próprio 'dados'.
+        """
+        colunas = [c for c in self.tabela.columns if c != self.chave] if colunas is None else list(colunas)
+        existentes = [c for c in colunas if c in dados.columns]
+        if existentes and not sobrescrever:
+            raise ValueError(f"As colunas {existentes} já existem no DataFrame; use 'sobrescrever=True'.")
+        posicoes = self.posicoes(dados[self.chave])
+        for coluna in colunas:
+            valores = pd.api.extensions.take(self.tabela[coluna].array, posicoes, allow_fill=True)
+            dados[coluna] = pd.Series(valores, index=dados.index)
+        return dados
+
+
+def anexar_colunas(dados, tabela, chave, colunas=None, sobrescrever=False):
+    """Atalho para 'TabelaConsulta(tabela, chave).anexar(dados, colunas)'."""
+    return TabelaConsulta(tabela, chave).anexar(dados, colunas, sobrescrever)
+
+
+def _medir(funcao):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def comparar_pico_memoria(n_linhas=1_000_000, n_colunas=40, semente=0):
+    """
+    Compara tempo e pico de memória (tracemalloc) de 'merge' e 'anexar_colunas'
+    em um DataFrame sintético de 'n_linhas' x 'n_colunas', juntando uma coluna
+    por 'ID' e uma por 'Estado'. Retorna um DataFrame com o resultado.
+    """
+    aleatorio = np.random.default_rng(semente)
+    estados = ['AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA',
+               'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO']
+    dados = pd.DataFrame(aleatorio.random((n_linhas, n_colunas)), columns=[f'NIVEL_{i}' for i in range(n_colunas)])
+    dados['ID'] = np.arange(n_linhas)
+    dados['Estado'] = pd.Categorical(aleatorio.choice(estados, n_linhas))
+    dados2 = pd.DataFrame({'ID': np.arange(n_linhas), 'EXTRA': aleatorio.random(n_linhas)})
+    renda = pd.DataFrame({'Estado': estados, 'RENDA': aleatorio.random(len(estados))})
+
+    def com_merge():
+        return dados.merge(dados2, on='ID', how='left').merge(renda, on='Estado', how='left')
+
+    def com_anexar():
+        # Altera o próprio 'dados'; por isso é a última medição.
+        anexar_colunas(dados, dados2, 'ID')
+        return anexar_colunas(dados, renda, 'Estado')
+
+    linhas = []
+    for nome, funcao in [('merge', com_merge), ('anexar_colunas', com_anexar)]:
+        resultado, segundos, pico = _medir(funcao)
+        linhas.append({'METODO': nome, 'SEGUNDOS': segundos, 'PICO_MB': pico / 2 ** 20, 'LINHAS': len(resultado)})
+        del resultado
+    return pd.DataFrame(linhas)
+
+
+if __name__ == '__main__':
+    print(comparar_pico_memoria())
@@ -0,0 +1,176 @@
+# Esquema de tipos categóricos para as colunas de texto da pesquisa.
+#
+# Colunas como 'GENERO', 'FAIXA IDADE' e 'FAIXA SALARIAL' chegam do Excel como
+# strings ('object'). Cada groupby, value_counts, pivot_table, crosstab ou
+# filtro com '==' compara strings, e cada linha guarda sua própria cópia do texto.
+# Convertendo essas colunas para 'Categorical' o texto é guardado uma vez por
+# categoria e as linhas passam a ter apenas um código inteiro pequeno, o que
+# reduz a memória e acelera as agregações, principalmente quando várias
+# edições da pesquisa são empilhadas (com o mesmo conjunto de categorias,
+# 'pd.concat' mantém o tipo categórico).
+#
+# Antes da conversão os valores são normalizados: espaços nas pontas são
+# removidos (ex.: ' Acima de R$ 40.001/mês') e grafias alternativas conhecidas
+# são unificadas (ex.: '+55' -> '55+').
+#
+# 'harmonizar_edicao' prepara uma edição (um ano) da pesquisa para ser
+# empilhada com as demais no conjunto particionado de 'edicoes.py': nomes de
+# colunas e tipos iguais em todos os anos, texto normalizado, mas ainda sem
+# 'Categorical' (as categorias são aplicadas na leitura, sobre todas as edições).
+
+import warnings
+
+import pandas as pd
+
+# Para cada coluna: a lista fixa de categorias (na ordem de exibição) e um
+# dicionário de variantes {grafia encontrada: grafia padrão}.
+# 'categorias' igual a None indica que as categorias são as encontradas nos dados.
+ESQUEMA_CATEGORICO = {
+    'GENERO': {
+        'categorias': ['Feminino', 'Masculino', 'Prefiro não informar'],
+        'variantes': {},
+    },
+    'FAIXA IDADE': {
+        'categorias': ['17-21', '22-24', '25-29', '30-34', '35-39', '40-44', '45-49', '50-54', '55+'],
+        'variantes': {'+55': '55+'},
+    },
+    'FAIXA SALARIAL': {
+        'categorias': [
+            'Menos de R$ 1.000/mês',
+            'de R$ 1.001/mês a R$ 2.000/mês',
+            'de R$ 2.001/mês a R$ 3.000/mês',
+            'de R$ 3.001/mês a R$ 4.000/mês',
+            'de R$ 4.001/mês a R$ 6.000/mês',
+            'de R$ 6.001/mês a R$ 8.000/mês',
+            'de R$ 8.001/mês a R$ 12.000/mês',
+            'de R$ 12.001/mês a R$ 16.000/mês',
+            'de R$ 16.001/mês a R$ 20.000/mês',
+            'de R$ 20.001/mês a R$ 25.000/mês',
+            'de R$ 25.001/mês a R$ 30.000/mês',
+            'de R$ 30.001/mês a R$ 40.000/mês',
+            'Acima de R$ 40.001/mês',
+        ],
+        'variantes': {},
+    },
+    'COR/RACA/ETNIA': {
+        'categorias': ['Branca', 'Parda', 'Preta', 'Amarela', 'Indígena', 'Outra', 'Prefiro não informar'],
+        'variantes': {'Índigina': 'Indígena'},
+    },
+    'NIVEL': {
+        'categorias': ['Júnior', 'Pleno', 'Sênior'],
+        'variantes': {'Junior': 'Júnior', 'Senior': 'Sênior'},
+    },
+    'UF ONDE MORA': {
+        'categorias': None,
+        'variantes': {},
+    },
+    'NIVEL DE ENSINO': {
+        'categorias': [
+            'Não tenho graduação formal',
+            'Estudante de graduação',
+            'Graduação/Bacharelado',
+            'Pós-graduação',
+            'Mestrado',
+            'Doutorado ou Phd',
+            'Prefiro não informar',
+        ],
+        'variantes': {},
+    },
+}
+
+
+# Nomes de colunas que aparecem com outra grafia em outras edições ou em outras
+# etapas da análise, com o nome usado na edição 2022.
+RENOMEACOES_EDICOES = {
+    'Estado': 'UF ONDE MORA',
+    'UF': 'UF ONDE MORA',
+    'REGIAO': 'REGIAO ONDE MORA',
+    'GESTOR': 'GESTOR?',
+}
+
+# Tipos das colunas numéricas no conjunto de edições; as demais colunas são texto.
+TIPOS_NUMERICOS_EDICOES = {
+    'ID': 'Int64',
+    'IDADE': 'float64',
+    'SALARIO': 'float64',
+    'GESTOR?': 'Int64',
+}
+
+
+def normalizar_coluna(serie, variantes=None):
+    """Remove espaços nas pontas e troca as grafias alternativas pela grafia padrão."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype(object)
+    texto = serie.where(serie.isna(), serie.astype(str).str.strip())
+    if variantes:
+        texto = texto.replace(variantes)
+    return texto
+
+
+def converter_coluna(serie, categorias=None, variantes=None):
+    """
+    Normaliza 'serie' e converte para 'Categorical' com as 'categorias' informadas.
+
+    Valores que não estão na lista de categorias não são descartados: eles são
+    acrescentados ao final das categorias e um aviso é emitido, para que a
+    lista do esquema possa ser atualizada.
+    """
+    texto = normalizar_coluna(serie, variantes)
+    if categorias is None:
+        return texto.astype('category')
+    desconhecidos = sorted(set(texto.dropna().unique()) - set(categorias))
+    if desconhecidos:
+        warnings.warn(
+            f"Coluna '{serie.name}': valores fora do esquema adicionados como categorias: {desconhecidos}",
+            stacklevel=2,
+        )
+    return texto.astype(pd.CategoricalDtype(list(categorias) + desconhecidos))
+
+
+def aplicar_esquema(dados, esquema=None):
+    """Retorna uma cópia de 'dados' com as colunas do esquema convertidas para 'Categorical'."""
+    esquema = ESQUEMA_CATEGORICO if esquema is None else esquema
+    dados = dados.copy()
+    for coluna, definicao in esquema.items():
+        if coluna in dados.columns:
+            dados[coluna] = converter_coluna(
+                dados[coluna], definicao.get('categorias'), definicao.get('variantes'),
+            )
+    return dados
+
+
+def harmonizar_edicao(dados, renomeacoes=None, tipos_numericos=None, esquema=None):
+    """
+    Retorna uma cópia de 'dados' com o esquema comum a todas as edições.
+
+    As colunas são renomeadas pelos nomes de 2022 ('RENOMEACOES_EDICOES'), as
+    numéricas são convertidas para os tipos de 'TIPOS_NUMERICOS_EDICOES'
+    (valores não numéricos viram nulo) e as demais viram texto normalizado
+    (espaços nas pontas e variantes do 'ESQUEMA_CATEGORICO').
+    """
+    renomeacoes = RENOMEACOES_EDICOES if renomeacoes is None else renomeacoes
+    tipos_numericos = TIPOS_NUMERICOS_EDICOES if tipos_numericos is None else tipos_numericos
+    esquema = ESQUEMA_CATEGORICO if esquema is None else esquema
+    dados = dados.rename(columns={antigo: novo for antigo, novo in renomeacoes.items()
+                                  if antigo in dados.columns and novo not in dados.columns})
+    harmonizado = {}
+    for coluna in dados.columns:
+        if coluna in tipos_numericos:
+            harmonizado[coluna] = pd.to_numeric(dados[coluna], errors='coerce').astype(tipos_numericos[coluna])
+        else:
+            harmonizado[coluna] = normalizar_coluna(dados[coluna], esquema.get(coluna, {}).get('variantes'))
+    return pd.DataFrame(harmonizado, index=dados.index)
+
+
+def relatorio_memoria(antes, depois):
+    """
+    Compara o uso de memória (em bytes, contando o conteúdo das strings) por coluna
+    de dois DataFrames, tipicamente antes e depois de 'aplicar_esquema'.
+    """
+    relatorio = pd.DataFrame({
+        'ANTES': antes.memory_usage(index=False, deep=True),
+        'DEPOIS': depois.memory_usage(index=False, deep=True),
+    })
+    relatorio.loc['TOTAL'] = relatorio.sum()
+    relatorio['REDUCAO (%)'] = (1 - relatorio['DEPOIS'] / relatorio['ANTES']) * 100
+    return relatorio
@@ -0,0 +1,121 @@
+# Etapas da análise State of Data 2022 declaradas para o 'pipeline.py'.
+#
+# Cada função corresponde a uma seção do script 'Analise_de_Dados_DataHackers.py'
+# (apenas as transformações; as células que só exibem resultados ficam no
+# script). Os resultados passam de uma etapa para a outra diretamente, sem a
+# exportação e releitura do CSV entre as seções.
+#
+# Fontes esperadas em 'Pipeline.executar(fontes=...)':
+#   'planilha'             -> planilha_modulo3.xlsx
+#   'planilha_complemento' -> Cópia de Planilha_Aula_parte2.xlsx
+#   'banco'                -> status_brasil (SQLite)
+
+import cache_colunar
+import codificacao
+import cubo
+import enriquecimento
+import esquema
+import extracao_flags
+import fonte_sql
+import graficos
+import imputacao
+import incremental
+import outliers
+import regras
+import relatorio_graficos
+import resumos
+from pipeline import Etapa, Pipeline
+
+
+def carregar_pesquisa(caminho):
+    # Leitura pelo cache colunar e conversão das colunas de texto para 'category'.
+    return esquema.aplicar_esquema(cache_colunar.carregar_planilha(caminho))
+
+
+def tratar_faltantes(dados):
+    # 'GENERO' nulo vira 'Prefiro não informar'; 'IDADE' e 'SALARIO' são preenchidos por grupo.
+    dados = dados.copy()
+    dados['GENERO'] = dados['GENERO'].fillna('Prefiro não informar')
+    return imputacao.ImputadorPorGrupo(imputacao.ESTRATEGIA_PADRAO).ajustar_aplicar(dados)
+
+
+def tratar_outliers_salario(dados):
+    # Regra dos 3 desvios padrão; outliers recebem a média da própria faixa salarial.
+    # Só média e desvio entram nessa regra, então os quartis aproximados do esboço bastam.
+    limites = outliers.calcular_limites(dados, coluna='SALARIO')
+    medias_faixa = outliers.medias_por_faixa(dados, limites['3sigma'])
+    return outliers.substituir_outliers(dados, limites['3sigma'], medias_faixa)
+
+
+def estado_incremental(pesquisa, faltantes, tratados):
+    # Resumos combináveis dos dados tratados e os parâmetros de tratamento congelados,
+    # para que novas ondas da pesquisa sejam somadas sem recalcular tudo.
+    limites = outliers.calcular_limites(faltantes, coluna='SALARIO')['3sigma']
+    tratamento = {
+        'preencher': {'GENERO': 'Prefiro não informar'},
+        'imputador': imputacao.ImputadorPorGrupo(imputacao.ESTRATEGIA_PADRAO).ajustar(pesquisa),
+        'limites': limites,
+        'medias_faixa': outliers.medias_por_faixa(faltantes, limites),
+    }
+    return incremental.EstadoIncremental(tratamento=tratamento).atualizar(tratados)
+
+
+def cubo_agregados(dados):
+    # Cubo de agregados com 'IDADE' e 'SALARIO' já tratados (antes do One-Hot Encoding de 'NIVEL').
+    return cubo.CuboAgregado.construir(dados)
+
+
+def criar_features(dados):
+    # 'NOVO_NIVEL', One-Hot Encoding de 'NIVEL' e 'GERACAO'.
+    dados = dados.copy()
+    dados['NOVO_NIVEL'] = regras.aplicar_regra(dados, regras.REGRA_NOVO_NIVEL)
+    dados = codificacao.CodificadorEsparso(['NIVEL']).ajustar(dados).anexar(dados)
+    dados['GERACAO'] = regras.aplicar_regra(dados, regras.REGRA_GERACAO)
+    return dados
+
+
+def carregar_complemento(caminho):
+    return cache_colunar.carregar_planilha(caminho)
+
+
+def juntar_complemento(dados, dados2):
+    # Junta as respostas da segunda planilha e cria as colunas de busca de emprego.
+    dados = enriquecimento.anexar_colunas(dados.copy(), dados2, chave='ID')
+    flags = extracao_flags.extrair_flags(dados['Você pretende mudar de emprego nos próximos 6 meses?'],
+                                         {'EM_BUSCA': 'em busca', 'ABERTO_OPORTUNIDADES': 'aberto'})
+    dados['EM_BUSCA'] = flags['EM_BUSCA']
+    dados['ABERTO_OPORTUNIDADES'] = flags['ABERTO_OPORTUNIDADES']
+    return dados
+
+
+def consultar_renda_estados(caminho_banco):
+    return fonte_sql.renda_por_estado(caminho_banco)
+
+
+def juntar_renda(dados, estados_renda):
+    dados = dados.rename(columns={'UF ONDE MORA': 'Estado'})
+    return enriquecimento.anexar_colunas(dados, estados_renda, chave='Estado', colunas=[fonte_sql.COLUNA_RENDA])
+
+
+def agregados_graficos(dados):
+    # Agregados usados pelos gráficos da seção de visualização (e pelo relatório em 'relatorio_graficos.py').
+    return relatorio_graficos.calcular_agregados(dados)
+
+
+def criar_pipeline_analise(diretorio_cache=None):
+    """Pipeline com as etapas da análise, na ordem do script."""
+    return Pipeline([
+        Etapa('pesquisa', carregar_pesquisa, ['planilha'], modulos=[cache_colunar, esquema]),
+        Etapa('faltantes', tratar_faltantes, ['pesquisa'], modulos=[imputacao, extracao_flags]),
+        Etapa('outliers', tratar_outliers_salario, ['faltantes'], modulos=[outliers, resumos, extracao_flags]),
+        Etapa('estado_incremental', estado_incremental, ['pesquisa', 'faltantes', 'outliers'],
+              modulos=[incremental, imputacao, outliers, resumos, extracao_flags]),
+        Etapa('cubo', cubo_agregados, ['outliers'], modulos=[cubo]),
+        Etapa('features', criar_features, ['outliers'], modulos=[regras, codificacao]),
+        Etapa('complemento', carregar_complemento, ['planilha_complemento'], modulos=[cache_colunar]),
+        Etapa('dados_completos', juntar_complemento, ['features', 'complemento'], modulos=[enriquecimento, extracao_flags]),
+        Etapa('renda_estados', consultar_renda_estados, ['banco'], modulos=[fonte_sql]),
+        Etapa('dados_renda', juntar_renda, ['dados_completos', 'renda_estados'], modulos=[enriquecimento]),
+        Etapa('agregados_graficos', agregados_graficos, ['dados_renda'],
+              modulos=[relatorio_graficos, graficos]),
+    ], diretorio_cache=diretorio_cache)
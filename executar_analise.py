@@ -0,0 +1,182 @@
+# Ponto de entrada em linha de comando para rodar a análise sem o Google Colab.
+#
+# Executa o pipeline de 'etapas_analise.py' com caminhos locais configuráveis,
+# sem montar o Google Drive e sem abrir janelas de gráficos. As bibliotecas de
+# gráficos e de estatística não são importadas aqui: cada etapa importa o que
+# precisa apenas quando é executada, o que reduz o tempo de partida dos jobs
+# agendados que só precisam do CSV tratado.
+#
+# Exemplo:
+#   python executar_analise.py --dados ./dados --saida ./saida
+#
+# Modo incremental: depois de uma execução completa, uma nova onda de respostas
+# é somada aos resumos gravados em '<saida>/estado_incremental.json', sem
+# reprocessar as respostas anteriores:
+#   python executar_analise.py --saida ./saida --acrescentar ./dados/onda2.xlsx
+#
+# Com '--relatorio', todos os gráficos da seção de visualização são gravados em
+# '<saida>/relatorio' (PNG/SVG/HTML e um 'index.html'), desenhados em paralelo
+# por 'relatorio_graficos.py'.
+#
+# Com '--instrumentar', o tempo de relógio e de CPU, a memória e as dimensões
+# de entrada e saída de cada etapa são gravados em '<saida>/instrumentacao.json'
+# e acrescentados ao histórico '<saida>/historico_instrumentacao.csv'
+# (ver 'instrumentacao.py'); '--perfilar' grava também o cProfile da etapa mais lenta.
+#
+# Em '--dados' devem estar os arquivos usados pelo script original
+# ('planilha_modulo3.xlsx', 'Cópia de Planilha_Aula_parte2.xlsx' e 'status_brasil');
+# cada um pode ser trocado individualmente pelas opções abaixo.
+
+import argparse
+import os
+import sys
+import time
+
+# Backend não interativo: nenhum gráfico tenta abrir uma janela. Definido antes
+# de qualquer importação do matplotlib (que só acontece dentro das etapas).
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+ARQUIVO_PLANILHA = 'planilha_modulo3.xlsx'
+ARQUIVO_COMPLEMENTO = 'Cópia de Planilha_Aula_parte2.xlsx'
+ARQUIVO_BANCO = 'status_brasil'
+ARQUIVO_SAIDA = 'analise_dados.csv'
+ARQUIVO_CUBO = 'cubo_agregados.parquet'
+ARQUIVO_ESTADO = 'estado_incremental.json'
+ARQUIVO_RESUMO = 'resumo_incremental.csv'
+DIRETORIO_RELATORIO = 'relatorio'
+ARQUIVO_INSTRUMENTACAO = 'instrumentacao.json'
+ARQUIVO_HISTORICO = 'historico_instrumentacao.csv'
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description='Análise da pesquisa State of Data Brazil 2022 em modo batch (sem Google Colab).',
+    )
+    parser.add_argument('--dados', default=os.environ.get('DATAHACKERS_DADOS', '.'),
+                        help='Diretório com as planilhas e o banco SQLite (padrão: $DATAHACKERS_DADOS ou ".").')
+    parser.add_argument('--planilha', help=f"Caminho da planilha principal (padrão: <dados>/{ARQUIVO_PLANILHA}).")
+    parser.add_argument('--complemento', help=f"Caminho da segunda planilha (padrão: <dados>/{ARQUIVO_COMPLEMENTO}).")
+    parser.add_argument('--banco', help=f"Caminho do banco SQLite (padrão: <dados>/{ARQUIVO_BANCO}).")
+    parser.add_argument('--saida', default='saida', help='Diretório onde os resultados são gravados (padrão: "saida").')
+    parser.add_argument('--cache', help='Diretório do cache das etapas do pipeline.')
+    parser.add_argument('--sem-sql', action='store_true',
+                        help='Não consulta o banco SQLite; grava os dados tratados sem a renda por estado.')
+    parser.add_argument('--indexar-banco', action='store_true',
+                        help='Cria os índices de cobertura no banco SQLite antes da análise (altera o arquivo do banco).')
+    parser.add_argument('--acrescentar', nargs='+', metavar='LOTE',
+                        help=f'Soma novos lotes de respostas ao estado incremental em <saida>/{ARQUIVO_ESTADO} '
+                             'em vez de refazer a análise completa.')
+    parser.add_argument('--relatorio', action='store_true',
+                        help=f'Grava todos os gráficos em <saida>/{DIRETORIO_RELATORIO} (PNG, SVG e HTML).')
+    parser.add_argument('--processos', type=int,
+                        help='Número de processos usados para desenhar os gráficos do relatório '
+                             '(padrão: um por gráfico, limitado aos núcleos).')
+    parser.add_argument('--instrumentar', action='store_true',
+                        help=f'Grava tempo, CPU, memória e dimensões de cada etapa em <saida>/{ARQUIVO_INSTRUMENTACAO} '
+                             f'e no histórico <saida>/{ARQUIVO_HISTORICO}.')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='Mede também o pico de memória alocada com o tracemalloc (mais lento).')
+    parser.add_argument('--perfilar', nargs='?', const=True, metavar='ETAPA',
+                        help='Roda as etapas (ou só ETAPA) sob o cProfile e grava o perfil da mais lenta em <saida>.')
+    return parser
+
+
+def acrescentar_lotes(opcoes):
+    # Importações adiadas, como em 'main'.
+    import cache_colunar
+    import esquema
+    from incremental import EstadoIncremental
+
+    caminho_estado = os.path.join(opcoes.saida, ARQUIVO_ESTADO)
+    if not os.path.exists(caminho_estado):
+        print(f"Estado incremental não encontrado em '{caminho_estado}'; "
+              'execute antes a análise completa.', file=sys.stderr)
+        return 2
+    faltando = [caminho for caminho in opcoes.acrescentar if not os.path.exists(caminho)]
+    if faltando:
+        print('Arquivos de entrada não encontrados:\n  ' + '\n  '.join(faltando), file=sys.stderr)
+        return 2
+
+    inicio = time.perf_counter()
+    estado = EstadoIncremental.carregar(caminho_estado)
+    for caminho in opcoes.acrescentar:
+        lote = esquema.aplicar_esquema(cache_colunar.carregar_planilha(caminho))
+        estado.atualizar(lote, tratar=True)
+        print(f"Lote '{caminho}': {len(lote)} respostas acrescentadas.")
+    estado.salvar(caminho_estado)
+    resumo = estado.resumo()
+    resumo.to_csv(os.path.join(opcoes.saida, ARQUIVO_RESUMO), index=False)
+
+    print(resumo.to_string(index=False))
+    print(f'Tempo total: {time.perf_counter() - inicio:.2f} s')
+    return 0
+
+
+def main(argumentos=None):
+    opcoes = criar_parser().parse_args(argumentos)
+    if opcoes.acrescentar:
+        return acrescentar_lotes(opcoes)
+
+    # Importação adiada: '--help' não precisa carregar o pandas.
+    from etapas_analise import criar_pipeline_analise
+
+    fontes = {
+        'planilha': opcoes.planilha or os.path.join(opcoes.dados, ARQUIVO_PLANILHA),
+        'planilha_complemento': opcoes.complemento or os.path.join(opcoes.dados, ARQUIVO_COMPLEMENTO),
+    }
+    alvo = 'dados_completos'
+    if not opcoes.sem_sql:
+        fontes['banco'] = opcoes.banco or os.path.join(opcoes.dados, ARQUIVO_BANCO)
+        alvo = 'dados_renda'
+
+    faltando = [caminho for caminho in fontes.values() if not os.path.exists(caminho)]
+    if faltando:
+        print('Arquivos de entrada não encontrados:\n  ' + '\n  '.join(faltando), file=sys.stderr)
+        return 2
+    if opcoes.indexar_banco and 'banco' in fontes:
+        import fonte_sql
+
+        fonte_sql.criar_indices(fontes['banco'])
+
+    from instrumentacao import Instrumentacao
+
+    inicio = time.perf_counter()
+    instrumentacao = Instrumentacao(tracemalloc=opcoes.tracemalloc, perfilar=opcoes.perfilar)
+    pipeline = criar_pipeline_analise(opcoes.cache)
+    alvos = [alvo, 'cubo', 'estado_incremental']
+    if opcoes.relatorio and not opcoes.sem_sql:
+        alvos.append('agregados_graficos')
+    resultados, relatorio = pipeline.executar(fontes, alvos=alvos, instrumentacao=instrumentacao)
+
+    os.makedirs(opcoes.saida, exist_ok=True)
+    with instrumentacao.etapa('gravar_resultados', resultados[alvo]):
+        resultados[alvo].to_csv(os.path.join(opcoes.saida, ARQUIVO_SAIDA), index=False)
+        resultados['cubo'].salvar(os.path.join(opcoes.saida, ARQUIVO_CUBO))
+        resultados['estado_incremental'].salvar(os.path.join(opcoes.saida, ARQUIVO_ESTADO))
+        resultados['estado_incremental'].resumo().to_csv(os.path.join(opcoes.saida, ARQUIVO_RESUMO), index=False)
+    relatorio.to_csv(os.path.join(opcoes.saida, 'tempos_etapas.csv'), index=False)
+
+    print(relatorio.to_string(index=False))
+    if opcoes.relatorio:
+        import relatorio_graficos
+        with instrumentacao.etapa('relatorio_graficos') as medicao:
+            # Sem o banco não há a etapa 'agregados_graficos'; os mesmos agregados saem dos dados tratados.
+            agregados = (resultados.get('agregados_graficos')
+                         or relatorio_graficos.calcular_agregados(resultados[alvo]))
+            medicao.saida = relatorio_graficos.gerar_relatorio(
+                agregados, os.path.join(opcoes.saida, DIRETORIO_RELATORIO), processos=opcoes.processos)
+        print(medicao.saida.to_string(index=False))
+    if opcoes.instrumentar or opcoes.perfilar:
+        instrumentacao.salvar(os.path.join(opcoes.saida, ARQUIVO_INSTRUMENTACAO))
+        instrumentacao.salvar(os.path.join(opcoes.saida, ARQUIVO_HISTORICO))
+        print(instrumentacao.tabela().drop(columns=['INICIO']).round(3).to_string(index=False))
+    perfil = instrumentacao.salvar_perfil(opcoes.saida)
+    if perfil:
+        print(f"Perfil (cProfile) da etapa mais lenta gravado em '{perfil}'.")
+    print(f'Tempo total: {time.perf_counter() - inicio:.2f} s')
+    print(f"Resultados gravados em '{opcoes.saida}'.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
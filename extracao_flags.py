@@ -0,0 +1,77 @@
+# Extração de indicadores (flags) e números de respostas em texto livre.
+#
+# 'EM_BUSCA' e 'ABERTO_OPORTUNIDADES' eram cada uma uma varredura
+# 'str.contains(..., case=False)' sobre todas as respostas, e o notebook de
+# regressão ainda usa '.apply' linha a linha ('Salário' in x) e 'str.extract'.
+# Como as respostas de formulário se repetem muito, aqui cada padrão é avaliado
+# apenas uma vez por resposta DISTINTA e o resultado é espalhado para as linhas
+# pelos códigos das categorias. O custo passa a depender do número de respostas
+# diferentes, não do número de respondentes.
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+def _codigos_unicos(serie):
+    # Códigos inteiros de cada linha (-1 para nulos) e a lista de valores distintos.
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), pd.Series(serie.cat.categories, dtype=object)
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    return codigos, pd.Series(unicos, dtype=object)
+
+
+def _espalhar(valores_unicos, codigos, index, dtype):
+    # Leva o resultado calculado por valor distinto para cada linha (nulos -> NA).
+    valores = pd.array(valores_unicos, dtype=dtype)
+    return pd.Series(pd.api.extensions.take(valores, codigos, allow_fill=True), index=index)
+
+
+def mapear_unicos(serie, funcao, dtype=None):
+    """
+    Aplica 'funcao' uma única vez a cada valor distinto (não nulo) de 'serie' e
+    espalha o resultado para todas as linhas. Linhas nulas ficam nulas.
+    Substitui o 'serie.apply(funcao)' quando há muitas respostas repetidas.
+    """
+    codigos, unicos = _codigos_unicos(serie)
+    resultados = [funcao(valor) for valor in unicos]
+    return _espalhar(resultados, codigos, serie.index, dtype)
+
+
+def extrair_flags(serie, padroes, case=False, regex=True):
+    """
+    Calcula várias flags booleanas de uma coluna de texto em uma só passada.
+
+    'padroes' é um dicionário {nome da flag: padrão}; cada flag é True quando o
+    padrão aparece na resposta (como 'str.contains'). Retorna um DataFrame com
+    uma coluna 'boolean' por flag; respostas nulas ficam como <NA>.
+    """
+    codigos, unicos = _codigos_unicos(serie)
+    texto = unicos.astype(str)
+    flags = {}
+    for nome, padrao in padroes.items():
+        presentes = texto.str.contains(padrao, case=case, regex=regex).to_numpy(dtype=bool)
+        flags[nome] = _espalhar(presentes, codigos, serie.index, 'boolean')
+    return pd.DataFrame(flags, index=serie.index)
+
+
+def extrair_numero(serie, padrao=r'(\d+)', remover=None):
+    """
+    Extrai o primeiro número de cada resposta (como 'str.extract(r'(\\d+)')'),
+    avaliando cada resposta distinta uma única vez.
+
+    'remover' é um texto retirado antes da extração (ex.: '.' para que
+    '1.001 a 3.000' vire '1001 a 3000', como no notebook de regressão).
+    Retorna uma Series 'Float64'; respostas sem número ou nulas ficam <NA>.
+    """
+    expressao = re.compile(padrao)
+
+    def primeiro_numero(valor):
+        texto = str(valor)
+        if remover:
+            texto = texto.replace(remover, '')
+        encontrado = expressao.search(texto)
+        return float(encontrado.group(1)) if encontrado else np.nan
+
+    return mapear_unicos(serie, primeiro_numero, dtype='Float64')
@@ -0,0 +1,144 @@
+# Acesso ao banco SQLite 'status_brasil' (renda dos municípios).
+#
+# No script original cada consulta abria sua própria conexão e a renda média
+# por estado era obtida com uma consulta 'IN (?, ?, ...)' montada na hora,
+# varrendo 'Municipio_Status' a cada execução. Este módulo:
+#
+#   - reutiliza uma única conexão somente leitura por arquivo de banco;
+#   - oferece 'criar_indices', um passo explícito (nunca chamado nas consultas)
+#     que cria índices de cobertura em 'municipio_ID' e 'Estado', para que a
+#     junção e o agrupamento sejam resolvidos só pelos índices. O banco de
+#     origem só é alterado quando esse passo é pedido;
+#   - calcula UMA vez as tabelas de renda média por estado e por cidade para
+#     todos os municípios, guardando o resultado na memória e em Parquet no
+#     cache colunar. Execuções seguintes (e junções por cidade) usam essas
+#     tabelas sem consultar 'Municipio_Status' de novo, até o banco mudar.
+
+import os
+import sqlite3
+import warnings
+from contextlib import closing
+
+import pandas as pd
+
+from cache_colunar import DIRETORIO_CACHE_PADRAO, identificar_origem
+
+# Nome da coluna de renda média, o mesmo gerado pela consulta original
+# ('SELECT ..., AVG(Municipio_Status.Renda)'), para manter o restante da análise igual.
+COLUNA_RENDA = 'AVG(Municipio_Status.Renda)'
+
+INDICES = {
+    'idx_municipio_status_id_renda': 'Municipio_Status (municipio_ID, Renda)',
+    'idx_municipios_estado_id': 'Municipios_Brasileiros (Estado, municipio_ID)',
+    'idx_municipios_id_cidade_estado': 'Municipios_Brasileiros (municipio_ID, Cidade, Estado)',
+}
+
+CONSULTA_RENDA_ESTADO = f'''
+    SELECT Municipios_Brasileiros.Estado AS Estado, AVG(Municipio_Status.Renda) AS "{COLUNA_RENDA}"
+    FROM Municipios_Brasileiros
+    INNER JOIN Municipio_Status ON Municipios_Brasileiros.municipio_ID = Municipio_Status.municipio_ID
+    GROUP BY Municipios_Brasileiros.Estado;
+'''
+
+CONSULTA_RENDA_CIDADE = f'''
+    SELECT Municipios_Brasileiros.Estado AS Estado, Municipios_Brasileiros.Cidade AS Cidade,
+           AVG(Municipio_Status.Renda) AS "{COLUNA_RENDA}"
+    FROM Municipios_Brasileiros
+    INNER JOIN Municipio_Status ON Municipios_Brasileiros.municipio_ID = Municipio_Status.municipio_ID
+    GROUP BY Municipios_Brasileiros.municipio_ID;
+'''
+
+# Conexões somente leitura abertas, por caminho absoluto do banco.
+_CONEXOES = {}
+# Tabelas de renda já calculadas: {(caminho, hash do banco, tipo): DataFrame}.
+_TABELAS = {}
+
+
+def conectar(caminho):
+    """Retorna a conexão somente leitura de 'caminho', abrindo-a apenas na primeira chamada."""
+    caminho = os.path.abspath(caminho)
+    if caminho not in _CONEXOES:
+        if not os.path.exists(caminho):
+            raise FileNotFoundError(f"Banco de dados não encontrado: '{caminho}'")
+        _CONEXOES[caminho] = sqlite3.connect(f'file:{caminho}?mode=ro', uri=True, check_same_thread=False)
+    return _CONEXOES[caminho]
+
+
+def fechar_conexoes():
+    """Fecha todas as conexões abertas por 'conectar'."""
+    for conexao in _CONEXOES.values():
+        conexao.close()
+    _CONEXOES.clear()
+
+
+def indices_existentes(caminho):
+    """Nomes dos índices definidos no banco."""
+    cursor = conectar(caminho).execute("SELECT name FROM sqlite_master WHERE type = 'index';")
+    return {linha[0] for linha in cursor.fetchall()}
+
+
+def criar_indices(caminho):
+    """
+    Cria em 'caminho' os índices de 'INDICES' que ainda não existem.
+
+    Passo opcional e explícito ('executar_analise.py --indexar-banco'): as
+    consultas deste módulo só leem o banco e nunca chamam esta função. A
+    criação usa uma conexão de escrita temporária; se o arquivo não puder ser
+    alterado, apenas emite um aviso. Retorna a lista de índices que continuam
+    faltando.
+    """
+    faltando = [nome for nome in INDICES if nome not in indices_existentes(caminho)]
+    if not faltando:
+        return []
+    try:
+        # 'closing' fecha a conexão (e libera a trava de escrita) mesmo se um
+        # 'CREATE INDEX' falhar; o 'with' interno só confirma ou desfaz a transação.
+        with closing(sqlite3.connect(caminho)) as conexao_escrita, conexao_escrita:
+            for nome in faltando:
+                conexao_escrita.execute(f'CREATE INDEX IF NOT EXISTS {nome} ON {INDICES[nome]};')
+    except sqlite3.OperationalError as erro:
+        warnings.warn(f'Não foi possível criar os índices {faltando} em {caminho!r}: {erro}', stacklevel=2)
+    return [nome for nome in INDICES if nome not in indices_existentes(caminho)]
+
+
+def _tabela_renda(caminho, tipo, consulta, diretorio_cache=None):
+    # Memória -> Parquet no cache -> consulta ao banco, nessa ordem.
+    caminho = os.path.abspath(caminho)
+    sha = identificar_origem(caminho, diretorio_cache)
+    chave = (caminho, sha, tipo)
+    if chave in _TABELAS:
+        return _TABELAS[chave]
+
+    diretorio_cache = diretorio_cache or DIRETORIO_CACHE_PADRAO
+    arquivo_cache = os.path.join(diretorio_cache, f'renda_{tipo}_{sha}.parquet')
+    if os.path.exists(arquivo_cache):
+        tabela = pd.read_parquet(arquivo_cache)
+    else:
+        tabela = pd.read_sql(consulta, conectar(caminho))
+        os.makedirs(diretorio_cache, exist_ok=True)
+        tabela.to_parquet(arquivo_cache, index=False)
+    _TABELAS[chave] = tabela
+    return tabela
+
+
+def renda_por_estado(caminho, estados=None, diretorio_cache=None):
+    """
+    Renda média dos municípios por estado (colunas 'Estado' e COLUNA_RENDA).
+
+    'estados' filtra o resultado (equivale ao 'WHERE Estado IN (...)' original),
+    mas a tabela completa é calculada uma vez só e reaproveitada.
+    """
+    tabela = _tabela_renda(caminho, 'estado', CONSULTA_RENDA_ESTADO, diretorio_cache)
+    if estados is not None:
+        tabela = tabela[tabela['Estado'].isin(list(estados))]
+    return tabela.reset_index(drop=True)
+
+
+def renda_por_cidade(caminho, diretorio_cache=None):
+    """Renda média por município (colunas 'Estado', 'Cidade' e COLUNA_RENDA)."""
+    return _tabela_renda(caminho, 'cidade', CONSULTA_RENDA_CIDADE, diretorio_cache)
+
+
+def limpar_memoria():
+    """Descarta as tabelas de renda guardadas na memória (o cache em disco é mantido)."""
+    _TABELAS.clear()
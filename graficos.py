@@ -0,0 +1,233 @@
+# Gráficos de dispersão e de linha que continuam utilizáveis com milhões de linhas.
+#
+# 'plt.scatter(dados['IDADE'], dados['SALARIO'], alpha=0.5)' desenha um
+# marcador por respondente e 'px.scatter(..., trendline='ols')' grava todos os
+# pontos no HTML e ajusta a reta pelo statsmodels. Com milhões de linhas o
+# gráfico demora minutos para desenhar e o HTML fica com centenas de MB.
+#
+# Aqui os dados são primeiro reduzidos a um agregado pequeno:
+#   - até 'LIMITE_PONTOS' pares, os próprios pontos (o gráfico é o mesmo de antes);
+#   - acima disso, um histograma 2-D (densidade de respondentes por célula
+#     idade x salário) ou, para o 'scattergl' do Plotly, uma amostra aleatória
+#     de 'LIMITE_PONTOS' pontos (decimação feita antes de enviar ao navegador).
+# A linha de tendência é a reta de mínimos quadrados calculada em forma
+# fechada ('resumos.CoMomentos': inclinação = cov(x, y) / var(x)) sobre TODOS
+# os pares, sem statsmodels. Os agregados ficam em cache, com a chave calculada
+# a partir dos pares e dos parâmetros da redução: desenhar de novo o mesmo
+# gráfico não refaz o histograma nem a reta. As figuras não são guardadas (são
+# objetos mutáveis, e uma 'Figure' fechada pelo pyplot não é exibida de novo);
+# cada chamada desenha uma figura nova a partir do agregado, o que é rápido.
+#
+# matplotlib e plotly são importados apenas dentro das funções que desenham.
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from resumos import CoMomentos
+
+LIMITE_PONTOS = 50_000
+LIMITE_LINHA = 2_000
+CELULAS_PADRAO = (80, 60)
+MAXIMO_AGREGADOS_CACHE = 32
+
+# Agregados já calculados: {chave dos pares e parâmetros: AgregadoDispersao}, do menos para o mais recente.
+_AGREGADOS = OrderedDict()
+
+
+class AgregadoDispersao:
+    """
+    Resumo de um par de colunas pronto para desenhar.
+
+    'tipo' é 'pontos' (x e y são os próprios pontos, eventualmente decimados)
+    ou 'densidade' (contagens do histograma 2-D em 'contagens', com as bordas
+    'bordas_x' e 'bordas_y'). 'n' é o total de pares válidos e 'tendencia' é
+    (inclinação, intercepto, r²) da reta ajustada sobre todos eles.
+    """
+
+    def __init__(self, tipo, n, tendencia, x=None, y=None, contagens=None, bordas_x=None, bordas_y=None):
+        self.tipo = tipo
+        self.n = n
+        self.tendencia = tendencia
+        self.x, self.y = x, y
+        self.contagens, self.bordas_x, self.bordas_y = contagens, bordas_x, bordas_y
+
+
+def _pares_validos(x, y):
+    x = pd.to_numeric(pd.Series(x), errors='coerce').to_numpy(dtype=float)
+    y = pd.to_numeric(pd.Series(y), errors='coerce').to_numpy(dtype=float)
+    validos = ~(np.isnan(x) | np.isnan(y))
+    return x[validos], y[validos]
+
+
+def tendencia_linear(x, y):
+    """
+    Reta de mínimos quadrados y = inclinação * x + intercepto, em forma fechada.
+
+    Mesmo resultado do 'trendline='ols'' do Plotly (OLS com intercepto).
+    Retorna (inclinação, intercepto, r²); NaN quando x é constante.
+    """
+    momentos = CoMomentos().atualizar(x, y)
+    if momentos.n < 2 or momentos.m2_x == 0:
+        return (np.nan, np.nan, np.nan)
+    inclinacao = momentos.c_xy / momentos.m2_x
+    intercepto = momentos.media_y - inclinacao * momentos.media_x
+    return (float(inclinacao), float(intercepto), float(momentos.correlacao() ** 2))
+
+
+def _chave_pares(x, y, *parametros):
+    resumo = hashlib.sha256(repr(parametros).encode())
+    for valores in (x, y):
+        resumo.update(np.ascontiguousarray(valores))
+    return resumo.hexdigest()
+
+
+def agregar_dispersao(x, y, limite=LIMITE_PONTOS, modo='densidade', celulas=CELULAS_PADRAO, semente=0):
+    """
+    Reduz os pares (x, y) ao agregado que será desenhado.
+
+    Até 'limite' pares válidos, mantém os pontos. Acima disso, 'modo' define a
+    redução: 'densidade' (histograma 2-D com 'celulas' = (colunas, linhas)) ou
+    'amostra' ('limite' pontos sorteados sem reposição). O agregado é
+    reaproveitado do cache se os pares e os parâmetros forem os mesmos.
+    """
+    if modo not in ('densidade', 'amostra'):
+        raise ValueError(f"Modo desconhecido: '{modo}'. Use 'densidade' ou 'amostra'.")
+    x, y = _pares_validos(x, y)
+    chave = _chave_pares(x, y, limite, modo, tuple(np.atleast_1d(celulas)), semente)
+    if chave in _AGREGADOS:
+        _AGREGADOS.move_to_end(chave)
+        return _AGREGADOS[chave]
+    agregado = _reduzir(x, y, limite, modo, celulas, semente)
+    # O mesmo agregado é devolvido a cada chamada com esses pares: os arrays ficam somente leitura.
+    for valores in (agregado.x, agregado.y, agregado.contagens, agregado.bordas_x, agregado.bordas_y):
+        if valores is not None:
+            valores.setflags(write=False)
+    _AGREGADOS[chave] = agregado
+    if len(_AGREGADOS) > MAXIMO_AGREGADOS_CACHE:
+        _AGREGADOS.popitem(last=False)
+    return agregado
+
+
+def _reduzir(x, y, limite, modo, celulas, semente):
+    tendencia = tendencia_linear(x, y)
+    n = x.size
+    if n <= limite:
+        return AgregadoDispersao('pontos', n, tendencia, x=x, y=y)
+    if modo == 'amostra':
+        escolhidos = np.sort(np.random.default_rng(semente).choice(n, size=limite, replace=False))
+        return AgregadoDispersao('pontos', n, tendencia, x=x[escolhidos], y=y[escolhidos])
+    contagens, bordas_x, bordas_y = np.histogram2d(x, y, bins=celulas)
+    return AgregadoDispersao('densidade', n, tendencia, contagens=contagens, bordas_x=bordas_x, bordas_y=bordas_y)
+
+
+def limpar_cache_agregados():
+    _AGREGADOS.clear()
+
+
+def decimar_serie(serie, limite=LIMITE_LINHA):
+    """
+    Reduz uma série ordenada pelo índice (ex.: 'salario_por_idade') a no máximo
+    'limite' pontos para o gráfico de linha, mantendo o mínimo e o máximo de
+    cada trecho: picos e vales continuam visíveis.
+    """
+    if len(serie) <= limite:
+        return serie
+    serie = serie.sort_index()
+    trechos = np.arange(len(serie)) * (limite // 2) // len(serie)
+    # Índice posicional: 'idxmin'/'idxmax' devolvem diretamente a posição de cada extremo.
+    grupos = pd.Series(serie.to_numpy(dtype=float)).groupby(trechos)
+    escolhidas = np.unique(np.concatenate([grupos.idxmin().dropna(), grupos.idxmax().dropna()]).astype(np.int64))
+    return serie.iloc[escolhidas]
+
+
+def dispersao_matplotlib(x, y, titulo='', rotulo_x='', rotulo_y='', limite=LIMITE_PONTOS, tendencia=False,
+                         celulas=CELULAS_PADRAO):
+    """
+    Gráfico de dispersão do matplotlib: os pontos (com 'alpha=0.5', como no
+    script) até 'limite' pares; acima disso, a densidade do histograma 2-D em
+    escala logarítmica. Retorna uma 'Figure' nova a cada chamada (o agregado
+    vem do cache se os pares forem os mesmos).
+    """
+    agregado = agregar_dispersao(x, y, limite, 'densidade', celulas)
+    return desenhar_dispersao_matplotlib(agregado, titulo, rotulo_x, rotulo_y, tendencia)
+
+
+def desenhar_dispersao_matplotlib(agregado, titulo='', rotulo_x='', rotulo_y='', tendencia=False):
+    """Desenha a figura do matplotlib (registrada no pyplot) de um 'AgregadoDispersao' já calculado."""
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    figura, eixo = plt.subplots(figsize=(10, 6))
+    if agregado.tipo == 'pontos':
+        eixo.scatter(agregado.x, agregado.y, alpha=0.5)
+    else:
+        contagens = np.ma.masked_equal(agregado.contagens.T, 0)
+        malha = eixo.pcolormesh(agregado.bordas_x, agregado.bordas_y, contagens, norm=LogNorm(), cmap='viridis')
+        figura.colorbar(malha, ax=eixo, label=f'Respondentes por célula (total: {agregado.n:,})')
+    if tendencia:
+        _desenhar_tendencia_matplotlib(eixo, agregado)
+    eixo.set_title(titulo)
+    eixo.set_xlabel(rotulo_x)
+    eixo.set_ylabel(rotulo_y)
+    eixo.grid(True)
+    return figura
+
+
+def _extremos_x(agregado):
+    if agregado.tipo == 'pontos':
+        return (agregado.x.min(), agregado.x.max()) if agregado.x.size else (np.nan, np.nan)
+    return agregado.bordas_x[0], agregado.bordas_x[-1]
+
+
+def _desenhar_tendencia_matplotlib(eixo, agregado):
+    inclinacao, intercepto, r2 = agregado.tendencia
+    if np.isnan(inclinacao):
+        return
+    xs = np.array(_extremos_x(agregado))
+    eixo.plot(xs, inclinacao * xs + intercepto, color='red', linewidth=2, label=f'Tendência (R² = {r2:.3f})')
+    eixo.legend()
+
+
+def dispersao_plotly(x, y, titulo='', rotulo_x='', rotulo_y='', limite=LIMITE_PONTOS, modo='densidade',
+                     tendencia=True, celulas=CELULAS_PADRAO):
+    """
+    Gráfico de dispersão interativo do Plotly com linha de tendência.
+
+    Até 'limite' pares os pontos são desenhados com 'Scattergl' (WebGL).
+    Acima disso, 'modo' escolhe entre 'densidade' (mapa de calor do histograma
+    2-D) e 'amostra' ('Scattergl' com 'limite' pontos sorteados). A reta é
+    sempre ajustada sobre todos os pares. O HTML gerado cresce com o agregado,
+    não com o número de respondentes.
+    """
+    agregado = agregar_dispersao(x, y, limite, modo, celulas)
+    return desenhar_dispersao_plotly(agregado, titulo, rotulo_x, rotulo_y, tendencia)
+
+
+def desenhar_dispersao_plotly(agregado, titulo='', rotulo_x='', rotulo_y='', tendencia=True):
+    """Desenha uma figura nova do Plotly a partir de um 'AgregadoDispersao' já calculado."""
+    import plotly.graph_objects as go
+
+    figura = go.Figure()
+    if agregado.tipo == 'pontos':
+        nome = 'Respondentes' if agregado.x.size == agregado.n else f'Amostra ({agregado.x.size:,} de {agregado.n:,})'
+        figura.add_trace(go.Scattergl(x=agregado.x, y=agregado.y, mode='markers', name=nome,
+                                      marker={'opacity': 0.5}))
+    else:
+        centros_x = (agregado.bordas_x[:-1] + agregado.bordas_x[1:]) / 2
+        centros_y = (agregado.bordas_y[:-1] + agregado.bordas_y[1:]) / 2
+        contagens = np.where(agregado.contagens.T > 0, agregado.contagens.T, np.nan)
+        figura.add_trace(go.Heatmap(x=centros_x, y=centros_y, z=np.log10(contagens), customdata=contagens,
+                                    colorscale='Viridis', name='Respondentes',
+                                    colorbar={'title': 'log10(respondentes)'},
+                                    hovertemplate='x=%{x:.1f}<br>y=%{y:.0f}<br>respondentes=%{customdata:.0f}'))
+    inclinacao, intercepto, r2 = agregado.tendencia
+    if tendencia and not np.isnan(inclinacao):
+        xs = np.array(_extremos_x(agregado))
+        figura.add_trace(go.Scatter(x=xs, y=inclinacao * xs + intercepto, mode='lines', name='Tendência (OLS)',
+                                    line={'color': 'red'},
+                                    hovertemplate=f'y = {inclinacao:.2f}x + {intercepto:.2f}<br>R² = {r2:.4f}'))
+    figura.update_layout(title=titulo, xaxis_title=rotulo_x, yaxis_title=rotulo_y)
+    return figura
@@ -0,0 +1,139 @@
+# Preenchimento de valores faltantes por grupo.
+#
+# No script original cada preenchimento era uma varredura separada da coluna:
+# a média de 'IDADE' da faixa '17-21', depois a média geral para a faixa '55+',
+# depois a mediana geral de 'SALARIO', cada uma seguida de um '.loc[...]'.
+# Aqui a estratégia de cada coluna é declarada em um dicionário, as estatísticas
+# de todas as colunas que usam o mesmo agrupamento são calculadas em um único
+# 'groupby' e os nulos são preenchidos de uma vez, com reserva para um valor
+# global quando o grupo não tem estatística (ex.: faixa '55+' sem nenhuma idade).
+#
+# As estatísticas ajustadas ficam guardadas no imputador e podem ser salvas em
+# JSON, para preencher novos lotes da pesquisa sem recalculá-las.
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from extracao_flags import mapear_unicos
+from resumos import valor_nativo
+
+# Estratégia usada na análise: média de 'IDADE' por 'FAIXA IDADE' e mediana de
+# 'SALARIO' por 'FAIXA SALARIAL', ambas com a estatística global como reserva.
+ESTRATEGIA_PADRAO = {
+    'IDADE': {'estatistica': 'mean', 'grupo': 'FAIXA IDADE', 'reserva': 'mean'},
+    'SALARIO': {'estatistica': 'median', 'grupo': 'FAIXA SALARIAL', 'reserva': 'median'},
+}
+
+_ESTATISTICAS = ('mean', 'median')
+
+
+class ImputadorPorGrupo:
+    """
+    Preenche os nulos das colunas alvo com uma estatística calculada por grupo.
+
+    'estrategia' é um dicionário {coluna alvo: {'estatistica', 'grupo', 'reserva'}}:
+    'estatistica' e 'reserva' são 'mean' ou 'median'; 'grupo' é a coluna de
+    agrupamento (ou None para usar apenas a estatística global).
+    """
+
+    def __init__(self, estrategia=None):
+        self.estrategia = ESTRATEGIA_PADRAO if estrategia is None else estrategia
+        for coluna, definicao in self.estrategia.items():
+            for chave in ('estatistica', 'reserva'):
+                if definicao.get(chave, 'mean') not in _ESTATISTICAS:
+                    raise ValueError(f"Estatística inválida para '{coluna}': '{definicao[chave]}'")
+        # {coluna alvo: Series grupo -> valor} e {coluna alvo: valor global}
+        self.estatisticas_grupo = {}
+        self.estatisticas_globais = {}
+
+    def ajustar(self, dados):
+        """Calcula as estatísticas por grupo e globais de todas as colunas alvo."""
+        # Junta as colunas alvo que usam o mesmo grupo e a mesma estatística,
+        # para fazer um único groupby por combinação.
+        lotes = {}
+        for coluna, definicao in self.estrategia.items():
+            chave = (definicao.get('grupo'), definicao.get('estatistica', 'mean'))
+            lotes.setdefault(chave, []).append(coluna)
+
+        for (grupo, estatistica), colunas in lotes.items():
+            if grupo is None:
+                continue
+            tabela = dados.groupby(grupo, observed=True)[colunas].agg(estatistica)
+            for coluna in colunas:
+                self.estatisticas_grupo[coluna] = tabela[coluna].dropna()
+
+        for coluna, definicao in self.estrategia.items():
+            self.estatisticas_globais[coluna] = float(dados[coluna].agg(definicao.get('reserva', 'mean')))
+            self.estatisticas_grupo.setdefault(coluna, pd.Series(dtype=float))
+        return self
+
+    def aplicar(self, dados):
+        """Retorna uma cópia de 'dados' com os nulos das colunas alvo preenchidos."""
+        if not self.estatisticas_globais:
+            raise RuntimeError('O imputador precisa ser ajustado antes de ser aplicado.')
+        dados = dados.copy()
+        for coluna, definicao in self.estrategia.items():
+            nulos = dados[coluna].isna().to_numpy()
+            if not nulos.any():
+                continue
+            grupo = definicao.get('grupo')
+            if grupo is not None and len(self.estatisticas_grupo[coluna]):
+                # Cada linha recebe a estatística do seu grupo (equivalente a um
+                # 'groupby(grupo).transform', mas usando os valores já ajustados).
+                # A busca é feita uma vez por grupo distinto e espalhada pelos códigos.
+                estatisticas = self.estatisticas_grupo[coluna]
+                valores = mapear_unicos(dados[grupo], lambda valor: estatisticas.get(valor, np.nan),
+                                        dtype='float64').to_numpy(dtype=float)
+            else:
+                valores = np.full(len(dados), np.nan)
+            valores = np.where(np.isnan(valores), self.estatisticas_globais[coluna], valores)
+            preenchida = dados[coluna].to_numpy(dtype=float, copy=True)
+            preenchida[nulos] = valores[nulos]
+            dados[coluna] = preenchida
+        return dados
+
+    def ajustar_aplicar(self, dados):
+        """Ajusta o imputador em 'dados' e preenche os nulos do próprio 'dados'."""
+        return self.ajustar(dados).aplicar(dados)
+
+    def para_dict(self):
+        """
+        Estratégia e estatísticas ajustadas em um dicionário serializável em JSON.
+
+        As estatísticas por grupo são pares [grupo, valor], para que grupos
+        numéricos ou booleanos (ex.: 'GESTOR?') voltem com o mesmo tipo.
+        """
+        return {
+            'estrategia': self.estrategia,
+            'estatisticas_grupo': {
+                coluna: [[valor_nativo(grupo), float(valor)] for grupo, valor in serie.items()]
+                for coluna, serie in self.estatisticas_grupo.items()
+            },
+            'estatisticas_globais': self.estatisticas_globais,
+        }
+
+    @classmethod
+    def de_dict(cls, conteudo):
+        imputador = cls(conteudo['estrategia'])
+        imputador.estatisticas_grupo = {}
+        for coluna, valores in conteudo['estatisticas_grupo'].items():
+            # Arquivos antigos gravavam {grupo em texto: valor}.
+            pares = list(valores.items()) if isinstance(valores, dict) else valores
+            imputador.estatisticas_grupo[coluna] = pd.Series(
+                [valor for _, valor in pares], index=pd.Index([grupo for grupo, _ in pares], dtype=object),
+                dtype=float)
+        imputador.estatisticas_globais = conteudo['estatisticas_globais']
+        return imputador
+
+    def salvar(self, caminho):
+        """Grava a estratégia e as estatísticas ajustadas em um arquivo JSON."""
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.para_dict(), arquivo, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Recria um imputador já ajustado a partir do JSON gravado por 'salvar'."""
+        with open(caminho, encoding='utf-8') as arquivo:
+            return cls.de_dict(json.load(arquivo))
@@ -0,0 +1,256 @@
+# Modo incremental: novas ondas de respostas da pesquisa somadas aos resultados.
+#
+# A cada execução, médias, medianas, quantis, a correlação 'IDADE' x 'SALARIO',
+# o intervalo de confiança do salário e os 'value_counts' eram recalculados
+# sobre todas as linhas. 'EstadoIncremental' guarda apenas resumos combináveis
+# dos dados já tratados (ver 'resumos.py'):
+#   - 'Momentos' de 'IDADE' e 'SALARIO'       -> média, desvio, intervalo t;
+#   - 'CoMomentos' de ('IDADE', 'SALARIO')    -> 'correlacao_continua';
+#   - 'ContagemCategorias' das colunas categóricas -> 'value_counts';
+#   - 'EsbocoQuantis' de 'IDADE' e 'SALARIO'  -> mediana e quantis.
+# Um lote novo atualiza esses resumos em O(tamanho do lote), sem reler as
+# respostas anteriores.
+#
+# Opcionalmente o estado também guarda os parâmetros de tratamento ajustados na
+# carga completa (imputador, limites de outliers e médias por faixa salarial):
+# lotes brutos são tratados com esses parâmetros CONGELADOS antes de entrarem
+# nos resumos, como acontece com um modelo já treinado. Se uma onda nova mudar
+# muito a distribuição, o recomendado é refazer a carga completa.
+#
+# Tolerância em relação a um recálculo completo ('verificar_recalculo'):
+#   - contagens: iguais;
+#   - médias, desvios, intervalo de confiança e correlação: diferença relativa
+#     de até 1e-9 (apenas arredondamento de ponto flutuante);
+#   - quantis: exatos enquanto o total de valores não passa de 'k'; acima disso,
+#     erro de posto de até 'TOLERANCIA_POSTO' (1% com o k padrão).
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from imputacao import ImputadorPorGrupo
+from outliers import substituir_outliers
+from resumos import CoMomentos, ContagemCategorias, EsbocoQuantis, Momentos
+
+COLUNAS_NUMERICAS_PADRAO = ['IDADE', 'SALARIO']
+COLUNAS_CATEGORICAS_PADRAO = ['GENERO', 'FAIXA IDADE', 'FAIXA SALARIAL', 'NIVEL', 'UF ONDE MORA', 'GESTOR?']
+PAR_CORRELACAO_PADRAO = ('IDADE', 'SALARIO')
+
+TOLERANCIA_RELATIVA = 1e-9
+TOLERANCIA_POSTO = 0.01
+
+
+class EstadoIncremental:
+    """
+    Resumos combináveis dos dados tratados, atualizáveis lote a lote.
+
+    'tratamento' (opcional) é um dicionário com os parâmetros congelados usados
+    em 'tratar_lote': 'imputador' (ImputadorPorGrupo ajustado), 'limites'
+    (tupla inferior, superior de 'SALARIO'), 'medias_faixa' (Series faixa ->
+    média) e 'preencher' ({coluna: valor para os nulos}).
+    """
+
+    def __init__(self, colunas_numericas=None, colunas_categoricas=None, par_correlacao=PAR_CORRELACAO_PADRAO,
+                 k=2048, tratamento=None):
+        self.colunas_numericas = list(COLUNAS_NUMERICAS_PADRAO if colunas_numericas is None else colunas_numericas)
+        self.colunas_categoricas = list(
+            COLUNAS_CATEGORICAS_PADRAO if colunas_categoricas is None else colunas_categoricas)
+        self.par_correlacao = tuple(par_correlacao)
+        self.k = k
+        self.tratamento = tratamento or {}
+        self.lotes = 0
+        self.momentos = {coluna: Momentos() for coluna in self.colunas_numericas}
+        self.esbocos = {coluna: EsbocoQuantis(k=k, semente=0) for coluna in self.colunas_numericas}
+        self.contagens = {coluna: ContagemCategorias() for coluna in self.colunas_categoricas}
+        self.comomentos = CoMomentos()
+
+    def tratar_lote(self, lote):
+        """Aplica ao lote bruto o tratamento congelado (preenchimentos, imputação e outliers)."""
+        lote = lote.copy()
+        for coluna, valor in self.tratamento.get('preencher', {}).items():
+            lote[coluna] = lote[coluna].fillna(valor)
+        if self.tratamento.get('imputador') is not None:
+            lote = self.tratamento['imputador'].aplicar(lote)
+        if self.tratamento.get('limites') is not None:
+            lote = substituir_outliers(lote, self.tratamento['limites'], self.tratamento['medias_faixa'])
+        return lote
+
+    def atualizar(self, lote, tratar=False):
+        """
+        Incorpora um lote de respostas aos resumos. Com 'tratar=True' o lote
+        bruto passa antes por 'tratar_lote'. Retorna o próprio estado.
+        """
+        if tratar:
+            lote = self.tratar_lote(lote)
+        for coluna in self.colunas_numericas:
+            valores = pd.to_numeric(lote[coluna], errors='coerce').to_numpy(dtype=float)
+            self.momentos[coluna].atualizar(valores)
+            self.esbocos[coluna].atualizar(valores)
+        for coluna in self.colunas_categoricas:
+            if coluna in lote.columns:
+                self.contagens[coluna].atualizar(lote[coluna])
+        x, y = self.par_correlacao
+        self.comomentos.atualizar(pd.to_numeric(lote[x], errors='coerce'), pd.to_numeric(lote[y], errors='coerce'))
+        self.lotes += 1
+        return self
+
+    def combinar(self, outro):
+        """Incorpora o estado 'outro' (ex.: calculado em paralelo sobre outra parte dos dados)."""
+        for coluna in self.colunas_numericas:
+            self.momentos[coluna].combinar(outro.momentos[coluna])
+            self.esbocos[coluna].combinar(outro.esbocos[coluna])
+        for coluna in self.colunas_categoricas:
+            self.contagens[coluna].combinar(outro.contagens[coluna])
+        self.comomentos.combinar(outro.comomentos)
+        self.lotes += outro.lotes
+        return self
+
+    # Resultados
+
+    def correlacao(self):
+        """Correlação de Pearson do par 'par_correlacao' ('correlacao_continua' do script)."""
+        return self.comomentos.correlacao()
+
+    def intervalo_media(self, coluna='SALARIO', nivel_confianca=0.95):
+        """Intervalo t da média (mesmo cálculo de 'stats.t.interval' com 'stats.sem')."""
+        from scipy import stats
+
+        momentos = self.momentos[coluna]
+        if momentos.n < 2:
+            return (np.nan, np.nan)
+        erro_padrao = momentos.desvio() / np.sqrt(momentos.n)
+        return stats.t.interval(nivel_confianca, momentos.n - 1, loc=momentos.media, scale=erro_padrao)
+
+    def contagem_valores(self, coluna):
+        """Equivalente a 'dados[coluna].value_counts()' (sem as categorias com zero)."""
+        return self.contagens[coluna].serie().rename_axis(coluna)
+
+    def quantil(self, coluna, q):
+        return self.esbocos[coluna].quantil(q)
+
+    def resumo(self):
+        """Resultados principais em um DataFrame (uma linha por estatística)."""
+        linhas = []
+        for coluna in self.colunas_numericas:
+            momentos = self.momentos[coluna]
+            inferior, superior = self.intervalo_media(coluna)
+            for nome, valor in [('n', momentos.n), ('media', momentos.media), ('desvio', momentos.desvio()),
+                                ('minimo', momentos.minimo), ('maximo', momentos.maximo),
+                                ('mediana', self.quantil(coluna, 0.5)),
+                                ('ic95_inferior', inferior), ('ic95_superior', superior)]:
+                linhas.append({'COLUNA': coluna, 'ESTATISTICA': nome, 'VALOR': float(valor)})
+        linhas.append({'COLUNA': ' x '.join(self.par_correlacao), 'ESTATISTICA': 'correlacao',
+                       'VALOR': self.correlacao()})
+        return pd.DataFrame(linhas)
+
+    # Persistência
+
+    def para_dict(self):
+        tratamento = {}
+        if self.tratamento.get('preencher'):
+            tratamento['preencher'] = self.tratamento['preencher']
+        if self.tratamento.get('imputador') is not None:
+            tratamento['imputador'] = self.tratamento['imputador'].para_dict()
+        if self.tratamento.get('limites') is not None:
+            tratamento['limites'] = [float(limite) for limite in self.tratamento['limites']]
+            tratamento['medias_faixa'] = {str(faixa): float(media)
+                                          for faixa, media in self.tratamento['medias_faixa'].items()}
+        return {
+            'colunas_numericas': self.colunas_numericas,
+            'colunas_categoricas': self.colunas_categoricas,
+            'par_correlacao': list(self.par_correlacao),
+            'k': self.k,
+            'lotes': self.lotes,
+            'momentos': {coluna: momentos.para_dict() for coluna, momentos in self.momentos.items()},
+            'esbocos': {coluna: esboco.para_dict() for coluna, esboco in self.esbocos.items()},
+            'contagens': {coluna: contagem.para_dict() for coluna, contagem in self.contagens.items()},
+            'comomentos': self.comomentos.para_dict(),
+            'tratamento': tratamento,
+        }
+
+    @classmethod
+    def de_dict(cls, conteudo):
+        tratamento = dict(conteudo.get('tratamento', {}))
+        if 'imputador' in tratamento:
+            tratamento['imputador'] = ImputadorPorGrupo.de_dict(tratamento['imputador'])
+        if 'limites' in tratamento:
+            tratamento['limites'] = tuple(tratamento['limites'])
+            tratamento['medias_faixa'] = pd.Series(tratamento['medias_faixa'], dtype=float)
+        estado = cls(conteudo['colunas_numericas'], conteudo['colunas_categoricas'],
+                     conteudo['par_correlacao'], conteudo['k'], tratamento)
+        estado.lotes = conteudo['lotes']
+        estado.momentos = {coluna: Momentos.de_dict(valor) for coluna, valor in conteudo['momentos'].items()}
+        estado.esbocos = {coluna: EsbocoQuantis.de_dict(valor, semente=estado.lotes)
+                          for coluna, valor in conteudo['esbocos'].items()}
+        estado.contagens = {coluna: ContagemCategorias.de_dict(valor)
+                            for coluna, valor in conteudo['contagens'].items()}
+        estado.comomentos = CoMomentos.de_dict(conteudo['comomentos'])
+        return estado
+
+    def salvar(self, caminho):
+        """Grava o estado (resumos e tratamento congelado) em JSON."""
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.para_dict(), arquivo, ensure_ascii=False)
+
+    @classmethod
+    def carregar(cls, caminho):
+        with open(caminho, encoding='utf-8') as arquivo:
+            return cls.de_dict(json.load(arquivo))
+
+
+def verificar_recalculo(estado, dados, nivel_confianca=0.95):
+    """
+    Compara os resultados do 'estado' com um recálculo completo sobre 'dados'
+    (todas as linhas já tratadas). Retorna um DataFrame com os dois valores,
+    a diferença, a tolerância aplicada e se ficou dentro dela ('OK').
+    """
+    from scipy import stats
+
+    linhas = []
+
+    def comparar(estatistica, incremental, completo, tolerancia, relativa=True):
+        diferenca = abs(incremental - completo)
+        if relativa:
+            diferenca = diferenca / max(abs(completo), 1e-300)
+        linhas.append({'ESTATISTICA': estatistica, 'INCREMENTAL': incremental, 'RECALCULO': completo,
+                       'DIFERENCA': diferenca, 'TOLERANCIA': tolerancia, 'OK': bool(diferenca <= tolerancia)})
+
+    for coluna in estado.colunas_numericas:
+        valores = pd.to_numeric(dados[coluna], errors='coerce').dropna()
+        momentos = estado.momentos[coluna]
+        comparar(f'{coluna} media', momentos.media, valores.mean(), TOLERANCIA_RELATIVA)
+        comparar(f'{coluna} desvio', momentos.desvio(), valores.std(), TOLERANCIA_RELATIVA)
+        if len(valores) > 1:
+            intervalo = stats.t.interval(nivel_confianca, len(valores) - 1, loc=valores.mean(),
+                                         scale=stats.sem(valores))
+            for nome, incremental, completo in zip(['inferior', 'superior'],
+                                                   estado.intervalo_media(coluna, nivel_confianca), intervalo):
+                comparar(f'{coluna} IC {nome}', incremental, completo, TOLERANCIA_RELATIVA)
+        # Quantis: compara o posto (fração de valores abaixo) da estimativa com o posto pedido.
+        # Com valores repetidos a estimativa ocupa uma faixa de postos; basta 'q' estar nela.
+        ordenados = np.sort(valores.to_numpy())
+        for q in (0.25, 0.5, 0.75):
+            estimativa = estado.quantil(coluna, q)
+            if len(ordenados) <= estado.k:
+                comparar(f'{coluna} quantil {q}', estimativa, valores.quantile(q), TOLERANCIA_RELATIVA)
+                continue
+            posto_inicial = np.searchsorted(ordenados, estimativa, side='left') / len(ordenados)
+            posto_final = np.searchsorted(ordenados, estimativa, side='right') / len(ordenados)
+            posto = min(max(q, posto_inicial), posto_final)
+            comparar(f'{coluna} posto do quantil {q}', posto, q, TOLERANCIA_POSTO, relativa=False)
+
+    x, y = estado.par_correlacao
+    comparar('correlacao', estado.correlacao(),
+             pd.to_numeric(dados[x], errors='coerce').corr(pd.to_numeric(dados[y], errors='coerce')),
+             TOLERANCIA_RELATIVA)
+
+    for coluna in estado.colunas_categoricas:
+        if coluna not in dados.columns:
+            continue
+        completas = dados[coluna].value_counts()
+        completas = completas[completas > 0]
+        incrementais = estado.contagem_valores(coluna)
+        diferentes = completas.to_dict() != incrementais.to_dict()
+        comparar(f'{coluna} value_counts', float(diferentes), 0.0, 0.0, relativa=False)
+    return pd.DataFrame(linhas)
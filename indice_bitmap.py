@@ -0,0 +1,257 @@
+# Índice de bitmaps para filtros repetidos sobre as mesmas colunas.
+#
+# A seção de filtragem (e os painéis que fatiam a pesquisa por gênero, idade,
+# cor/raça...) monta expressões como
+#   dados[(dados['IDADE'] > 30) & (dados['GENERO'] == 'Feminino')]
+# e cada uma compara a coluna inteira de novo. Aqui as comparações são feitas
+# uma única vez, na construção do índice:
+#
+#   - colunas categóricas: um bitmap (1 bit por linha) para cada valor;
+#   - colunas numéricas ('IDADE', 'SALARIO'): bitmaps acumulados por faixa,
+#     "valor <= borda" para cada borda (os próprios valores, se forem poucos,
+#     ou quantis). Um intervalo qualquer sai de dois bitmaps; só as linhas da
+#     faixa que contém o limite da consulta são conferidas com os valores.
+#
+# Os bitmaps ficam compactados em palavras de 64 bits (8 linhas por byte) e os
+# filtros compostos ('&', '|', '~') são operações bit a bit sobre essas
+# palavras. A contagem de um filtro não materializa nenhuma linha; as posições
+# só são expandidas quando pedidas ('posicoes', 'selecionar').
+
+import numpy as np
+import pandas as pd
+
+FAIXAS_PADRAO = 64
+# Colunas com mais valores distintos só são indexadas se pedidas em 'categoricas' (ver custo em 'IndiceBitmap').
+LIMITE_CATEGORIAS = 64
+COLUNAS_NUMERICAS_PADRAO = ['IDADE', 'SALARIO']
+
+# Bits ligados de cada byte, para contar sem 'np.bitwise_count' (que só existe a partir do NumPy 2.0).
+_BITS_POR_BYTE = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+# Palavras little-endian: o bit j da palavra w é a linha 64 * w + j (mesma ordem do 'packbits(bitorder='little')').
+_PALAVRA = np.dtype('<u8')
+
+
+def _compactar(mascara):
+    # Máscara booleana -> palavras de 64 bits (bits excedentes do final em 0).
+    bytes_ = np.packbits(np.asarray(mascara, dtype=bool), bitorder='little')
+    sobra = -bytes_.size % 8
+    if sobra:
+        bytes_ = np.concatenate([bytes_, np.zeros(sobra, dtype=np.uint8)])
+    return bytes_.view(_PALAVRA)
+
+
+def _ligar(palavras, posicoes):
+    # Liga os bits das 'posicoes' (poucas) sem expandir o bitmap.
+    posicoes = np.asarray(posicoes, dtype=np.int64)
+    np.bitwise_or.at(palavras, posicoes >> 6, np.left_shift(np.uint64(1), (posicoes & 63).astype(np.uint64)))
+    return palavras
+
+
+def _expandir(palavras, n):
+    return np.unpackbits(palavras.view(np.uint8), count=n, bitorder='little').view(bool)
+
+
+def _contar(palavras):
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(palavras).sum())
+    return int(_BITS_POR_BYTE[palavras.view(np.uint8)].sum())
+
+
+class Filtro:
+    """
+    Resultado de uma condição do índice: um bitmap sobre as linhas.
+
+    Combina-se com '&', '|' e '~' como as máscaras do pandas; '~' inverte
+    também as linhas nulas (como '~(dados['GENERO'] == 'Feminino')').
+    """
+
+    def __init__(self, indice, palavras):
+        self.indice = indice
+        self.palavras = palavras
+
+    def __and__(self, outro):
+        return Filtro(self.indice, self.palavras & outro.palavras)
+
+    def __or__(self, outro):
+        return Filtro(self.indice, self.palavras | outro.palavras)
+
+    def __invert__(self):
+        return Filtro(self.indice, ~self.palavras & self.indice.todas)
+
+    def contagem(self):
+        """Número de linhas que satisfazem o filtro (sem expandir o bitmap)."""
+        return _contar(self.palavras)
+
+    def mascara(self):
+        """Máscara booleana com uma posição por linha, como 'dados['GENERO'] == ...'."""
+        return _expandir(self.palavras, self.indice.n)
+
+    def posicoes(self):
+        """Posições (para 'iloc') das linhas que satisfazem o filtro, em ordem."""
+        return np.flatnonzero(self.mascara())
+
+    def contar_por(self, coluna, dropna=True):
+        """
+        Contagem de cada valor de uma coluna categórica indexada entre as linhas
+        do filtro, como 'dados[filtro][coluna].value_counts()', sem selecionar as linhas.
+        """
+        valores = self.indice.categoricas[coluna]
+        contagens = {valor: _contar(self.palavras & bitmap) for valor, bitmap in valores.items()}
+        if not dropna:
+            contagens[np.nan] = _contar(self.palavras & self.indice.nulos[coluna])
+        serie = pd.Series(contagens, dtype='int64', name='count')
+        serie.index.name = coluna
+        serie = serie[serie > 0] if dropna else serie
+        return serie.sort_values(ascending=False, kind='stable')
+
+
+class IndiceBitmap:
+    """
+    Índice de bitmaps de um DataFrame.
+
+    'categoricas' são as colunas indexadas por valor (padrão: colunas
+    categóricas, de texto ou booleanas com até 'LIMITE_CATEGORIAS' valores);
+    'numericas' são indexadas por faixas, com até 'faixas' bordas. O índice
+    vale para o DataFrame da construção: se 'dados' mudar, construa de novo.
+
+    Custo em memória, com n linhas: n/8 bytes por valor distinto de cada
+    coluna categórica, mais n/8 bytes de nulos por coluna (1 milhão de linhas:
+    125 KB por valor, ou 8 MB para uma coluna com 64 valores). Cada coluna
+    numérica guarda até 'faixas' bitmaps acumulados (faixas * n/8 bytes) e as
+    posições e os valores ordenados (16 bytes por linha). 'memoria()' informa
+    o total do índice construído.
+    """
+
+    def __init__(self, dados, categoricas=None, numericas=None, faixas=FAIXAS_PADRAO):
+        self.n = len(dados)
+        self.todas = _compactar(np.ones(self.n, dtype=bool))
+        self.nulos = {}
+        self.categoricas = {}
+        self.bordas = {}
+        self.acumulados = {}
+        self.ordenados = {}
+        self.exatas = {}
+
+        if numericas is None:
+            numericas = [coluna for coluna in COLUNAS_NUMERICAS_PADRAO if coluna in dados]
+        if categoricas is None:
+            categoricas = [coluna for coluna, serie in dados.items()
+                           if coluna not in numericas and _categorica(serie)
+                           and serie.nunique() <= LIMITE_CATEGORIAS]
+        for coluna in categoricas:
+            self._indexar_categorica(coluna, dados[coluna])
+        for coluna in numericas:
+            self._indexar_numerica(coluna, dados[coluna], faixas)
+
+    def _indexar_categorica(self, coluna, serie):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos, valores = serie.cat.codes.to_numpy(), serie.cat.categories
+        else:
+            codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+        self.nulos[coluna] = _compactar(codigos == -1)
+        # Uma passada para ordenar os códigos e cada valor é um trecho contíguo da ordem.
+        ordem = np.argsort(codigos, kind='stable')
+        inicios = np.searchsorted(codigos[ordem], np.arange(len(valores) + 1))
+        bitmaps = {}
+        for codigo, valor in enumerate(valores):
+            mascara = np.zeros(self.n, dtype=bool)
+            mascara[ordem[inicios[codigo]:inicios[codigo + 1]]] = True
+            bitmaps[valor] = _compactar(mascara)
+        self.categoricas[coluna] = bitmaps
+
+    def _indexar_numerica(self, coluna, serie, faixas):
+        valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        nulos = np.isnan(valores)
+        # Posições das linhas não nulas em ordem de valor: as linhas de uma faixa são um trecho contíguo.
+        ordem = np.flatnonzero(~nulos)
+        ordem = ordem[np.argsort(valores[ordem], kind='stable')]
+        ordenados = valores[ordem]
+        unicos = np.unique(ordenados)
+        # Poucos valores distintos (ex.: idades inteiras): as bordas são os próprios valores e o índice é exato.
+        exata = unicos.size <= faixas
+        bordas = unicos if exata else np.unique(np.quantile(ordenados, np.linspace(0, 1, faixas + 1)[1:]))
+        self.nulos[coluna] = _compactar(nulos)
+        self.bordas[coluna] = bordas
+        self.exatas[coluna] = exata
+        self.ordenados[coluna] = (ordem, ordenados)
+        # Comparações com NaN são False: as linhas nulas não entram em nenhum bitmap acumulado.
+        self.acumulados[coluna] = [_compactar(valores <= borda) for borda in bordas]
+
+    def _vazio(self):
+        return np.zeros_like(self.todas)
+
+    def _ate(self, coluna, limite, inclusivo):
+        # Linhas com valor <= limite (ou < limite): bitmap acumulado da maior borda abaixo do
+        # limite mais as linhas da faixa seguinte que passam na comparação. Como as linhas estão
+        # ordenadas por valor, essas são um trecho de 'ordem', achado por busca binária.
+        bordas, acumulados = self.bordas[coluna], self.acumulados[coluna]
+        lado = 'right' if inclusivo else 'left'
+        k = int(np.searchsorted(bordas, limite, side=lado)) - 1
+        resultado = acumulados[k].copy() if k >= 0 else self._vazio()
+        if k + 1 >= len(bordas) or self.exatas[coluna] or (inclusivo and k >= 0 and bordas[k] == limite):
+            return resultado
+        ordem, ordenados = self.ordenados[coluna]
+        inicio = int(np.searchsorted(ordenados, bordas[k], side='right')) if k >= 0 else 0
+        fim = int(np.searchsorted(ordenados, limite, side=lado))
+        return _ligar(resultado, ordem[inicio:fim])
+
+    # Condições
+
+    def igual(self, coluna, valor):
+        """'dados[coluna] == valor'."""
+        return Filtro(self, self.categoricas[coluna].get(valor, self._vazio()))
+
+    def em(self, coluna, valores):
+        """'dados[coluna].isin(valores)'."""
+        palavras = self._vazio()
+        for valor in valores:
+            palavras = palavras | self.categoricas[coluna].get(valor, palavras)
+        return Filtro(self, palavras)
+
+    def contem(self, coluna, padrao, case=True, regex=True):
+        """'dados[coluna].str.contains(padrao, na=False)', avaliado só nos valores distintos."""
+        bitmaps = self.categoricas[coluna]
+        valores = pd.Series(list(bitmaps), dtype=object)
+        presentes = valores.astype(str).str.contains(padrao, case=case, regex=regex).to_numpy(dtype=bool)
+        return self.em(coluna, valores[presentes].tolist())
+
+    def nulo(self, coluna):
+        """'dados[coluna].isnull()'."""
+        return Filtro(self, self.nulos[coluna])
+
+    def menor(self, coluna, limite):
+        return Filtro(self, self._ate(coluna, limite, inclusivo=False))
+
+    def menor_igual(self, coluna, limite):
+        return Filtro(self, self._ate(coluna, limite, inclusivo=True))
+
+    def maior(self, coluna, limite):
+        return Filtro(self, ~self._ate(coluna, limite, inclusivo=True) & ~self.nulos[coluna] & self.todas)
+
+    def maior_igual(self, coluna, limite):
+        return Filtro(self, ~self._ate(coluna, limite, inclusivo=False) & ~self.nulos[coluna] & self.todas)
+
+    def entre(self, coluna, minimo, maximo, inclusive='both'):
+        """'dados[coluna].between(minimo, maximo, inclusive)'."""
+        inclui_minimo = inclusive in ('both', 'left')
+        inclui_maximo = inclusive in ('both', 'right')
+        abaixo = self._ate(coluna, minimo, inclusivo=not inclui_minimo)
+        return Filtro(self, self._ate(coluna, maximo, inclusivo=inclui_maximo) & ~abaixo)
+
+    def selecionar(self, dados, filtro):
+        """'dados[filtro]': as linhas do DataFrame usado na construção."""
+        return dados.iloc[filtro.posicoes()]
+
+    def memoria(self):
+        """Bytes ocupados pelo índice (bitmaps e colunas numéricas ordenadas)."""
+        bitmaps = [self.todas, *self.nulos.values()]
+        bitmaps += [array for ordenados in self.ordenados.values() for array in ordenados]
+        bitmaps += [bitmap for valores in self.categoricas.values() for bitmap in valores.values()]
+        bitmaps += [bitmap for acumulados in self.acumulados.values() for bitmap in acumulados]
+        return sum(bitmap.nbytes for bitmap in bitmaps)
+
+
+def _categorica(serie):
+    return (isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(serie)
+            or pd.api.types.is_string_dtype(serie) or pd.api.types.is_bool_dtype(serie))
+
@@ -0,0 +1,378 @@
+# Instrumentação das etapas da análise: tempo, CPU, memória e tamanho dos dados.
+#
+# 'tempos_etapas.csv' e o benchmark em 'benchmarks/' mostram só o tempo de cada
+# etapa do pipeline, e o script (exportação do notebook) não mede nada. Aqui
+# cada etapa ou seção é medida por um gerenciador de contexto
+# ('with instrumentacao.etapa(nome, entrada)'), por um decorador
+# ('@instrumentacao.medir()') ou, no script, por marcas de seção
+# ('instrumentacao.secao(nome, dados)'), que fecham a seção anterior e abrem a
+# próxima sem mudar a indentação das células. Para cada etapa são guardados:
+#   - o tempo de relógio e o tempo de CPU do processo (todas as threads);
+#   - a memória residente (RSS) no fim e o pico de RSS durante a etapa. No
+#     Linux o pico é zerado no início de cada etapa ('/proc/self/clear_refs');
+#     nos demais sistemas é o pico do processo até o fim da etapa;
+#   - opcionalmente, o pico de memória alocada segundo o tracemalloc (mais
+#     preciso, mas deixa o código Python bem mais lento);
+#   - linhas e colunas da entrada e da saída (DataFrames, Series e arrays).
+#
+# O registro vai para um JSON (uma execução) ou é acrescentado a um CSV
+# (histórico de execuções, com colunas fixas); 'comparar_logs' aponta as etapas que ficaram mais
+# lentas que na execução anterior, como o '--comparar' do benchmark. Com
+# 'perfilar', as etapas também rodam sob o cProfile e as estatísticas da etapa
+# mais lenta são gravadas ('salvar_perfil') para abrir com 'pstats' ou snakeviz.
+#
+# Exemplo (linha de comando), comparando as duas últimas execuções do histórico:
+#   python instrumentacao.py saida/historico_instrumentacao.csv
+
+import argparse
+import cProfile
+import functools
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+COLUNAS = ['ETAPA', 'INICIO', 'SEGUNDOS', 'CPU_SEGUNDOS', 'RSS_MB', 'PICO_RSS_MB', 'PICO_TRACEMALLOC_MB',
+           'LINHAS_ENTRADA', 'COLUNAS_ENTRADA', 'LINHAS_SAIDA', 'COLUNAS_SAIDA', 'PERFILADA', 'ERRO']
+# Colunas do histórico CSV: sempre as mesmas, com os detalhes extras de cada
+# etapa (ex.: 'SITUACAO' do pipeline) juntos em 'DETALHES', em JSON.
+COLUNAS_HISTORICO = ['EXECUCAO'] + COLUNAS + ['DETALHES']
+TOLERANCIA_PADRAO = 1.2
+# Diferenças menores que isto (em segundos) são ruído de medição, não regressão.
+DIFERENCA_MINIMA = 0.005
+LINHAS_RESUMO_PERFIL = 40
+
+
+def _dimensoes(objeto):
+    """(linhas, colunas) de um DataFrame, Series ou array; (None, None) para outros objetos."""
+    forma = getattr(objeto, 'shape', None)
+    if not isinstance(forma, tuple) or not forma:
+        return None, None
+    return forma[0], (forma[1] if len(forma) > 1 else 1)
+
+
+def _para_historico(tabela):
+    """Converte uma tabela de registros para as colunas fixas do histórico CSV."""
+    extras = [coluna for coluna in tabela.columns if coluna not in COLUNAS_HISTORICO]
+    historico = tabela.reindex(columns=COLUNAS_HISTORICO)
+    if extras:
+        detalhes = [json.dumps({chave: valor for chave, valor in linha.items() if pd.notna(valor)},
+                               ensure_ascii=False, default=str)
+                    for linha in tabela[extras].to_dict('records')]
+        historico['DETALHES'] = [None if texto == '{}' else texto for texto in detalhes]
+    return historico
+
+
+def _status_mb(campo):
+    # Campos 'VmRSS' / 'VmHWM' (em kB) de '/proc/self/status'; None fora do Linux.
+    try:
+        with open('/proc/self/status', encoding='ascii') as arquivo:
+            for linha in arquivo:
+                if linha.startswith(campo + ':'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _pico_rss_processo():
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # 'ru_maxrss' é em kB no Linux e em bytes no macOS.
+    return pico / 2 ** 20 if sys.platform == 'darwin' else pico / 1024
+
+
+def _zerar_pico_rss():
+    """Zera o pico de RSS ('VmHWM') do processo; só é possível no Linux."""
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as arquivo:
+            arquivo.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class Medicao:
+    """
+    Uma etapa em andamento. Dentro do 'with', a saída da etapa pode ser
+    informada em 'saida' para que as suas dimensões sejam registradas.
+    """
+
+    def __init__(self, nome, entrada, detalhes):
+        self.nome = nome
+        self.linhas_entrada, self.colunas_entrada = _dimensoes(entrada)
+        self.detalhes = detalhes
+        self.saida = None
+        self.perfil = None
+        # Maiores picos lidos antes de uma etapa interna (aninhada) zerar os
+        # contadores e picos das próprias etapas internas.
+        self.pico_rss_internas = 0.0
+        self.pico_tracemalloc_internas = 0
+        self.inicio = datetime.now().isoformat(timespec='seconds')
+        self.relogio = time.perf_counter()
+        self.cpu = time.process_time()
+
+
+class Instrumentacao:
+    """
+    Registro das medições de uma execução.
+
+    'tracemalloc' liga a medição do pico de memória alocada. 'perfilar' liga o
+    cProfile: True para todas as etapas (o perfil guardado é o da mais lenta)
+    ou o nome (ou uma lista de nomes) das etapas a perfilar, por exemplo a mais
+    lenta de uma execução anterior, para não atrasar as demais.
+    """
+
+    def __init__(self, tracemalloc=False, perfilar=None):
+        self.tracemalloc = tracemalloc
+        self.perfilar = {perfilar} if isinstance(perfilar, str) else perfilar
+        self.registros = []
+        self.perfis = {}
+        # Identifica a execução no histórico CSV.
+        self.inicio = datetime.now().isoformat(timespec='milliseconds')
+        self._pilha = []
+        self._secao = None
+        self._zera_rss = None
+
+    def _deve_perfilar(self, nome):
+        if not self.perfilar:
+            return False
+        # O cProfile não pode ser ligado duas vezes ao mesmo tempo.
+        if any(medicao.perfil is not None for medicao in self._pilha):
+            return False
+        return self.perfilar is True or nome in self.perfilar
+
+    def iniciar(self, nome, entrada=None, **detalhes):
+        """Começa a medir a etapa 'nome'; prefira 'etapa' ou 'medir', que encerram a medição sozinhos."""
+        if self._pilha:
+            # Os contadores vão ser zerados: guarda na etapa externa o pico que ela já atingiu.
+            externa = self._pilha[-1]
+            pico_rss = _status_mb('VmHWM') if self._zera_rss else None
+            externa.pico_rss_internas = max(externa.pico_rss_internas, pico_rss or 0.0)
+            if self.tracemalloc and tracemalloc.is_tracing():
+                externa.pico_tracemalloc_internas = max(externa.pico_tracemalloc_internas,
+                                                        tracemalloc.get_traced_memory()[1])
+        if self._zera_rss is None:
+            self._zera_rss = _zerar_pico_rss()
+        elif self._zera_rss:
+            _zerar_pico_rss()
+        if self.tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        medicao = Medicao(nome, entrada, detalhes)
+        if self._deve_perfilar(nome):
+            medicao.perfil = cProfile.Profile()
+            medicao.perfil.enable()
+        self._pilha.append(medicao)
+        return medicao
+
+    def encerrar(self, medicao, saida=None, erro=None):
+        """Encerra 'medicao' e guarda o registro. Retorna o registro (dicionário)."""
+        segundos = time.perf_counter() - medicao.relogio
+        cpu = time.process_time() - medicao.cpu
+        if medicao.perfil is not None:
+            medicao.perfil.disable()
+        pico_rss = _status_mb('VmHWM') if self._zera_rss else _pico_rss_processo()
+        if pico_rss is not None:
+            pico_rss = max(pico_rss, medicao.pico_rss_internas)
+        pico_tracemalloc = None
+        if self.tracemalloc and tracemalloc.is_tracing():
+            pico_tracemalloc = max(tracemalloc.get_traced_memory()[1], medicao.pico_tracemalloc_internas)
+        self._pilha.remove(medicao)
+        if self._pilha:
+            externa = self._pilha[-1]
+            externa.pico_rss_internas = max(externa.pico_rss_internas, pico_rss or 0.0)
+            externa.pico_tracemalloc_internas = max(externa.pico_tracemalloc_internas, pico_tracemalloc or 0)
+        elif self.tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        linhas_saida, colunas_saida = _dimensoes(saida if saida is not None else medicao.saida)
+        registro = {
+            'ETAPA': medicao.nome,
+            'INICIO': medicao.inicio,
+            'SEGUNDOS': segundos,
+            'CPU_SEGUNDOS': cpu,
+            'RSS_MB': _status_mb('VmRSS'),
+            'PICO_RSS_MB': pico_rss,
+            'PICO_TRACEMALLOC_MB': None if pico_tracemalloc is None else pico_tracemalloc / 2 ** 20,
+            'LINHAS_ENTRADA': medicao.linhas_entrada,
+            'COLUNAS_ENTRADA': medicao.colunas_entrada,
+            'LINHAS_SAIDA': linhas_saida,
+            'COLUNAS_SAIDA': colunas_saida,
+            'PERFILADA': medicao.perfil is not None,
+            'ERRO': None if erro is None else type(erro).__name__,
+            **medicao.detalhes,
+        }
+        self.registros.append(registro)
+        if medicao.perfil is not None:
+            self.perfis[len(self.registros) - 1] = medicao.perfil
+        return registro
+
+    @contextmanager
+    def etapa(self, nome, entrada=None, **detalhes):
+        """
+        Mede o bloco 'with' como a etapa 'nome'. 'entrada' (DataFrame, array...)
+        dá as dimensões de entrada; as de saída vêm de 'medicao.saida'.
+        Argumentos nomeados extras viram colunas do registro.
+        """
+        medicao = self.iniciar(nome, entrada, **detalhes)
+        try:
+            yield medicao
+        except BaseException as erro:
+            self.encerrar(medicao, erro=erro)
+            raise
+        self.encerrar(medicao)
+
+    def medir(self, nome=None):
+        """
+        Decorador: mede cada chamada da função (com o nome da função, se 'nome'
+        for None). A entrada é o primeiro argumento com dimensões e a saída é o retorno.
+        """
+        def decorador(funcao):
+            @functools.wraps(funcao)
+            def medida(*argumentos, **opcoes):
+                entrada = next((valor for valor in argumentos if _dimensoes(valor)[0] is not None), None)
+                with self.etapa(nome or funcao.__name__, entrada) as medicao:
+                    medicao.saida = funcao(*argumentos, **opcoes)
+                return medicao.saida
+            return medida
+        return decorador
+
+    def secao(self, nome, dados=None):
+        """
+        Marca de seção para código linear (como o script): encerra a seção
+        aberta, com 'dados' como saída, e abre a seção 'nome' com 'dados' como
+        entrada. Com 'nome' None apenas encerra a seção aberta.
+        """
+        if self._secao is not None:
+            self.encerrar(self._secao, dados)
+        self._secao = self.iniciar(nome, dados) if nome is not None else None
+
+    def tabela(self):
+        """Registros como DataFrame, na ordem em que as etapas terminaram."""
+        extras = [coluna for registro in self.registros for coluna in registro if coluna not in COLUNAS]
+        return pd.DataFrame(self.registros, columns=COLUNAS + list(dict.fromkeys(extras)))
+
+    def mais_lenta(self):
+        """Posição (em 'registros') da etapa perfilada mais lenta, ou None."""
+        if not self.perfis:
+            return None
+        return max(self.perfis, key=lambda posicao: self.registros[posicao]['SEGUNDOS'])
+
+    def salvar(self, caminho):
+        """
+        Grava os registros. '.json': a execução completa (metadados e etapas),
+        substituindo o arquivo. '.csv': as etapas são acrescentadas ao arquivo,
+        com a coluna 'EXECUCAO' (início da execução), formando um histórico.
+        O CSV tem sempre as colunas 'COLUNAS_HISTORICO'; um histórico gravado
+        com outras colunas é convertido antes de receber a execução nova.
+        """
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        if caminho.endswith('.json'):
+            conteudo = {
+                'execucao': {'inicio': self.inicio, 'python': platform.python_version(),
+                             'plataforma': platform.platform(), 'argumentos': sys.argv},
+                'etapas': self.registros,
+            }
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                json.dump(conteudo, arquivo, ensure_ascii=False, indent=2, default=str)
+        else:
+            tabela = self.tabela()
+            tabela.insert(0, 'EXECUCAO', self.inicio)
+            existe = os.path.exists(caminho)
+            if existe and list(pd.read_csv(caminho, nrows=0).columns) != COLUNAS_HISTORICO:
+                _para_historico(pd.read_csv(caminho)).to_csv(caminho, index=False)
+            _para_historico(tabela).to_csv(caminho, mode='a', header=not existe, index=False)
+        return caminho
+
+    def salvar_perfil(self, diretorio):
+        """
+        Grava o cProfile da etapa perfilada mais lenta em '<diretorio>/perfil_<etapa>.prof'
+        e um resumo (funções por tempo acumulado) em '.txt'. Retorna o caminho do
+        '.prof', ou None se nenhuma etapa foi perfilada.
+        """
+        posicao = self.mais_lenta()
+        if posicao is None:
+            return None
+        os.makedirs(diretorio, exist_ok=True)
+        nome = ''.join(c if c.isalnum() or c in '-_' else '_' for c in self.registros[posicao]['ETAPA'])
+        caminho = os.path.join(diretorio, f'perfil_{nome}.prof')
+        estatisticas = pstats.Stats(self.perfis[posicao])
+        estatisticas.dump_stats(caminho)
+        with open(os.path.splitext(caminho)[0] + '.txt', 'w', encoding='utf-8') as arquivo:
+            estatisticas.stream = arquivo
+            estatisticas.sort_stats('cumulative').print_stats(LINHAS_RESUMO_PERFIL)
+        return caminho
+
+
+def carregar_log(caminho):
+    """Lê um registro gravado por 'Instrumentacao.salvar' (JSON ou CSV) como DataFrame."""
+    if caminho.endswith('.json'):
+        with open(caminho, encoding='utf-8') as arquivo:
+            conteudo = json.load(arquivo)
+        tabela = pd.DataFrame(conteudo['etapas'])
+        tabela.insert(0, 'EXECUCAO', conteudo['execucao']['inicio'])
+        return tabela
+    return pd.read_csv(caminho)
+
+
+def comparar_logs(atual, anterior, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Junta as etapas de 'atual' às de 'anterior' (DataFrames de 'carregar_log';
+    de cada um é usada a última execução) e marca como 'REGRESSAO' as etapas
+    com tempo acima de 'tolerancia' vezes o anterior (e pelo menos
+    'DIFERENCA_MINIMA' segundos mais lentas).
+    """
+    def ultima(log):
+        if 'EXECUCAO' in log.columns:
+            log = log[log['EXECUCAO'] == log['EXECUCAO'].iloc[-1]]
+        # Etapas repetidas na mesma execução (ex.: uma função decorada) são somadas.
+        return log.groupby('ETAPA', sort=False).agg(SEGUNDOS=('SEGUNDOS', 'sum'), PICO_RSS_MB=('PICO_RSS_MB', 'max'))
+
+    comparacao = ultima(atual).join(ultima(anterior), how='inner', rsuffix='_ANTERIOR').reset_index()
+    comparacao['RAZAO'] = comparacao['SEGUNDOS'] / comparacao['SEGUNDOS_ANTERIOR']
+    comparacao['REGRESSAO'] = ((comparacao['RAZAO'] > tolerancia)
+                               & (comparacao['SEGUNDOS'] - comparacao['SEGUNDOS_ANTERIOR'] > DIFERENCA_MINIMA))
+    return comparacao
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description='Compara execuções registradas pela instrumentação das etapas.')
+    parser.add_argument('log', help='Histórico CSV (compara as duas últimas execuções) ou JSON da execução atual.')
+    parser.add_argument('--anterior', help='Registro (JSON ou CSV) da execução anterior.')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO,
+                        help='Razão de tempo acima da qual uma etapa é considerada regressão.')
+    return parser
+
+
+def main(argumentos=None):
+    opcoes = criar_parser().parse_args(argumentos)
+    atual = carregar_log(opcoes.log)
+    if opcoes.anterior:
+        anterior = carregar_log(opcoes.anterior)
+    else:
+        execucoes = atual['EXECUCAO'].drop_duplicates()
+        if len(execucoes) < 2:
+            print(f"'{opcoes.log}' tem só uma execução; informe '--anterior'.", file=sys.stderr)
+            return 2
+        anterior = atual[atual['EXECUCAO'] == execucoes.iloc[-2]]
+    comparacao = comparar_logs(atual, anterior, opcoes.tolerancia)
+    print(comparacao.round(4).to_string(index=False))
+    return 1 if comparacao['REGRESSAO'].any() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# Intervalos de confiança por grupo: t de Student e bootstrap.
+#
+# O script calculava um único 'stats.t.interval' para todos os salários. Aqui os
+# intervalos t da média são calculados para todos os grupos de uma vez: um único
+# groupby fornece contagem, média e desvio de cada grupo e a distribuição t é
+# avaliada em forma vetorizada para todos eles.
+#
+# Para a mediana (e também para a média, sem supor normalidade) há o bootstrap.
+# Todas as reamostras de um grupo são sorteadas como uma única matriz de índices
+# B x n do NumPy, em vez de um laço Python por reamostra. Quando B * n é grande
+# demais para a memória, a matriz é gerada em fatias; com 'processos' > 1 as
+# reamostras (ou os grupos) são distribuídas entre processos.
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Dimensões usadas na análise para os intervalos por grupo.
+DIMENSOES_PADRAO = ['GENERO', 'UF ONDE MORA', 'NOVO_NIVEL', 'GERACAO']
+
+# Limite de elementos da matriz de índices gerada de uma vez (~40 MB em int64).
+_MAXIMO_ELEMENTOS = 5_000_000
+
+_ESTATISTICAS = {
+    'mean': lambda amostras: amostras.mean(axis=1),
+    'median': lambda amostras: np.median(amostras, axis=1),
+}
+
+
+def intervalos_t(dados, coluna='SALARIO', grupo='GENERO', nivel_confianca=0.95):
+    """
+    Intervalo t de Student da média de 'coluna' para cada valor de 'grupo'.
+
+    Retorna um DataFrame indexado pelo grupo com 'n', 'media', 'erro_padrao',
+    'inferior' e 'superior' (mesmo cálculo de 'stats.t.interval' com
+    'scale=stats.sem(...)', feito para todos os grupos de uma vez).
+    Grupos com menos de 2 observações ficam com o intervalo nulo.
+    """
+    resumo = dados.groupby(grupo, observed=True)[coluna].agg(['count', 'mean', 'std'])
+    resumo.columns = ['n', 'media', 'desvio']
+    erro_padrao = resumo['desvio'] / np.sqrt(resumo['n'])
+    graus_liberdade = (resumo['n'] - 1).where(resumo['n'] > 1)
+    t_critico = stats.t.ppf((1 + nivel_confianca) / 2, graus_liberdade)
+    resumo['erro_padrao'] = erro_padrao
+    resumo['inferior'] = resumo['media'] - t_critico * erro_padrao
+    resumo['superior'] = resumo['media'] + t_critico * erro_padrao
+    return resumo
+
+
+def intervalos_t_por_dimensoes(dados, coluna='SALARIO', dimensoes=None, nivel_confianca=0.95):
+    """Junta em um DataFrame os 'intervalos_t' de cada dimensão (índice: dimensão, grupo)."""
+    dimensoes = DIMENSOES_PADRAO if dimensoes is None else dimensoes
+    partes = {
+        dimensao: intervalos_t(dados, coluna, dimensao, nivel_confianca).rename_axis('GRUPO')
+        for dimensao in dimensoes if dimensao in dados.columns
+    }
+    return pd.concat(partes, names=['DIMENSAO'])
+
+
+def _reamostrar(valores, estatistica, reamostras, semente):
+    # Sorteia as reamostras em fatias de no máximo '_MAXIMO_ELEMENTOS' índices.
+    aleatorio = np.random.default_rng(semente)
+    funcao = _ESTATISTICAS[estatistica]
+    por_fatia = max(1, _MAXIMO_ELEMENTOS // max(1, valores.size))
+    resultados = []
+    for inicio in range(0, reamostras, por_fatia):
+        tamanho = min(por_fatia, reamostras - inicio)
+        indices = aleatorio.integers(0, valores.size, size=(tamanho, valores.size))
+        resultados.append(funcao(valores[indices]))
+    return np.concatenate(resultados) if resultados else np.empty(0)
+
+
+def distribuicao_bootstrap(valores, estatistica='mean', reamostras=2000, semente=None, processos=None):
+    """
+    Retorna as 'reamostras' réplicas bootstrap de 'estatistica' ('mean' ou 'median').
+
+    Com 'processos' > 1 as reamostras são divididas entre processos, cada um com
+    uma semente independente derivada de 'semente' (resultado reprodutível).
+    """
+    if estatistica not in _ESTATISTICAS:
+        raise ValueError(f"Estatística inválida: '{estatistica}'. Use 'mean' ou 'median'.")
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[~np.isnan(valores)]
+    if valores.size == 0:
+        return np.full(reamostras, np.nan)
+    if not processos or processos <= 1:
+        return _reamostrar(valores, estatistica, reamostras, semente)
+
+    sementes = np.random.SeedSequence(semente).spawn(processos)
+    partes = np.array_split(np.arange(reamostras), processos)
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [
+            executor.submit(_reamostrar, valores, estatistica, parte.size, semente_parte)
+            for parte, semente_parte in zip(partes, sementes) if parte.size
+        ]
+        return np.concatenate([futuro.result() for futuro in futuros])
+
+
+def intervalo_bootstrap(valores, estatistica='mean', reamostras=2000, nivel_confianca=0.95,
+                        semente=None, processos=None):
+    """Intervalo bootstrap percentil (inferior, superior) de 'estatistica' de 'valores'."""
+    replicas = distribuicao_bootstrap(valores, estatistica, reamostras, semente, processos)
+    alfa = (1 - nivel_confianca) / 2
+    inferior, superior = np.nanquantile(replicas, [alfa, 1 - alfa])
+    return float(inferior), float(superior)
+
+
+def _intervalo_grupo(argumentos):
+    valores, estatistica, reamostras, nivel_confianca, semente = argumentos
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[~np.isnan(valores)]
+    if valores.size == 0:
+        return 0, np.nan, np.nan, np.nan
+    estimativa = float(_ESTATISTICAS[estatistica](valores[None, :])[0])
+    inferior, superior = intervalo_bootstrap(valores, estatistica, reamostras, nivel_confianca, semente)
+    return valores.size, estimativa, inferior, superior
+
+
+def intervalos_bootstrap(dados, coluna='SALARIO', grupo='GENERO', estatistica='median', reamostras=2000,
+                         nivel_confianca=0.95, semente=None, processos=None):
+    """
+    Intervalo bootstrap de 'estatistica' de 'coluna' para cada valor de 'grupo'.
+
+    Cada grupo usa uma semente independente derivada de 'semente'. Com
+    'processos' > 1, os grupos são distribuídos entre processos.
+    Retorna um DataFrame com 'n', 'estimativa', 'inferior' e 'superior'.
+    """
+    if estatistica not in _ESTATISTICAS:
+        raise ValueError(f"Estatística inválida: '{estatistica}'. Use 'mean' ou 'median'.")
+    grupos = dados.groupby(grupo, observed=True)[coluna]
+    nomes = list(grupos.groups)
+    sementes = np.random.SeedSequence(semente).spawn(len(nomes))
+    tarefas = [
+        (grupos.get_group(nome).to_numpy(dtype=float), estatistica, reamostras, nivel_confianca, semente_grupo)
+        for nome, semente_grupo in zip(nomes, sementes)
+    ]
+    if processos and processos > 1:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            resultados = list(executor.map(_intervalo_grupo, tarefas))
+    else:
+        resultados = [_intervalo_grupo(tarefa) for tarefa in tarefas]
+    indice = pd.Index(nomes, name=grupo)
+    return pd.DataFrame(resultados, index=indice, columns=['n', 'estimativa', 'inferior', 'superior'])
@@ -0,0 +1,297 @@
+# Treino e validação do modelo de regressão do salário ('Regresão_linear_pt2.ipynb').
+#
+# O notebook treina um único 'LinearRegression' em um 'train_test_split' e
+# padroniza os dados de teste com 'scaler.fit_transform(X_test)': o scaler é
+# ajustado de novo nos dados de teste, que passam a ter média e desvio próprios
+# (vazamento de informação e escala diferente da usada no treino). As dummies
+# ('pd.get_dummies(..., drop_first=True)') também dependem das categorias
+# presentes em cada lote.
+#
+# Aqui codificação, imputação, padronização e modelo ficam em um único
+# 'Pipeline' do scikit-learn, ajustado só com os dados de treino de cada dobra.
+# A validação cruzada (k dobras) percorre 'LinearRegression' e a grade de
+# 'alpha' de 'Ridge' e 'Lasso', com as combinações (candidato, dobra)
+# distribuídas entre os núcleos pelo joblib. O melhor candidato é ajustado de
+# novo no treino, avaliado no teste e gravado com 'salvar_modelo'; 'prever'
+# aplica o modelo gravado a novos respondentes em lotes.
+#
+# Exemplo:
+#   python modelagem.py treinar --dados analise_dados_mod7_(1).xlsx --modelo modelo_salario.joblib
+#   python modelagem.py prever --dados novos.xlsx --modelo modelo_salario.joblib --saida previsoes.csv
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from codificacao import CodificadorEsparso
+from extracao_flags import extrair_flags, extrair_numero
+from regras import REGRA_NIVEL_ENSINO, REGRA_NOVO_NIVEL, aplicar_regra
+
+# Filtros e colunas do notebook de regressão.
+COLUNA_SITUACAO = 'QUAL SUA SITUAÇÃO ATUAL DE TRABALHO?'
+SITUACAO_MODELADA = 'Empregado (CLT)'
+COLUNA_COR = 'COR/RACA/ETNIA'
+CORES_RETIRADAS = ['Prefiro não informar', 'Outra', 'Índigina']
+COLUNA_EXPERIENCIA = 'Quanto tempo de experiência na área de dados você tem?'
+COLUNA_INSATISFACAO = 'Qual o principal motivo da sua insatisfação com a empresa atual?'
+
+ALVO = 'SALARIO'
+COLUNAS_NUMERICAS = ['IDADE', 'NAO BRANCA', 'TEMPO EXPERIENCIA', 'INSATISFACAO', 'NIVEL DE ENSINO',
+                     'NUMERO DE FUNCIONARIOS']
+COLUNAS_CATEGORICAS = ['GENERO', 'SETOR', 'NOVO_NIVEL', 'REGIAO ONDE MORA']
+
+MODELOS = {'linear': LinearRegression, 'ridge': Ridge, 'lasso': Lasso}
+GRADE_ALPHA = [0.01, 0.1, 1.0, 10.0, 100.0, 1000.0]
+DOBRAS_PADRAO = 5
+TAMANHO_LOTE_PREVISAO = 100_000
+
+
+class CodificadorCategorico(BaseEstimator, TransformerMixin):
+    """
+    'CodificadorEsparso' no formato de transformador do scikit-learn, para
+    entrar no 'Pipeline': o vocabulário é aprendido no 'fit' (só com os dados
+    de treino) e categorias não vistas viram zeros na previsão.
+    """
+
+    def __init__(self, drop_first=True):
+        self.drop_first = drop_first
+
+    def fit(self, X, y=None):
+        self.codificador_ = CodificadorEsparso(list(X.columns), drop_first=self.drop_first).ajustar(X)
+        return self
+
+    def transform(self, X):
+        return self.codificador_.transformar(X, formato='csr')
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(self.codificador_.nomes_colunas, dtype=object)
+
+
+def preparar_atributos(dados):
+    """
+    Colunas usadas pelo modelo, derivadas como no notebook de regressão (sem
+    filtrar linhas): serve tanto para o treino quanto para novos respondentes.
+    """
+    atributos = pd.DataFrame(index=dados.index)
+    atributos['IDADE'] = pd.to_numeric(dados['IDADE'], errors='coerce')
+    atributos['GENERO'] = dados['GENERO']
+    # Como no notebook ('1 if x != 'Branca' else 0'), respostas nulas contam como não brancas.
+    atributos['NAO BRANCA'] = (dados[COLUNA_COR] != 'Branca').astype(np.int64)
+    atributos['TEMPO EXPERIENCIA'] = extrair_numero(dados[COLUNA_EXPERIENCIA]).fillna(0).astype(float)
+    # 'Salário' in x: texto exato, com maiúsculas, avaliado uma vez por resposta distinta.
+    atributos['INSATISFACAO'] = (extrair_flags(dados[COLUNA_INSATISFACAO], {'INSATISFACAO': 'Salário'},
+                                               case=True, regex=False)['INSATISFACAO']
+                                 .fillna(False).astype(np.int64))
+    atributos['SETOR'] = dados['SETOR']
+    atributos['REGIAO ONDE MORA'] = dados['REGIAO ONDE MORA']
+    atributos['NIVEL DE ENSINO'] = aplicar_regra(dados, REGRA_NIVEL_ENSINO).astype(float)
+    atributos['NUMERO DE FUNCIONARIOS'] = extrair_numero(dados['NUMERO DE FUNCIONARIOS'], remover='.').astype(float)
+    if 'NOVO_NIVEL' in dados:
+        atributos['NOVO_NIVEL'] = dados['NOVO_NIVEL']
+    else:
+        atributos['NOVO_NIVEL'] = aplicar_regra(dados, REGRA_NOVO_NIVEL)
+    return atributos[COLUNAS_NUMERICAS + COLUNAS_CATEGORICAS]
+
+
+def preparar_dados_regressao(dados):
+    """
+    Aplica os filtros do notebook (apenas 'Empregado (CLT)', sem as cores
+    retiradas) e retorna (X, y). Linhas sem salário são descartadas.
+    """
+    filtro = (dados[COLUNA_SITUACAO] == SITUACAO_MODELADA) & ~dados[COLUNA_COR].isin(CORES_RETIRADAS)
+    filtrados = dados[filtro.to_numpy(dtype=bool, na_value=False)]
+    y = pd.to_numeric(filtrados[ALVO], errors='coerce')
+    filtrados, y = filtrados[y.notna()], y[y.notna()].astype(float)
+    return preparar_atributos(filtrados), y
+
+
+def criar_modelo(modelo='linear', alpha=None):
+    """
+    Pipeline completo: imputação das colunas numéricas pela mediana, dummies
+    das categóricas ('drop_first', como no notebook), padronização de todas as
+    colunas e o regressor ('linear', 'ridge' ou 'lasso', com 'alpha').
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo desconhecido: '{modelo}'. Use um de {sorted(MODELOS)}.")
+    parametros = {}
+    if modelo != 'linear':
+        parametros['alpha'] = 1.0 if alpha is None else alpha
+    if modelo == 'lasso':
+        parametros['max_iter'] = 10_000
+    colunas = ColumnTransformer([
+        ('numericas', SimpleImputer(strategy='median'), COLUNAS_NUMERICAS),
+        ('categoricas', CodificadorCategorico(drop_first=True), COLUNAS_CATEGORICAS),
+    ], sparse_threshold=0, verbose_feature_names_out=False)
+    return Pipeline([
+        ('colunas', colunas),
+        ('padronizacao', StandardScaler()),
+        ('regressor', MODELOS[modelo](**parametros)),
+    ])
+
+
+def candidatos(grade_alpha=GRADE_ALPHA):
+    """Combinações (modelo, alpha) avaliadas: 'linear' e a grade de 'alpha' de 'ridge' e 'lasso'."""
+    return [('linear', np.nan)] + [(modelo, alpha) for modelo in ('ridge', 'lasso') for alpha in grade_alpha]
+
+
+def _metricas(y, previsto):
+    return {
+        'MSE': mean_squared_error(y, previsto),
+        'MAE': mean_absolute_error(y, previsto),
+        'R2': r2_score(y, previsto),
+    }
+
+
+def _avaliar_dobra(modelo, alpha, X, y, treino, teste):
+    # Roda em um processo do joblib: ajusta um pipeline novo só com a dobra de treino.
+    estimador = criar_modelo(modelo, None if np.isnan(alpha) else alpha)
+    inicio = time.perf_counter()
+    estimador.fit(X.iloc[treino], y.iloc[treino])
+    segundos_ajuste = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    previsto = estimador.predict(X.iloc[teste])
+    segundos_previsao = time.perf_counter() - inicio
+    return {'MODELO': modelo, 'ALPHA': alpha, **_metricas(y.iloc[teste], previsto),
+            'SEGUNDOS_AJUSTE': segundos_ajuste, 'SEGUNDOS_PREVISAO': segundos_previsao}
+
+
+def validar_modelos(X, y, grade_alpha=GRADE_ALPHA, dobras=DOBRAS_PADRAO, n_jobs=-1, semente=42):
+    """
+    Validação cruzada em 'dobras' partes de todos os 'candidatos(grade_alpha)'.
+
+    Cada par (candidato, dobra) é uma tarefa do joblib ('n_jobs=-1': todos os
+    núcleos). Retorna um DataFrame com a média das dobras de MSE, MAE, R² e dos
+    tempos de ajuste e previsão (e o desvio do MSE), do menor para o maior MSE.
+    """
+    divisoes = list(KFold(n_splits=dobras, shuffle=True, random_state=semente).split(X))
+    tarefas = [joblib.delayed(_avaliar_dobra)(modelo, alpha, X, y, treino, teste)
+               for modelo, alpha in candidatos(grade_alpha) for treino, teste in divisoes]
+    por_dobra = pd.DataFrame(joblib.Parallel(n_jobs=n_jobs)(tarefas))
+
+    agrupado = por_dobra.groupby(['MODELO', 'ALPHA'], dropna=False, sort=False)
+    resultados = agrupado[['MSE', 'MAE', 'R2', 'SEGUNDOS_AJUSTE', 'SEGUNDOS_PREVISAO']].mean()
+    resultados.insert(1, 'MSE_DESVIO', agrupado['MSE'].std())
+    return resultados.sort_values('MSE').reset_index()
+
+
+def avaliar_modelo(modelo, X, y):
+    """MSE, MAE, R² e tempo de previsão de um pipeline já ajustado."""
+    inicio = time.perf_counter()
+    previsto = modelo.predict(X)
+    return {**_metricas(y, previsto), 'SEGUNDOS_PREVISAO': time.perf_counter() - inicio}
+
+
+def treinar_regressao(dados, grade_alpha=GRADE_ALPHA, dobras=DOBRAS_PADRAO, n_jobs=-1, tamanho_teste=0.2,
+                      semente=42):
+    """
+    Fluxo completo do notebook, sem vazamento: separa treino e teste (20%,
+    'random_state=42' como no notebook), escolhe o candidato de menor MSE na
+    validação cruzada do treino, ajusta-o no treino inteiro e avalia no teste.
+
+    Retorna (modelo ajustado, resultados da validação cruzada, métricas no teste).
+    """
+    X, y = preparar_dados_regressao(dados)
+    X_treino, X_teste, y_treino, y_teste = train_test_split(X, y, test_size=tamanho_teste, random_state=semente)
+    resultados = validar_modelos(X_treino, y_treino, grade_alpha, dobras, n_jobs, semente)
+
+    melhor = resultados.iloc[0]
+    modelo = criar_modelo(melhor['MODELO'], None if np.isnan(melhor['ALPHA']) else melhor['ALPHA'])
+    inicio = time.perf_counter()
+    modelo.fit(X_treino, y_treino)
+    segundos_ajuste = time.perf_counter() - inicio
+    metricas_teste = {'MODELO': melhor['MODELO'], 'ALPHA': melhor['ALPHA'],
+                      **avaliar_modelo(modelo, X_teste, y_teste), 'SEGUNDOS_AJUSTE': segundos_ajuste}
+    return modelo, resultados, metricas_teste
+
+
+def coeficientes(modelo):
+    """Coeficientes do regressor por atributo (já padronizado), do maior para o menor, como no notebook."""
+    nomes = modelo[:-1].get_feature_names_out()
+    coef = pd.DataFrame(modelo[-1].coef_, columns=['COEFICIENTES'], index=nomes)
+    return coef.sort_values(by='COEFICIENTES', ascending=False)
+
+
+def salvar_modelo(modelo, caminho):
+    """Grava o pipeline ajustado (codificação, escala e regressor juntos)."""
+    joblib.dump(modelo, caminho)
+
+
+def carregar_modelo(caminho):
+    return joblib.load(caminho)
+
+
+def prever(modelo, dados, tamanho_lote=TAMANHO_LOTE_PREVISAO):
+    """
+    Salário previsto para cada linha de 'dados' (respostas brutas, com as
+    colunas da pesquisa), em lotes de 'tamanho_lote' linhas.
+    """
+    atributos = preparar_atributos(dados)
+    previsoes = [modelo.predict(atributos.iloc[inicio:inicio + tamanho_lote])
+                 for inicio in range(0, len(atributos), tamanho_lote)]
+    valores = np.concatenate(previsoes) if previsoes else np.empty(0)
+    return pd.Series(valores, index=dados.index, name='SALARIO_PREVISTO')
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description='Modelo de regressão do salário (State of Data Brazil 2022).')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    treinar = comandos.add_parser('treinar', help='Validação cruzada, escolha do modelo e gravação do pipeline.')
+    treinar.add_argument('--dados', required=True, help='Planilha/CSV/Parquet com as respostas tratadas.')
+    treinar.add_argument('--modelo', default='modelo_salario.joblib', help='Arquivo do pipeline ajustado.')
+    treinar.add_argument('--dobras', type=int, default=DOBRAS_PADRAO, help='Número de dobras da validação cruzada.')
+    treinar.add_argument('--alphas', type=float, nargs='+', default=GRADE_ALPHA,
+                         help='Grade de alpha para Ridge e Lasso.')
+    treinar.add_argument('--processos', type=int, default=-1, help='Processos do joblib (padrão: todos os núcleos).')
+    treinar.add_argument('--resultados', help='CSV onde gravar os resultados da validação cruzada.')
+
+    prever_parser = comandos.add_parser('prever', help='Aplica um pipeline gravado a novos respondentes.')
+    prever_parser.add_argument('--dados', required=True, help='Planilha/CSV/Parquet com as novas respostas.')
+    prever_parser.add_argument('--modelo', default='modelo_salario.joblib', help='Arquivo do pipeline ajustado.')
+    prever_parser.add_argument('--saida', default='previsoes_salario.csv', help='CSV com as previsões.')
+    return parser
+
+
+def main(argumentos=None):
+    opcoes = criar_parser().parse_args(argumentos)
+    # Importação adiada, como em 'executar_analise.py'.
+    from cache_colunar import carregar_planilha
+
+    if not os.path.exists(opcoes.dados):
+        print(f"Arquivo de entrada não encontrado: '{opcoes.dados}'", file=sys.stderr)
+        return 2
+    dados = carregar_planilha(opcoes.dados)
+
+    if opcoes.comando == 'treinar':
+        modelo, resultados, metricas_teste = treinar_regressao(dados, opcoes.alphas, opcoes.dobras, opcoes.processos)
+        salvar_modelo(modelo, opcoes.modelo)
+        if opcoes.resultados:
+            resultados.to_csv(opcoes.resultados, index=False)
+        print(resultados.to_string(index=False))
+        print('Teste:', ', '.join(f'{nome}={valor}' for nome, valor in metricas_teste.items()))
+        print(f"Modelo gravado em '{opcoes.modelo}'.")
+        return 0
+
+    modelo = carregar_modelo(opcoes.modelo)
+    inicio = time.perf_counter()
+    previsoes = prever(modelo, dados)
+    previsoes.to_frame().to_csv(opcoes.saida)
+    print(f"{len(previsoes)} previsões gravadas em '{opcoes.saida}' ({time.perf_counter() - inicio:.2f} s).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# Detecção e tratamento de outliers de 'SALARIO' em blocos.
+#
+# No script original Q1, Q3, IIQ, média e desvio padrão eram calculados com
+# várias passadas completas pela coluna e a substituição dos outliers era
+# escrita à mão para duas faixas salariais ('media_30_40' e 'media_40').
+#
+# Aqui os limites pela regra do IIQ (Q1 - 1.5*IIQ, Q3 + 1.5*IIQ) e pela regra
+# dos 3 desvios padrão são calculados em UMA passada, bloco a bloco, com
+# resumos combináveis (momentos de Welford e um esboço de quantis KLL). Em
+# seguida os outliers de TODAS as faixas salariais são substituídos pela média
+# dos salários não discrepantes da própria faixa. Como tudo funciona bloco a
+# bloco, arquivos maiores que a memória podem ser tratados.
+#
+# Os 'blocos' aceitos pelas funções são um DataFrame (tratado como bloco único),
+# uma lista de DataFrames ou uma função sem argumentos que retorna um iterador
+# de DataFrames novo a cada chamada (ex.: lambda: ler_em_blocos(caminho)).
+# Iteradores de uma só passada (como o próprio gerador 'ler_em_blocos(...)')
+# são recusados com TypeError: 'tratar_outliers' percorre os blocos três vezes
+# e, a partir da segunda passada, o iterador já estaria esgotado.
+
+import numpy as np
+import pandas as pd
+
+from extracao_flags import mapear_unicos
+from resumos import EsbocoQuantis, Momentos
+
+METODOS = ('3sigma', 'iqr')
+
+
+def _iterar(blocos):
+    if isinstance(blocos, pd.DataFrame):
+        return iter([blocos])
+    if callable(blocos):
+        return iter(blocos())
+    iterador = iter(blocos)
+    if iterador is blocos:
+        raise TypeError("'blocos' é um iterador de uma só passada. Passe um DataFrame, uma lista de DataFrames "
+                        "ou uma função que retorne um iterador novo a cada chamada "
+                        "(ex.: lambda: ler_em_blocos(caminho)).")
+    return iterador
+
+
+def calcular_limites(blocos, coluna='SALARIO', k=512):
+    """
+    Calcula em uma única passada os limites de outliers de 'coluna'.
+
+    Retorna um dicionário com 'Q1', 'Q3', 'IIQ', 'media', 'desvio' (amostral,
+    como o 'std()' do pandas) e os limites inferior/superior das regras do IIQ
+    e dos 3 desvios padrão. Os quartis vêm do esboço de quantis de tamanho 'k'
+    (aproximados, com memória limitada). Com 'k=None' os valores não nulos de
+    todos os blocos são guardados e os quartis são exatos, iguais aos do
+    'quantile()' do pandas; nesse caso a memória cresce com o número de linhas.
+    Média, desvio e os limites dos 3 desvios padrão são sempre exatos.
+    """
+    momentos = Momentos()
+    esboco = EsbocoQuantis(k=k, semente=0) if k is not None else None
+    guardados = []
+    for bloco in _iterar(blocos):
+        valores = bloco[coluna].to_numpy(dtype=float)
+        momentos.atualizar(valores)
+        if esboco is not None:
+            esboco.atualizar(valores)
+        else:
+            guardados.append(valores[~np.isnan(valores)])
+
+    if esboco is not None:
+        q1, q3 = esboco.quantil([0.25, 0.75])
+    else:
+        todos = np.concatenate(guardados) if guardados else np.empty(0)
+        q1, q3 = np.quantile(todos, [0.25, 0.75]) if todos.size else (np.nan, np.nan)
+    iiq = q3 - q1
+    media = momentos.media if momentos.n else np.nan
+    desvio = momentos.desvio()
+    return {
+        'n': momentos.n,
+        'Q1': float(q1),
+        'Q3': float(q3),
+        'IIQ': float(iiq),
+        'media': media,
+        'desvio': desvio,
+        'iqr': (float(q1 - 1.5 * iiq), float(q3 + 1.5 * iiq)),
+        '3sigma': (media - 3 * desvio, media + 3 * desvio),
+    }
+
+
+def _dentro(valores, limite_inferior, limite_superior):
+    return (valores >= limite_inferior) & (valores <= limite_superior)
+
+
+def medias_por_faixa(blocos, limites, coluna='SALARIO', faixa='FAIXA SALARIAL'):
+    """
+    Média de 'coluna' por 'faixa' considerando apenas os valores dentro dos
+    'limites' (tupla inferior, superior). Calculada em uma passada, somando
+    soma e contagem de cada faixa bloco a bloco.
+    """
+    somas = None
+    for bloco in _iterar(blocos):
+        valores = bloco[coluna]
+        parcial = valores[_dentro(valores, *limites)].groupby(bloco[faixa], observed=True).agg(['sum', 'count'])
+        somas = parcial if somas is None else somas.add(parcial, fill_value=0)
+    if somas is None:
+        return pd.Series(dtype=float)
+    return somas['sum'] / somas['count']
+
+
+def substituir_outliers(bloco, limites, medias, coluna='SALARIO', faixa='FAIXA SALARIAL'):
+    """
+    Retorna uma cópia de 'bloco' em que os valores de 'coluna' fora dos 'limites'
+    recebem a média da sua faixa ('medias'). Se a faixa não tiver média (nenhum
+    valor dentro dos limites), o valor é apenas limitado ao intervalo.
+    """
+    bloco = bloco.copy()
+    valores = bloco[coluna].to_numpy(dtype=float, copy=True)
+    fora = ~_dentro(valores, *limites) & ~np.isnan(valores)
+    if fora.any():
+        substitutos = mapear_unicos(bloco[faixa], lambda valor: medias.get(valor, np.nan),
+                                    dtype='float64').to_numpy(dtype=float)
+        substitutos = np.where(np.isnan(substitutos), np.clip(valores, *limites), substitutos)
+        valores[fora] = substitutos[fora]
+    bloco[coluna] = valores
+    return bloco
+
+
+def tratar_outliers(blocos, coluna='SALARIO', faixa='FAIXA SALARIAL', metodo='3sigma', k=512):
+    """
+    Calcula os limites, as médias por faixa e devolve os blocos tratados.
+
+    'blocos' precisa poder ser percorrido mais de uma vez: um DataFrame, uma
+    lista de DataFrames ou uma função que retorne um iterador novo a cada
+    chamada. Um gerador como 'ler_em_blocos(caminho)' levanta TypeError.
+
+    Retorna (limites calculados, iterador de blocos tratados). Para um DataFrame
+    em memória, 'pd.concat(list(blocos_tratados))' reconstrói o DataFrame.
+    São duas passadas de leitura (limites e médias por faixa) mais a passada
+    que gera os blocos tratados.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método de outliers desconhecido: '{metodo}'. Use um de {METODOS}.")
+    limites = calcular_limites(blocos, coluna, k=k)
+    intervalo = limites[metodo]
+    medias = medias_por_faixa(blocos, intervalo, coluna, faixa)
+    tratados = (substituir_outliers(bloco, intervalo, medias, coluna, faixa) for bloco in _iterar(blocos))
+    return limites, tratados
@@ -0,0 +1,331 @@
+# Perfil das colunas da pesquisa em uma única passada.
+#
+# O script chama 'dados.info()' duas vezes, 'dados.describe()' uma vez e mais
+# de uma dúzia de 'value_counts(dropna=False)' / 'isnull().value_counts()':
+# cada chamada percorre os dados de novo e o resultado só aparece impresso no
+# notebook. 'PerfilDados' percorre cada bloco uma única vez e, para cada
+# coluna, acumula os resumos combináveis de 'resumos.py':
+#
+#   - tipos observados e quantidade de nulos ('info()');
+#   - valores mais frequentes ('value_counts'), enquanto a coluna tiver até
+#     'LIMITE_CATEGORIAS' valores distintos;
+#   - momentos e quantis aproximados das colunas numéricas ('describe()'); os
+#     quantis não dependem do tamanho dos blocos, então o mesmo arquivo gera
+#     o mesmo JSON com qualquer '--tamanho-bloco';
+#   - número de valores distintos: exato pelas contagens ou, nas colunas de
+#     alta cardinalidade como 'ID', estimado pelo HyperLogLog.
+#
+# O resultado é um JSON com chaves ordenadas, que pode ser comparado entre
+# ondas da pesquisa ('comparar_perfis' ou um simples 'diff').
+#
+# Exemplo:
+#   python perfil.py planilha_modulo3.xlsx --saida perfil_2022.json
+#   python perfil.py onda2.xlsx --saida perfil_onda2.json --comparar perfil_2022.json
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from resumos import ContagemCategorias, ContagemDistintos, EsbocoQuantis, Momentos, valor_nativo
+
+TOP_K_PADRAO = 10
+LIMITE_CATEGORIAS = 10_000
+QUANTIS = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+K_ESBOCO = 1024
+TAMANHO_BLOCO_PADRAO = 100_000
+# Métricas comparadas por 'comparar_perfis'.
+METRICAS_COMPARADAS = ['tipo', 'percentual_nulos', 'distintos', 'mais_frequente', 'media', 'desvio', 'minimo',
+                       'mediana', 'maximo']
+
+
+def _numerica(serie):
+    return pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)
+
+
+def _numero(valor):
+    # NaN/inf não existem em JSON: viram null.
+    valor = float(valor)
+    return valor if np.isfinite(valor) else None
+
+
+class PerfilColuna:
+    """Resumos de uma coluna, atualizados bloco a bloco."""
+
+    def __init__(self, limite_categorias=LIMITE_CATEGORIAS):
+        self.limite_categorias = limite_categorias
+        self.tipos = []
+        self.n = 0
+        self.nulos = 0
+        self.contagem = ContagemCategorias()
+        self.distintos = ContagemDistintos()
+        self.momentos = None
+        self.esboco = None
+
+    def atualizar(self, serie):
+        tipo = str(serie.dtype)
+        if tipo not in self.tipos:
+            self.tipos.append(tipo)
+        validos = serie.dropna()
+        self.n += len(serie)
+        self.nulos += len(serie) - len(validos)
+        if validos.empty:
+            return self
+        if _numerica(validos):
+            if self.momentos is None:
+                # Semente fixa: o mesmo arquivo gera sempre o mesmo JSON.
+                self.momentos, self.esboco = Momentos(), EsbocoQuantis(k=K_ESBOCO, semente=0)
+            valores = validos.to_numpy(dtype=float)
+            self.momentos.atualizar(valores)
+            self.esboco.atualizar(valores)
+        self.distintos.atualizar(validos)
+        if self.contagem is not None:
+            if len(self.contagem.contagens) + validos.nunique() > self.limite_categorias:
+                # Alta cardinalidade (ex.: 'ID'): só o HyperLogLog continua.
+                self.contagem = None
+            else:
+                self.contagem.atualizar(validos)
+        return self
+
+    def combinar(self, outra):
+        self.tipos += [tipo for tipo in outra.tipos if tipo not in self.tipos]
+        self.n += outra.n
+        self.nulos += outra.nulos
+        self.distintos.combinar(outra.distintos)
+        if self.contagem is not None and outra.contagem is not None:
+            self.contagem.combinar(outra.contagem)
+            if len(self.contagem.contagens) > self.limite_categorias:
+                self.contagem = None
+        else:
+            self.contagem = None
+        if outra.momentos is not None:
+            if self.momentos is None:
+                self.momentos, self.esboco = Momentos(), EsbocoQuantis(k=K_ESBOCO, semente=0)
+            self.momentos.combinar(outra.momentos)
+            self.esboco.combinar(outra.esboco)
+        return self
+
+    def relatorio(self, top_k=TOP_K_PADRAO):
+        resultado = {
+            'tipo': ' | '.join(self.tipos),
+            'linhas': self.n,
+            'nulos': self.nulos,
+            'percentual_nulos': _numero(100 * self.nulos / self.n) if self.n else None,
+        }
+        if self.contagem is not None:
+            resultado['distintos'] = len(self.contagem.contagens)
+            resultado['distintos_aproximado'] = False
+            # Empates em ordem de texto, para que o JSON não mude de uma execução para outra.
+            frequentes = sorted(self.contagem.contagens.items(), key=lambda item: (-item[1], str(item[0])))[:top_k]
+            resultado['mais_frequentes'] = [[valor_nativo(valor), contagem] for valor, contagem in frequentes]
+        else:
+            resultado['distintos'] = round(self.distintos.estimativa())
+            resultado['distintos_aproximado'] = True
+            resultado['mais_frequentes'] = None
+        if self.momentos is not None and self.momentos.n:
+            quantis = self.esboco.quantil(QUANTIS)
+            resultado['numerico'] = {
+                'n': self.momentos.n,
+                'media': _numero(self.momentos.media),
+                'desvio': _numero(self.momentos.desvio()),
+                'minimo': _numero(self.momentos.minimo),
+                'maximo': _numero(self.momentos.maximo),
+                'quantis': {f'{q:g}': _numero(valor) for q, valor in zip(QUANTIS, quantis)},
+                'quantis_aproximados': bool(self.esboco.n > K_ESBOCO),
+            }
+        return resultado
+
+
+class PerfilDados:
+    """Perfil de todas as colunas de um DataFrame (ou de um arquivo lido em blocos)."""
+
+    def __init__(self, limite_categorias=LIMITE_CATEGORIAS):
+        self.limite_categorias = limite_categorias
+        self.linhas = 0
+        self.colunas = {}
+
+    def atualizar(self, lote):
+        """Acrescenta um bloco: cada coluna é percorrida uma vez."""
+        for nome, serie in lote.items():
+            if nome not in self.colunas:
+                self.colunas[nome] = PerfilColuna(self.limite_categorias)
+                # Coluna que só aparece neste bloco: as linhas anteriores contam como nulas.
+                self.colunas[nome].n = self.colunas[nome].nulos = self.linhas
+            self.colunas[nome].atualizar(serie)
+        for nome, coluna in self.colunas.items():
+            if nome not in lote:
+                coluna.n += len(lote)
+                coluna.nulos += len(lote)
+        self.linhas += len(lote)
+        return self
+
+    def combinar(self, outro):
+        """Incorpora o perfil de outra parte dos dados (ex.: outro arquivo)."""
+        for nome in list(self.colunas) + [nome for nome in outro.colunas if nome not in self.colunas]:
+            coluna = self.colunas.setdefault(nome, PerfilColuna(self.limite_categorias))
+            if nome in outro.colunas:
+                if coluna.n == 0 and self.linhas:
+                    coluna.n = coluna.nulos = self.linhas
+                coluna.combinar(outro.colunas[nome])
+            else:
+                coluna.n += outro.linhas
+                coluna.nulos += outro.linhas
+        self.linhas += outro.linhas
+        return self
+
+    def relatorio(self, top_k=TOP_K_PADRAO):
+        """Dicionário pronto para JSON: {'linhas': ..., 'colunas': {coluna: {...}}}."""
+        return {
+            'linhas': self.linhas,
+            'colunas': {nome: coluna.relatorio(top_k) for nome, coluna in self.colunas.items()},
+        }
+
+    def tabela(self, top_k=TOP_K_PADRAO):
+        """
+        O mesmo relatório como DataFrame (uma linha por coluna), no lugar de
+        'dados.info()' + 'dados.describe()'.
+        """
+        return tabela_perfil(self.relatorio(top_k))
+
+    def salvar(self, caminho, top_k=TOP_K_PADRAO):
+        """Grava o relatório em JSON (chaves ordenadas e indentado, para comparar com 'diff')."""
+        salvar_perfil(self.relatorio(top_k), caminho)
+
+
+def tabela_perfil(relatorio):
+    linhas = []
+    for nome, coluna in relatorio['colunas'].items():
+        numerico = coluna.get('numerico') or {}
+        quantis = numerico.get('quantis', {})
+        frequentes = coluna.get('mais_frequentes')
+        linhas.append({
+            'COLUNA': nome,
+            'TIPO': coluna['tipo'],
+            'NAO_NULOS': coluna['linhas'] - coluna['nulos'],
+            'NULOS': coluna['nulos'],
+            'PERCENTUAL_NULOS': coluna['percentual_nulos'],
+            'DISTINTOS': coluna['distintos'],
+            'MAIS_FREQUENTE': frequentes[0][0] if frequentes else None,
+            'FREQUENCIA': frequentes[0][1] if frequentes else None,
+            'MEDIA': numerico.get('media'),
+            'DESVIO': numerico.get('desvio'),
+            'MINIMO': numerico.get('minimo'),
+            '25%': quantis.get('0.25'),
+            '50%': quantis.get('0.5'),
+            '75%': quantis.get('0.75'),
+            'MAXIMO': numerico.get('maximo'),
+        })
+    return pd.DataFrame(linhas)
+
+
+def salvar_perfil(relatorio, caminho):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2, sort_keys=True, default=str)
+
+
+def carregar_perfil(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def perfilar(fonte, tamanho_bloco=TAMANHO_BLOCO_PADRAO, limite_categorias=LIMITE_CATEGORIAS):
+    """
+    Perfil de um DataFrame ou de um arquivo (xlsx, csv ou parquet), lido em
+    blocos de 'tamanho_bloco' linhas ('cache_colunar.ler_em_blocos').
+    """
+    perfil = PerfilDados(limite_categorias)
+    if isinstance(fonte, pd.DataFrame):
+        for inicio in range(0, max(len(fonte), 1), tamanho_bloco):
+            perfil.atualizar(fonte.iloc[inicio:inicio + tamanho_bloco])
+        return perfil
+    from cache_colunar import ler_em_blocos
+
+    for lote in ler_em_blocos(fonte, tamanho_bloco=tamanho_bloco):
+        perfil.atualizar(lote)
+    return perfil
+
+
+def _metricas(coluna):
+    numerico = coluna.get('numerico') or {}
+    frequentes = coluna.get('mais_frequentes')
+    return {
+        'tipo': coluna['tipo'],
+        'percentual_nulos': coluna['percentual_nulos'],
+        'distintos': coluna['distintos'],
+        'mais_frequente': frequentes[0][0] if frequentes else None,
+        'media': numerico.get('media'),
+        'desvio': numerico.get('desvio'),
+        'minimo': numerico.get('minimo'),
+        'mediana': numerico.get('quantis', {}).get('0.5'),
+        'maximo': numerico.get('maximo'),
+    }
+
+
+def comparar_perfis(anterior, atual, tolerancia=1e-9):
+    """
+    Diferenças entre dois relatórios (ex.: duas ondas da pesquisa).
+
+    Retorna um DataFrame com COLUNA, METRICA, ANTERIOR, ATUAL e VARIACAO
+    (diferença relativa, nas métricas numéricas). Colunas que entraram ou
+    saíram aparecem com a métrica 'coluna'.
+    """
+    diferencas = []
+    colunas_anteriores, colunas_atuais = anterior['colunas'], atual['colunas']
+    if anterior['linhas'] != atual['linhas']:
+        diferencas.append({'COLUNA': None, 'METRICA': 'linhas', 'ANTERIOR': anterior['linhas'],
+                           'ATUAL': atual['linhas'],
+                           'VARIACAO': (atual['linhas'] - anterior['linhas']) / anterior['linhas']
+                           if anterior['linhas'] else None})
+    for nome in list(colunas_anteriores) + [nome for nome in colunas_atuais if nome not in colunas_anteriores]:
+        if nome not in colunas_atuais or nome not in colunas_anteriores:
+            diferencas.append({'COLUNA': nome, 'METRICA': 'coluna',
+                               'ANTERIOR': 'presente' if nome in colunas_anteriores else 'ausente',
+                               'ATUAL': 'presente' if nome in colunas_atuais else 'ausente', 'VARIACAO': None})
+            continue
+        antes, depois = _metricas(colunas_anteriores[nome]), _metricas(colunas_atuais[nome])
+        for metrica in METRICAS_COMPARADAS:
+            valor_antes, valor_depois = antes[metrica], depois[metrica]
+            numericos = all(isinstance(valor, (int, float)) and not isinstance(valor, bool)
+                            for valor in (valor_antes, valor_depois))
+            if numericos:
+                if abs(valor_depois - valor_antes) <= tolerancia * max(abs(valor_antes), 1.0):
+                    continue
+                variacao = (valor_depois - valor_antes) / abs(valor_antes) if valor_antes else None
+            elif valor_antes == valor_depois:
+                continue
+            else:
+                variacao = None
+            diferencas.append({'COLUNA': nome, 'METRICA': metrica, 'ANTERIOR': valor_antes, 'ATUAL': valor_depois,
+                               'VARIACAO': variacao})
+    return pd.DataFrame(diferencas, columns=['COLUNA', 'METRICA', 'ANTERIOR', 'ATUAL', 'VARIACAO'])
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Perfil das colunas de uma planilha da pesquisa em uma passada.')
+    parser.add_argument('arquivo', help='Planilha, CSV ou Parquet.')
+    parser.add_argument('--saida', help='JSON onde gravar o perfil (padrão: <arquivo>.perfil.json).')
+    parser.add_argument('--top', type=int, default=TOP_K_PADRAO, help='Quantidade de valores mais frequentes.')
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO_PADRAO, help='Linhas por bloco.')
+    parser.add_argument('--comparar', help='Perfil JSON anterior para comparar (ex.: onda anterior).')
+    opcoes = parser.parse_args(argumentos)
+
+    if not os.path.exists(opcoes.arquivo):
+        print(f"Arquivo de entrada não encontrado: '{opcoes.arquivo}'", file=sys.stderr)
+        return 2
+    perfil = perfilar(opcoes.arquivo, opcoes.tamanho_bloco)
+    relatorio = perfil.relatorio(opcoes.top)
+    saida = opcoes.saida or os.path.splitext(opcoes.arquivo)[0] + '.perfil.json'
+    salvar_perfil(relatorio, saida)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(tabela_perfil(relatorio).to_string(index=False))
+        if opcoes.comparar:
+            print(comparar_perfis(carregar_perfil(opcoes.comparar), relatorio).to_string(index=False))
+    print(f"Perfil gravado em '{saida}'.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
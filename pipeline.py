@@ -0,0 +1,218 @@
+# Executor de pipeline incremental com checkpoint por etapa.
+#
+# O script é uma exportação linear do notebook: qualquer mudança (até em um
+# gráfico) exige rodar tudo de novo, inclusive a leitura do Excel. Aqui cada
+# etapa é declarada com um nome, a função que a executa e as entradas de que
+# depende (arquivos de origem ou resultados de outras etapas).
+#
+# O resultado de cada etapa é gravado em disco sob uma chave de conteúdo:
+# o hash combina o código da função e dos módulos do projeto de que ela
+# depende, os parâmetros e as chaves das entradas, que por sua vez dependem do
+# hash dos arquivos de origem. Os módulos do projeto (arquivos '.py' ao lado
+# deste) são encontrados a partir dos nomes usados pela função e seguidos pelos
+# seus 'import', direta ou indiretamente: se 'outliers.py' importa
+# 'extracao_flags', mudar 'extracao_flags.py' invalida as etapas que usam
+# 'outliers', mesmo sem declará-lo em 'modulos'. Assim, ao rodar de novo, só são recalculadas as etapas
+# cujo código ou dados de entrada mudaram (e as que dependem delas); as
+# demais são lidas do cache, e só quando o seu resultado é de fato necessário.
+#
+# Cada execução produz um relatório com a situação e o tempo de cada etapa.
+# Com uma 'instrumentacao.Instrumentacao', cada etapa também tem CPU, memória
+# e dimensões da entrada e da saída registradas.
+
+import ast
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import textwrap
+import time
+
+import pandas as pd
+
+from cache_colunar import identificar_origem
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_PIPELINE_PADRAO = os.environ.get('DATAHACKERS_PIPELINE', os.path.join(DIRETORIO_PROJETO, '.cache_pipeline'))
+
+
+def _arquivo_local(nome_modulo):
+    # Arquivo do módulo se ele for do projeto; None para a biblioteca padrão e pacotes instalados.
+    if not nome_modulo:
+        return None
+    caminho = os.path.join(DIRETORIO_PROJETO, nome_modulo.split('.')[0] + '.py')
+    return caminho if os.path.isfile(caminho) else None
+
+
+def _modulos_importados(codigo):
+    # Nomes dos módulos em todos os 'import' do código, inclusive os feitos dentro de funções.
+    for no in ast.walk(ast.parse(codigo)):
+        if isinstance(no, ast.Import):
+            yield from (alias.name for alias in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.level == 0:
+            yield no.module
+
+
+def dependencias_locais(arquivos):
+    """Arquivos do projeto importados, direta ou indiretamente, pelos 'arquivos' (incluídos), em ordem."""
+    encontrados = set()
+    pendentes = list(arquivos)
+    while pendentes:
+        arquivo = pendentes.pop()
+        if arquivo in encontrados:
+            continue
+        encontrados.add(arquivo)
+        with open(arquivo, 'rb') as fonte:
+            pendentes += [local for local in map(_arquivo_local, _modulos_importados(fonte.read())) if local]
+    return sorted(encontrados)
+
+
+class Etapa:
+    """
+    Uma etapa do pipeline.
+
+    'funcao' é chamada com os valores de 'entradas' (na mesma ordem) e com os
+    'parametros' como argumentos nomeados. Cada entrada é o nome de outra etapa
+    ou de uma fonte (arquivo) informada em 'Pipeline.executar'; para fontes, a
+    função recebe o caminho do arquivo. Os módulos do projeto usados pela
+    função (e os que eles importam) entram no hash do código automaticamente;
+    'modulos' acrescenta outros módulos cujo código, se alterado, também
+    invalida o resultado desta etapa.
+    """
+
+    def __init__(self, nome, funcao, entradas=(), parametros=None, modulos=()):
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = tuple(entradas)
+        self.parametros = parametros or {}
+        self.modulos = tuple(modulos)
+
+    def _arquivos_usados(self):
+        # Módulos do projeto referenciados pela função: 'modulo.f()', 'f()' importada de outro
+        # módulo ou 'import' dentro do corpo. O próprio módulo da função não entra (só o código dela).
+        globais = getattr(self.funcao, '__globals__', {})
+        proprio = _arquivo_local(getattr(self.funcao, '__module__', None))
+        arquivos = {os.path.abspath(inspect.getsourcefile(modulo)) for modulo in self.modulos}
+        for nome in self.funcao.__code__.co_names:
+            objeto = globais.get(nome)
+            modulo = objeto.__name__ if inspect.ismodule(objeto) else getattr(objeto, '__module__', None)
+            arquivos.add(_arquivo_local(modulo))
+        try:
+            arquivos.update(map(_arquivo_local, _modulos_importados(textwrap.dedent(inspect.getsource(self.funcao)))))
+        except SyntaxError:
+            # Lambda no meio de uma expressão maior: o trecho de código não é analisável sozinho.
+            pass
+        return arquivos - {None, proprio}
+
+    def hash_codigo(self):
+        sha = hashlib.sha256(inspect.getsource(self.funcao).encode('utf-8'))
+        for arquivo in dependencias_locais(self._arquivos_usados()):
+            sha.update(os.path.basename(arquivo).encode('utf-8'))
+            with open(arquivo, 'rb') as fonte:
+                sha.update(fonte.read())
+        return sha.hexdigest()
+
+
+class Pipeline:
+    """Conjunto de etapas com cache em disco do resultado de cada uma."""
+
+    def __init__(self, etapas, diretorio_cache=None):
+        self.etapas = {etapa.nome: etapa for etapa in etapas}
+        if len(self.etapas) != len(etapas):
+            raise ValueError('Há etapas com nomes repetidos no pipeline.')
+        self.diretorio_cache = diretorio_cache or DIRETORIO_PIPELINE_PADRAO
+
+    def _chaves(self, fontes, alvos):
+        # A chave de uma etapa depende só do código, dos parâmetros e das chaves
+        # das entradas, então todas podem ser calculadas antes de executar qualquer etapa.
+        # Só as etapas necessárias para os 'alvos' entram: as demais podem depender
+        # de fontes não informadas (ex.: o banco, com '--sem-sql').
+        chaves = {nome: identificar_origem(caminho) for nome, caminho in fontes.items()}
+
+        def chave(nome, visitando=()):
+            if nome in chaves:
+                return chaves[nome]
+            if nome not in self.etapas:
+                raise KeyError(f"Entrada '{nome}' não é uma etapa nem uma fonte informada.")
+            if nome in visitando:
+                raise ValueError(f"Dependência circular envolvendo a etapa '{nome}'.")
+            etapa = self.etapas[nome]
+            conteudo = json.dumps({
+                'nome': nome,
+                'codigo': etapa.hash_codigo(),
+                'parametros': etapa.parametros,
+                'entradas': [chave(entrada, visitando + (nome,)) for entrada in etapa.entradas],
+            }, sort_keys=True, default=str)
+            chaves[nome] = hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+            return chaves[nome]
+
+        for nome in alvos:
+            chave(nome)
+        return chaves
+
+    def _arquivo(self, nome, chave):
+        return os.path.join(self.diretorio_cache, f'{nome}_{chave[:16]}.pkl')
+
+    def executar(self, fontes, alvos=None, instrumentacao=None):
+        """
+        Executa o pipeline e retorna (resultados, relatório).
+
+        'fontes' é um dicionário {nome da fonte: caminho do arquivo}. 'alvos' são
+        as etapas cujo resultado se deseja (todas, se None). 'resultados' traz o
+        valor dos alvos; o relatório é um DataFrame com a situação ('calculada'
+        ou 'cache') e o tempo em segundos de cada etapa usada. Com
+        'instrumentacao', cada etapa (calculada ou lida do cache) é medida por ela.
+        """
+        os.makedirs(self.diretorio_cache, exist_ok=True)
+        alvos = list(self.etapas) if alvos is None else list(alvos)
+        chaves = self._chaves(fontes, alvos)
+        valores = {}
+        relatorio = []
+
+        def medir(nome, situacao, entrada, funcao):
+            if instrumentacao is None:
+                return funcao()
+            with instrumentacao.etapa(nome, entrada, SITUACAO=situacao) as medicao:
+                medicao.saida = funcao()
+            return medicao.saida
+
+        def ler(arquivo):
+            with open(arquivo, 'rb') as entrada:
+                return pickle.load(entrada)
+
+        def obter(nome):
+            if nome in valores:
+                return valores[nome]
+            if nome in fontes:
+                valores[nome] = fontes[nome]
+                return valores[nome]
+            etapa = self.etapas[nome]
+            arquivo = self._arquivo(nome, chaves[nome])
+            inicio = time.perf_counter()
+            if os.path.exists(arquivo):
+                situacao = 'cache'
+                valores[nome] = medir(nome, situacao, None, lambda: ler(arquivo))
+            else:
+                argumentos = [obter(entrada) for entrada in etapa.entradas]
+                # O tempo das entradas já foi contado nas etapas de origem.
+                inicio = time.perf_counter()
+                situacao = 'calculada'
+                valores[nome] = medir(nome, situacao, argumentos[0] if argumentos else None,
+                                      lambda: etapa.funcao(*argumentos, **etapa.parametros))
+                temporario = arquivo + '.tmp'
+                with open(temporario, 'wb') as saida:
+                    pickle.dump(valores[nome], saida, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporario, arquivo)
+            relatorio.append({'ETAPA': nome, 'SITUACAO': situacao, 'SEGUNDOS': time.perf_counter() - inicio})
+            return valores[nome]
+
+        resultados = {alvo: obter(alvo) for alvo in alvos}
+        return resultados, pd.DataFrame(relatorio, columns=['ETAPA', 'SITUACAO', 'SEGUNDOS'])
+
+    def limpar_cache(self):
+        """Remove os resultados gravados das etapas."""
+        if not os.path.isdir(self.diretorio_cache):
+            return
+        for nome in os.listdir(self.diretorio_cache):
+            os.remove(os.path.join(self.diretorio_cache, nome))
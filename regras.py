@@ -0,0 +1,161 @@
+# Camada declarativa de regras para a engenharia de features.
+#
+# As colunas derivadas da análise ('NOVO_NIVEL', 'GERACAO' e o 'NIVEL DE ENSINO'
+# ordinal do notebook de regressão) eram calculadas com '.apply', chamando uma
+# função Python por respondente. Aqui cada regra é descrita como uma tabela
+# (condição/escolha, bordas de faixas ou lista ordenada de categorias) e
+# compilada para operações vetorizadas do NumPy/Pandas:
+#
+#   - 'selecao' -> np.select
+#   - 'faixas'  -> pd.cut + pd.Categorical.from_codes
+#   - 'ordinal' -> códigos de pd.Categorical
+#
+# As funções originais continuam aqui como referência; 'tests/test_regras.py'
+# confere que as regras compiladas produzem exatamente o mesmo resultado.
+
+import numpy as np
+import pandas as pd
+
+
+### Funções de referência (implementação original, linha a linha)
+
+# Se a pessoa for gestora (GESTOR? == 1), o 'NOVO_NIVEL' será "Pessoa gestora".
+# Caso contrário, manterá o valor original da coluna 'NIVEL'.
+def preencher_nivel(gestor, nivel):
+    if gestor == 1:
+        return "Pessoa gestora"
+    else:
+        return nivel
+
+# Categoriza a 'IDADE' em 'GERACAO' (Geração X, Y, Z, Alpha).
+def determinar_geracao(idade):
+    if 39 < idade <= 58:
+        return "Geração X"
+    elif 29 < idade <= 39:
+        return "Geração Y"
+    elif 19 < idade <= 29:
+        return "Geração Z"
+    else:
+        return "Geração Alpha"
+
+# Converte o 'NIVEL DE ENSINO' em um valor ordinal (lambda do notebook de regressão).
+def nivel_de_ensino_ordinal(x):
+    return (0 if x == 'Não tenho graduação formal' else
+            1 if x == 'Estudante de graduação' else
+            2 if x == 'Graduação/Bacharelado' else
+            3 if x == 'Pós-graduação' else
+            4 if x == 'Mestrado' else
+            5 if x == 'Doutorado ou Phd' else -1)
+
+
+### Tabelas de regras
+
+# Cada caso é um par ({coluna: valor, ...}, escolha): a escolha é usada quando
+# todas as colunas do dicionário são iguais ao valor indicado. O primeiro caso
+# verdadeiro vence; sem nenhum caso verdadeiro, vale o valor de 'padrao_coluna'.
+REGRA_NOVO_NIVEL = {
+    'tipo': 'selecao',
+    'casos': [({'GESTOR?': 1}, 'Pessoa gestora')],
+    'padrao_coluna': 'NIVEL',
+}
+
+# Faixas fechadas à direita: (19, 29] -> Z, (29, 39] -> Y, (39, 58] -> X.
+# Idades fora das faixas (ou nulas) recebem 'fora_das_faixas'.
+REGRA_GERACAO = {
+    'tipo': 'faixas',
+    'coluna': 'IDADE',
+    'bordas': [19, 29, 39, 58],
+    'rotulos': ['Geração Z', 'Geração Y', 'Geração X'],
+    'fora_das_faixas': 'Geração Alpha',
+}
+
+# A posição de cada categoria na lista é o seu código ordinal.
+# Valores desconhecidos (ou nulos) recebem 'desconhecido'.
+REGRA_NIVEL_ENSINO = {
+    'tipo': 'ordinal',
+    'coluna': 'NIVEL DE ENSINO',
+    'categorias': [
+        'Não tenho graduação formal',
+        'Estudante de graduação',
+        'Graduação/Bacharelado',
+        'Pós-graduação',
+        'Mestrado',
+        'Doutorado ou Phd',
+    ],
+    'desconhecido': -1,
+}
+
+
+### Compilação das regras
+
+def _compilar_selecao(regra):
+    casos = regra['casos']
+    padrao_coluna = regra.get('padrao_coluna')
+    padrao_valor = regra.get('padrao_valor')
+
+    def aplicar(dados):
+        condicoes = []
+        for filtro, _ in casos:
+            condicao = np.ones(len(dados), dtype=bool)
+            for coluna, valor in filtro.items():
+                condicao &= (dados[coluna] == valor).to_numpy(dtype=bool, na_value=False)
+            condicoes.append(condicao)
+        escolhas = [np.full(len(dados), escolha, dtype=object) for _, escolha in casos]
+        if padrao_coluna is not None:
+            padrao = dados[padrao_coluna].to_numpy(dtype=object)
+        else:
+            padrao = np.full(len(dados), padrao_valor, dtype=object)
+        return pd.Series(np.select(condicoes, escolhas, default=padrao), index=dados.index, dtype=object)
+
+    return aplicar
+
+
+def _compilar_faixas(regra):
+    coluna = regra['coluna']
+    bordas = regra['bordas']
+    rotulos = list(regra['rotulos'])
+    fora = regra['fora_das_faixas']
+    categorias = rotulos + [fora]
+
+    def aplicar(dados):
+        codigos = pd.cut(dados[coluna], bins=bordas, labels=False, right=True)
+        codigos = codigos.fillna(len(rotulos)).astype(np.int8).to_numpy()
+        return pd.Series(pd.Categorical.from_codes(codigos, categories=categorias), index=dados.index)
+
+    return aplicar
+
+
+def _compilar_ordinal(regra):
+    coluna = regra['coluna']
+    categorias = regra['categorias']
+    desconhecido = regra.get('desconhecido', -1)
+
+    def aplicar(dados):
+        codigos = pd.Index(categorias).get_indexer(dados[coluna]).astype(np.int64)
+        if desconhecido != -1:
+            codigos[codigos == -1] = desconhecido
+        return pd.Series(codigos, index=dados.index)
+
+    return aplicar
+
+
+_COMPILADORES = {
+    'selecao': _compilar_selecao,
+    'faixas': _compilar_faixas,
+    'ordinal': _compilar_ordinal,
+}
+
+
+def compilar_regra(regra):
+    """Compila uma tabela de regra em uma função vetorizada 'f(dados) -> Series'."""
+    try:
+        compilador = _COMPILADORES[regra['tipo']]
+    except KeyError:
+        raise ValueError(f"Tipo de regra desconhecido: '{regra.get('tipo')}'") from None
+    return compilador(regra)
+
+
+def aplicar_regra(dados, regra):
+    """Aplica uma tabela de regra ao DataFrame 'dados' e retorna a coluna resultante."""
+    return compilar_regra(regra)(dados)
+
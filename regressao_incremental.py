@@ -0,0 +1,235 @@
+# Regressão linear do salário ajustada em blocos (equações normais acumuladas).
+#
+# O notebook de regressão carrega todas as respostas em 'X' e 'y' antes do
+# 'model.fit'. Com várias edições da pesquisa empilhadas, os dados podem não
+# caber na memória. Aqui cada bloco é preparado e codificado como em
+# 'modelagem.py' e só a matriz de co-momentos de [SALARIO, atributos]
+# ('resumos.MatrizCoMomentos': médias e XᵀX / Xᵀy centrados, combinados pela
+# fórmula de Chan) é guardada. A memória depende do número de atributos, não do
+# número de respondentes, e estados calculados em arquivos ou anos diferentes
+# podem ser combinados com 'combinar'.
+#
+# Da mesma matriz saem:
+#   - os coeficientes de mínimos quadrados (iguais aos do 'LinearRegression'
+#     sobre os mesmos dados em memória) e o intercepto;
+#   - os coeficientes na escala padronizada (como após o 'StandardScaler' do
+#     notebook), usados no ranking 'coefs.plot.barh';
+#   - erros padrão, estatística t, p-valores e R².
+#
+# As dummies seguem o 'drop_first' do notebook: a primeira categoria de cada
+# coluna (na ordem das categorias do primeiro bloco em que a coluna aparece) é
+# a referência. Categorias que só aparecem em blocos seguintes ganham colunas
+# novas ao final da matriz. Linhas com algum atributo numérico nulo são
+# descartadas (o 'LinearRegression' não aceita nulos).
+
+import json
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from modelagem import COLUNAS_CATEGORICAS, COLUNAS_NUMERICAS, preparar_atributos, preparar_dados_regressao
+from resumos import MatrizCoMomentos
+
+TAMANHO_BLOCO_PADRAO = 100_000
+
+
+def _categorias(serie):
+    # Mesma ordem do 'CodificadorEsparso'/'pd.get_dummies': categorias do tipo categórico ou valores ordenados.
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return [str(categoria) for categoria in serie.cat.categories]
+    return sorted({str(valor) for valor in serie.dropna().unique()})
+
+
+class RegressaoIncremental:
+    """
+    Regressão linear de 'SALARIO' acumulada bloco a bloco.
+
+    'atualizar' recebe respostas brutas (com os filtros do notebook); 'resolver'
+    pode ser chamado a qualquer momento e usa apenas a matriz acumulada.
+    """
+
+    def __init__(self, colunas_numericas=None, colunas_categoricas=None):
+        self.colunas_numericas = list(colunas_numericas or COLUNAS_NUMERICAS)
+        self.colunas_categoricas = list(colunas_categoricas or COLUNAS_CATEGORICAS)
+        # {coluna: [categoria de referência, demais categorias...]}
+        self.vocabulario = {}
+        self.nomes = list(self.colunas_numericas)
+        self.momentos = MatrizCoMomentos(1 + len(self.nomes))
+        self.lotes = 0
+
+    def _ampliar_vocabulario(self, categorias_por_coluna):
+        # {coluna: categorias}: as que ainda não existem ganham colunas novas ao final da matriz.
+        novos = []
+        for coluna in self.colunas_categoricas:
+            categorias = categorias_por_coluna.get(coluna, [])
+            if coluna not in self.vocabulario:
+                if not categorias:
+                    continue
+                self.vocabulario[coluna] = list(categorias)
+                novos += [f'{coluna}_{categoria}' for categoria in categorias[1:]]
+            else:
+                conhecidas = set(self.vocabulario[coluna])
+                adicionais = [categoria for categoria in categorias if categoria not in conhecidas]
+                self.vocabulario[coluna] += adicionais
+                novos += [f'{coluna}_{categoria}' for categoria in adicionais]
+        self.nomes += novos
+        self.momentos.ampliar(len(novos))
+
+    def _matriz(self, atributos):
+        # Colunas na ordem de 'self.nomes': numéricas seguidas das dummies.
+        matriz = np.zeros((len(atributos), len(self.nomes)))
+        matriz[:, :len(self.colunas_numericas)] = atributos[self.colunas_numericas].to_numpy(dtype=float,
+                                                                                            na_value=np.nan)
+        posicoes = {nome: posicao for posicao, nome in enumerate(self.nomes)}
+        for coluna, categorias in self.vocabulario.items():
+            texto = atributos[coluna].astype(object).where(atributos[coluna].isna(), atributos[coluna].astype(str))
+            codigos = pd.Categorical(texto, categories=categorias).codes
+            colunas = np.array([-1] + [posicoes[f'{coluna}_{categoria}'] for categoria in categorias[1:]])
+            marcadas = codigos > 0
+            matriz[np.flatnonzero(marcadas), colunas[codigos[marcadas]]] = 1.0
+        return matriz
+
+    def atualizar(self, lote):
+        """Acrescenta um bloco de respostas brutas (aplica os filtros do notebook)."""
+        atributos, y = preparar_dados_regressao(lote)
+        if len(atributos):
+            self._ampliar_vocabulario({coluna: _categorias(atributos[coluna]) for coluna in self.colunas_categoricas})
+            self.momentos.atualizar(np.column_stack([y.to_numpy(dtype=float), self._matriz(atributos)]))
+        self.lotes += 1
+        return self
+
+    def combinar(self, outra):
+        """Incorpora o estado de 'outra' (ex.: outro ano), alinhando as colunas pelos nomes."""
+        for coluna, categorias in outra.vocabulario.items():
+            if coluna in self.vocabulario and self.vocabulario[coluna][0] != categorias[0]:
+                raise ValueError(f"Categorias de referência diferentes em '{coluna}': "
+                                 f"'{self.vocabulario[coluna][0]}' e '{categorias[0]}'.")
+        if outra.momentos.n:
+            self._ampliar_vocabulario(outra.vocabulario)
+            # Reordena a matriz de 'outra' para as colunas deste estado (zeros nas que ela não tem).
+            ordem = [0] + [1 + outra.nomes.index(nome) if nome in outra.nomes else -1 for nome in self.nomes]
+            alinhada = MatrizCoMomentos()
+            alinhada.n = outra.momentos.n
+            media = np.append(outra.momentos.media, 0.0)
+            m2 = np.pad(outra.momentos.m2, ((0, 1), (0, 1)))
+            alinhada.media = media[ordem]
+            alinhada.m2 = m2[np.ix_(ordem, ordem)]
+            self.momentos.combinar(alinhada)
+        self.lotes += outra.lotes
+        return self
+
+    @property
+    def n(self):
+        return self.momentos.n
+
+    def resolver(self):
+        """
+        Resolve as equações normais com a matriz acumulada.
+
+        Retorna um DataFrame indexado pelos atributos com COEFICIENTE (escala
+        original), ERRO_PADRAO, T, P_VALOR, COEFICIENTE_PADRONIZADO e
+        ERRO_PADRAO_PADRONIZADO, e guarda 'intercepto' e 'r2'. Atributos
+        constantes ficam com coeficiente 0 e erro padrão nulo, como no
+        'LinearRegression' (solução de norma mínima).
+        """
+        n, m2 = self.momentos.n, self.momentos.m2
+        variaveis = np.diag(m2)[1:] > 0
+        indices = np.flatnonzero(variaveis)
+        sxx = m2[1:, 1:][np.ix_(indices, indices)]
+        sxy = m2[1:, 0][indices]
+        # 'pinv' tolera colinearidade exata (ex.: dummies sempre juntas) como o 'lstsq' do scikit-learn.
+        inversa = np.linalg.pinv(sxx)
+        coeficientes = np.zeros(len(self.nomes))
+        coeficientes[indices] = inversa @ sxy
+
+        graus_liberdade = n - np.linalg.matrix_rank(sxx) - 1 if indices.size else n - 1
+        residuo = max(m2[0, 0] - coeficientes[indices] @ sxy, 0.0)
+        variancia_residuo = residuo / graus_liberdade if graus_liberdade > 0 else np.nan
+        erros = np.full(len(self.nomes), np.nan)
+        erros[indices] = np.sqrt(np.clip(np.diag(inversa), 0, None) * variancia_residuo)
+
+        medias = self.momentos.media
+        self.intercepto = float(medias[0] - coeficientes @ medias[1:])
+        self.r2 = float(1 - residuo / m2[0, 0]) if m2[0, 0] > 0 else np.nan
+        # Escala do 'StandardScaler' (desvio com ddof=0).
+        desvios = np.sqrt(np.diag(m2)[1:] / n) if n else np.full(len(self.nomes), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            estatistica_t = coeficientes / erros
+        resultado = pd.DataFrame({
+            'COEFICIENTE': coeficientes,
+            'ERRO_PADRAO': erros,
+            'T': estatistica_t,
+            'P_VALOR': 2 * stats.t.sf(np.abs(estatistica_t), graus_liberdade) if graus_liberdade > 0 else np.nan,
+            'COEFICIENTE_PADRONIZADO': coeficientes * desvios,
+            'ERRO_PADRAO_PADRONIZADO': erros * desvios,
+        }, index=pd.Index(self.nomes, name='ATRIBUTO'))
+        self.coeficientes_ = resultado
+        return resultado
+
+    def coefs(self):
+        """Coeficientes padronizados do maior para o menor (o 'coefs' do notebook)."""
+        resultado = self.resolver()
+        coef = resultado[['COEFICIENTE_PADRONIZADO']].rename(columns={'COEFICIENTE_PADRONIZADO': 'COEFICIENTES'})
+        return coef.sort_values(by='COEFICIENTES', ascending=False)
+
+    def grafico_coeficientes(self, figsize=(8, 4)):
+        """'coefs.plot.barh' com a linha vertical em zero, como no notebook. Retorna a 'Figure'."""
+        eixo = self.coefs().plot.barh(figsize=figsize)
+        eixo.axvline(x=0, color='red')
+        return eixo.figure
+
+    def prever(self, dados):
+        """Salário previsto para respostas brutas (sem os filtros do notebook)."""
+        if not hasattr(self, 'coeficientes_'):
+            self.resolver()
+        atributos = preparar_atributos(dados)
+        matriz = self._matriz(atributos)
+        previsto = self.intercepto + matriz @ self.coeficientes_['COEFICIENTE'].to_numpy()
+        return pd.Series(previsto, index=dados.index, name='SALARIO_PREVISTO')
+
+    def para_dict(self):
+        return {
+            'colunas_numericas': self.colunas_numericas,
+            'colunas_categoricas': self.colunas_categoricas,
+            'vocabulario': self.vocabulario,
+            'nomes': self.nomes,
+            'momentos': self.momentos.para_dict(),
+            'lotes': self.lotes,
+        }
+
+    @classmethod
+    def de_dict(cls, conteudo):
+        regressao = cls(conteudo['colunas_numericas'], conteudo['colunas_categoricas'])
+        regressao.vocabulario = conteudo['vocabulario']
+        regressao.nomes = conteudo['nomes']
+        regressao.momentos = MatrizCoMomentos.de_dict(conteudo['momentos'])
+        regressao.lotes = conteudo['lotes']
+        return regressao
+
+    def salvar(self, caminho):
+        """Grava o vocabulário e a matriz acumulada em JSON."""
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.para_dict(), arquivo, ensure_ascii=False)
+
+    @classmethod
+    def carregar(cls, caminho):
+        with open(caminho, encoding='utf-8') as arquivo:
+            return cls.de_dict(json.load(arquivo))
+
+
+def ajustar_em_blocos(caminhos, tamanho_bloco=TAMANHO_BLOCO_PADRAO, regressao=None):
+    """
+    Ajusta (ou continua ajustando 'regressao') lendo cada arquivo de 'caminhos'
+    em blocos de 'tamanho_bloco' linhas ('cache_colunar.ler_em_blocos').
+    """
+    from cache_colunar import ler_em_blocos
+
+    regressao = regressao or RegressaoIncremental()
+    if isinstance(caminhos, str):
+        caminhos = [caminhos]
+    for caminho in caminhos:
+        for lote in ler_em_blocos(caminho, tamanho_bloco=tamanho_bloco):
+            regressao.atualizar(lote)
+    return regressao
+
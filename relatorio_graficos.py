@@ -0,0 +1,216 @@
+# Exportação de todos os gráficos da análise para um diretório de relatório.
+#
+# Na seção de visualização cada gráfico é montado com 'plt.figure()' e exibido
+# com 'plt.show()' / 'fig.show()', um de cada vez, esperando uma tela. Aqui os
+# gráficos são declarados em 'GRAFICOS' (nome, título, função que desenha,
+# agregados de que precisa) e desenhados sem tela, em paralelo, em processos
+# com o backend 'Agg' do matplotlib. Cada gráfico vira arquivos PNG/SVG
+# (matplotlib) ou HTML (Plotly) e um 'index.html' reúne todos.
+#
+# Os agregados ('genero_counts', 'salario_por_idade' e o agregado de dispersão
+# 'idade_salario' de 'graficos.py') são calculados uma única vez, no processo
+# principal; cada processo recebe apenas os agregados dos seus gráficos, que
+# são pequenos, e nunca as linhas da pesquisa.
+
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import graficos
+
+FORMATOS_PADRAO = ('png', 'svg', 'html')
+FORMATOS_POR_BIBLIOTECA = {'matplotlib': ('png', 'svg'), 'plotly': ('html', 'png', 'svg')}
+ARQUIVO_PLOTLYJS = 'plotly.min.js'
+
+
+class Grafico:
+    """
+    Um gráfico do relatório.
+
+    'funcao' recebe os 'agregados' (na mesma ordem) e retorna uma figura do
+    matplotlib ou do Plotly, conforme 'biblioteca'.
+    """
+
+    def __init__(self, nome, titulo, funcao, agregados, biblioteca='matplotlib'):
+        self.nome = nome
+        self.titulo = titulo
+        self.funcao = funcao
+        self.agregados = tuple(agregados)
+        self.biblioteca = biblioteca
+
+
+def calcular_agregados(dados):
+    """Agregados usados pelos gráficos, calculados uma vez sobre 'dados'."""
+    return {
+        'genero_counts': dados['GENERO'].value_counts(),
+        'salario_por_idade': dados.groupby('IDADE')['SALARIO'].mean(),
+        'idade_salario': graficos.agregar_dispersao(dados['IDADE'], dados['SALARIO']),
+    }
+
+
+# Funções de desenho (uma por gráfico da seção de visualização).
+
+def barras_genero(genero_counts):
+    import matplotlib.pyplot as plt
+
+    figura, eixo = plt.subplots()
+    eixo.bar(genero_counts.index.astype(str), genero_counts.values)
+    eixo.set_title('Quantidade de Pessoas por Gêneros na Área de Dados')
+    eixo.set_xlabel('Gênero')
+    eixo.set_ylabel('Quantidade')
+    return figura
+
+
+def contagem_genero_seaborn(genero_counts):
+    # Mesmo visual do 'sns.countplot(data=dados, x='GENERO')', mas a partir das
+    # contagens já calculadas: as linhas não são contadas de novo.
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    figura, eixo = plt.subplots()
+    generos = genero_counts.index.astype(str)
+    sns.barplot(x=generos, y=genero_counts.values, hue=generos, palette='pastel', legend=False, ax=eixo)
+    eixo.set_title('Quantidade de Pessoas por Gêneros na Área de Dados')
+    eixo.set_xlabel('Gênero')
+    eixo.set_ylabel('Quantidade')
+    eixo.grid(True)
+    return figura
+
+
+def linha_salario_idade(salario_por_idade):
+    import matplotlib.pyplot as plt
+
+    serie = graficos.decimar_serie(salario_por_idade)
+    figura, eixo = plt.subplots()
+    eixo.plot(serie.index, serie.values, marker='o', linestyle='--')
+    eixo.set_title('Média de Salário por Idade')
+    eixo.set_xlabel('Idade')
+    eixo.set_ylabel('Salário')
+    eixo.grid(True)
+    return figura
+
+
+def linha_salario_idade_plotly(salario_por_idade):
+    import plotly.express as px
+
+    serie = graficos.decimar_serie(salario_por_idade)
+    return px.line(serie.reset_index(), x='IDADE', y='SALARIO', title='Média de Salário por Idade', markers=True)
+
+
+def dispersao_idade_salario(idade_salario):
+    return graficos.desenhar_dispersao_matplotlib(idade_salario, 'Relação Idade x Salário', 'Idade', 'Salário')
+
+
+def dispersao_idade_salario_plotly(idade_salario):
+    return graficos.desenhar_dispersao_plotly(idade_salario, 'Relação Idade x Salário', 'IDADE', 'SALARIO')
+
+
+GRAFICOS = [
+    Grafico('barras_genero', 'Quantidade de pessoas por gênero (matplotlib)', barras_genero, ['genero_counts']),
+    Grafico('contagem_genero', 'Quantidade de pessoas por gênero (seaborn)', contagem_genero_seaborn,
+            ['genero_counts']),
+    Grafico('linha_salario_idade', 'Média de salário por idade (matplotlib)', linha_salario_idade,
+            ['salario_por_idade']),
+    Grafico('linha_salario_idade_interativo', 'Média de salário por idade (Plotly)', linha_salario_idade_plotly,
+            ['salario_por_idade'], biblioteca='plotly'),
+    Grafico('dispersao_idade_salario', 'Relação idade x salário (matplotlib)', dispersao_idade_salario,
+            ['idade_salario']),
+    Grafico('dispersao_idade_salario_interativo', 'Relação idade x salário com tendência (Plotly)',
+            dispersao_idade_salario_plotly, ['idade_salario'], biblioteca='plotly'),
+]
+
+
+def _iniciar_processo():
+    # Backend sem tela em cada processo, antes de qualquer 'pyplot'.
+    os.environ['MPLBACKEND'] = 'Agg'
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _renderizar(grafico, valores, diretorio, formatos):
+    """Desenha um gráfico e grava um arquivo por formato. Roda dentro de um processo do pool."""
+    inicio = time.perf_counter()
+    figura = grafico.funcao(*valores)
+    arquivos = []
+    for formato in formatos:
+        caminho = os.path.join(diretorio, f'{grafico.nome}.{formato}')
+        if grafico.biblioteca == 'matplotlib':
+            figura.savefig(caminho, format=formato, bbox_inches='tight')
+        elif formato == 'html':
+            # A biblioteca JavaScript é gravada uma vez no diretório e referenciada por todos os HTML.
+            figura.write_html(caminho, include_plotlyjs='directory', full_html=True)
+        else:
+            try:
+                figura.write_image(caminho)
+            except (ValueError, ImportError, RuntimeError):
+                # PNG/SVG do Plotly dependem do pacote opcional 'kaleido'; o HTML é suficiente.
+                continue
+        arquivos.append(os.path.basename(caminho))
+    if grafico.biblioteca == 'matplotlib':
+        import matplotlib.pyplot as plt
+        plt.close(figura)
+    return grafico.nome, arquivos, time.perf_counter() - inicio
+
+
+def _escrever_indice(diretorio, graficos_relatorio, arquivos):
+    partes = ['<!DOCTYPE html>', '<html lang="pt-BR">', '<head><meta charset="utf-8">',
+              '<title>State of Data Brazil 2022 - Gráficos</title></head>', '<body>',
+              '<h1>State of Data Brazil 2022 - Gráficos</h1>']
+    for grafico in graficos_relatorio:
+        gerados = arquivos.get(grafico.nome, [])
+        partes.append(f'<h2>{html.escape(grafico.titulo)}</h2>')
+        pagina = next((nome for nome in gerados if nome.endswith('.html')), None)
+        imagem = next((nome for nome in gerados if nome.endswith(('.svg', '.png'))), None)
+        if pagina:
+            partes.append(f'<iframe src="{html.escape(pagina)}" width="100%" height="520" frameborder="0"></iframe>')
+        elif imagem:
+            partes.append(f'<img src="{html.escape(imagem)}" alt="{html.escape(grafico.titulo)}">')
+        links = ' | '.join(f'<a href="{html.escape(nome)}">{html.escape(nome)}</a>' for nome in gerados)
+        partes.append(f'<p>{links}</p>')
+    partes += ['</body>', '</html>']
+    with open(os.path.join(diretorio, 'index.html'), 'w', encoding='utf-8') as arquivo:
+        arquivo.write('\n'.join(partes))
+
+
+def gerar_relatorio(agregados, diretorio, formatos=FORMATOS_PADRAO, graficos_relatorio=None, processos=None):
+    """
+    Desenha os gráficos ('GRAFICOS' por padrão) a partir dos 'agregados' e grava
+    os arquivos e um 'index.html' em 'diretorio'.
+
+    Cada gráfico é gravado nos 'formatos' pedidos que a sua biblioteca suporta
+    (PNG/SVG do Plotly só com o pacote 'kaleido'). 'processos' é o número de
+    processos do pool (padrão: um por gráfico, limitado aos núcleos; 1 desenha
+    no próprio processo). Retorna um DataFrame com os arquivos e o tempo de cada gráfico.
+    """
+    graficos_relatorio = GRAFICOS if graficos_relatorio is None else graficos_relatorio
+    faltando = sorted({nome for grafico in graficos_relatorio for nome in grafico.agregados} - set(agregados))
+    if faltando:
+        raise KeyError(f'Agregados ausentes para os gráficos: {faltando}')
+    os.makedirs(diretorio, exist_ok=True)
+
+    tarefas = []
+    for grafico in graficos_relatorio:
+        formatos_grafico = [f for f in formatos if f in FORMATOS_POR_BIBLIOTECA[grafico.biblioteca]]
+        if formatos_grafico:
+            tarefas.append((grafico, [agregados[nome] for nome in grafico.agregados], diretorio, formatos_grafico))
+    if any(grafico.biblioteca == 'plotly' and 'html' in formatos_grafico
+           for grafico, _, _, formatos_grafico in tarefas):
+        # Gravado antes do pool, para que os processos não escrevam o mesmo arquivo ao mesmo tempo.
+        from plotly.offline import get_plotlyjs
+        with open(os.path.join(diretorio, ARQUIVO_PLOTLYJS), 'w', encoding='utf-8') as arquivo:
+            arquivo.write(get_plotlyjs())
+
+    processos = processos or min(len(tarefas), os.cpu_count() or 1)
+    if processos <= 1:
+        resultados = [_renderizar(*tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo) as executor:
+            resultados = list(executor.map(_renderizar, *zip(*tarefas)))
+
+    arquivos = {nome: gerados for nome, gerados, _ in resultados}
+    _escrever_indice(diretorio, graficos_relatorio, arquivos)
+    return pd.DataFrame([{'GRAFICO': nome, 'ARQUIVOS': ', '.join(gerados), 'SEGUNDOS': segundos}
+                         for nome, gerados, segundos in resultados])
@@ -0,0 +1,438 @@
+# Resumos estatísticos combináveis ("mergeable") para processamento em blocos.
+#
+# Cada resumo pode ser atualizado bloco a bloco e dois resumos calculados em
+# partes diferentes dos dados podem ser combinados, chegando ao mesmo resultado
+# de um cálculo sobre os dados completos. Assim, arquivos maiores que a memória
+# são processados em uma única passada, bloco a bloco.
+#
+# - Momentos: contagem, média, soma dos quadrados dos desvios (Welford/Chan),
+#   mínimo e máximo -> média, variância e desvio padrão exatos.
+# - EsbocoQuantis: esboço de quantis no estilo KLL, com memória limitada e erro
+#   de posto aproximadamente proporcional a 1/k.
+# - CoMomentos: médias, somas dos quadrados e co-momento de um par de colunas
+#   -> correlação de Pearson exata.
+# - ContagemCategorias: frequência de cada valor -> 'value_counts'.
+# - MatrizCoMomentos: médias e matriz de co-momentos de várias colunas
+#   -> covariâncias e as equações normais de uma regressão linear.
+# - ContagemDistintos: HyperLogLog -> número aproximado de valores distintos
+#   com memória fixa (erro relativo típico de 1,04 / sqrt(2**precisao)).
+
+import numpy as np
+import pandas as pd
+
+
+class Momentos:
+    """Momentos de primeira e segunda ordem combináveis (algoritmo de Welford/Chan)."""
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    def atualizar(self, valores):
+        """Acrescenta os valores de um bloco (nulos são ignorados)."""
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return self
+        bloco = Momentos()
+        bloco.n = valores.size
+        bloco.media = float(valores.mean())
+        bloco.m2 = float(((valores - bloco.media) ** 2).sum())
+        bloco.minimo = float(valores.min())
+        bloco.maximo = float(valores.max())
+        return self.combinar(bloco)
+
+    def combinar(self, outro):
+        """Incorpora os momentos de 'outro' (calculados em outra parte dos dados)."""
+        if outro.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.media, self.m2 = outro.n, outro.media, outro.m2
+            self.minimo, self.maximo = outro.minimo, outro.maximo
+            return self
+        n = self.n + outro.n
+        delta = outro.media - self.media
+        self.media += delta * outro.n / n
+        self.m2 += outro.m2 + delta ** 2 * self.n * outro.n / n
+        self.n = n
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        return self
+
+    def variancia(self, ddof=1):
+        if self.n - ddof <= 0:
+            return np.nan
+        return self.m2 / (self.n - ddof)
+
+    def desvio(self, ddof=1):
+        """Desvio padrão; 'ddof=1' é o mesmo padrão do 'Series.std()' do pandas."""
+        return float(np.sqrt(self.variancia(ddof)))
+
+    def para_dict(self):
+        return {'n': self.n, 'media': self.media, 'm2': self.m2, 'minimo': self.minimo, 'maximo': self.maximo}
+
+    @classmethod
+    def de_dict(cls, conteudo):
+        momentos = cls()
+        for chave, valor in conteudo.items():
+            setattr(momentos, chave, valor)
+        return momentos
+
+
+class EsbocoQuantis:
+    """
+    Esboço de quantis combinável no estilo KLL.
+
+    Os valores ficam em uma hierarquia de "compactadores": um item no nível h
+    representa 2**h valores originais. Quando um nível passa da sua capacidade,
+    ele é ordenado e metade dos itens (os de posição par ou ímpar, escolhidos ao
+    acaso) sobe para o nível seguinte. Enquanto o total de valores não passa de
+    'k' nenhum valor é descartado e os quantis são exatos.
+
+    Os valores recebidos entram nos compactadores em lotes de exatamente 'k'
+    (o resto espera em 'pendentes'), então o resultado depende só da ordem dos
+    valores e da semente, e não do tamanho dos blocos passados a 'atualizar'.
+    """
+
+    def __init__(self, k=512, semente=None):
+        self.k = k
+        self.niveis = [np.empty(0)]
+        self.pendentes = np.empty(0)
+        self.n = 0
+        self._aleatorio = np.random.default_rng(semente)
+
+    def _capacidade(self, nivel):
+        # Níveis mais altos (itens mais pesados) têm capacidade k; os mais baixos
+        # diminuem geometricamente (fator 2/3), com mínimo de 2 itens.
+        profundidade = len(self.niveis) - nivel - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** profundidade)))
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if itens.size > self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+                itens = np.sort(itens)
+                # Com tamanho ímpar, o último item fica no nível atual.
+                sobra = itens[-1:] if itens.size % 2 else itens[:0]
+                pares = itens[:itens.size - sobra.size]
+                deslocamento = self._aleatorio.integers(2)
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], pares[deslocamento::2]])
+                self.niveis[nivel] = sobra
+                # Uma compactação pode ter aumentado o número de níveis e, com
+                # isso, reduzido as capacidades dos níveis de baixo.
+                nivel = 0
+                continue
+            nivel += 1
+
+    def atualizar(self, valores):
+        """Acrescenta os valores de um bloco (nulos são ignorados)."""
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return self
+        self.n += valores.size
+        self._receber(valores)
+        return self
+
+    def _receber(self, valores):
+        pendentes = np.concatenate([self.pendentes, valores])
+        inicio = 0
+        while pendentes.size - inicio >= self.k:
+            self.niveis[0] = np.concatenate([self.niveis[0], pendentes[inicio:inicio + self.k]])
+            self._compactar()
+            inicio += self.k
+        self.pendentes = pendentes[inicio:]
+
+    def combinar(self, outro):
+        """Incorpora o esboço 'outro', somando os compactadores nível a nível."""
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.n += outro.n
+        self._compactar()
+        self._receber(outro.pendentes)
+        return self
+
+    def quantil(self, q):
+        """
+        Quantil(is) aproximado(s) 'q' (escalar ou lista entre 0 e 1).
+
+        Usa interpolação linear entre os pontos da distribuição acumulada
+        ponderada, como o 'quantile' padrão do pandas nos casos exatos.
+        """
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        valores = np.concatenate(self.niveis + [self.pendentes])
+        pesos = np.concatenate([np.full(itens.size, 2.0 ** nivel) for nivel, itens in enumerate(self.niveis)]
+                               + [np.ones(self.pendentes.size)])
+        ordem = np.argsort(valores, kind='stable')
+        valores, pesos = valores[ordem], pesos[ordem]
+        # Posição (0 .. n-1) do centro de cada item na amostra ordenada completa.
+        posicoes = np.cumsum(pesos) - (pesos + 1) / 2
+        total = pesos.sum()
+        return np.interp(np.asarray(q) * (total - 1), posicoes, valores)
+
+    def para_dict(self):
+        return {'k': self.k, 'n': self.n, 'niveis': [itens.tolist() for itens in self.niveis],
+                'pendentes': self.pendentes.tolist()}
+
+    @classmethod
+    def de_dict(cls, conteudo, semente=None):
+        esboco = cls(k=conteudo['k'], semente=semente)
+        esboco.n = conteudo['n']
+        esboco.niveis = [np.asarray(itens, dtype=float) for itens in conteudo['niveis']]
+        # Estados gravados antes de existir 'pendentes' não têm a chave.
+        esboco.pendentes = np.asarray(conteudo.get('pendentes', []), dtype=float)
+        return esboco
+
+
+class CoMomentos:
+    """
+    Momentos conjuntos de duas colunas (x, y), combináveis como 'Momentos'.
+
+    Só entram as linhas em que x e y não são nulos, como no 'Series.corr'.
+    Guarda n, as médias, as somas dos quadrados dos desvios de x e de y e a
+    soma dos produtos dos desvios (co-momento).
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.media_x = 0.0
+        self.media_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def atualizar(self, x, y):
+        """Acrescenta os pares (x, y) de um bloco."""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        validos = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[validos], y[validos]
+        if x.size == 0:
+            return self
+        bloco = CoMomentos()
+        bloco.n = x.size
+        bloco.media_x, bloco.media_y = float(x.mean()), float(y.mean())
+        desvios_x, desvios_y = x - bloco.media_x, y - bloco.media_y
+        bloco.m2_x = float(desvios_x @ desvios_x)
+        bloco.m2_y = float(desvios_y @ desvios_y)
+        bloco.c_xy = float(desvios_x @ desvios_y)
+        return self.combinar(bloco)
+
+    def combinar(self, outro):
+        """Incorpora os co-momentos de 'outro' (fórmula de Chan para pares)."""
+        if outro.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(outro.__dict__)
+            return self
+        n = self.n + outro.n
+        delta_x = outro.media_x - self.media_x
+        delta_y = outro.media_y - self.media_y
+        peso = self.n * outro.n / n
+        self.m2_x += outro.m2_x + delta_x ** 2 * peso
+        self.m2_y += outro.m2_y + delta_y ** 2 * peso
+        self.c_xy += outro.c_xy + delta_x * delta_y * peso
+        self.media_x += delta_x * outro.n / n
+        self.media_y += delta_y * outro.n / n
+        self.n = n
+        return self
+
+    def covariancia(self, ddof=1):
+        if self.n - ddof <= 0:
+            return np.nan
+        return self.c_xy / (self.n - ddof)
+
+    def correlacao(self):
+        """Correlação de Pearson entre x e y."""
+        if self.n < 2 or self.m2_x == 0 or self.m2_y == 0:
+            return np.nan
+        return float(self.c_xy / np.sqrt(self.m2_x * self.m2_y))
+
+    def para_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def de_dict(cls, conteudo):
+        comomentos = cls()
+        comomentos.__dict__.update(conteudo)
+        return comomentos
+
+
+class MatrizCoMomentos:
+    """
+    Versão de 'CoMomentos' para várias colunas ao mesmo tempo.
+
+    Guarda n, o vetor de médias e a matriz M com as somas dos produtos dos
+    desvios de cada par de colunas (M / n é a matriz de covariâncias). Só
+    entram as linhas sem nenhum nulo. Colunas novas podem ser acrescentadas
+    ao final com 'ampliar' (as linhas anteriores valem 0 nelas).
+    """
+
+    def __init__(self, dimensao=0):
+        self.n = 0
+        self.media = np.zeros(dimensao)
+        self.m2 = np.zeros((dimensao, dimensao))
+
+    @property
+    def dimensao(self):
+        return self.media.size
+
+    def atualizar(self, matriz):
+        """Acrescenta as linhas de um bloco ('matriz' n x dimensao)."""
+        matriz = np.asarray(matriz, dtype=float)
+        matriz = matriz[~np.isnan(matriz).any(axis=1)]
+        if matriz.shape[0] == 0:
+            return self
+        bloco = MatrizCoMomentos()
+        bloco.n = matriz.shape[0]
+        bloco.media = matriz.mean(axis=0)
+        desvios = matriz - bloco.media
+        bloco.m2 = desvios.T @ desvios
+        return self.combinar(bloco)
+
+    def ampliar(self, quantidade):
+        """Acrescenta 'quantidade' colunas ao final, com valor 0 em todas as linhas já vistas."""
+        if quantidade > 0:
+            self.media = np.concatenate([self.media, np.zeros(quantidade)])
+            self.m2 = np.pad(self.m2, ((0, quantidade), (0, quantidade)))
+        return self
+
+    def combinar(self, outra):
+        """Incorpora a matriz de 'outra' (fórmula de Chan, com as mesmas colunas)."""
+        if outra.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.media, self.m2 = outra.n, outra.media.copy(), outra.m2.copy()
+            return self
+        if outra.dimensao != self.dimensao:
+            raise ValueError(f'Dimensões diferentes: {self.dimensao} e {outra.dimensao}.')
+        n = self.n + outra.n
+        delta = outra.media - self.media
+        self.m2 = self.m2 + outra.m2 + np.outer(delta, delta) * (self.n * outra.n / n)
+        self.media = self.media + delta * outra.n / n
+        self.n = n
+        return self
+
+    def covariancia(self, ddof=1):
+        if self.n - ddof <= 0:
+            return np.full_like(self.m2, np.nan)
+        return self.m2 / (self.n - ddof)
+
+    def para_dict(self):
+        return {'n': self.n, 'media': self.media.tolist(), 'm2': self.m2.tolist()}
+
+    @classmethod
+    def de_dict(cls, conteudo):
+        matriz = cls()
+        matriz.n = conteudo['n']
+        matriz.media = np.asarray(conteudo['media'], dtype=float)
+        matriz.m2 = np.asarray(conteudo['m2'], dtype=float).reshape(matriz.media.size, matriz.media.size)
+        return matriz
+
+
+class ContagemCategorias:
+    """Frequência de cada valor (não nulo) de uma coluna, combinável entre blocos."""
+
+    def __init__(self):
+        self.contagens = {}
+
+    def atualizar(self, valores):
+        """Acrescenta as contagens de um bloco (uma única passada: 'value_counts')."""
+        for valor, contagem in pd.Series(valores).value_counts(sort=False).items():
+            if contagem:
+                self.contagens[valor] = self.contagens.get(valor, 0) + int(contagem)
+        return self
+
+    def combinar(self, outra):
+        for valor, contagem in outra.contagens.items():
+            self.contagens[valor] = self.contagens.get(valor, 0) + contagem
+        return self
+
+    def serie(self):
+        """As contagens como 'value_counts' (ordem decrescente de frequência)."""
+        serie = pd.Series(self.contagens, dtype='int64', name='count')
+        return serie.sort_values(ascending=False, kind='stable')
+
+    def para_dict(self):
+        # Pares [valor, contagem]: as chaves de um JSON só podem ser texto e
+        # valores como os 0/1 de 'GESTOR?' perderiam o tipo.
+        return {'contagens': [[valor_nativo(valor), contagem] for valor, contagem in self.contagens.items()]}
+
+    @classmethod
+    def de_dict(cls, conteudo):
+        contagem = cls()
+        contagem.contagens = {valor: quantidade for valor, quantidade in conteudo['contagens']}
+        return contagem
+
+
+class ContagemDistintos:
+    """
+    Estimativa do número de valores distintos (HyperLogLog), combinável entre blocos.
+
+    Cada valor é reduzido a um hash de 64 bits: os 'precisao' primeiros bits
+    escolhem um registrador, que guarda o maior número de zeros à esquerda
+    (mais um) visto no restante do hash. Valores repetidos não mudam os
+    registradores, então o custo de memória é fixo (2**precisao bytes).
+    """
+
+    def __init__(self, precisao=14):
+        self.precisao = precisao
+        self.registradores = np.zeros(2 ** precisao, dtype=np.uint8)
+
+    def atualizar(self, valores):
+        """Acrescenta os valores (não nulos) de um bloco."""
+        serie = pd.Series(valores).dropna()
+        if serie.empty:
+            return self
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            # 1 e 1.0 (o mesmo valor lido como int em um bloco e float em outro) têm o mesmo hash.
+            serie = serie.astype('float64')
+        hashes = pd.util.hash_pandas_object(serie, index=False).to_numpy(dtype=np.uint64)
+        bits_restantes = 64 - self.precisao
+        indices = (hashes >> np.uint64(bits_restantes)).astype(np.int64)
+        restos = hashes & np.uint64((1 << bits_restantes) - 1)
+        # Comprimento em bits do resto (exato: o resto tem menos de 53 bits e cabe em um float).
+        comprimentos = np.frexp(restos.astype(np.float64))[1]
+        posicoes = (bits_restantes - comprimentos + 1).astype(np.uint8)
+        np.maximum.at(self.registradores, indices, posicoes)
+        return self
+
+    def combinar(self, outra):
+        if outra.precisao != self.precisao:
+            raise ValueError(f'Precisões diferentes: {self.precisao} e {outra.precisao}.')
+        np.maximum(self.registradores, outra.registradores, out=self.registradores)
+        return self
+
+    def estimativa(self):
+        """Número estimado de valores distintos (com a correção para poucos valores)."""
+        m = self.registradores.size
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / np.sum(np.ldexp(1.0, -self.registradores.astype(np.int64)))
+        vazios = int(np.count_nonzero(self.registradores == 0))
+        if estimativa <= 2.5 * m and vazios:
+            # Contagem linear: mais precisa enquanto há registradores vazios.
+            estimativa = m * np.log(m / vazios)
+        return float(estimativa)
+
+    def para_dict(self):
+        return {'precisao': self.precisao, 'registradores': self.registradores.tolist()}
+
+    @classmethod
+    def de_dict(cls, conteudo):
+        contagem = cls(conteudo['precisao'])
+        contagem.registradores = np.asarray(conteudo['registradores'], dtype=np.uint8)
+        return contagem
+
+
+def valor_nativo(valor):
+    # Converte escalares do NumPy (np.int64, np.float64...) para tipos do Python.
+    return valor.item() if isinstance(valor, np.generic) else valor
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency
+
+import dados_sinteticos
+from associacao import cramer_coeficiente, matriz_associacao, qui_quadrado
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    dados = dados_sinteticos.gerar_pesquisa(3_000, semente=37)
+    # Nulos em posições diferentes nas duas colunas: os pares com algum nulo são descartados.
+    dados.loc[dados.index[::11], 'COR/RACA/ETNIA'] = None
+    dados.loc[dados.index[::13], 'NIVEL DE ENSINO'] = None
+    dados['PAIS'] = 'Brasil'
+    return dados
+
+
+def _esperado(x, y):
+    tabela = pd.crosstab(x, y)
+    qui2, p_valor, _, _ = chi2_contingency(tabela, correction=False)
+    v = np.sqrt(qui2 / tabela.to_numpy().sum() / (min(tabela.shape) - 1))
+    return qui2, p_valor, v
+
+
+def test_cramer_igual_ao_chi2_contingency(pesquisa):
+    qui2, p_valor, v = _esperado(pesquisa['COR/RACA/ETNIA'], pesquisa['NIVEL DE ENSINO'])
+    tabela = pd.crosstab(pesquisa['COR/RACA/ETNIA'], pesquisa['NIVEL DE ENSINO'])
+    assert qui_quadrado(tabela) == pytest.approx((qui2, p_valor, v))
+    assert cramer_coeficiente(pesquisa['COR/RACA/ETNIA'], pesquisa['NIVEL DE ENSINO']) == pytest.approx(v)
+
+
+def test_matriz_igual_ao_chi2_contingency(pesquisa):
+    colunas = ['COR/RACA/ETNIA', 'NIVEL DE ENSINO', 'GENERO', 'SETOR']
+    v, p_valores = matriz_associacao(pesquisa, colunas)
+    assert list(v.index) == colunas and np.allclose(v.to_numpy(), v.to_numpy().T)
+    for i, x in enumerate(colunas):
+        assert v.loc[x, x] == 1
+        for y in colunas[i + 1:]:
+            _, p_valor, coeficiente = _esperado(pesquisa[x], pesquisa[y])
+            assert v.loc[x, y] == pytest.approx(coeficiente)
+            assert p_valores.loc[x, y] == pytest.approx(p_valor)
+
+
+def test_coluna_com_uma_categoria(pesquisa):
+    assert np.isnan(cramer_coeficiente(pesquisa['PAIS'], pesquisa['GENERO']))
+    v, _ = matriz_associacao(pesquisa, ['PAIS', 'GENERO'])
+    assert np.isnan(v.loc['PAIS', 'GENERO'])
+
+
+def test_processos_igual_a_sequencial(pesquisa):
+    colunas = ['COR/RACA/ETNIA', 'NIVEL DE ENSINO', 'GENERO', 'SETOR', 'NIVEL']
+    sequencial = matriz_associacao(pesquisa, colunas)
+    paralelo = matriz_associacao(pesquisa, colunas, processos=2, pares_por_tarefa=3)
+    pd.testing.assert_frame_equal(sequencial[0], paralelo[0])
+    pd.testing.assert_frame_equal(sequencial[1], paralelo[1])
+
+
+def test_colunas_com_muitas_categorias_ficam_de_fora(pesquisa):
+    dados = pesquisa.assign(TEXTO_LIVRE=pesquisa['ID'].astype(str))
+    with pytest.warns(UserWarning, match='TEXTO_LIVRE'):
+        v, _ = matriz_associacao(dados)
+    assert 'TEXTO_LIVRE' not in v.index and 'GENERO' in v.index
+    v, _ = matriz_associacao(dados, ['TEXTO_LIVRE', 'GENERO'], max_categorias=None)
+    assert list(v.index) == ['TEXTO_LIVRE', 'GENERO']
@@ -0,0 +1,108 @@
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+import cache_colunar
+import dados_sinteticos
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return str(tmp_path / 'cache')
+
+
+def test_csv_convertido_uma_vez(tmp_path, cache):
+    origem = tmp_path / 'pesquisa.csv'
+    dados = dados_sinteticos.gerar_pesquisa(500, semente=1)
+    dados.to_csv(origem, index=False)
+
+    primeiro = cache_colunar.garantir_cache(str(origem), cache)
+    pd.testing.assert_frame_equal(cache_colunar.carregar_planilha(str(origem), diretorio_cache=cache),
+                                  pd.read_csv(origem), check_dtype=False)
+    assert cache_colunar.garantir_cache(str(origem), cache) == primeiro
+
+    # Conteúdo novo -> novo Parquet; outras opções de leitura -> outro arquivo do cache.
+    dados.head(10).to_csv(origem, index=False)
+    segundo = cache_colunar.garantir_cache(str(origem), cache)
+    assert segundo != primeiro
+    assert cache_colunar.garantir_cache(str(origem), cache, sep=',') != segundo
+
+
+def test_colunas_pedidas(tmp_path, cache):
+    origem = tmp_path / 'pesquisa.csv'
+    dados_sinteticos.gerar_pesquisa(200, semente=2).to_csv(origem, index=False)
+    lidos = cache_colunar.carregar_planilha(str(origem), colunas=['IDADE', 'SALARIO'], diretorio_cache=cache)
+    assert list(lidos.columns) == ['IDADE', 'SALARIO']
+
+
+def test_tipos_preservados_e_mistos_como_texto(tmp_path, cache):
+    origem = tmp_path / 'respostas.parquet'
+    dados = pd.DataFrame({
+        'ID': pd.Series([1, None, 3], dtype=object),
+        'HORARIO': [datetime.time(9, 30), None, datetime.time(18, 0)],
+        'DATA': [datetime.date(2022, 10, 1), datetime.date(2022, 11, 2), None],
+        'TEXTO': ['a', None, 'c'],
+    })
+    dados.to_parquet(origem, index=False)
+    misturados = dados.assign(**{'RESPOSTA': pd.Series([10, 'dez', None], dtype=object)})
+
+    with pytest.warns(UserWarning, match="'RESPOSTA'"):
+        preparados = cache_colunar._preparar_para_parquet(misturados)
+    assert preparados['RESPOSTA'].tolist()[:2] == ['10', 'dez'] and pd.isna(preparados['RESPOSTA'][2])
+    for coluna in ['ID', 'HORARIO', 'DATA']:
+        assert preparados[coluna].tolist() == misturados[coluna].tolist()
+
+    lidos = cache_colunar.carregar_planilha(str(origem), diretorio_cache=cache)
+    assert lidos['HORARIO'][0] == datetime.time(9, 30)
+    assert lidos['ID'].tolist()[::2] == [1, 3]
+
+
+def test_ler_em_blocos(tmp_path, cache):
+    origem = tmp_path / 'pesquisa.parquet'
+    dados = dados_sinteticos.gerar_pesquisa(1_000, semente=3)
+    dados.to_parquet(origem, index=False)
+    blocos = list(cache_colunar.ler_em_blocos(str(origem), colunas=['ID', 'IDADE'], tamanho_bloco=300,
+                                              diretorio_cache=cache))
+    assert [len(bloco) for bloco in blocos] == [300, 300, 300, 100]
+    pd.testing.assert_frame_equal(pd.concat(blocos, ignore_index=True), dados[['ID', 'IDADE']],
+                                  check_dtype=False)
+
+
+def test_limpar_cache(tmp_path, cache):
+    origem = tmp_path / 'pesquisa.csv'
+    dados_sinteticos.gerar_pesquisa(50, semente=4).to_csv(origem, index=False)
+    cache_colunar.garantir_cache(str(origem), cache)
+    cache_colunar.limpar_cache(cache)
+    assert os.listdir(cache) == []
+
+
+def _parquets(cache):
+    return sorted(nome for nome in os.listdir(cache) if nome.endswith('.parquet'))
+
+
+def test_versao_anterior_apagada(tmp_path, cache):
+    origem = tmp_path / 'analise_dados.csv'
+    copia = tmp_path / 'copia.csv'
+    dados = dados_sinteticos.gerar_pesquisa(300, semente=4)
+    dados.to_csv(origem, index=False)
+    dados.to_csv(copia, index=False)
+    primeiro = cache_colunar.garantir_cache(str(origem), cache)
+    cache_colunar.garantir_cache(str(origem), cache, sep=',')
+    cache_colunar.garantir_cache(str(copia), cache)
+
+    # A cópia ainda usa o conteúdo antigo: os Parquets dele ficam.
+    dados.head(50).to_csv(origem, index=False)
+    segundo = cache_colunar.garantir_cache(str(origem), cache)
+    assert os.path.exists(primeiro) and len(_parquets(cache)) == 3
+
+    # Regravado a cada execução: só a versão atual de cada conteúdo fica no cache.
+    for linhas in (60, 70):
+        dados.head(linhas).to_csv(copia, index=False)
+        dados.head(linhas).to_csv(origem, index=False)
+        atual = cache_colunar.garantir_cache(str(origem), cache)
+        cache_colunar.garantir_cache(str(copia), cache)
+    assert not os.path.exists(primeiro) and not os.path.exists(segundo)
+    assert _parquets(cache) == [os.path.basename(atual)]
+    assert len(cache_colunar.carregar_planilha(str(copia), diretorio_cache=cache)) == 70
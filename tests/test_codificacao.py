@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dados_sinteticos
+import codificacao
+from codificacao import CodificadorEsparso
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    return dados_sinteticos.gerar_pesquisa(1_000, semente=13)
+
+
+@pytest.mark.parametrize('drop_first', [False, True])
+def test_igual_ao_get_dummies(pesquisa, drop_first):
+    colunas = ['NIVEL', 'GENERO']
+    codificador = CodificadorEsparso(colunas, drop_first=drop_first).ajustar(pesquisa)
+    esperado = pd.get_dummies(pesquisa[colunas], columns=colunas, drop_first=drop_first, dtype=np.uint8)
+
+    assert codificador.nomes_colunas == list(esperado.columns)
+    np.testing.assert_array_equal(codificador.transformar(pesquisa).toarray(), esperado.to_numpy())
+    densas = codificador.transformar(pesquisa, formato='pandas').sparse.to_dense()
+    np.testing.assert_array_equal(densas.to_numpy(), esperado.to_numpy())
+
+
+def test_vocabulario_fixo_entre_lotes(pesquisa, tmp_path):
+    codificador = CodificadorEsparso(['NIVEL']).ajustar(pesquisa)
+    caminho = tmp_path / 'vocabulario.json'
+    codificador.salvar(caminho)
+    carregado = CodificadorEsparso.carregar(caminho)
+
+    # Lote sem algumas categorias e com uma desconhecida: mesmo layout, linha desconhecida zerada.
+    lote = pd.DataFrame({'NIVEL': [codificador.vocabulario['NIVEL'][0], 'Estagiário', None]})
+    matriz = carregado.transformar(lote).toarray()
+    assert matriz.shape == (3, len(codificador.nomes_colunas))
+    assert matriz[0, 0] == 1 and matriz[1:].sum() == 0
+
+
+def test_multiselecao():
+    dados = pd.DataFrame({'FERRAMENTAS': ['Python, SQL', 'SQL', None, 'R, Python, Python']})
+    codificador = CodificadorEsparso(['FERRAMENTAS'], multiselecao={'FERRAMENTAS': ','}).ajustar(dados)
+    assert codificador.nomes_colunas == ['FERRAMENTAS_Python', 'FERRAMENTAS_R', 'FERRAMENTAS_SQL']
+    np.testing.assert_array_equal(codificador.transformar(dados).toarray(),
+                                  [[1, 0, 1], [0, 0, 1], [0, 0, 0], [1, 1, 0]])
+
+
+def test_importar_nao_carrega_scipy():
+    codigo = 'import sys, codificacao; print("scipy" in sys.modules)'
+    saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(codificacao.__file__))
+    assert saida.stdout.strip() == 'False'
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+import dados_sinteticos
+import correlacoes
+from correlacoes import ajustar_fdr, colunas_numericas, correlacoes_com_alvo, correlacoes_pares
+
+ALVO = 'SALARIO'
+TOLERANCIA = 1e-4
+
+
+@pytest.fixture(scope='module')
+def dados():
+    pesquisa = dados_sinteticos.gerar_pesquisa(3_000, semente=5)
+    aleatorio = np.random.default_rng(5)
+    # Colunas extras com nulos em linhas diferentes e indicadoras 0/1 do 'NIVEL'.
+    ruido = pesquisa['IDADE'] + aleatorio.normal(0, 5, len(pesquisa))
+    pesquisa['IDADE_RUIDO'] = ruido.mask(aleatorio.random(len(pesquisa)) < 0.1)
+    pesquisa['SALARIO_LOG'] = np.log1p(pesquisa['SALARIO']).mask(aleatorio.random(len(pesquisa)) < 0.05)
+    indicadoras = pd.get_dummies(pesquisa['NIVEL'], prefix='NIVEL', dtype=float)
+    return pd.concat([pesquisa, indicadoras], axis=1)
+
+
+@pytest.fixture(scope='module')
+def colunas(dados):
+    return [coluna for coluna in colunas_numericas(dados) if dados[coluna].nunique() > 1]
+
+
+def _numericas(dados, colunas):
+    return dados[colunas].apply(pd.to_numeric, errors='coerce').astype(float)
+
+
+@pytest.mark.parametrize('tamanho_bloco', [2, 512])
+def test_pearson_pares_igual_ao_pandas(dados, colunas, tamanho_bloco):
+    pares = correlacoes_pares(dados, colunas, tamanho_bloco=tamanho_bloco)
+    referencia = _numericas(dados, colunas).corr()
+
+    assert len(pares) == len(colunas) * (len(colunas) - 1) // 2
+    esperado = [referencia.loc[x, y] for x, y in zip(pares['COLUNA_X'], pares['COLUNA_Y'])]
+    np.testing.assert_allclose(pares['COEFICIENTE'], esperado, atol=TOLERANCIA)
+
+
+def test_p_valores_iguais_ao_pearsonr(dados, colunas):
+    contra_alvo = correlacoes_com_alvo(dados, ALVO, colunas).set_index('COLUNA')
+    for coluna, linha in contra_alvo.iterrows():
+        validos = _numericas(dados, [ALVO, coluna]).dropna()
+        r, p = stats.pearsonr(validos[ALVO], validos[coluna])
+        assert linha['N'] == len(validos)
+        assert linha['COEFICIENTE'] == pytest.approx(r, abs=TOLERANCIA)
+        assert linha['P_VALOR'] == pytest.approx(p, rel=1e-2, abs=1e-6)
+
+
+def test_ponto_bisserial(dados, colunas):
+    contra_alvo = correlacoes_com_alvo(dados, ALVO, colunas).set_index('COLUNA')
+    indicadoras = [coluna for coluna in colunas if coluna.startswith('NIVEL_')]
+    assert indicadoras
+    for coluna in indicadoras:
+        validos = _numericas(dados, [ALVO, coluna]).dropna()
+        assert contra_alvo.loc[coluna, 'COEFICIENTE'] == pytest.approx(
+            stats.pointbiserialr(validos[coluna], validos[ALVO])[0], abs=TOLERANCIA)
+        assert contra_alvo.loc[coluna, 'TIPO'] == 'ponto-bisserial'
+
+
+def test_indicadoras_das_categoricas(dados):
+    # As indicadoras geradas pelo 'CodificadorEsparso' dão o mesmo resultado das colunas do 'get_dummies'.
+    geradas = correlacoes_com_alvo(dados, ALVO, colunas=[], categoricas=['NIVEL']).set_index('COLUNA')
+    prontas = correlacoes_com_alvo(dados, ALVO, colunas=list(geradas.index)).set_index('COLUNA')
+    np.testing.assert_allclose(geradas['COEFICIENTE'], prontas.loc[geradas.index, 'COEFICIENTE'], atol=1e-6)
+
+
+def test_spearman_sem_nulos(dados, colunas):
+    completas = _numericas(dados, colunas).dropna()
+    spearman = correlacoes_pares(completas, colunas, metodo='spearman')
+    referencia = completas.corr(method='spearman')
+    esperado = [referencia.loc[x, y] for x, y in zip(spearman['COLUNA_X'], spearman['COLUNA_Y'])]
+    np.testing.assert_allclose(spearman['COEFICIENTE'], esperado, atol=TOLERANCIA)
+
+    contra_alvo = correlacoes_com_alvo(completas, ALVO, colunas, metodo='spearman').set_index('COLUNA')
+    for coluna, linha in contra_alvo.iterrows():
+        resultado = stats.spearmanr(completas[ALVO], completas[coluna])
+        assert linha['COEFICIENTE'] == pytest.approx(resultado.statistic, abs=TOLERANCIA)
+        assert linha['P_VALOR'] == pytest.approx(resultado.pvalue, rel=1e-2, abs=1e-6)
+
+
+def test_limiar(dados, colunas):
+    todos = correlacoes_pares(dados, colunas)
+    filtrados = correlacoes_pares(dados, colunas, limiar=0.3)
+    assert (filtrados['COEFICIENTE'].abs() >= 0.3).all()
+    assert len(filtrados) == (todos['COEFICIENTE'].abs() >= 0.3).sum()
+
+
+def test_ajuste_fdr_igual_ao_scipy(dados, colunas):
+    p = np.concatenate([correlacoes_pares(dados, colunas)['P_VALOR'].dropna().to_numpy(), [0.5, 0.01, 0.04, 1.0]])
+    np.testing.assert_allclose(ajustar_fdr(p), stats.false_discovery_control(p, method='bh'))
+
+
+def test_ajuste_fdr_mantem_nulos():
+    q = ajustar_fdr(np.array([0.01, np.nan, 0.04]))
+    assert np.isnan(q[1])
+    np.testing.assert_allclose(q[[0, 2]], stats.false_discovery_control([0.01, 0.04], method='bh'))
+
+
+@pytest.mark.parametrize('metodo', ['pearson', 'spearman'])
+def test_categoricas_esparsas_em_blocos(monkeypatch, metodo):
+    # Uma categórica com muitos valores: as indicadoras só viram densas no bloco atual.
+    pesquisa = dados_sinteticos.gerar_pesquisa(2_000, semente=9)
+    pesquisa['CIDADE'] = np.random.default_rng(9).integers(0, 60, len(pesquisa)).astype(str)
+    pesquisa.loc[pesquisa.sample(frac=0.1, random_state=9).index, 'SALARIO'] = np.nan
+    larguras = []
+    montar = correlacoes._Padronizada._montar
+    monkeypatch.setattr(correlacoes._Padronizada, '_montar',
+                        lambda self, colunas: larguras.append(colunas.stop - colunas.start) or montar(self, colunas))
+
+    numericas = ['IDADE', 'SALARIO']
+    geradas = correlacoes_pares(pesquisa, numericas, categoricas=['CIDADE'], metodo=metodo, tamanho_bloco=16)
+    contra_alvo = correlacoes_com_alvo(pesquisa, ALVO, ['IDADE'], categoricas=['CIDADE'], metodo=metodo,
+                                       tamanho_bloco=16).set_index('COLUNA')
+    assert max(larguras) <= 16
+
+    indicadoras = pd.get_dummies(pesquisa['CIDADE'], prefix='CIDADE', dtype=float)
+    densas = pd.concat([pesquisa[numericas], indicadoras], axis=1)
+    prontas = correlacoes_pares(densas, list(densas.columns), metodo=metodo)
+    chave = ['COLUNA_X', 'COLUNA_Y']
+    comparadas = geradas.merge(prontas, on=chave, suffixes=('', '_DENSA'), validate='one_to_one')
+    assert len(comparadas) == len(prontas)
+    np.testing.assert_allclose(comparadas['COEFICIENTE'], comparadas['COEFICIENTE_DENSA'], atol=1e-5)
+    assert (comparadas['N'] == comparadas['N_DENSA']).all()
+    assert (comparadas['TIPO'] == comparadas['TIPO_DENSA']).all()
+
+    referencia = correlacoes_com_alvo(densas, ALVO, [c for c in densas.columns if c != ALVO],
+                                      metodo=metodo).set_index('COLUNA')
+    np.testing.assert_allclose(contra_alvo['COEFICIENTE'], referencia.loc[contra_alvo.index, 'COEFICIENTE'],
+                               atol=1e-5)
+    assert (contra_alvo['N'] == referencia.loc[contra_alvo.index, 'N']).all()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dados_sinteticos
+from cubo import CuboAgregado
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    dados = dados_sinteticos.gerar_pesquisa(3_000, semente=31)
+    # Salários nulos em algumas linhas, para separar contagem de linhas e de valores.
+    dados.loc[dados.index[::7], 'SALARIO'] = np.nan
+    return dados
+
+
+@pytest.fixture(scope='module')
+def cubo(pesquisa):
+    return CuboAgregado.construir(pesquisa)
+
+
+def test_tabela_cruzada_conta_linhas_como_crosstab(pesquisa, cubo):
+    esperado = pd.crosstab(pesquisa['GENERO'], pesquisa['GESTOR?'])
+    obtido = cubo.tabela_cruzada('GENERO', 'GESTOR?')
+    pd.testing.assert_frame_equal(obtido.fillna(0).astype(int), esperado, check_names=False,
+                                  check_index_type=False, check_column_type=False)
+
+
+def test_tabela_cruzada_com_medida_como_pivot_table(pesquisa, cubo):
+    esperado = pd.pivot_table(pesquisa, values='SALARIO', index='GENERO', columns='GESTOR?',
+                              aggfunc='count', observed=True)
+    obtido = cubo.tabela_cruzada('GENERO', 'GESTOR?', medida='SALARIO')
+    pd.testing.assert_frame_equal(obtido.astype(float), esperado.astype(float), check_names=False,
+                                  check_index_type=False, check_column_type=False)
+    assert (obtido.to_numpy() <= cubo.tabela_cruzada('GENERO', 'GESTOR?').to_numpy()).all()
+
+
+def test_tabela_cruzada_medida_desconhecida(cubo):
+    with pytest.raises(KeyError):
+        cubo.tabela_cruzada('GENERO', 'GESTOR?', medida='ID')
+
+
+def test_estatisticas_conferem_com_pandas(pesquisa, cubo):
+    feminino = pesquisa[pesquisa['GENERO'] == 'Feminino']
+    assert cubo.estatistica('SALARIO', 'media', filtros={'GENERO': 'Feminino'}) == pytest.approx(
+        feminino['SALARIO'].mean())
+    assert cubo.estatistica('IDADE', 'desvio', filtros={'GENERO': 'Feminino'}) == pytest.approx(
+        feminino['IDADE'].std())
+    contagem = cubo.contagem('GENERO')
+    esperado = pesquisa['GENERO'].value_counts(dropna=False)
+    assert contagem.to_dict() == {chave: int(valor) for chave, valor in esperado.items()}
+
+
+def test_salvar_e_carregar(cubo, tmp_path):
+    caminho = tmp_path / 'cubo.parquet'
+    cubo.salvar(caminho)
+    lido = CuboAgregado.carregar(caminho)
+    assert lido.dimensoes == cubo.dimensoes and lido.medidas == cubo.medidas
+    pd.testing.assert_frame_equal(lido.consultar('NIVEL'), cubo.consultar('NIVEL'), check_index_type=False)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dados_sinteticos
+from edicoes import COLUNA_ANO, COLUNA_ESTADO, ConjuntoEdicoes, gravar_edicao
+from esquema import harmonizar_edicao
+
+COLUNAS = ['ID', COLUNA_ANO, COLUNA_ESTADO, 'IDADE', 'SALARIO']
+
+
+@pytest.fixture(scope='module')
+def edicoes():
+    return {2021: dados_sinteticos.gerar_pesquisa(1_500, semente=21),
+            2022: dados_sinteticos.gerar_pesquisa(2_000, semente=22)}
+
+
+@pytest.fixture(scope='module')
+def empilhados(edicoes):
+    return pd.concat(
+        [harmonizar_edicao(dados).assign(**{COLUNA_ANO: np.int16(ano)}) for ano, dados in edicoes.items()],
+        ignore_index=True,
+    )
+
+
+@pytest.fixture(scope='module')
+def conjunto(edicoes, tmp_path_factory):
+    diretorio = tmp_path_factory.mktemp('edicoes')
+    for ano, dados in edicoes.items():
+        # Grupos de linhas pequenos para que os filtros em 'IDADE' possam descartar grupos.
+        gravar_edicao(dados, ano, diretorio, linhas_por_grupo=256)
+    return ConjuntoEdicoes(diretorio)
+
+
+def _ordenados(dados):
+    return dados.sort_values([COLUNA_ANO, 'ID']).reset_index(drop=True)
+
+
+def test_anos(conjunto, edicoes):
+    assert conjunto.anos() == sorted(edicoes)
+
+
+CONSULTAS = {
+    'idade_minima': ([('IDADE', '>=', 30)], lambda d: d['IDADE'] >= 30),
+    'estado': ([('Estado', '==', 'SP')], lambda d: d[COLUNA_ESTADO] == 'SP'),
+    'ano_e_estado': ([('ANO', '==', 2022), (COLUNA_ESTADO, 'in', ['SP', 'RJ'])],
+                     lambda d: (d[COLUNA_ANO] == 2022) & d[COLUNA_ESTADO].isin(['SP', 'RJ'])),
+    'idade_e_genero': ([('IDADE', '<', 25), ('GENERO', '==', 'Feminino')],
+                       lambda d: (d['IDADE'] < 25) & (d['GENERO'] == 'Feminino')),
+    'estado_diferente': ([('Estado', '!=', 'SP')], lambda d: (d[COLUNA_ESTADO] != 'SP') & d[COLUNA_ESTADO].notna()),
+}
+
+
+@pytest.mark.parametrize('nome', CONSULTAS)
+def test_consulta_igual_ao_filtro_pandas(conjunto, empilhados, nome):
+    filtros, condicao = CONSULTAS[nome]
+    lidos = _ordenados(conjunto.carregar(COLUNAS, filtros, categorico=False))
+    mascara = condicao(empilhados).fillna(False).astype(bool)
+    esperados = _ordenados(empilhados.loc[mascara, COLUNAS])
+
+    assert len(lidos) == len(esperados) > 0
+    for coluna in COLUNAS:
+        assert lidos[coluna].astype(object).equals(esperados[coluna].astype(object)), coluna
+
+
+def test_ler_em_blocos_igual_a_carregar(conjunto):
+    filtros = [('IDADE', '>=', 30)]
+    blocos = pd.concat(list(conjunto.ler_em_blocos(COLUNAS, filtros, tamanho_bloco=500)), ignore_index=True)
+    pd.testing.assert_frame_equal(_ordenados(blocos), _ordenados(conjunto.carregar(COLUNAS, filtros,
+                                                                                     categorico=False)))
+
+
+def test_filtro_por_estado_descarta_particoes_e_colunas(conjunto):
+    plano = conjunto.plano(['SALARIO'], [('Estado', '==', 'SP')])
+    assert plano['arquivos_lidos'] < plano['arquivos']
+    assert plano['bytes_lidos'] < plano['bytes']
+
+
+def test_filtro_por_idade_descarta_grupos_de_linhas(conjunto):
+    plano = conjunto.plano(['SALARIO'], [('IDADE', '>=', 50)])
+    assert plano['grupos_lidos'] < plano['grupos']
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from enriquecimento import TabelaConsulta, anexar_colunas
+
+
+@pytest.fixture
+def dados():
+    aleatorio = np.random.default_rng(5)
+    return pd.DataFrame({
+        'ID': aleatorio.permutation(np.arange(0, 400, 2)),
+        'Estado': pd.Categorical(aleatorio.choice(['SP', 'RJ', 'MG', 'XX'], 200)),
+        'VALOR': aleatorio.random(200),
+    }, index=np.arange(1000, 1200))
+
+
+def _tabela(chave, valores):
+    aleatorio = np.random.default_rng(7)
+    return pd.DataFrame({
+        chave: valores,
+        'INTEIRO': np.arange(len(valores), dtype=np.int64),
+        'REAL': aleatorio.random(len(valores)),
+        'TEXTO': [f'v{i}' for i in range(len(valores))],
+        'NULAVEL': pd.array(np.arange(len(valores)), dtype='Int64'),
+    })
+
+
+@pytest.mark.parametrize('chave, valores', [
+    ('ID', np.arange(0, 300, 3)),
+    ('Estado', ['RJ', 'SP', 'MG', 'BA']),
+])
+def test_anexar_igual_ao_merge(dados, chave, valores):
+    tabela = _tabela(chave, valores)
+    esperado = dados.merge(tabela, on=chave, how='left')
+    esperado.index = dados.index
+    obtido = anexar_colunas(dados.copy(), tabela, chave)
+    assert list(obtido.columns) == list(esperado.columns)
+    # O 'merge' converte a chave categórica para o tipo da chave da tabela; 'anexar' não mexe nela.
+    pd.testing.assert_series_equal(obtido[chave].astype(object), esperado[chave].astype(object))
+    anexadas = [coluna for coluna in tabela.columns if coluna != chave]
+    pd.testing.assert_frame_equal(obtido[anexadas], esperado[anexadas])
+    # Chaves sem correspondência ficam nulas em todas as colunas anexadas.
+    sem_par = ~dados[chave].isin(valores)
+    assert sem_par.any() and obtido.loc[sem_par, ['INTEIRO', 'REAL', 'TEXTO', 'NULAVEL']].isna().all().all()
+
+
+def test_colunas_escolhidas_e_sobrescrever(dados):
+    tabela = _tabela('ID', np.arange(0, 300, 3))
+    consulta = TabelaConsulta(tabela, 'ID')
+    consulta.anexar(dados, ['REAL'])
+    assert list(dados.columns) == ['ID', 'Estado', 'VALOR', 'REAL']
+    with pytest.raises(ValueError):
+        consulta.anexar(dados, ['REAL'])
+    consulta.anexar(dados, ['REAL'], sobrescrever=True)
+
+
+def test_chave_repetida():
+    tabela = pd.DataFrame({'ID': [1, 2, 2, 3, 3], 'EXTRA': range(5)})
+    with pytest.raises(ValueError, match='repetido'):
+        TabelaConsulta(tabela, 'ID')
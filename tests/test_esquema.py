@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dados_sinteticos
+from esquema import ESQUEMA_CATEGORICO, aplicar_esquema, converter_coluna, harmonizar_edicao, normalizar_coluna
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    dados = dados_sinteticos.gerar_pesquisa(2_000, semente=53)
+    dados['FAIXA IDADE'] = dados['FAIXA IDADE'].astype(object)
+    dados.loc[dados.index[:5], 'FAIXA IDADE'] = ['+55', ' 22-24 ', None, np.nan, '55+']
+    return dados
+
+
+def test_valores_e_nulos_preservados(pesquisa):
+    convertido = aplicar_esquema(pesquisa)
+    for coluna, definicao in ESQUEMA_CATEGORICO.items():
+        assert isinstance(convertido[coluna].dtype, pd.CategoricalDtype)
+        esperado = normalizar_coluna(pesquisa[coluna], definicao['variantes'])
+        # None e NaN viram o mesmo nulo do 'Categorical'; os demais valores são mantidos.
+        assert convertido[coluna].isna().equals(pesquisa[coluna].isna())
+        validos = pesquisa[coluna].notna()
+        assert convertido[coluna][validos].astype(object).equals(esperado[validos].astype(object))
+    assert convertido['FAIXA IDADE'].iloc[:5].tolist()[:2] == ['55+', '22-24']
+    assert convertido['FAIXA IDADE'].iloc[2:4].isna().all()
+    assert list(convertido['FAIXA IDADE'].cat.categories) == ESQUEMA_CATEGORICO['FAIXA IDADE']['categorias']
+    # As colunas fora do esquema não mudam.
+    pd.testing.assert_series_equal(convertido['SETOR'], pesquisa['SETOR'])
+
+
+def test_ida_e_volta_pelo_parquet_e_concat(pesquisa, tmp_path):
+    convertido = aplicar_esquema(pesquisa)
+    caminho = tmp_path / 'pesquisa.parquet'
+    convertido.to_parquet(caminho)
+    lido = pd.read_parquet(caminho)
+    for coluna in ESQUEMA_CATEGORICO:
+        pd.testing.assert_series_equal(lido[coluna].astype(object), convertido[coluna].astype(object))
+        assert list(lido[coluna].cat.categories) == list(convertido[coluna].cat.categories)
+    empilhado = pd.concat([convertido.iloc[:1000], convertido.iloc[1000:]])
+    assert isinstance(empilhado['GENERO'].dtype, pd.CategoricalDtype)
+
+
+def test_valor_fora_do_esquema_vira_categoria():
+    serie = pd.Series(['Feminino', 'Não binário', None], name='GENERO')
+    with pytest.warns(UserWarning, match='Não binário'):
+        convertido = converter_coluna(serie, ESQUEMA_CATEGORICO['GENERO']['categorias'])
+    assert list(convertido.cat.categories)[-1] == 'Não binário'
+    assert convertido.astype(object).tolist()[:2] == ['Feminino', 'Não binário'] and pd.isna(convertido.iloc[2])
+
+
+def test_harmonizar_edicao():
+    edicao = pd.DataFrame({'ID': ['1', '2', 'x'], 'Estado': [' SP', 'RJ ', None], 'GESTOR': [1, None, 0],
+                           'FAIXA IDADE': ['+55', '17-21', np.nan]})
+    harmonizada = harmonizar_edicao(edicao)
+    assert list(harmonizada.columns) == ['ID', 'UF ONDE MORA', 'GESTOR?', 'FAIXA IDADE']
+    assert str(harmonizada['ID'].dtype) == 'Int64' and harmonizada['ID'].isna().tolist() == [False, False, True]
+    assert harmonizada['UF ONDE MORA'].tolist()[:2] == ['SP', 'RJ'] and pd.isna(harmonizada['UF ONDE MORA'][2])
+    assert harmonizada['FAIXA IDADE'].tolist()[:2] == ['55+', '17-21']
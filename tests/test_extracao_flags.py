@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from extracao_flags import extrair_flags, extrair_numero, mapear_unicos
+
+RESPOSTAS = [
+    'Estou em busca de oportunidades, dentro ou fora do Brasil',
+    'Não estou buscando, mas me considero aberto a outras oportunidades',
+    np.nan,
+    '',
+    'EM BUSCA de algo novo',
+    'Não estou buscando e não quero mudar de emprego',
+    None,
+    'Estou em busca de oportunidades, dentro ou fora do Brasil',
+]
+PADROES = {'EM_BUSCA': 'em busca', 'ABERTO_OPORTUNIDADES': 'aberto'}
+
+
+@pytest.fixture(params=['object', 'category'])
+def respostas(request):
+    return pd.Series(RESPOSTAS * 3, dtype=request.param, index=np.arange(100, 100 + 3 * len(RESPOSTAS)))
+
+
+def test_flags_iguais_ao_str_contains(respostas):
+    flags = extrair_flags(respostas, PADROES)
+    original = respostas.astype(object)
+    for nome, padrao in PADROES.items():
+        esperado = original.str.contains(padrao, case=False).astype('boolean')
+        pd.testing.assert_series_equal(flags[nome], esperado, check_names=False)
+    assert flags.index.equals(respostas.index)
+    # Nulo fica <NA>; texto vazio é uma resposta sem o padrão.
+    assert flags['EM_BUSCA'].iloc[2] is pd.NA and flags['EM_BUSCA'].iloc[3] is np.False_
+
+
+def test_flags_com_maiusculas_e_sem_regex():
+    serie = pd.Series(['Salário', 'salário baixo', 'Falta de Salário.', np.nan, ''])
+    flags = extrair_flags(serie, {'SALARIO': 'Salário', 'PONTO': '.'}, case=True, regex=False)
+    assert flags['SALARIO'].tolist() == [True, False, True, pd.NA, False]
+    assert flags['PONTO'].tolist() == [False, False, True, pd.NA, False]
+
+
+@pytest.mark.parametrize('remover', [None, '.'])
+def test_numero_igual_ao_str_extract(remover):
+    serie = pd.Series(['de 1 a 2 anos', 'Mais de 10 anos', 'Menos de 1 ano', 'Não tenho experiência',
+                       '', np.nan, 'de 1.001 a 3.000', 'de 1 a 2 anos'])
+    texto = serie if remover is None else serie.str.replace(remover, '', regex=False)
+    esperado = texto.str.extract(r'(\d+)')[0].astype(float)
+    obtido = extrair_numero(serie, remover=remover)
+    assert obtido.dtype == 'Float64'
+    pd.testing.assert_series_equal(obtido.astype(float), esperado, check_names=False)
+
+
+def test_mapear_unicos_chama_uma_vez_por_valor(respostas):
+    chamadas = []
+
+    def tamanho(valor):
+        chamadas.append(valor)
+        return len(valor)
+
+    obtido = mapear_unicos(respostas, tamanho, dtype='Int64')
+    esperado = respostas.astype(object).map(len, na_action='ignore').astype('Int64')
+    pd.testing.assert_series_equal(obtido, esperado)
+    assert len(chamadas) == len(set(chamadas)) == respostas.dropna().nunique()
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import dados_sinteticos
+import fonte_sql
+
+
+@pytest.fixture
+def banco(tmp_path):
+    caminho = dados_sinteticos.gerar_banco(str(tmp_path / 'status_brasil'), semente=3)
+    yield caminho
+    fonte_sql.fechar_conexoes()
+    fonte_sql.limpar_memoria()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return str(tmp_path / 'cache')
+
+
+def _consulta_original(caminho, consulta):
+    conexao = sqlite3.connect(caminho)
+    try:
+        return pd.read_sql(consulta, conexao)
+    finally:
+        conexao.close()
+
+
+def test_renda_por_estado_igual_a_consulta_original(banco, cache):
+    esperado = _consulta_original(banco, fonte_sql.CONSULTA_RENDA_ESTADO)
+    obtido = fonte_sql.renda_por_estado(banco, diretorio_cache=cache)
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+    filtrado = fonte_sql.renda_por_estado(banco, estados=['SP', 'RJ'], diretorio_cache=cache)
+    assert sorted(filtrado['Estado']) == ['RJ', 'SP']
+
+
+def test_renda_por_cidade_igual_a_consulta_original(banco, cache):
+    esperado = _consulta_original(banco, fonte_sql.CONSULTA_RENDA_CIDADE)
+    pd.testing.assert_frame_equal(fonte_sql.renda_por_cidade(banco, diretorio_cache=cache), esperado)
+
+
+def test_consultas_nao_alteram_o_banco(banco, cache):
+    antes = os.stat(banco)
+    fonte_sql.renda_por_estado(banco, diretorio_cache=cache)
+    fonte_sql.renda_por_cidade(banco, diretorio_cache=cache)
+    depois = os.stat(banco)
+
+    assert (depois.st_mtime_ns, depois.st_size) == (antes.st_mtime_ns, antes.st_size)
+    assert not fonte_sql.indices_existentes(banco) & set(fonte_sql.INDICES)
+
+
+def test_conexao_somente_leitura_e_reaproveitada(banco):
+    conexao = fonte_sql.conectar(banco)
+    assert fonte_sql.conectar(banco) is conexao
+    with pytest.raises(sqlite3.OperationalError):
+        conexao.execute('CREATE TABLE teste (x int);')
+
+
+def test_cache_em_parquet_reaproveitado(banco, cache):
+    primeira = fonte_sql.renda_por_estado(banco, diretorio_cache=cache)
+    assert any(nome.startswith('renda_estado_') for nome in os.listdir(cache))
+    fonte_sql.limpar_memoria()
+    fonte_sql.fechar_conexoes()
+    pd.testing.assert_frame_equal(fonte_sql.renda_por_estado(banco, diretorio_cache=cache), primeira)
+
+
+def test_criar_indices(banco, cache):
+    esperado = _consulta_original(banco, fonte_sql.CONSULTA_RENDA_ESTADO)
+    assert fonte_sql.criar_indices(banco) == []
+    assert set(fonte_sql.INDICES) <= fonte_sql.indices_existentes(banco)
+    # Criar de novo não faz nada; as consultas continuam iguais.
+    assert fonte_sql.criar_indices(banco) == []
+    pd.testing.assert_frame_equal(fonte_sql.renda_por_estado(banco, diretorio_cache=cache), esperado)
+
+
+def test_criar_indices_fecha_a_conexao_quando_falha(banco, monkeypatch):
+    conexoes = []
+    conectar = sqlite3.connect
+
+    def registrar(*argumentos, **opcoes):
+        conexao = conectar(*argumentos, **opcoes)
+        # A conexão somente leitura de 'conectar' fica aberta de propósito; só a de escrita importa.
+        if not opcoes.get('uri'):
+            conexoes.append(conexao)
+        return conexao
+
+    monkeypatch.setattr(fonte_sql.sqlite3, 'connect', registrar)
+    monkeypatch.setattr(fonte_sql, 'INDICES', {'idx_invalido': 'Tabela_Que_Nao_Existe (coluna)'})
+    with pytest.warns(UserWarning, match='idx_invalido'):
+        assert fonte_sql.criar_indices(banco) == ['idx_invalido']
+    assert conexoes
+    for conexao in conexoes:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conexao.execute('SELECT 1')
+
+
+def test_banco_inexistente(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        fonte_sql.conectar(str(tmp_path / 'nao_existe'))
@@ -0,0 +1,87 @@
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+import graficos
+
+
+@pytest.fixture
+def pares():
+    aleatorio = np.random.default_rng(0)
+    x = aleatorio.uniform(18, 60, 5_000)
+    y = 300 * x + aleatorio.normal(0, 2_000, x.size)
+    x[::50] = np.nan
+    return x, y
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    graficos.limpar_cache_agregados()
+    yield
+    plt.close('all')
+
+
+def test_tendencia_igual_ao_polyfit(pares):
+    x, y = pares
+    validos = ~np.isnan(x)
+    inclinacao, intercepto, r2 = graficos.tendencia_linear(*graficos._pares_validos(x, y))
+    esperado = np.polyfit(x[validos], y[validos], 1)
+    assert (inclinacao, intercepto) == pytest.approx(tuple(esperado))
+    assert r2 == pytest.approx(np.corrcoef(x[validos], y[validos])[0, 1] ** 2)
+
+
+def test_reducoes(pares):
+    x, y = pares
+    n = int((~np.isnan(x)).sum())
+    assert graficos.agregar_dispersao(x, y).tipo == 'pontos'
+    densidade = graficos.agregar_dispersao(x, y, limite=1_000, celulas=(20, 10))
+    assert densidade.tipo == 'densidade' and densidade.contagens.shape == (20, 10)
+    assert densidade.contagens.sum() == densidade.n == n
+    amostra = graficos.agregar_dispersao(x, y, limite=1_000, modo='amostra')
+    assert amostra.tipo == 'pontos' and amostra.x.size == 1_000 and amostra.n == n
+    with pytest.raises(ValueError):
+        graficos.agregar_dispersao(x, y, modo='outro')
+
+
+def test_agregado_em_cache_e_somente_leitura(pares):
+    x, y = pares
+    primeiro = graficos.agregar_dispersao(x, y, limite=1_000)
+    assert graficos.agregar_dispersao(x.copy(), y.copy(), limite=1_000) is primeiro
+    assert graficos.agregar_dispersao(x, y, limite=1_000, celulas=(10, 10)) is not primeiro
+    with pytest.raises(ValueError):
+        primeiro.contagens[0, 0] = 1
+
+
+def test_figura_matplotlib_nova_a_cada_chamada(pares):
+    x, y = pares
+    primeira = graficos.dispersao_matplotlib(x, y, 'Idade x Salário', limite=1_000, tendencia=True)
+    plt.close(primeira)
+    segunda = graficos.dispersao_matplotlib(x, y, 'Idade x Salário', limite=1_000, tendencia=True)
+    assert segunda is not primeira
+    # A figura nova está registrada no pyplot (plt.show / savefig a partir do pyplot funcionam).
+    assert plt.fignum_exists(segunda.number)
+    assert segunda.axes[0].get_title() == 'Idade x Salário'
+
+
+def test_figura_plotly_independente(pares):
+    x, y = pares
+    primeira = graficos.dispersao_plotly(x, y, 'Idade x Salário', limite=1_000)
+    primeira.update_layout(title='Alterado')
+    segunda = graficos.dispersao_plotly(x, y, 'Idade x Salário', limite=1_000)
+    assert segunda is not primeira
+    assert segunda.layout.title.text == 'Idade x Salário'
+    assert [traco.type for traco in segunda.data] == ['heatmap', 'scatter']
+
+
+def test_decimar_serie_mantem_extremos():
+    serie = pd.Series(np.sin(np.linspace(0, 20, 10_000)), index=np.arange(10_000))
+    serie.iloc[1234] = 5.0
+    decimada = graficos.decimar_serie(serie, limite=200)
+    assert len(decimada) <= 200
+    assert decimada.max() == 5.0 and decimada.min() == serie.min()
+    assert decimada.index.is_monotonic_increasing
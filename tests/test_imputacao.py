@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dados_sinteticos
+from imputacao import ESTRATEGIA_PADRAO, ImputadorPorGrupo
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    return dados_sinteticos.gerar_pesquisa(4_000, semente=41)
+
+
+def _original(dados):
+    # Preenchimento do script antes do imputador: um groupby/transform por coluna.
+    dados = dados.copy()
+    media_faixa = dados.groupby('FAIXA IDADE', observed=True)['IDADE'].transform('mean')
+    dados['IDADE'] = dados['IDADE'].fillna(media_faixa).fillna(dados['IDADE'].mean())
+    mediana_faixa = dados.groupby('FAIXA SALARIAL', observed=True)['SALARIO'].transform('median')
+    dados['SALARIO'] = dados['SALARIO'].fillna(mediana_faixa).fillna(dados['SALARIO'].median())
+    return dados
+
+
+def test_ajustar_aplicar_igual_ao_groupby(pesquisa):
+    assert pesquisa['IDADE'].isna().any() and pesquisa['SALARIO'].isna().any()
+    obtido = ImputadorPorGrupo(ESTRATEGIA_PADRAO).ajustar_aplicar(pesquisa)
+    esperado = _original(pesquisa)
+    for coluna in ('IDADE', 'SALARIO'):
+        np.testing.assert_allclose(obtido[coluna].to_numpy(), esperado[coluna].to_numpy())
+    assert pesquisa['IDADE'].isna().any()
+
+
+def test_grupo_sem_estatistica_recebe_reserva():
+    dados = pd.DataFrame({'IDADE': [20.0, 22.0, np.nan, np.nan], 'FAIXA IDADE': ['a', 'a', 'a', 'b']})
+    imputador = ImputadorPorGrupo({'IDADE': {'estatistica': 'mean', 'grupo': 'FAIXA IDADE', 'reserva': 'median'}})
+    assert imputador.ajustar_aplicar(dados)['IDADE'].tolist() == [20.0, 22.0, 21.0, 21.0]
+
+
+def test_estatistica_invalida():
+    with pytest.raises(ValueError):
+        ImputadorPorGrupo({'IDADE': {'estatistica': 'moda', 'grupo': None}})
+    with pytest.raises(RuntimeError):
+        ImputadorPorGrupo().aplicar(pd.DataFrame({'IDADE': [1.0], 'SALARIO': [1.0]}))
+
+
+@pytest.mark.parametrize('grupo', ['GESTOR?', 'NIVEL_CODIGO'])
+def test_salvar_carregar_com_grupo_nao_texto(pesquisa, tmp_path, grupo):
+    dados = pesquisa.assign(**{'GESTOR?': pesquisa['GESTOR?'].astype(bool),
+                               'NIVEL_CODIGO': pesquisa['NIVEL'].cat.codes.astype('int64')})
+    estrategia = {'SALARIO': {'estatistica': 'median', 'grupo': grupo, 'reserva': 'mean'}}
+    ajustado = ImputadorPorGrupo(estrategia).ajustar(dados)
+    caminho = tmp_path / 'imputador.json'
+    ajustado.salvar(caminho)
+    carregado = ImputadorPorGrupo.carregar(caminho)
+    assert json.loads(caminho.read_text(encoding='utf-8'))['estatisticas_grupo']['SALARIO'][0][0] is not None
+    pd.testing.assert_frame_equal(carregado.aplicar(dados), ajustado.aplicar(dados))
+    # Os nulos recebem a estatística do grupo, não a reserva global.
+    preenchidos = carregado.aplicar(dados).loc[dados['SALARIO'].isna(), 'SALARIO']
+    assert (preenchidos != carregado.estatisticas_globais['SALARIO']).any()
+
+
+def test_carregar_formato_antigo(pesquisa):
+    ajustado = ImputadorPorGrupo(ESTRATEGIA_PADRAO).ajustar(pesquisa)
+    conteudo = ajustado.para_dict()
+    conteudo['estatisticas_grupo'] = {coluna: {str(grupo): valor for grupo, valor in pares}
+                                      for coluna, pares in conteudo['estatisticas_grupo'].items()}
+    carregado = ImputadorPorGrupo.de_dict(conteudo)
+    pd.testing.assert_frame_equal(carregado.aplicar(pesquisa), ajustado.aplicar(pesquisa))
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import dados_sinteticos
+import incremental
+from incremental import EstadoIncremental, verificar_recalculo
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    return dados_sinteticos.gerar_pesquisa(4_000, semente=17)
+
+
+def _em_lotes(dados, tamanho):
+    estado = EstadoIncremental()
+    for inicio in range(0, len(dados), tamanho):
+        estado.atualizar(dados.iloc[inicio:inicio + tamanho])
+    return estado
+
+
+def test_lotes_iguais_ao_recalculo_completo(pesquisa):
+    comparacao = verificar_recalculo(_em_lotes(pesquisa, 700), pesquisa)
+    assert comparacao['OK'].all(), comparacao[~comparacao['OK']]
+
+
+def test_combinar_e_salvar(pesquisa, tmp_path):
+    metade = len(pesquisa) // 2
+    estado = _em_lotes(pesquisa.iloc[:metade], 500).combinar(_em_lotes(pesquisa.iloc[metade:], 500))
+    caminho = tmp_path / 'estado.json'
+    estado.salvar(caminho)
+    comparacao = verificar_recalculo(EstadoIncremental.carregar(caminho), pesquisa)
+    assert comparacao['OK'].all(), comparacao[~comparacao['OK']]
+
+
+def test_importar_nao_carrega_scipy():
+    codigo = 'import sys, incremental; print("scipy" in sys.modules)'
+    saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(incremental.__file__))
+    assert saida.stdout.strip() == 'False'
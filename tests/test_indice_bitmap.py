@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dados_sinteticos
+from indice_bitmap import LIMITE_CATEGORIAS, IndiceBitmap
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    return dados_sinteticos.gerar_pesquisa(3_000, semente=11)
+
+
+# 'faixas=8' força bordas por quantis também em 'IDADE'; com 64 o índice de 'IDADE' é exato.
+@pytest.fixture(scope='module', params=[8, 64])
+def indice(request, pesquisa):
+    return IndiceBitmap(pesquisa, faixas=request.param)
+
+
+def _confere(filtro, mascara):
+    esperada = mascara.to_numpy(dtype=bool, na_value=False)
+    np.testing.assert_array_equal(filtro.mascara(), esperada)
+    assert filtro.contagem() == esperada.sum()
+
+
+def test_filtros_da_secao_de_filtragem(pesquisa, indice):
+    idade, salario, genero = pesquisa['IDADE'], pesquisa['SALARIO'], pesquisa['GENERO']
+    mediana = float(salario.median())
+    _confere(indice.igual('GENERO', 'Feminino'), genero == 'Feminino')
+    _confere(indice.contem('GENERO', 'não'), genero.str.contains('não', na=False))
+    _confere(indice.maior('IDADE', 30) & indice.igual('GENERO', 'Feminino'), (idade > 30) & (genero == 'Feminino'))
+    _confere(indice.igual('COR/RACA/ETNIA', 'Amarela') & indice.menor('IDADE', 40),
+             (pesquisa['COR/RACA/ETNIA'] == 'Amarela') & (idade < 40))
+    _confere(indice.maior('SALARIO', mediana) | indice.menor_igual('IDADE', 25), (salario > mediana) | (idade <= 25))
+    _confere(~indice.igual('GENERO', 'Masculino'), ~(genero == 'Masculino'))
+    _confere(indice.em('GENERO', ['Feminino', 'Outro']), genero.isin(['Feminino', 'Outro']))
+    _confere(indice.nulo('IDADE'), idade.isnull())
+
+
+def _limites(indice, coluna, serie):
+    # Bordas do próprio índice, valores entre bordas, extremos e valores fora do intervalo dos dados.
+    bordas = indice.bordas[coluna]
+    entre_bordas = (bordas[:-1] + bordas[1:]) / 2
+    return np.unique(np.concatenate([bordas, entre_bordas, [serie.min() - 1, serie.max() + 1]]))
+
+
+@pytest.mark.parametrize('coluna', ['IDADE', 'SALARIO'])
+def test_comparacoes_nas_bordas(pesquisa, indice, coluna):
+    serie = pesquisa[coluna]
+    for limite in _limites(indice, coluna, serie):
+        _confere(indice.menor(coluna, limite), serie < limite)
+        _confere(indice.menor_igual(coluna, limite), serie <= limite)
+        _confere(indice.maior(coluna, limite), serie > limite)
+        _confere(indice.maior_igual(coluna, limite), serie >= limite)
+
+
+@pytest.mark.parametrize('inclusive', ['both', 'neither', 'left', 'right'])
+@pytest.mark.parametrize('coluna', ['IDADE', 'SALARIO'])
+def test_entre(pesquisa, indice, coluna, inclusive):
+    serie = pesquisa[coluna]
+    limites = _limites(indice, coluna, serie)
+    for minimo, maximo in zip(limites[:-3], limites[3:]):
+        _confere(indice.entre(coluna, minimo, maximo, inclusive=inclusive),
+                 serie.between(minimo, maximo, inclusive=inclusive))
+    # Intervalo de um único valor.
+    valor = indice.bordas[coluna][0]
+    _confere(indice.entre(coluna, valor, valor, inclusive=inclusive), serie.between(valor, valor, inclusive=inclusive))
+
+
+def test_contar_por(pesquisa, indice):
+    selecao = (pesquisa['IDADE'] >= 30) & (pesquisa['GENERO'] == 'Feminino')
+    esperado = pesquisa[selecao]['NIVEL'].value_counts()
+    obtido = (indice.maior_igual('IDADE', 30) & indice.igual('GENERO', 'Feminino')).contar_por('NIVEL')
+    pd.testing.assert_series_equal(obtido.sort_index(), esperado[esperado > 0].sort_index(), check_names=False,
+                                   check_index_type=False, check_categorical=False)
+
+
+def test_selecionar(pesquisa, indice):
+    filtro = indice.igual('COR/RACA/ETNIA', 'Amarela') & indice.menor('IDADE', 40)
+    esperado = pesquisa[(pesquisa['COR/RACA/ETNIA'] == 'Amarela') & (pesquisa['IDADE'] < 40)]
+    pd.testing.assert_frame_equal(indice.selecionar(pesquisa, filtro), esperado)
+
+
+def test_colunas_com_muitos_valores_nao_sao_indexadas_por_padrao():
+    n = 4 * LIMITE_CATEGORIAS
+    dados = pd.DataFrame({'ID': [f'id{i}' for i in range(n)], 'GENERO': ['Feminino', 'Masculino'] * (n // 2)})
+    indice = IndiceBitmap(dados)
+    assert 'ID' not in indice.categoricas and 'GENERO' in indice.categoricas
+    assert 'ID' in IndiceBitmap(dados, categoricas=['ID']).categoricas
@@ -0,0 +1,109 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from instrumentacao import COLUNAS, COLUNAS_HISTORICO, Instrumentacao, carregar_log, comparar_logs
+
+
+def _alocar(megabytes):
+    bloco = np.ones(megabytes * 2 ** 20 // 8)
+    return float(bloco.sum())
+
+
+def test_etapas_aninhadas_guardam_o_pico_da_externa():
+    instrumentacao = Instrumentacao(tracemalloc=True)
+    with instrumentacao.etapa('externa', pd.DataFrame({'A': range(10)})) as externa:
+        # O pico da etapa externa acontece ANTES de a interna começar e zerar os contadores.
+        _alocar(64)
+        with instrumentacao.etapa('interna'):
+            _alocar(1)
+        externa.saida = np.zeros((3, 2))
+    interna, externa = instrumentacao.registros
+    assert [interna['ETAPA'], externa['ETAPA']] == ['interna', 'externa']
+    assert externa['PICO_TRACEMALLOC_MB'] >= 64 > interna['PICO_TRACEMALLOC_MB']
+    assert externa['PICO_RSS_MB'] >= interna['PICO_RSS_MB']
+    assert (externa['LINHAS_ENTRADA'], externa['COLUNAS_ENTRADA']) == (10, 1)
+    assert (externa['LINHAS_SAIDA'], externa['COLUNAS_SAIDA']) == (3, 2)
+
+
+def test_erro_e_decorador():
+    instrumentacao = Instrumentacao()
+
+    @instrumentacao.medir()
+    def dobrar(dados):
+        return pd.concat([dados, dados])
+
+    dobrar(pd.DataFrame({'A': range(4)}))
+    with pytest.raises(KeyError):
+        with instrumentacao.etapa('falha'):
+            raise KeyError('x')
+    medida, falha = instrumentacao.registros
+    assert (medida['ETAPA'], medida['LINHAS_SAIDA']) == ('dobrar', 8)
+    assert falha['ERRO'] == 'KeyError'
+
+
+def test_salvar_json(tmp_path):
+    instrumentacao = Instrumentacao()
+    instrumentacao.secao('primeira')
+    instrumentacao.secao('segunda', pd.DataFrame({'A': [1, 2]}))
+    instrumentacao.secao(None)
+    caminho = instrumentacao.salvar(str(tmp_path / 'log.json'))
+    with open(caminho, encoding='utf-8') as arquivo:
+        conteudo = json.load(arquivo)
+    assert [etapa['ETAPA'] for etapa in conteudo['etapas']] == ['primeira', 'segunda']
+    log = carregar_log(caminho)
+    assert list(log.columns[:len(COLUNAS) + 1]) == ['EXECUCAO'] + COLUNAS
+
+
+def test_salvar_csv_com_detalhes_diferentes(tmp_path):
+    caminho = str(tmp_path / 'historico.csv')
+    primeira = Instrumentacao()
+    with primeira.etapa('gravar'):
+        pass
+    primeira.salvar(caminho)
+    segunda = Instrumentacao()
+    segunda.inicio = 'segunda'
+    with segunda.etapa('limpeza', SITUACAO='executada'):
+        pass
+    with segunda.etapa('gravar'):
+        pass
+    segunda.salvar(caminho)
+
+    historico = carregar_log(caminho)
+    assert list(historico.columns) == COLUNAS_HISTORICO
+    assert historico['ETAPA'].tolist() == ['gravar', 'limpeza', 'gravar']
+    assert json.loads(historico['DETALHES'].iloc[1]) == {'SITUACAO': 'executada'}
+    assert historico['DETALHES'].iloc[[0, 2]].isna().all()
+
+
+def test_historico_antigo_e_convertido(tmp_path):
+    caminho = str(tmp_path / 'historico.csv')
+    antigo = pd.DataFrame([{'EXECUCAO': 'antiga', 'ETAPA': 'limpeza', 'SEGUNDOS': 1.0, 'SITUACAO': 'cache'}])
+    antigo.to_csv(caminho, index=False)
+    Instrumentacao().salvar(caminho)
+    nova = Instrumentacao()
+    with nova.etapa('limpeza'):
+        pass
+    nova.salvar(caminho)
+    historico = pd.read_csv(caminho)
+    assert list(historico.columns) == COLUNAS_HISTORICO
+    assert json.loads(historico['DETALHES'].iloc[0]) == {'SITUACAO': 'cache'}
+    assert len(historico) == 2
+
+
+def _log(execucao, tempos):
+    return pd.DataFrame([{'EXECUCAO': execucao, 'ETAPA': etapa, 'SEGUNDOS': segundos, 'PICO_RSS_MB': 100.0}
+                         for etapa, segundos in tempos])
+
+
+def test_comparar_logs():
+    anterior = _log('a', [('limpeza', 1.0), ('outliers', 0.5), ('rapida', 0.001)])
+    atual = pd.concat([anterior, _log('b', [('limpeza', 1.5), ('outliers', 0.25), ('outliers', 0.3),
+                                            ('rapida', 0.004), ('nova', 1.0)])])
+    comparacao = comparar_logs(atual, anterior).set_index('ETAPA')
+    assert set(comparacao.index) == {'limpeza', 'outliers', 'rapida'}
+    assert comparacao.loc['outliers', 'SEGUNDOS'] == pytest.approx(0.55)
+    assert comparacao['REGRESSAO'].to_dict() == {'limpeza': True, 'outliers': False, 'rapida': False}
+    assert not comparar_logs(atual, anterior, tolerancia=2.0)['REGRESSAO'].any()
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+import dados_sinteticos
+import intervalos
+from intervalos import (distribuicao_bootstrap, intervalo_bootstrap, intervalos_bootstrap, intervalos_t,
+                        intervalos_t_por_dimensoes)
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    dados = dados_sinteticos.gerar_pesquisa(3_000, semente=59)
+    dados['GRUPO_UNICO'] = pd.Series(['a'] * (len(dados) - 1) + ['b'], index=dados.index)
+    return dados
+
+
+def test_intervalos_t_iguais_ao_scipy(pesquisa):
+    resumo = intervalos_t(pesquisa, 'SALARIO', 'GENERO', nivel_confianca=0.9)
+    for grupo, valores in pesquisa.groupby('GENERO', observed=True)['SALARIO']:
+        valores = valores.dropna()
+        inferior, superior = stats.t.interval(0.9, len(valores) - 1, loc=valores.mean(), scale=stats.sem(valores))
+        assert resumo.loc[grupo, 'n'] == len(valores)
+        assert resumo.loc[grupo, 'inferior'] == pytest.approx(inferior)
+        assert resumo.loc[grupo, 'superior'] == pytest.approx(superior)
+
+
+def test_grupo_com_uma_observacao_fica_nulo(pesquisa):
+    resumo = intervalos_t(pesquisa, 'IDADE', 'GRUPO_UNICO')
+    assert resumo.loc['b', 'n'] == 1 and np.isnan(resumo.loc['b', ['inferior', 'superior']]).all()
+    assert np.isfinite(resumo.loc['a', ['inferior', 'superior']].astype(float)).all()
+    por_dimensao = intervalos_t_por_dimensoes(pesquisa, 'SALARIO', ['GENERO', 'NAO_EXISTE'])
+    assert set(por_dimensao.index.get_level_values('DIMENSAO')) == {'GENERO'}
+
+
+def test_bootstrap_igual_ao_laco_original():
+    valores = np.random.default_rng(1).lognormal(8, 1, 300)
+    aleatorio = np.random.default_rng(11)
+    esperado = np.array([np.median(valores[aleatorio.integers(0, valores.size, size=valores.size)])
+                         for _ in range(500)])
+    np.testing.assert_allclose(distribuicao_bootstrap(valores, 'median', 500, semente=11), esperado)
+
+
+def test_bootstrap_em_fatias(monkeypatch):
+    valores = np.random.default_rng(2).normal(size=200)
+    inteiro = distribuicao_bootstrap(valores, 'mean', 300, semente=5)
+    monkeypatch.setattr(intervalos, '_MAXIMO_ELEMENTOS', 1_000)
+    np.testing.assert_allclose(distribuicao_bootstrap(valores, 'mean', 300, semente=5), inteiro)
+
+
+def test_bootstrap_reprodutivel_com_processos():
+    valores = np.append(np.random.default_rng(3).normal(10, 2, 400), np.nan)
+    primeiro = intervalo_bootstrap(valores, 'mean', 1_000, semente=7, processos=2)
+    assert intervalo_bootstrap(valores, 'mean', 1_000, semente=7, processos=2) == primeiro
+    inferior, superior = primeiro
+    assert inferior < np.nanmean(valores) < superior
+    with pytest.raises(ValueError):
+        distribuicao_bootstrap(valores, 'moda')
+
+
+def test_intervalos_bootstrap_por_grupo(pesquisa):
+    sequencial = intervalos_bootstrap(pesquisa, 'SALARIO', 'GENERO', reamostras=200, semente=3)
+    paralelo = intervalos_bootstrap(pesquisa, 'SALARIO', 'GENERO', reamostras=200, semente=3, processos=2)
+    pd.testing.assert_frame_equal(sequencial, paralelo)
+    medianas = pesquisa.groupby('GENERO', observed=True)['SALARIO'].median()
+    np.testing.assert_allclose(sequencial['estimativa'], medianas.loc[sequencial.index])
+    assert (sequencial['inferior'] <= sequencial['estimativa']).all()
+    assert (sequencial['estimativa'] <= sequencial['superior']).all()
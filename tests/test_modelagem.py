@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import KFold
+
+import dados_sinteticos
+import modelagem
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    return dados_sinteticos.gerar_pesquisa(3_000, semente=43)
+
+
+@pytest.fixture(scope='module')
+def regressao(pesquisa):
+    return modelagem.preparar_dados_regressao(pesquisa)
+
+
+def _ajuste_manual(X_treino, y_treino, X_teste):
+    # Imputação, dummies e padronização ajustadas à mão, só com a dobra de treino.
+    medianas = X_treino[modelagem.COLUNAS_NUMERICAS].median()
+    partes_treino = [X_treino[modelagem.COLUNAS_NUMERICAS].fillna(medianas)]
+    partes_teste = [X_teste[modelagem.COLUNAS_NUMERICAS].fillna(medianas)]
+    for coluna in modelagem.COLUNAS_CATEGORICAS:
+        if isinstance(X_treino[coluna].dtype, pd.CategoricalDtype):
+            categorias = list(X_treino[coluna].cat.categories)
+        else:
+            categorias = sorted(X_treino[coluna].dropna().unique(), key=str)
+        for X, partes in ((X_treino, partes_treino), (X_teste, partes_teste)):
+            valores = pd.Categorical(X[coluna].astype(object), categories=categorias)
+            partes.append(pd.get_dummies(valores, drop_first=True, dtype=float).set_index(X.index))
+    treino = pd.concat(partes_treino, axis=1).to_numpy(dtype=float)
+    teste = pd.concat(partes_teste, axis=1).to_numpy(dtype=float)
+    media, desvio = treino.mean(axis=0), treino.std(axis=0)
+    desvio[desvio == 0] = 1.0
+    regressor = LinearRegression().fit((treino - media) / desvio, y_treino)
+    return medianas, media, regressor.predict((teste - media) / desvio)
+
+
+def test_escala_e_imputacao_ajustadas_so_no_treino(regressao):
+    X, y = regressao
+    treino, teste = next(KFold(n_splits=5, shuffle=True, random_state=42).split(X))
+    modelo = modelagem.criar_modelo('linear').fit(X.iloc[treino], y.iloc[treino])
+    medianas, media, previsto = _ajuste_manual(X.iloc[treino], y.iloc[treino], X.iloc[teste])
+
+    imputador = modelo.named_steps['colunas'].named_transformers_['numericas']
+    np.testing.assert_allclose(imputador.statistics_, medianas.to_numpy())
+    np.testing.assert_allclose(modelo.named_steps['padronizacao'].mean_, media)
+    # Com o scaler ajustado em todas as linhas, a média seria outra.
+    media_completa = X[modelagem.COLUNAS_NUMERICAS].fillna(medianas).mean().to_numpy()
+    assert not np.allclose(media[:len(media_completa)], media_completa)
+    np.testing.assert_allclose(modelo.predict(X.iloc[teste]), previsto, rtol=1e-6)
+
+    dobra = modelagem._avaliar_dobra('linear', np.nan, X, y, treino, teste)
+    assert dobra['MSE'] == pytest.approx(np.mean((y.iloc[teste].to_numpy() - previsto) ** 2), rel=1e-6)
+
+
+def test_tabela_da_validacao_cruzada(regressao):
+    X, y = regressao
+    grade = [0.1, 10.0]
+    resultados = modelagem.validar_modelos(X, y, grade_alpha=grade, dobras=3, n_jobs=1)
+    assert list(resultados.columns) == ['MODELO', 'ALPHA', 'MSE', 'MSE_DESVIO', 'MAE', 'R2', 'SEGUNDOS_AJUSTE',
+                                        'SEGUNDOS_PREVISAO']
+    assert len(resultados) == len(modelagem.candidatos(grade)) == 5
+    assert resultados['MSE'].is_monotonic_increasing
+    assert set(resultados['MODELO']) == {'linear', 'ridge', 'lasso'}
+    assert resultados.loc[resultados['MODELO'] == 'linear', 'ALPHA'].isna().all()
+
+
+def test_salvar_carregar_e_prever_com_categorias_novas(pesquisa, regressao, tmp_path):
+    X, y = regressao
+    modelo = modelagem.criar_modelo('ridge', alpha=1.0).fit(X, y)
+    caminho = tmp_path / 'modelo.joblib'
+    modelagem.salvar_modelo(modelo, caminho)
+    carregado = modelagem.carregar_modelo(caminho)
+
+    novos = pesquisa.head(500).copy()
+    novos['SETOR'] = novos['SETOR'].astype(object)
+    novos.loc[novos.index[:50], 'SETOR'] = 'Setor que não existia'
+    novos.loc[novos.index[50:100], 'SETOR'] = np.nan
+    previsto = modelagem.prever(carregado, novos, tamanho_lote=128)
+    assert previsto.index.equals(novos.index) and previsto.name == 'SALARIO_PREVISTO'
+    assert np.isfinite(previsto).all()
+    np.testing.assert_allclose(previsto, modelo.predict(modelagem.preparar_atributos(novos)))
+    # Categoria nova e nulo ficam com zeros nas dummies de 'SETOR': mesma previsão.
+    iguais = novos.iloc[[0, 0]].assign(SETOR=[np.nan, 'Setor que não existia'])
+    comparacao = modelagem.prever(carregado, iguais)
+    assert comparacao.iloc[0] == pytest.approx(comparacao.iloc[1])
+
+
+def test_modelo_desconhecido():
+    with pytest.raises(ValueError):
+        modelagem.criar_modelo('arvore')
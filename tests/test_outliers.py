@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cache_colunar
+import dados_sinteticos
+from outliers import calcular_limites, medias_por_faixa, substituir_outliers, tratar_outliers
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    return dados_sinteticos.gerar_pesquisa(5_000, semente=23)
+
+
+def _blocos(dados, tamanho):
+    return [dados.iloc[inicio:inicio + tamanho] for inicio in range(0, len(dados), tamanho)]
+
+
+def test_quartis_exatos_com_k_none(pesquisa):
+    salario = pesquisa['SALARIO']
+    for blocos in (pesquisa, _blocos(pesquisa, 700)):
+        limites = calcular_limites(blocos, k=None)
+        assert limites['Q1'] == salario.quantile(0.25)
+        assert limites['Q3'] == salario.quantile(0.75)
+        assert limites['n'] == salario.count()
+
+
+def test_quartis_aproximados_com_k_padrao(pesquisa):
+    limites = calcular_limites(_blocos(pesquisa, 700))
+    exatos = calcular_limites(pesquisa, k=None)
+    escala = exatos['IIQ']
+    assert abs(limites['Q1'] - exatos['Q1']) < 0.1 * escala
+    assert abs(limites['Q3'] - exatos['Q3']) < 0.1 * escala
+
+
+def test_tres_sigma_exato_com_qualquer_k(pesquisa):
+    salario = pesquisa['SALARIO']
+    esperado = (salario.mean() - 3 * salario.std(), salario.mean() + 3 * salario.std())
+    for k in (None, 512, 16):
+        inferior, superior = calcular_limites(_blocos(pesquisa, 700), k=k)['3sigma']
+        assert inferior == pytest.approx(esperado[0])
+        assert superior == pytest.approx(esperado[1])
+
+
+def test_coluna_vazia():
+    limites = calcular_limites(pd.DataFrame({'SALARIO': [np.nan, np.nan]}), k=None)
+    assert limites['n'] == 0
+    assert np.isnan(limites['Q1']) and np.isnan(limites['Q3'])
+
+
+def test_substituir_outliers_usa_media_da_faixa():
+    bloco = pd.DataFrame({
+        'SALARIO': [10.0, 12.0, 1000.0, 20.0, -50.0, np.nan],
+        'FAIXA SALARIAL': ['a', 'a', 'a', 'b', 'c', 'a'],
+    })
+    limites = (0.0, 100.0)
+    medias = medias_por_faixa(bloco, limites)
+    tratado = substituir_outliers(bloco, limites, medias)
+    # 'a' recebe a média dos valores válidos; 'c' não tem média e é limitado ao intervalo.
+    assert tratado['SALARIO'].tolist()[:5] == [10.0, 12.0, 11.0, 20.0, 0.0]
+    assert np.isnan(tratado['SALARIO'].iloc[5])
+    assert bloco['SALARIO'].iloc[2] == 1000.0
+
+
+def test_tratar_outliers_em_blocos_igual_ao_bloco_unico(pesquisa):
+    _, inteiro = tratar_outliers(pesquisa, metodo='3sigma')
+    _, em_blocos = tratar_outliers(_blocos(pesquisa, 700), metodo='3sigma')
+    pd.testing.assert_frame_equal(pd.concat(list(inteiro)), pd.concat(list(em_blocos)))
+
+
+def test_metodo_desconhecido(pesquisa):
+    with pytest.raises(ValueError):
+        tratar_outliers(pesquisa, metodo='mad')
+
+
+def test_tratar_outliers_lendo_arquivo_em_blocos(pesquisa, tmp_path):
+    caminho = str(tmp_path / 'pesquisa.csv')
+    pesquisa[['SALARIO', 'FAIXA SALARIAL']].to_csv(caminho, index=False)
+    limites, tratados = tratar_outliers(lambda: cache_colunar.ler_em_blocos(caminho, tamanho_bloco=700))
+    tratados = list(tratados)
+    assert len(tratados) > 1
+    assert sum(len(bloco) for bloco in tratados) == len(pesquisa)
+    assert limites['n'] == pesquisa['SALARIO'].count()
+
+
+def test_iterador_de_uma_passada_e_recusado(pesquisa, tmp_path):
+    caminho = str(tmp_path / 'pesquisa.csv')
+    pesquisa[['SALARIO', 'FAIXA SALARIAL']].to_csv(caminho, index=False)
+    with pytest.raises(TypeError):
+        tratar_outliers(cache_colunar.ler_em_blocos(caminho, tamanho_bloco=700))
+    with pytest.raises(TypeError):
+        calcular_limites(iter(_blocos(pesquisa, 700)))
@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dados_sinteticos
+from perfil import comparar_perfis, perfilar
+from resumos import EsbocoQuantis, valor_nativo
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    return dados_sinteticos.gerar_pesquisa(6_000, semente=29)
+
+
+def test_esboco_nao_depende_do_tamanho_dos_blocos():
+    valores = np.random.default_rng(3).lognormal(8, 1, 20_000)
+    quantis = []
+    for tamanho in (1, 333, 1_000, 7_919, len(valores)):
+        esboco = EsbocoQuantis(k=256, semente=0)
+        for inicio in range(0, len(valores), tamanho):
+            esboco.atualizar(valores[inicio:inicio + tamanho])
+        quantis.append(esboco.quantil([0.1, 0.5, 0.9]))
+    for outros in quantis[1:]:
+        np.testing.assert_array_equal(quantis[0], outros)
+
+
+def test_esboco_exato_ate_k_e_pendentes_gravados():
+    esboco = EsbocoQuantis(k=100, semente=0).atualizar(np.arange(80.0))
+    assert esboco.quantil(0.5) == pd.Series(np.arange(80.0)).quantile(0.5)
+    copia = EsbocoQuantis.de_dict(json.loads(json.dumps(esboco.para_dict())), semente=0)
+    assert copia.quantil(0.5) == esboco.quantil(0.5)
+
+
+def test_mesmo_perfil_com_blocos_diferentes(pesquisa):
+    pequenos = perfilar(pesquisa, tamanho_bloco=500).relatorio()
+    grandes = perfilar(pesquisa, tamanho_bloco=4_000).relatorio()
+    assert comparar_perfis(pequenos, grandes).empty
+    for coluna in ('ID', 'SALARIO'):
+        assert pequenos['colunas'][coluna]['numerico']['quantis'] == grandes['colunas'][coluna]['numerico']['quantis']
+
+
+def test_perfil_confere_com_pandas(pesquisa):
+    relatorio = perfilar(pesquisa, tamanho_bloco=1_000).relatorio()
+    idade = relatorio['colunas']['IDADE']
+    assert idade['nulos'] == pesquisa['IDADE'].isna().sum()
+    assert idade['numerico']['media'] == pytest.approx(pesquisa['IDADE'].mean())
+    assert idade['numerico']['desvio'] == pytest.approx(pesquisa['IDADE'].std())
+    contagens = pesquisa['NIVEL'].value_counts()
+    assert relatorio['colunas']['NIVEL']['mais_frequentes'][0] == [contagens.index[0], int(contagens.iloc[0])]
+
+
+def test_comparar_perfis_aponta_mudancas(pesquisa):
+    anterior = perfilar(pesquisa).relatorio()
+    alterada = pesquisa.assign(SALARIO=pesquisa['SALARIO'] * 2).drop(columns=['NIVEL'])
+    diferencas = comparar_perfis(anterior, perfilar(alterada).relatorio())
+    assert {'media', 'mediana'} <= set(diferencas.loc[diferencas['COLUNA'] == 'SALARIO', 'METRICA'])
+    assert (diferencas.loc[diferencas['COLUNA'] == 'NIVEL', 'METRICA'] == 'coluna').all()
+
+
+def test_valor_nativo():
+    assert type(valor_nativo(np.int64(3))) is int
+    assert type(valor_nativo(np.float64(1.5))) is float
+    assert valor_nativo('a') == 'a'
@@ -0,0 +1,80 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+import pipeline
+from pipeline import Etapa, Pipeline, dependencias_locais
+
+
+@pytest.fixture
+def projeto(tmp_path, monkeypatch):
+    # Projeto mínimo: a etapa usa 'modulo_a', que importa 'modulo_b' dentro de uma função.
+    (tmp_path / 'modulo_b.py').write_text('FATOR = 2\n', encoding='utf-8')
+    (tmp_path / 'modulo_a.py').write_text(
+        'def dobrar(valor):\n'
+        '    from modulo_b import FATOR\n'
+        '    return valor * FATOR\n', encoding='utf-8')
+    (tmp_path / 'etapas_teste.py').write_text(
+        'import json\n'
+        'import modulo_a\n\n\n'
+        'def ler(caminho):\n'
+        '    with open(caminho, encoding="utf-8") as arquivo:\n'
+        '        return int(arquivo.read())\n\n\n'
+        'def dobrar(valor):\n'
+        '    return modulo_a.dobrar(valor)\n', encoding='utf-8')
+    (tmp_path / 'entrada.txt').write_text('21', encoding='utf-8')
+    monkeypatch.setattr(pipeline, 'DIRETORIO_PROJETO', str(tmp_path))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for nome in ('etapas_teste', 'modulo_a', 'modulo_b'):
+        monkeypatch.delitem(sys.modules, nome, raising=False)
+    etapas = importlib.import_module('etapas_teste')
+    criar = lambda: Pipeline([Etapa('valor', etapas.ler, ['entrada']), Etapa('dobro', etapas.dobrar, ['valor'])],
+                             diretorio_cache=str(tmp_path / 'cache'))
+    return tmp_path, criar
+
+
+def _situacoes(relatorio):
+    return dict(zip(relatorio['ETAPA'], relatorio['SITUACAO']))
+
+
+def test_dependencias_transitivas_entram_no_hash(projeto):
+    diretorio, criar = projeto
+    etapa = criar().etapas['dobro']
+    assert [os.path.basename(arquivo) for arquivo in dependencias_locais(etapa._arquivos_usados())] == \
+        ['modulo_a.py', 'modulo_b.py']
+
+    antes = etapa.hash_codigo()
+    (diretorio / 'modulo_b.py').write_text('FATOR = 3\n', encoding='utf-8')
+    assert etapa.hash_codigo() != antes
+
+
+def test_cache_invalidado_por_modulo_importado_indiretamente(projeto):
+    diretorio, criar = projeto
+    fontes = {'entrada': str(diretorio / 'entrada.txt')}
+    resultados, relatorio = criar().executar(fontes, alvos=['dobro'])
+    assert resultados['dobro'] == 42
+    assert set(_situacoes(relatorio).values()) == {'calculada'}
+
+    _, relatorio = criar().executar(fontes, alvos=['dobro'])
+    assert _situacoes(relatorio) == {'dobro': 'cache'}
+
+    (diretorio / 'modulo_b.py').write_text('FATOR = 3\n', encoding='utf-8')
+    _, relatorio = criar().executar(fontes, alvos=['dobro'])
+    assert _situacoes(relatorio) == {'valor': 'cache', 'dobro': 'calculada'}
+
+
+def test_etapas_da_analise_incluem_extracao_flags():
+    import etapas_analise
+
+    etapas = etapas_analise.criar_pipeline_analise().etapas
+    for nome in ('faltantes', 'outliers', 'estado_incremental'):
+        arquivos = {os.path.basename(arquivo) for arquivo in dependencias_locais(etapas[nome]._arquivos_usados())}
+        assert 'extracao_flags.py' in arquivos, nome
+
+
+def test_dependencia_circular(tmp_path):
+    etapas = [Etapa('a', lambda b: b, ['b']), Etapa('b', lambda a: a, ['a'])]
+    with pytest.raises(ValueError):
+        Pipeline(etapas, diretorio_cache=str(tmp_path)).executar({}, alvos=['a'])
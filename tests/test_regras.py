@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dados_sinteticos
+import regras
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    return dados_sinteticos.gerar_pesquisa(2_000, semente=7)
+
+
+def _iguais(esperado, obtido):
+    return esperado.astype(object).equals(obtido.astype(object))
+
+
+def test_novo_nivel_equivale_a_funcao_original(pesquisa):
+    esperado = pesquisa.apply(lambda x: regras.preencher_nivel(x['GESTOR?'], x['NIVEL']), axis=1)
+    obtido = regras.aplicar_regra(pesquisa, regras.REGRA_NOVO_NIVEL)
+    assert _iguais(esperado, obtido)
+
+
+def test_novo_nivel_com_nulos():
+    dados = pd.DataFrame({
+        'GESTOR?': [1, 0, np.nan, 1, 0],
+        'NIVEL': ['Júnior', np.nan, 'Sênior', np.nan, 'Pleno'],
+    })
+    esperado = dados.apply(lambda x: regras.preencher_nivel(x['GESTOR?'], x['NIVEL']), axis=1)
+    obtido = regras.aplicar_regra(dados, regras.REGRA_NOVO_NIVEL)
+    assert _iguais(esperado, obtido)
+    assert obtido[0] == 'Pessoa gestora' and pd.isna(obtido[1])
+
+
+def test_geracao_equivale_a_funcao_original(pesquisa):
+    esperado = pesquisa['IDADE'].apply(regras.determinar_geracao)
+    obtido = regras.aplicar_regra(pesquisa, regras.REGRA_GERACAO)
+    assert _iguais(esperado, obtido)
+
+
+@pytest.mark.parametrize('idade', [18, 19, 19.5, 20, 29, 29.5, 30, 39, 39.5, 40, 58, 58.5, 59, 80])
+def test_geracao_nas_bordas_das_faixas(idade):
+    dados = pd.DataFrame({'IDADE': [idade]})
+    obtido = regras.aplicar_regra(dados, regras.REGRA_GERACAO)
+    assert obtido.iloc[0] == regras.determinar_geracao(idade)
+
+
+def test_geracao_com_idade_nula():
+    dados = pd.DataFrame({'IDADE': [np.nan, 25.0, None]})
+    esperado = dados['IDADE'].apply(regras.determinar_geracao)
+    obtido = regras.aplicar_regra(dados, regras.REGRA_GERACAO)
+    assert _iguais(esperado, obtido)
+    assert obtido.iloc[0] == 'Geração Alpha'
+
+
+def test_nivel_de_ensino_equivale_a_funcao_original():
+    dados = pd.DataFrame({'NIVEL DE ENSINO': regras.REGRA_NIVEL_ENSINO['categorias'] + ['Outro', np.nan]})
+    esperado = dados['NIVEL DE ENSINO'].apply(regras.nivel_de_ensino_ordinal)
+    obtido = regras.aplicar_regra(dados, regras.REGRA_NIVEL_ENSINO)
+    assert esperado.tolist() == obtido.tolist()
+
+
+def test_tipo_de_regra_desconhecido():
+    with pytest.raises(ValueError):
+        regras.compilar_regra({'tipo': 'inexistente'})
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+import dados_sinteticos
+from modelagem import COLUNAS_CATEGORICAS, COLUNAS_NUMERICAS, preparar_dados_regressao
+from regressao_incremental import RegressaoIncremental
+
+
+@pytest.fixture(scope='module')
+def pesquisa():
+    return dados_sinteticos.gerar_pesquisa(5_000, semente=3)
+
+
+def _ajustar(dados, tamanho_bloco):
+    regressao = RegressaoIncremental()
+    for inicio in range(0, len(dados), tamanho_bloco):
+        regressao.atualizar(dados.iloc[inicio:inicio + tamanho_bloco])
+    return regressao
+
+
+@pytest.fixture(scope='module')
+def referencia(pesquisa):
+    # Mesmo ajuste do notebook, em memória: linhas completas e 'get_dummies' com 'drop_first'.
+    X, y = preparar_dados_regressao(pesquisa)
+    completos = X[COLUNAS_NUMERICAS].notna().all(axis=1)
+    X, y = X[completos], y[completos]
+    matriz = pd.get_dummies(X, columns=COLUNAS_CATEGORICAS, drop_first=True, dtype=float)
+    return matriz, y, LinearRegression().fit(matriz, y)
+
+
+@pytest.mark.parametrize('tamanho_bloco', [700, 5_000])
+def test_coeficientes_iguais_ao_linear_regression(pesquisa, referencia, tamanho_bloco):
+    matriz, y, modelo = referencia
+    regressao = _ajustar(pesquisa, tamanho_bloco)
+    resultado = regressao.resolver()
+
+    assert set(resultado.index) == set(matriz.columns)
+    coeficientes = resultado['COEFICIENTE'].reindex(matriz.columns).to_numpy()
+    np.testing.assert_allclose(coeficientes, modelo.coef_, rtol=1e-6, atol=1e-6 * np.abs(modelo.coef_).max())
+    assert regressao.intercepto == pytest.approx(modelo.intercept_, rel=1e-6)
+    assert regressao.r2 == pytest.approx(modelo.score(matriz, y), abs=1e-9)
+
+
+def test_combinar_equivale_ao_ajuste_unico(pesquisa):
+    metade = len(pesquisa) // 2
+    combinada = _ajustar(pesquisa.iloc[:metade], 1_000).combinar(_ajustar(pesquisa.iloc[metade:], 1_000))
+    unica = _ajustar(pesquisa, 1_000)
+
+    esperado = unica.resolver()
+    obtido = combinada.resolver().reindex(esperado.index)
+    np.testing.assert_allclose(obtido['COEFICIENTE'], esperado['COEFICIENTE'], rtol=1e-6, atol=1e-6)
+    assert combinada.n == unica.n
+
+
+def test_salvar_e_carregar(pesquisa, tmp_path):
+    regressao = _ajustar(pesquisa, 1_000)
+    caminho = tmp_path / 'regressao.json'
+    regressao.salvar(caminho)
+    carregada = RegressaoIncremental.carregar(caminho)
+
+    pd.testing.assert_frame_equal(carregada.resolver(), regressao.resolver())
+    pd.testing.assert_series_equal(carregada.prever(pesquisa), regressao.prever(pesquisa))
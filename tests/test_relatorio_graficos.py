@@ -0,0 +1,61 @@
+import os
+import re
+
+import pytest
+
+import dados_sinteticos
+import relatorio_graficos
+
+
+@pytest.fixture(scope='module')
+def agregados():
+    return relatorio_graficos.calcular_agregados(dados_sinteticos.gerar_pesquisa(2_000, semente=47))
+
+
+@pytest.mark.parametrize('processos', [1, 2])
+def test_gerar_relatorio(agregados, tmp_path, processos):
+    diretorio = str(tmp_path / 'relatorio')
+    resumo = relatorio_graficos.gerar_relatorio(agregados, diretorio, formatos=('png', 'html'), processos=processos)
+    assert list(resumo['GRAFICO']) == [grafico.nome for grafico in relatorio_graficos.GRAFICOS]
+
+    for grafico in relatorio_graficos.GRAFICOS:
+        esperado = 'html' if grafico.biblioteca == 'plotly' else 'png'
+        caminho = os.path.join(diretorio, f'{grafico.nome}.{esperado}')
+        assert os.path.getsize(caminho) > 0
+
+    indice = open(os.path.join(diretorio, 'index.html'), encoding='utf-8').read()
+    for grafico in relatorio_graficos.GRAFICOS:
+        assert grafico.nome in indice
+
+    # Uma única cópia da biblioteca JavaScript, referenciada pelas páginas em vez de embutida.
+    scripts = [nome for nome in os.listdir(diretorio) if nome.endswith('.js')]
+    assert scripts == [relatorio_graficos.ARQUIVO_PLOTLYJS]
+    tamanho_biblioteca = os.path.getsize(os.path.join(diretorio, relatorio_graficos.ARQUIVO_PLOTLYJS))
+    for grafico in relatorio_graficos.GRAFICOS:
+        if grafico.biblioteca != 'plotly':
+            continue
+        pagina = os.path.join(diretorio, f'{grafico.nome}.html')
+        assert re.search(r'<script[^>]* src="plotly\.min\.js"', open(pagina, encoding='utf-8').read())
+        assert os.path.getsize(pagina) < tamanho_biblioteca / 10
+
+
+def test_biblioteca_gravada_uma_vez(agregados, tmp_path, monkeypatch):
+    import plotly.io._html
+    import plotly.offline
+
+    original = plotly.offline.get_plotlyjs
+    chamadas = []
+
+    def contar():
+        chamadas.append(1)
+        return original()
+
+    monkeypatch.setattr(plotly.offline, 'get_plotlyjs', contar)
+    monkeypatch.setattr(plotly.io._html, 'get_plotlyjs', contar)
+    relatorio_graficos.gerar_relatorio(agregados, str(tmp_path), formatos=('html',), processos=1)
+    assert len(chamadas) == 1
+
+
+def test_agregado_ausente(agregados, tmp_path):
+    with pytest.raises(KeyError):
+        relatorio_graficos.gerar_relatorio({'genero_counts': agregados['genero_counts']}, str(tmp_path))